@@ -0,0 +1,155 @@
+"""
+Бенчмарк записи и воспроизведения схваток (core.bout_recorder) без Qt и сети.
+
+Модель панели проводит схватки 2×3 мин с перерывом: случайные приёмы,
+предупреждения, отмены, паузы судьи; scoreboard_update рассылается так же,
+как ControlPanel.send_scoreboard_update (ClockPublisher + отсечка по
+изменению), и пишется BoutRecorder во временный каталог. Затем каждая
+запись проигрывается в HeadlessScoreboard:
+- на 100× с моделью времени (без реальных пауз) — табло должно показать
+  тот же счёт и время, что было на панели в моменты сообщений;
+- без пауз — скорость чтения и разбора записей.
+Считается размер записи (байт на схватку, против полных сообщений).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_bout_replay [--bouts 100]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from core.bout_recorder import (
+    REC_EVENT, REC_UNDO, BoutRecorder, BoutReplay, HeadlessScoreboard, replay_to_scoreboard,
+)
+from core.commands import CommandStack
+from core.match_clock import MatchClock
+from core.rules import BLUE, EVENT_CAUTION, EVENT_POINTS, RED, ScoringEvent
+from core.scoreboard_clock import ClockPublisher
+from core.sport_loader import SportLoader
+
+
+def record_bout(path, engine, rng):
+    """Модель панели; возвращает (число полных сообщений, их размер, ожидаемые показания)."""
+    now = {"t": 5000.0 + rng.uniform(0, 1000)}
+    clock = lambda: now["t"]
+    recorder = BoutRecorder(path, header={"mat": 1, "red": "Иванов", "blue": "Петров"}, clock=clock)
+    publisher = ClockPublisher()
+    state = engine.new_bout()
+    stack = CommandStack()
+    period_clock = MatchClock(engine.rules.period_duration, clock=clock)
+    last = {"signature": None, "sent": -1e9}
+    full_bytes = 0
+    messages = 0
+    expected = []
+
+    def send(period):
+        nonlocal full_bytes, messages
+        data = {
+            "type": "scoreboard_update", "mat": 1, "category": "Юноши 12-13 лет, 42 кг",
+            "red": {"name": "Иванов", "region": "Казань", "points": state.red.points,
+                    "cautions": state.red.cautions, "passivity": state.red.passivity},
+            "blue": {"name": "Петров", "region": "Уфа", "points": state.blue.points,
+                     "cautions": state.blue.cautions, "passivity": state.blue.passivity},
+            "period": period, "time_remaining": period_clock.seconds(), "is_break": False,
+            "break_time_remaining": 0, "opponent_wait_time": 0,
+        }
+        transition = publisher.observe(period_clock.running, period_clock.remaining(), period, False, now=now["t"])
+        signature = json.dumps({k: v for k, v in data.items() if k != "time_remaining"}, sort_keys=True)
+        if transition is None and signature == last["signature"] and now["t"] - last["sent"] < 5.0:
+            return
+        last["signature"], last["sent"] = signature, now["t"]
+        data["clock"] = publisher.state
+        recorder.board(data)
+        full_bytes += len(json.dumps(data, ensure_ascii=False))
+        messages += 1
+        expected.append((round(now["t"] - recorder.t0, 4), state.red.points, state.blue.points,
+                         period_clock.seconds()))
+
+    for period in range(1, engine.rules.periods + 1):
+        period_clock.reset()
+        period_clock.start(now=now["t"])
+        while period_clock.running and not state.finished:
+            now["t"] += 0.05
+            period_clock.poll()
+            roll = rng.random()
+            if roll < 0.002:
+                corner = rng.choice((RED, BLUE))
+                event = ScoringEvent(EVENT_POINTS, corner, points=rng.choice((1, 2, 4)))
+                stack.execute(engine, state, event)
+                recorder.record(REC_EVENT, event=event.to_dict())
+            elif roll < 0.0025:
+                event = ScoringEvent(EVENT_CAUTION, rng.choice((RED, BLUE)))
+                stack.execute(engine, state, event)
+                recorder.record(REC_EVENT, event=event.to_dict())
+            elif roll < 0.0028 and stack.can_undo:
+                recorder.record(REC_UNDO, event=stack.undo(state).event.to_dict())
+            elif roll < 0.0032:
+                period_clock.pause(now=now["t"])
+                send(period)
+                now["t"] += rng.uniform(2, 20)
+                period_clock.start(now=now["t"])
+            send(period)
+        if state.finished:
+            period_clock.pause(now=now["t"])
+            send(period)
+            break
+        now["t"] += engine.rules.break_duration
+    recorder.close()
+    return messages, full_bytes, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк записи и воспроизведения схваток")
+    parser.add_argument("--bouts", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = SportLoader.load_rules("greco_roman")
+    rng = random.Random(8)
+    with tempfile.TemporaryDirectory() as directory:
+        paths, expectations = [], []
+        messages = full_bytes = 0
+        for i in range(args.bouts):
+            path = os.path.join(directory, f"bout{i}.jsonl")
+            sent, size, expected = record_bout(path, engine, rng)
+            messages += sent
+            full_bytes += size
+            paths.append(path)
+            expectations.append(expected)
+        recorded_bytes = sum(os.path.getsize(p) for p in paths)
+        print(f"Схваток {args.bouts}, сообщений табло {messages}: "
+              f"запись {recorded_bytes / args.bouts / 1024:.1f} КБ/схватку, "
+              f"полные сообщения {full_bytes / args.bouts / 1024:.1f} КБ/схватку")
+
+        # 100× на модели времени: проверяем показания табло в моменты сообщений
+        mismatches = frames_total = 0
+        recorded_seconds = 0.0
+        for path, expected in zip(paths, expectations):
+            fake = {"t": 0.0}
+            replay = BoutReplay(path, speed=100.0, clock=lambda: fake["t"],
+                                sleep=lambda s: fake.__setitem__("t", fake["t"] + s))
+            frames = replay_to_scoreboard(replay, HeadlessScoreboard(mat=1, clock=replay.now))
+            recorded_seconds += replay.duration
+            frames_total += len(frames)
+            for frame, (t, red, blue, seconds) in zip(frames, expected):
+                shown = frame["time"].split(":")
+                if (frame["red"]["points"], frame["blue"]["points"]) != (red, blue) or \
+                        int(shown[0]) * 60 + int(shown[1]) != seconds or abs(frame["t"] - t) > 1e-3:
+                    mismatches += 1
+        print(f"100×: {recorded_seconds / 100:.1f} с воспроизведения вместо {recorded_seconds:.0f} с, "
+              f"расхождений с панелью {mismatches} из {frames_total}")
+
+        start = time.perf_counter()
+        records = 0
+        for path in paths:
+            replay = BoutReplay(path, speed=None)
+            frames = replay_to_scoreboard(replay, HeadlessScoreboard(mat=1, clock=replay.now))
+            records += len(replay.records)
+        elapsed = time.perf_counter() - start
+        print(f"без пауз: {args.bouts / elapsed:,.0f} схваток/с, {records / elapsed:,.0f} записей/с")
+
+
+if __name__ == "__main__":
+    main()
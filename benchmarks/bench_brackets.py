@@ -0,0 +1,74 @@
+"""
+Бенчмарк пакетного построения сеток (core.utils.create_brackets_batch).
+
+Синтетический турнир из 300 категорий; сравнивается построение по одной
+категории (create_bracket, настройки разведения читаются на каждую сетку)
+и пакетом. Пула процессов нет: на этих объёмах его запуск дороже самого
+построения.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_brackets [--categories 300] [--repeat 3]
+"""
+import argparse
+import copy
+import random
+import time
+
+from core.utils import create_bracket, create_brackets_batch
+
+
+def make_synthetic_categories(n_categories, seed=42):
+    rng = random.Random(seed)
+    categories = {}
+    for c in range(n_categories):
+        size = rng.choice([2, 3, 4, 5, 6, 8, 12, 16, 24, 32])
+        participants = [
+            {
+                "name": f"Участник {c}-{i}",
+                "club": f"Клуб {rng.randint(1, 40)}",
+                "rank": rng.choice(["Нет", "1 юн.", "3 сп.", "КМС"]),
+                "weight": round(rng.uniform(20, 90), 1),
+            }
+            for i in range(size)
+        ]
+        categories[f"{20 + c} кг"] = {"participants": participants, "matches": []}
+    return categories
+
+
+def one_by_one(data):
+    for name, category in data.items():
+        bracket = create_bracket(category["participants"], name)
+        category["matches"] = bracket["matches"]
+        category["type"] = bracket["type"]
+
+
+def run(categories, build, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        data = copy.deepcopy(categories)
+        start = time.perf_counter()
+        build(data)
+        best = min(best, time.perf_counter() - start)
+    return best, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пакетного построения сеток")
+    parser.add_argument("--categories", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    categories = make_synthetic_categories(args.categories)
+    total = sum(len(c["participants"]) for c in categories.values())
+    print(f"Категорий: {len(categories)}, участников: {total}")
+
+    single_time, reference = run(categories, one_by_one, args.repeat)
+    print(f"по одной категории: {single_time * 1000:8.1f} мс")
+    batch_time, data = run(categories, create_brackets_batch, args.repeat)
+    same = all(data[k]["matches"] == reference[k]["matches"] for k in reference)
+    print(f"пакетом:            {batch_time * 1000:8.1f} мс, ускорение x{single_time / batch_time:.2f}, "
+          f"результат совпадает: {same}")
+
+
+if __name__ == "__main__":
+    main()
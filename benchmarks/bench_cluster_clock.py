@@ -0,0 +1,110 @@
+"""
+Бенчмарк часов кластера (core.cluster_clock) на модели без сети.
+
+Часы узла ковра отстают от координатора на 93 с и уходят на 200 ppm;
+задержка сети 1–15 мс в каждую сторону, несимметричная, с редкими
+всплесками до 250 мс (очередь Wi-Fi, занятый UI-поток). Узел шлёт пробы
+на каждом heartbeat (3 с) 20 минут. Сравниваются:
+- локальное время узла (как сейчас: time.time() на каждом ПК);
+- смещение по последнему heartbeat (время приёма − ts отправителя);
+- оценка ClusterClock (медиана проб с наименьшей задержкой + skew).
+Считается расхождение с часами координатора раз в секунду после первой
+пробы и число случаев, когда время кластера пошло назад.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_cluster_clock [--minutes 20] [--skew-ppm 200]
+"""
+import argparse
+import random
+from statistics import median
+
+from core.cluster_clock import ClusterClock
+from core.constants import SCHEDULE_SYNC_HEARTBEAT
+
+
+WALL = 1_700_000_000.0
+NODE_BEHIND = 93.0
+
+
+def network_delay(rng):
+    if rng.random() < 0.05:
+        return rng.uniform(0.05, 0.25)
+    return rng.uniform(0.001, 0.015)
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк часов кластера")
+    parser.add_argument("--minutes", type=float, default=20.0)
+    parser.add_argument("--skew-ppm", type=float, default=200.0)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    skew = args.skew_ppm * 1e-6
+    now = {"t": 0.0}  # истинное время модели
+
+    coordinator = ClusterClock(monotonic=lambda: 1000.0 + now["t"], wall=lambda: WALL + now["t"])
+    coordinator.set_reference(True)
+    node = ClusterClock(
+        monotonic=lambda: 50.0 + now["t"] * (1.0 + skew),
+        wall=lambda: WALL - NODE_BEHIND + now["t"] * (1.0 + skew),
+    )
+
+    # Пробы и heartbeat: (время доставки, действие)
+    errors = {"локальное время": [], "последний heartbeat": [], "ClusterClock": []}
+    heartbeat_offset = None
+    backwards = 0
+    last_value = None
+    end = args.minutes * 60.0
+    next_heartbeat = 0.0
+    next_sample = 0.0
+    events = []
+    step = 0.0005
+
+    while now["t"] < end:
+        t = now["t"]
+        if t >= next_heartbeat:
+            # heartbeat координатора: ts по его часам
+            events.append((t + network_delay(rng), "heartbeat", coordinator.now()))
+            for _ in range(node.probes_wanted()):
+                events.append((t + network_delay(rng), "probe", node.local_time()))
+            next_heartbeat += SCHEDULE_SYNC_HEARTBEAT
+        for event in [e for e in events if e[0] <= t]:
+            events.remove(event)
+            _, kind, value = event
+            if kind == "heartbeat":
+                heartbeat_offset = value - node.local_time()
+            elif kind == "probe":
+                t2 = coordinator.now()
+                events.append((t + 0.0002 + network_delay(rng), "reply", (value, t2, coordinator.now())))
+            else:
+                node.add_probe(*value, node.local_time())
+
+        if t >= next_sample:
+            truth = coordinator.now()
+            value = node.now()
+            if last_value is not None and value < last_value:
+                backwards += 1
+            last_value = value
+            if node.synced:
+                errors["локальное время"].append(abs(node.local_time() - truth))
+                errors["последний heartbeat"].append(abs(node.local_time() + heartbeat_offset - truth))
+                errors["ClusterClock"].append(abs(value - truth))
+            next_sample += 1.0
+        now["t"] += step
+
+    print(f"Отставание узла {NODE_BEHIND:.0f} с, уход {args.skew_ppm:.0f} ppm, {args.minutes:.0f} мин")
+    for label, values in errors.items():
+        print(f"{label:<22} медиана {median(values) * 1000:10.2f} мс, p95 {percentile(values, 0.95) * 1000:10.2f} мс, "
+              f"макс {max(values) * 1000:10.2f} мс")
+    status = node.status()
+    print(f"оценка: смещение {status['offset_ms']} мс, уход {status['skew_ppm']} ppm, RTT {status['delay_ms']} мс")
+    print(f"время кластера шло назад: {backwards} раз")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Бенчмарк отмены действий судьи (core.commands) без Qt.
+
+Случайные схватки (очки, предупреждения, пассивность) записываются так же,
+как на панели управления: события через движок правил, строки истории
+по углам. Затем отменяется случайное число последних действий и
+сравнивается счёт с эталоном (схватка без отменённых событий). Сравниваются:
+- прежняя отмена: разбор последних строк истории по подстрокам
+  («Предупреждение», «Соперник получил», «(+N)»);
+- CommandStack: состояния до/после в каждой команде.
+Для стека дополнительно проверяется, что повтор всех отменённых команд
+возвращает исходный счёт, и считается скорость отмены/повтора.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_commands [--bouts 20000]
+"""
+import argparse
+import random
+import re
+import time
+
+from core.commands import FIELDS, CommandStack, snapshot
+from core.rules import (
+    BLUE, EVENT_CAUTION, EVENT_PASSIVITY, EVENT_POINTS, RED, ScoringEvent, other_corner,
+)
+from core.sport_loader import SportLoader
+
+
+def random_events(rng):
+    events = []
+    for _ in range(rng.randint(1, 12)):
+        corner = rng.choice((RED, BLUE))
+        roll = rng.random()
+        if roll < 0.7:
+            points = rng.choice((1, 1, 2, 2, 4))
+            events.append(ScoringEvent(EVENT_POINTS, corner, points=points, description=f"Приём {points}"))
+        elif roll < 0.85:
+            events.append(ScoringEvent(EVENT_CAUTION, corner, description="Предупреждение"))
+        else:
+            events.append(ScoringEvent(EVENT_PASSIVITY, corner, description="Пассивность"))
+    return events
+
+
+def record(engine, events):
+    """Проводит события как панель управления; возвращает (состояние, стек)."""
+    state = engine.new_bout()
+    stack = CommandStack()
+    for event in events:
+        if state.finished:
+            break
+        command = stack.execute(engine, state, event)
+        corner, opponent = event.corner, other_corner(event.corner)
+        if event.kind == EVENT_POINTS:
+            command.log(state, corner, f"12:00:00 - {event.description} (+{event.points})")
+        elif event.kind == EVENT_CAUTION:
+            command.log(state, corner, f"12:00:00 - {event.description}")
+            command.log(state, opponent, f"12:00:00 - Соперник получил {event.description.lower()} (+1 вам)")
+        else:
+            command.log(state, corner, f"12:00:00 - {event.description}")
+            if engine.passivity_scores(state.corner(corner).passivity):
+                command.log(state, opponent, "12:00:00 - Соперник проявил пассивность (+1 вам)")
+    return state, stack
+
+
+def legacy_undo(engine, state):
+    """Прежняя ControlPanel.undo_action: разбор строк истории."""
+    for corner in (RED, BLUE):
+        wrestler, opponent = state.corner(corner), state.opponent(corner)
+        if not wrestler.action_history:
+            continue
+        last = wrestler.action_history[-1]
+        if "редупреждение" in last and "Соперник" not in last:
+            wrestler.action_history.pop()
+            wrestler.cautions = max(0, wrestler.cautions - 1)
+            opponent.points = max(0, opponent.points - 1)
+            if opponent.action_history and "Соперник получил" in opponent.action_history[-1]:
+                opponent.action_history.pop()
+            return
+        if "ассивность" in last and "Соперник" not in last:
+            wrestler.action_history.pop()
+            old = wrestler.passivity
+            wrestler.passivity = max(0, wrestler.passivity - 1)
+            if engine.passivity_scores(old) and opponent.points > 0:
+                opponent.points -= 1
+            if opponent.action_history and "Соперник проявил" in opponent.action_history[-1]:
+                opponent.action_history.pop()
+            return
+    for corner in (RED, BLUE):
+        wrestler = state.corner(corner)
+        if wrestler.action_history:
+            found = re.search(r'\(\+(\d+)\)', wrestler.action_history.pop())
+            if found:
+                if wrestler.points >= int(found.group(1)):
+                    wrestler.points -= int(found.group(1))
+                return
+
+
+def score(state):
+    return {corner: {name: getattr(state.corner(corner), name) for name in FIELDS if name != "last_scored"}
+            for corner in (RED, BLUE)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк отмены действий судьи")
+    parser.add_argument("--bouts", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = SportLoader.load_rules("greco_roman")
+    rng = random.Random(7)
+    wrong = {"разбор строк истории": 0, "CommandStack": 0}
+    redo_wrong = 0
+    operations = 0
+    elapsed = 0.0
+    for _ in range(args.bouts):
+        events = random_events(rng)
+        state, stack = record(engine, events)
+        applied = len(stack)
+        n_undo = rng.randint(1, applied)
+        expected = score(record(engine, events[:applied - n_undo])[0])
+
+        legacy_state, _ = record(engine, events)
+        for _ in range(n_undo):
+            legacy_undo(engine, legacy_state)
+        wrong["разбор строк истории"] += score(legacy_state) != expected
+
+        final = snapshot(state)
+        start = time.perf_counter()
+        for _ in range(n_undo):
+            stack.undo(state)
+        undone = score(state)
+        for _ in range(n_undo):
+            stack.redo(state)
+        elapsed += time.perf_counter() - start
+        operations += 2 * n_undo
+        wrong["CommandStack"] += undone != expected
+        redo_wrong += snapshot(state) != final
+
+    print(f"Схваток {args.bouts}, правила: {engine.rules.name}")
+    for label, count in wrong.items():
+        print(f"{label:<22} неверный счёт после отмены: {count * 100 / args.bouts:5.1f}%")
+    print(f"повтор после отмены не вернул счёт: {redo_wrong} раз")
+    print(f"отмена/повтор: {operations / elapsed:,.0f} операций/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Бенчмарк часов схватки (core.match_clock) на модели без Qt.
+
+Период 3:00 под нагрузкой UI: таймер Qt срабатывает с опозданием 0–60 мс,
+иногда (2%) поток занят перерисовкой сетки или записью в БД на 0.3–1 с.
+Сравниваются:
+- прежний отсчёт: remaining -= 1 на каждом тике QTimer(1000), следующий тик —
+  через секунду после фактического;
+- MatchClock: дедлайн по монотонным часам, опрос каждые RENDER_INTERVAL_MS.
+Считается, на сколько конец периода и сигналы 30/10 с разошлись с
+истинным временем, по нескольким прогонам.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_match_clock [--runs 50] [--period 180]
+"""
+import argparse
+import random
+from statistics import median
+
+from core.match_clock import BEEP_MARKS, RENDER_INTERVAL_MS, MatchClock
+
+
+def ui_delay(rng):
+    if rng.random() < 0.02:
+        return rng.uniform(0.3, 1.0)
+    return rng.uniform(0.0, 0.06)
+
+
+def legacy_run(period, rng):
+    """Моменты сигналов {отметка: время} при декременте по тикам."""
+    fired = {}
+    t, remaining = 0.0, period
+    while remaining > 0:
+        t += 1.0 + ui_delay(rng)
+        remaining -= 1
+        if remaining in BEEP_MARKS:
+            fired[remaining] = t
+    return fired
+
+
+def engine_run(period, rng):
+    now = {"t": 0.0}
+    fired = {}
+    clock = MatchClock(period, marks=BEEP_MARKS, on_mark=lambda m: fired.setdefault(m, now["t"]),
+                       clock=lambda: now["t"])
+    clock.start()
+    while clock.running:
+        now["t"] += RENDER_INTERVAL_MS / 1000.0 + ui_delay(rng)
+        clock.poll()
+    return fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк часов схватки")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--period", type=int, default=180)
+    args = parser.parse_args()
+
+    for label, run in (("декремент по тикам", legacy_run), ("MatchClock", engine_run)):
+        rng = random.Random(4)
+        errors = {mark: [] for mark in BEEP_MARKS}
+        for _ in range(args.runs):
+            fired = run(args.period, rng)
+            for mark in BEEP_MARKS:
+                errors[mark].append(fired[mark] - (args.period - mark))
+        parts = [
+            f"{'конец' if mark == 0 else f'{mark} с'}: медиана {median(values) * 1000:7.0f} мс, "
+            f"макс {max(values) * 1000:7.0f} мс"
+            for mark, values in errors.items()
+        ]
+        print(f"{label:<20} " + " | ".join(parts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Бенчмарк создания схваток по результатам (core.progression).
+
+Турнир из олимпийских категорий с утешительными схватками (или сеткой
+проигравших) проводится целиком: схватки вызываются из очередей ковров,
+результат разыгрывается случайно, после каждого результата on_result()
+создаёт определившиеся схватки и ставит их в расписание. Измеряется время
+on_result() на результат в сравнении с полной генерацией расписания,
+а также число записей, которые нужно разослать по сети.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_progression [--categories 60] [--size 24] [--format repechage]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+from unittest import mock
+
+from core import progression
+from core.durations import DurationModel
+from core.mat_queue import get_mat_queue
+from core.progression import get_plan, on_result, slot_bouts
+from core.utils import create_bracket, generate_schedule
+
+
+N_MATS = 6
+
+
+def make_tournament(n_categories, size, rng):
+    categories = {}
+    for c in range(n_categories):
+        name = f"{30 + c} кг"
+        participants = [
+            {"name": f"Борец {c}-{i}", "club": f"Клуб {rng.randrange(12)}"}
+            for i in range(rng.randint(size // 2, size))
+        ]
+        bracket = create_bracket(participants, name, bracket_type="elimination", separate_by=("club",))
+        categories[name] = {"participants": participants, "matches": bracket["matches"], "type": "elimination"}
+    return {"name": "Бенчмарк", "categories": categories, "schedule": []}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк создания схваток по результатам")
+    parser.add_argument("--categories", type=int, default=60)
+    parser.add_argument("--size", type=int, default=24)
+    parser.add_argument("--format", choices=progression.FORMATS, default=progression.FORMAT_REPECHAGE)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tournament = make_tournament(args.categories, args.size, rng)
+    mats = range(1, N_MATS + 1)
+    # Модель длительностей без обучения по БД — бенчмарк не трогает tournaments.db
+    model = DurationModel()
+
+    with mock.patch.object(progression, "elimination_format", return_value=args.format):
+        for name, category in tournament["categories"].items():
+            get_plan(name, category)
+            first = [m for m in category["matches"] if "ПРОПУСК" not in (m["wrestler1"], m["wrestler2"])]
+            slot_bouts(tournament, name, first, mats, model=model)
+            # Проходы без соперника сразу открывают схватки второго раунда
+            slot_bouts(tournament, name, progression.advance_category(name, category), mats, model=model)
+
+    by_id = {
+        m["id"]: (name, m)
+        for name, category in tournament["categories"].items()
+        for m in category["matches"]
+    }
+    played = created = 0
+    elapsed = 0.0
+    while True:
+        queue = get_mat_queue(tournament)
+        batch = [m for m in (queue.pop(mat) for mat in mats) if m]
+        if not batch:
+            break
+        for entry in batch:
+            name, match = by_id[entry["match_id"]]
+            winner = rng.choice([match["wrestler1"], match["wrestler2"]])
+            match.update(completed=True, winner=winner, score1=3, score2=1)
+            entry.update(status="Завершен", completed=True)
+            start = time.perf_counter()
+            new_entries = on_result(tournament, name, match["id"], mats, model=model)
+            elapsed += time.perf_counter() - start
+            played += 1
+            created += len(new_entries)
+            for new in new_entries:
+                by_id[new["match_id"]] = (name, next(m for m in tournament["categories"][name]["matches"] if m["id"] == new["match_id"]))
+
+    pending = sum(len(c["progression"]["pending"]) for c in tournament["categories"].values())
+    print(f"Категорий: {args.categories}, формат: {args.format}, ковров: {N_MATS}")
+    print(f"Проведено схваток: {played}, создано по результатам: {created}, не создано: {pending}")
+    print(f"{'on_result на один результат':<40} {elapsed * 1000 / max(1, played):8.3f} мс")
+    print(f"{'записей к рассылке на результат':<40} {created / max(1, played):8.2f}")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        schedule = generate_schedule(dict(tournament), n_mats=N_MATS)
+    print(f"{'полная генерация расписания':<40} {(time.perf_counter() - start) * 1000:8.3f} мс")
+    print(f"{'записей при полной рассылке':<40} {len(schedule):8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Бенчмарк подписок по темам в core.network.NetworkManager.
+
+Локальный сервер и клиенты-табло (по умолчанию 8 ковров, 16 табло — по два
+на ковёр). Каждый ковёр публикует обновления табло; сравниваются два
+режима: табло без подписок (получают и разбирают трафик всех ковров, как
+раньше) и табло, подписанные на mat/<N>/scoreboard. Считаются полученные
+клиентами сообщения, время рассылки на сервере и счётчики тем.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_pubsub [--mats 8] [--displays 16] [--updates 200]
+"""
+import argparse
+import socket
+import threading
+import time
+
+from core.network import NetworkManager, mat_topic
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run(n_mats, n_displays, updates, subscribe):
+    received = [0] * n_displays
+    lock = threading.Lock()
+    port = free_port()
+    server = NetworkManager(port=port)
+    if not server.start_server("127.0.0.1"):
+        raise SystemExit(f"сервер на порту {port} не запустился")
+    clients = []
+    for i in range(n_displays):
+        client = NetworkManager(port=port)
+        mat = i % n_mats + 1
+
+        def on_update(message, sock, index=i):
+            with lock:
+                received[index] += 1
+
+        client.register_handler("scoreboard_update", on_update)
+        if subscribe:
+            client.subscribe(mat_topic(mat))
+        if not client.connect_to_server("127.0.0.1", reconnect=False):
+            raise SystemExit(f"табло {i + 1} не подключилось к серверу на порту {port}")
+        clients.append(client)
+
+    # Ждём, пока сервер примет подключения и подписки
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        with server._lock:
+            ready = len(server.client_sockets) == n_displays
+            if subscribe:
+                ready = ready and len(server._subscriptions) == n_displays
+        if ready:
+            break
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    for _ in range(updates):
+        for mat in range(1, n_mats + 1):
+            server.send_message("scoreboard_update", {"mat": mat, "time_remaining": 120, "red": {"points": 1}})
+    publish_time = time.perf_counter() - start
+
+    expected = updates * n_mats * (n_displays // n_mats if subscribe else n_displays)
+    deadline = time.time() + 10
+    while sum(received) < expected and time.time() < deadline:
+        time.sleep(0.01)
+    stats = server.get_topic_stats()
+    for client in clients:
+        client.stop()
+    server.stop()
+    if sum(received) < expected:
+        raise SystemExit(f"доставлено {sum(received)} из {expected} сообщений: результат бенчмарка недостоверен")
+    return sum(received), publish_time, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк подписок по темам")
+    parser.add_argument("--mats", type=int, default=8)
+    parser.add_argument("--displays", type=int, default=16)
+    parser.add_argument("--updates", type=int, default=200)
+    args = parser.parse_args()
+
+    for subscribe in (False, True):
+        total, elapsed, stats = run(args.mats, args.displays, args.updates, subscribe)
+        label = "с подписками" if subscribe else "без подписок"
+        print(f"{label}: получено клиентами {total}, на одно табло {total / args.displays:.0f}, "
+              f"рассылка {elapsed * 1000:.1f} мс")
+        topic = stats.get(mat_topic(1), {})
+        print(f"    {mat_topic(1)}: сообщений {topic.get('messages', 0)}, доставок {topic.get('deliveries', 0)}, "
+              f"байт {topic.get('bytes', 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Бенчмарк рейтингов (core.ratings).
+
+Синтетическая история: пул спортсменов со скрытой «силой», турниры по
+несколько сотен схваток, исход схватки разыгрывается по разнице сил.
+Измеряется полный пересчёт рейтингов по ~200 тыс. схваток (в памяти и
+из БД) и инкрементальное обновление после одной схватки, а также
+проверяется, что рейтинг упорядочивает спортсменов по силе.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_ratings [--bouts 200000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from core.db import get_connection, get_or_create_tournament_id
+from core.ratings import compute_ratings, rebuild_ratings, update_after_bout
+
+
+POOL_SIZE = 5000
+BOUTS_PER_TOURNAMENT = 800
+
+
+def make_history(n_bouts, seed=11):
+    rng = random.Random(seed)
+    strength = [rng.gauss(0, 1) for _ in range(POOL_SIZE)]
+    periods = []
+    while sum(len(p) for p in periods) < n_bouts:
+        bouts = []
+        for _ in range(BOUTS_PER_TOURNAMENT):
+            a, b = rng.sample(range(POOL_SIZE), 2)
+            p_win = 1.0 / (1.0 + 10 ** (-(strength[a] - strength[b])))
+            bouts.append((a + 1, b + 1, 1.0 if rng.random() < p_win else 0.0))
+        periods.append(bouts)
+    return strength, periods
+
+
+def rank_correlation(strength, state):
+    """Доля правильно упорядоченных пар (случайная выборка пар)."""
+    rng = random.Random(3)
+    ids = [a for a in state.table if state.table[a][2] >= 5]
+    good = total = 0
+    for _ in range(20000):
+        a, b = rng.sample(ids, 2)
+        if strength[a - 1] == strength[b - 1]:
+            continue
+        total += 1
+        good += (strength[a - 1] > strength[b - 1]) == (state.table[a][0] > state.table[b][0])
+    return good / max(1, total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк рейтингов")
+    parser.add_argument("--bouts", type=int, default=200000)
+    args = parser.parse_args()
+
+    strength, periods = make_history(args.bouts)
+    n_bouts = sum(len(p) for p in periods)
+    print(f"Схваток: {n_bouts}, турниров: {len(periods)}, спортсменов: {POOL_SIZE}")
+
+    start = time.perf_counter()
+    state = compute_ratings(periods)
+    print(f"{'пересчёт в памяти':<40} {(time.perf_counter() - start) * 1000:8.1f} мс")
+    print(f"{'верно упорядоченных пар':<40} {rank_correlation(strength, state) * 100:8.1f} %")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ratings.db")
+        conn = get_connection(path)
+        with conn:
+            conn.executemany(
+                "INSERT INTO athletes (id, identity_key, name, name_norm) VALUES (?, ?, ?, ?)",
+                ((i, f"a{i}|", f"A{i}", f"a{i}") for i in range(1, POOL_SIZE + 1)),
+            )
+            for index, bouts in enumerate(periods):
+                tid = get_or_create_tournament_id(
+                    conn, {"name": f"Т{index}", "date": f"01.01.{2000 + index}", "location": "Б"}
+                )
+                conn.executemany(
+                    "INSERT INTO bout_results (tournament_id, match_uid, athlete1_id, athlete2_id, winner_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    ((tid, f"m{i}", a, b, a if s == 1.0 else b) for i, (a, b, s) in enumerate(bouts)),
+                )
+        conn.close()
+
+        start = time.perf_counter()
+        rebuild_ratings(path)
+        print(f"{'пересчёт из БД с записью':<40} {(time.perf_counter() - start) * 1000:8.1f} мс")
+
+        conn = get_connection(path)
+        start = time.perf_counter()
+        for _ in range(100):
+            with conn:
+                update_after_bout(conn, 1, 2, 1, len(periods))
+        print(f"{'инкрементальное обновление (1 схватка)':<40} {(time.perf_counter() - start) * 10:8.3f} мс")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
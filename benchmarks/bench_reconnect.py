@@ -0,0 +1,118 @@
+"""
+Бенчмарк переподключения клиента NetworkManager с досылкой (loopback).
+
+Сервер публикует поток как на турнире: данные турнира целиком (один раз),
+табло четырёх ковров (снимки) и обновления схваток расписания. Клиент
+(второй ПК) подписан на турнир, расписание и табло ковра 1. Посреди
+потока соединение клиента обрывается; клиент переподключается сам
+(пауза ~2 с) и присылает последние номера тем. Считается:
+- через сколько после обрыва клиент снова в актуальном состоянии;
+- сколько пропущенных обновлений схваток восстановлено;
+- сколько байт дослано против повторной отправки турнира целиком.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_reconnect [--rate 40] [--outage 2]
+"""
+import argparse
+import contextlib
+import io
+import json
+import socket
+import threading
+import time
+
+from core.network import TOPIC_SCHEDULE, TOPIC_TOURNAMENT, NetworkManager, mat_topic
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def tournament(size):
+    return {"name": "Нагрузочный турнир", "categories": {
+        f"Категория {i}": {"matches": [{"id": f"c{i}-{j}", "wrestler1": f"Борец {j}", "wrestler2": f"Борец {j + 1}"}
+                                      for j in range(20)]}
+        for i in range(size)
+    }}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк переподключения с досылкой")
+    parser.add_argument("--rate", type=float, default=40.0, help="сообщений в секунду")
+    parser.add_argument("--outage", type=float, default=2.0, help="пауза до переподключения, с")
+    parser.add_argument("--duration", type=float, default=8.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = NetworkManager(port=port)
+    client = NetworkManager(port=port)
+    client.reconnect_base = args.outage
+    lock = threading.Lock()
+    received = {"matches": set(), "board": None, "after_reconnect": 0, "bytes": 0}
+
+    def on_message(message, client_socket):
+        with lock:
+            if client.reconnects:
+                received["after_reconnect"] += 1
+                received["bytes"] += len(json.dumps(message))
+            if message.get("type") == "match_update":
+                received["matches"].add(message["data"]["match_id"])
+            elif message.get("type") == "scoreboard_update":
+                received["board"] = message["data"]["points"]
+
+    for topic in (TOPIC_TOURNAMENT, TOPIC_SCHEDULE, mat_topic(1)):
+        client.subscribe(topic, on_message)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.start_server("127.0.0.1")
+        client.connect_to_server("127.0.0.1")
+        time.sleep(0.3)
+        data = tournament(200)
+        full_size = len(json.dumps(data))
+        server.send_message("tournament_update", data)
+
+        sent_matches, board = set(), None
+        dropped_at = recovered_at = None
+        missed_during_outage = 0
+        start = time.perf_counter()
+        n = 0
+        while time.perf_counter() - start < args.duration:
+            n += 1
+            mat = 1 + n % 4
+            board = n if mat == 1 else board
+            server.send_message("scoreboard_update", {"mat": mat, "points": n})
+            if n % 2 == 0:
+                match_id = f"m{n}"
+                sent_matches.add(match_id)
+                server.send_message("match_update", {"match_id": match_id, "status": "completed"})
+                if dropped_at is not None and not client.reconnects:
+                    missed_during_outage += 1
+            if dropped_at is None and time.perf_counter() - start > 1.0:
+                dropped_at = time.perf_counter()
+                client.client_sockets[0].shutdown(socket.SHUT_RDWR)
+            with lock:
+                current = sent_matches <= received["matches"] and received["board"] == board
+            if dropped_at is not None and client.reconnects and recovered_at is None and current:
+                recovered_at = time.perf_counter()
+            time.sleep(1.0 / args.rate)
+        time.sleep(0.3)
+        client.stop()
+        server.stop()
+
+    with lock:
+        lost = len(sent_matches - received["matches"])
+        print(f"Обрыв через 1 с, переподключений {client.reconnects}, поток {args.rate:.0f} сообщ./с")
+        if recovered_at is None:
+            print("клиент не вернулся в актуальное состояние")
+        else:
+            print(f"актуальное состояние через {recovered_at - dropped_at:.2f} с после обрыва")
+        print(f"обновлений схваток за время обрыва: {missed_during_outage}, потеряно после досылки: {lost}")
+        print(f"после переподключения получено {received['after_reconnect']} сообщений, "
+              f"{received['bytes'] / 1024:.1f} КБ; турнир целиком — {full_size / 1024:.1f} КБ")
+        print(f"не восстановленные темы: {client.resync_gaps or 'нет'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Бенчмарк репозитория турнира (core.repository.TournamentRepository).
+
+Синтетический турнир (по умолчанию ~5000 участников) сохраняется во временную
+БД; измеряются первое сохранение, повторное сохранение без изменений,
+ленивая загрузка и сохранение после изменения одного результата.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_repository [--categories 420]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_brackets import make_synthetic_categories
+from core.repository import TournamentRepository
+from core.utils import create_brackets_batch
+
+
+def make_tournament(n_categories):
+    categories = make_synthetic_categories(n_categories)
+    create_brackets_batch(categories)
+    participants = [p for cat in categories.values() for p in cat["participants"]]
+    schedule = [
+        {"match_id": m["id"], "category": name, "mat": 1 + i % 4, "status": "Ожидание", "start_min": 600 + i}
+        for name, cat in categories.items()
+        for i, m in enumerate(cat["matches"])
+    ]
+    return {
+        "name": "Бенчмарк",
+        "date": "01.01.2026",
+        "location": "Тест",
+        "participants": participants,
+        "categories": categories,
+        "schedule": schedule,
+    }
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:8.1f} мс")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк репозитория турнира")
+    parser.add_argument("--categories", type=int, default=420)
+    args = parser.parse_args()
+
+    tournament = make_tournament(args.categories)
+    print(f"Участников: {len(tournament['participants'])}, схваток: {len(tournament['schedule'])}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        repo = TournamentRepository(path)
+        timed("первое сохранение", lambda: repo.save(tournament))
+        timed("повторное сохранение без изменений", lambda: repo.save(tournament))
+        repo.close()
+
+        repo = TournamentRepository(path)
+        tournament_id = repo.list_tournaments()[0]["id"]
+        loaded = timed("ленивая загрузка", lambda: repo.load(tournament_id))
+        name = next(iter(loaded["categories"]))
+        match = loaded["categories"][name]["matches"][0]
+        match.update({"completed": True, "winner": match.get("wrestler1"), "score1": 3, "score2": 1})
+        loaded["schedule"][0]["status"] = "Завершен"
+        stats = timed("сохранение одного результата", lambda: repo.save(loaded))
+        print(f"Записано строк: {stats}")
+        loaded["schedule"][1]["status"] = "Завершен"
+        # В фоне поток UI занят только снимком подгруженных данных
+        future = timed("save_async: время в потоке UI", lambda: repo.save_async(loaded))
+        future.result()
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Бенчмарк движка правил (core.rules) без Qt.
+
+Для каждого вида спорта из sports/ генерируется поток случайных событий
+схватки (приёмы на 1/2/4/5 очков, предупреждения, пассивность) и схватки
+проводятся через simulate_bout. Считается скорость (схваток в секунду)
+и распределение исходов — удобно для регрессионной проверки правил.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_rules [--bouts 20000]
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from core.rules import (
+    BLUE, EVENT_CAUTION, EVENT_PASSIVITY, EVENT_POINTS, RED, ScoringEvent, simulate_bout,
+)
+from core.sport_loader import SportLoader
+from sports import SPORTS
+
+
+def random_events(rng):
+    events = []
+    for _ in range(rng.randint(0, 14)):
+        corner = rng.choice((RED, BLUE))
+        roll = rng.random()
+        if roll < 0.75:
+            events.append(ScoringEvent(EVENT_POINTS, corner, points=rng.choice((1, 1, 2, 2, 4, 5))))
+        elif roll < 0.85:
+            events.append(ScoringEvent(EVENT_CAUTION, corner))
+        else:
+            events.append(ScoringEvent(EVENT_PASSIVITY, corner))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк движка правил")
+    parser.add_argument("--bouts", type=int, default=20000)
+    args = parser.parse_args()
+
+    for sport_key in sorted(SPORTS):
+        engine = SportLoader.load_rules(sport_key)
+        rng = random.Random(6)
+        bouts = [random_events(rng) for _ in range(args.bouts)]
+        outcomes = Counter()
+        start = time.perf_counter()
+        for events in bouts:
+            state = simulate_bout(engine, events)
+            outcomes[state.reason.split(" ")[0]] += 1
+        elapsed = time.perf_counter() - start
+        print(f"{engine.rules.name}: {args.bouts / elapsed:,.0f} схваток/с, "
+              f"событий {sum(len(b) for b in bouts) / elapsed:,.0f}/с")
+        for reason, count in outcomes.most_common():
+            print(f"    {reason:<16} {count * 100 / args.bouts:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Бенчмарк часов табло (core.scoreboard_clock) на модели без Qt.
+
+Панель ведёт период 3:00: секунды уменьшаются по тикам QTimer с
+опозданием (джиттер), в середине — пауза на 7 с. Сравниваются два табло:
+- прежнее: панель рассылает полное состояние на каждом тике и раз в 500 мс,
+  табло перерисовывает время раз в 500 мс по последнему сообщению;
+- новое: рассылаются только переходы таймера (ClockPublisher), табло со
+  смещёнными монотонными часами отсчитывает само (ClockFollower) каждые 16 мс.
+Сеть — задержка 2–10 мс. Время моделируется с шагом 1 мс; считается доля
+времени, когда табло показывает не ту секунду, что панель, самое долгое
+расхождение и число сообщений.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_scoreboard_clock [--jitter-ms 40]
+"""
+import argparse
+import random
+
+from core.scoreboard_clock import ClockFollower, ClockPublisher
+
+
+PERIOD = 180
+PAUSE_AT, PAUSE_FOR = 60.0, 7.0
+DISPLAY_OFFSET = 12345.678  # монотонные часы табло ушли вперёд
+
+
+def panel_timeline(rng, jitter):
+    """[(время, оставшиеся секунды, идёт ли отсчёт)] — моменты изменения показаний панели."""
+    events = [(0.0, PERIOD, True)]
+    t, remaining, next_tick = 0.0, PERIOD, 1.0
+    paused = False
+    while remaining > 0:
+        if not paused and next_tick >= PAUSE_AT:
+            # Пауза: отсчёт стоит, после возобновления тики идут от момента пуска
+            events.append((PAUSE_AT, remaining, False))
+            events.append((PAUSE_AT + PAUSE_FOR, remaining, True))
+            next_tick = PAUSE_AT + PAUSE_FOR + 1.0
+            paused = True
+            continue
+        t = next_tick + rng.uniform(0, jitter)
+        remaining -= 1
+        events.append((t, remaining, remaining > 0))
+        next_tick = t + 1.0
+    return events
+
+
+def simulate(events, rng, new_scheme):
+    end = events[-1][0] + 1.0
+    step = 0.001
+    ev_index = 0
+    panel_remaining, panel_running = PERIOD, True
+    inbox = []  # (время доставки, сообщение)
+    messages = 0
+    publisher, follower = ClockPublisher(), ClockFollower()
+    last_data = None
+    shown = PERIOD
+    next_poll = 0.0
+    next_refresh = 0.0
+    mismatch = longest = current = 0.0
+
+    t = 0.0
+    while t < end:
+        changed = False
+        while ev_index < len(events) and events[ev_index][0] <= t:
+            _, panel_remaining, panel_running = events[ev_index]
+            ev_index += 1
+            changed = True
+
+        # Отправка с панели
+        if new_scheme:
+            if changed or t >= next_poll:
+                state = publisher.observe(panel_running, panel_remaining, 1, False, now=t)
+                if state is not None:
+                    inbox.append((t + rng.uniform(0.002, 0.010), state))
+                    messages += 1
+                if t >= next_poll:
+                    next_poll += 0.5
+        elif changed or t >= next_poll:
+            inbox.append((t + rng.uniform(0.002, 0.010), panel_remaining))
+            messages += 1
+            if t >= next_poll:
+                next_poll += 0.5
+
+        # Доставка на табло
+        for item in [i for i in inbox if i[0] <= t]:
+            inbox.remove(item)
+            if new_scheme:
+                follower.apply(item[1], received_at=item[0] + DISPLAY_OFFSET)
+            else:
+                last_data = item[1]
+
+        # Перерисовка
+        if t >= next_refresh:
+            if new_scheme:
+                shown = follower.seconds(now=t + DISPLAY_OFFSET) if follower.has_state() else shown
+                next_refresh += 0.016
+            else:
+                shown = last_data if last_data is not None else shown
+                next_refresh += 0.5
+
+        if shown != panel_remaining:
+            mismatch += step
+            current += step
+            longest = max(longest, current)
+        else:
+            current = 0.0
+        t += step
+    return mismatch / end, longest, messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк часов табло")
+    parser.add_argument("--jitter-ms", type=float, default=40.0, help="опоздание тика QTimer, до (мс)")
+    args = parser.parse_args()
+
+    events = panel_timeline(random.Random(1), args.jitter_ms / 1000.0)
+    for label, new_scheme in (("прежнее табло", False), ("локальный отсчёт", True)):
+        share, longest, messages = simulate(events, random.Random(2), new_scheme)
+        print(f"{label:<20} не та секунда {share * 100:5.1f}% времени, "
+              f"дольше всего {longest * 1000:6.0f} мс, сообщений {messages}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Бенчмарк жеребьёвки олимпийской сетки (core.seeding.build_draw).
+
+Сетки на 16/32/64/128 участников из небольшого числа клубов (крупные
+клубы выставляют много борцов). Сравнивается прежняя раскладка (соседние
+в списке, отсортированном по разряду) и посев с разведением одноклубников:
+пары одноклубников в 1-м раунде, взвешенный счёт столкновений и время.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_seeding [--repeat 50]
+"""
+import argparse
+import random
+import time
+
+from core.seeding import build_draw, club_collisions, collision_score
+from core.utils import create_bracket
+
+
+def make_wrestlers(n, rng):
+    # Распределение клубов с «тяжёлым хвостом»: несколько крупных клубов
+    clubs = [f"Клуб {i}" for i in range(max(4, n // 6))]
+    weights = [1.0 / (i + 1) for i in range(len(clubs))]
+    return [
+        {
+            "name": f"Борец {i}",
+            "club": rng.choices(clubs, weights)[0],
+            "rank": rng.choice(["Нет", "1 юн.", "3 сп.", "КМС"]),
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк жеребьёвки")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    print(f"{'участников':>10} {'1-й раунд было':>15} {'стало':>6} {'счёт было':>10} {'стало':>6} {'время, мс':>10}")
+    for n in (16, 32, 64, 128):
+        old_r1 = new_r1 = old_score = new_score = 0
+        elapsed = 0.0
+        for _ in range(args.repeat):
+            wrestlers = make_wrestlers(n, rng)
+            old = create_bracket(wrestlers, "x", "elimination", separate_by=())
+            old_draw = [w for m in old["matches"] for w in ({"name": m["wrestler1"], "club": m["club1"]},
+                                                             {"name": m["wrestler2"], "club": m["club2"]})]
+            start = time.perf_counter()
+            new_draw = build_draw(wrestlers, n, ("club",))
+            elapsed += time.perf_counter() - start
+            old_r1 += club_collisions(old_draw).get(1, 0)
+            new_r1 += club_collisions(new_draw).get(1, 0)
+            old_score += collision_score(old_draw)
+            new_score += collision_score(new_draw)
+        k = args.repeat
+        print(f"{n:>10} {old_r1 / k:>15.1f} {new_r1 / k:>6.1f} {old_score / k:>10.1f} {new_score / k:>6.1f} {elapsed / k * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
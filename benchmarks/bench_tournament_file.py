@@ -0,0 +1,64 @@
+"""
+Бенчмарк файла турнира: JSON (как сохраняет менеджер турниров, indent=2)
+против контейнера .mvpz (core.tournament_file).
+
+Измеряются размер файла, время сохранения, полной загрузки и ленивой
+загрузки с открытием одной категории, а также проверяется, что
+JSON -> .mvpz -> JSON не теряет данных.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_tournament_file [--categories 420]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.bench_repository import make_tournament, timed
+from core.tournament_file import container_to_json, json_to_container, load_container, save_container
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк файла турнира")
+    parser.add_argument("--categories", type=int, default=420)
+    args = parser.parse_args()
+
+    tournament = make_tournament(args.categories)
+    print(f"Участников: {len(tournament['participants'])}, схваток: {len(tournament['schedule'])}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "bench.json")
+        mvpz_path = os.path.join(tmp, "bench.mvpz")
+
+        def save_json():
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(tournament, f, ensure_ascii=False, indent=2)
+
+        def load_json():
+            with open(json_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        timed("сохранение JSON", save_json)
+        timed("сохранение .mvpz", lambda: save_container(tournament, mvpz_path))
+        print(f"{'размер JSON':<40} {os.path.getsize(json_path) / 1024:8.1f} КБ")
+        print(f"{'размер .mvpz':<40} {os.path.getsize(mvpz_path) / 1024:8.1f} КБ")
+
+        timed("загрузка JSON", load_json)
+        timed("полная загрузка .mvpz", lambda: load_container(mvpz_path, lazy=False))
+
+        def lazy_open_one():
+            data = load_container(mvpz_path)
+            name = next(iter(data["categories"]))
+            return data["categories"][name]["matches"]
+
+        timed("ленивая загрузка .mvpz + 1 категория", lazy_open_one)
+
+        converted = json_to_container(json_path, os.path.join(tmp, "roundtrip.mvpz"))
+        back = container_to_json(converted, os.path.join(tmp, "roundtrip.json"))
+        with open(back, "r", encoding="utf-8") as f:
+            same = json.load(f) == load_json()
+        print(f"JSON -> .mvpz -> JSON без потерь: {'да' if same else 'НЕТ'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Бенчмарк аналитики результатов (core.warehouse).
+
+Во временную БД заносится история из синтетических турниров (по умолчанию
+~100 тыс. схваток, спортсмены повторяются между турнирами), затем
+измеряются запросы: личные встречи двух спортсменов, итог спортсмена,
+медальный зачёт клубов за сезон, история схваток и запись одного
+нового результата через save_match_result.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_warehouse [--bouts 100000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from unittest import mock
+
+from core import db
+from core.utils import create_bracket
+from core.warehouse import ResultsWarehouse, record_tournament_results
+
+
+POOL_SIZE = 4000
+CLUBS = 60
+
+
+def make_history_tournament(index, rng):
+    """Турнир из категорий по 8 спортсменов из общего пула, все схватки сыграны."""
+    categories = {}
+    for c in range(40):
+        names = rng.sample(range(POOL_SIZE), 8)
+        participants = [
+            {"name": f"Спортсмен {n}", "club": f"Клуб {n % CLUBS}", "birth_year": 2005 + n % 8}
+            for n in names
+        ]
+        name = f"{30 + c} кг"
+        bracket = create_bracket(participants, name, bracket_type="round_robin")
+        for match in bracket["matches"]:
+            match["score1"], match["score2"] = rng.randint(0, 10), rng.randint(0, 10)
+            match["winner"] = match["wrestler1"] if match["score1"] >= match["score2"] else match["wrestler2"]
+            match["completed"] = True
+        categories[name] = {"participants": participants, "matches": bracket["matches"], "type": bracket["type"]}
+    return {
+        "name": f"Турнир {index}",
+        "date": f"01.{1 + index % 12:02d}.{2024 + index % 3}",
+        "location": "История",
+        "categories": categories,
+    }
+
+
+def timed(label, func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    print(f"{label:<44} {(time.perf_counter() - start) * 1000 / repeat:8.3f} мс")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк аналитики результатов")
+    parser.add_argument("--bouts", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "warehouse.db")
+        start = time.perf_counter()
+        bouts, index = 0, 0
+        while bouts < args.bouts:
+            bouts += record_tournament_results(make_history_tournament(index, rng), path)
+            index += 1
+        print(f"Загружено схваток: {bouts} из {index} турниров за {time.perf_counter() - start:.1f} с")
+
+        warehouse = ResultsWarehouse(path)
+        # Пара с наибольшим числом встреч
+        row = warehouse.conn.execute(
+            "SELECT a.name, b.name FROM head_to_head h JOIN athletes a ON a.id = h.athlete_lo "
+            "JOIN athletes b ON b.id = h.athlete_hi ORDER BY h.bouts DESC LIMIT 1"
+        ).fetchone()
+        name_a, name_b = row[0], row[1]
+        h2h = timed("личные встречи X против Y", lambda: warehouse.head_to_head(name_a, name_b), 200)
+        print(f"    {name_a} против {name_b}: {h2h}")
+        timed("итог спортсмена", lambda: warehouse.athlete_record(name_a), 200)
+        medals = timed("медали клубов за сезон 2025", lambda: warehouse.club_medals(2025), 200)
+        print(f"    лидер: {medals[0] if medals else '-'}")
+        timed("последние 50 схваток спортсмена", lambda: warehouse.athlete_history(name_a), 50)
+        warehouse.close()
+
+        tournament = make_history_tournament(index, rng)
+        name, category = next(iter(tournament["categories"].items()))
+        with mock.patch.object(db, "get_db_path", return_value=path):
+            timed(
+                "save_match_result с обновлением агрегатов",
+                lambda: db.save_match_result(tournament, name, category["matches"][0]),
+                20,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Сохранение турнира (JSON или .mvpz) в фоновом потоке.
+
+В потоке UI делается только снимок данных — pickle.dumps (C-реализация,
+на порядок быстрее json.dump с отступами) и хеш снимка. Разбор снимка,
+сериализация в JSON и запись выполняются в рабочем потоке: файл пишется
+во временный рядом с целевым и атомарно подменяется через os.replace,
+поэтому при сбое на диске остаётся либо старая, либо новая версия целиком.
+
+Автосохранения складываются в AUTOSAVE_DIR, хранятся последние
+DEFAULT_AUTOSAVE_KEEP файлов турнира и пропускаются, если данные не
+изменились с прошлого автосохранения.
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from core.tournament_file import is_container_path, save_container
+
+
+AUTOSAVE_DIR = "autosave"
+DEFAULT_AUTOSAVE_KEEP = 10
+
+
+def _slug(text: str) -> str:
+    slug = re.sub(r"[^\w\-]+", "_", str(text), flags=re.UNICODE).strip("_")
+    return slug or "tournament"
+
+
+def take_snapshot(tournament_data: Dict[str, Any]) -> Any:
+    """
+    Дешёвый снимок для передачи в рабочий поток: байты pickle, а если данные
+    не сериализуются pickle — готовая JSON-строка.
+    """
+    try:
+        return pickle.dumps(tournament_data, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return json.dumps(tournament_data, ensure_ascii=False, default=str)
+
+
+def snapshot_digest(snapshot: Any) -> str:
+    data = snapshot if isinstance(snapshot, bytes) else snapshot.encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def write_json_atomic(path: str, snapshot: Any, indent: Optional[int] = 2) -> str:
+    """Записывает снимок в JSON через временный файл и os.replace."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if isinstance(snapshot, bytes):
+                json.dump(pickle.loads(snapshot), f, ensure_ascii=False, indent=indent, default=str)
+            else:
+                f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def write_snapshot_atomic(path: str, snapshot: Any, indent: Optional[int] = 2) -> str:
+    """Записывает снимок в формате по расширению пути: контейнер .mvpz или JSON."""
+    if is_container_path(path):
+        data = pickle.loads(snapshot) if isinstance(snapshot, bytes) else json.loads(snapshot)
+        return save_container(data, path)
+    return write_json_atomic(path, snapshot, indent)
+
+
+class SnapshotService:
+    """Фоновое сохранение снимков турнира (один рабочий поток, порядок записей сохраняется)."""
+
+    def __init__(self, autosave_dir: str = AUTOSAVE_DIR, keep: int = DEFAULT_AUTOSAVE_KEEP):
+        self.autosave_dir = autosave_dir
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._lock = threading.Lock()
+        self._last_autosave_digest: Dict[str, str] = {}
+
+    def save_async(self, tournament_data: Dict[str, Any], path: str, indent: Optional[int] = 2) -> Future:
+        """
+        Сохраняет турнир в path в фоне (.mvpz — контейнер, иначе JSON).
+        Future возвращает путь или исключение.
+        """
+        snapshot = take_snapshot(tournament_data)
+        return self._executor.submit(write_snapshot_atomic, path, snapshot, indent)
+
+    def autosave(self, tournament_data: Optional[Dict[str, Any]]) -> Optional[Future]:
+        """
+        Автосохранение с ротацией. Возвращает None, если данные не изменились
+        с прошлого автосохранения этого турнира.
+        """
+        if not tournament_data:
+            return None
+        snapshot = take_snapshot(tournament_data)
+        digest = snapshot_digest(snapshot)
+        slug = _slug(tournament_data.get("name", "tournament"))
+        with self._lock:
+            if self._last_autosave_digest.get(slug) == digest:
+                return None
+            self._last_autosave_digest[slug] = digest
+        filename = f"autosave_{slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path = os.path.join(self.autosave_dir, filename)
+        return self._executor.submit(self._write_autosave, path, snapshot, slug)
+
+    def _write_autosave(self, path: str, snapshot: Any, slug: str) -> str:
+        try:
+            # Автосохранения без отступов: читает их программа, а не человек
+            write_json_atomic(path, snapshot, indent=None)
+        except Exception as e:
+            with self._lock:
+                self._last_autosave_digest.pop(slug, None)
+            print(f"[autosave] Ошибка автосохранения {path}: {e}")
+            raise
+        self._prune(slug)
+        print(f"[autosave] Турнир автоматически сохранен в {path}")
+        return path
+
+    def _prune(self, slug: str) -> None:
+        pattern = os.path.join(glob.escape(self.autosave_dir), f"autosave_{glob.escape(slug)}_*.json")
+        files = sorted(glob.glob(pattern))
+        for old in files[: max(0, len(files) - self.keep)]:
+            try:
+                os.remove(old)
+            except OSError as e:
+                print(f"[autosave] Не удалось удалить старое автосохранение {old}: {e}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_service: Optional[SnapshotService] = None
+
+
+def get_snapshot_service() -> SnapshotService:
+    global _service
+    if _service is None:
+        keep = DEFAULT_AUTOSAVE_KEEP
+        try:
+            from core.settings import get_settings
+            keep = int(get_settings().get("tournament", "autosave_keep", DEFAULT_AUTOSAVE_KEEP))
+        except Exception:
+            pass
+        _service = SnapshotService(keep=max(1, keep))
+    return _service
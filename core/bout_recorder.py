@@ -0,0 +1,265 @@
+"""
+Запись схватки и воспроизведение с ускорением.
+
+BoutRecorder дописывает поток схватки в отдельный файл bouts/<...>.jsonl:
+первая строка — заголовок (ковёр, схватка, борцы, время кластера начала и
+отметка time.monotonic() t0), далее записи {"t": секунды от t0, "k": вид, ...}:
+- REC_BOARD — scoreboard_update в том виде, в каком его получили табло;
+  хранятся только изменившиеся поля верхнего уровня (имена, категория и
+  счёт одного угла не повторяются в каждой строке);
+- REC_EVENT — событие правил (core.rules.ScoringEvent.to_dict());
+- REC_UNDO / REC_REDO — отмена и повтор действия судьи;
+- REC_END — окончание схватки (причина, победитель).
+Каждая строка сбрасывается на диск сразу: после сбоя запись обрывается
+на последнем событии, а не теряется целиком.
+
+BoutReplay читает запись и отдаёт её получателю (sink) с исходными
+интервалами, ускоренными в speed раз (speed=None — без пауз). Время
+воспроизведения — в часах панели на момент записи (now()), поэтому
+HeadlessScoreboard с clock=replay.now показывает то же, что показывало
+табло: для разбора спорных эпизодов. network_sink пересчитывает отметки
+часов в scoreboard_update на текущие и рассылает их настоящим табло —
+нагрузочная проверка табло реальным трафиком.
+"""
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.cluster_clock import cluster_datetime, cluster_time
+from core.scoreboard_clock import ClockFollower
+
+
+BOUTS_DIR = "bouts"
+MAX_SPEED = 100.0
+
+REC_BOARD = "board"
+REC_EVENT = "event"
+REC_UNDO = "undo"
+REC_REDO = "redo"
+REC_END = "end"
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w\-]+", "_", str(text), flags=re.UNICODE).strip("_")
+
+
+def bout_path(mat: int, match_id: Optional[str], names: Tuple[str, str], directory: str = BOUTS_DIR) -> str:
+    """Файл записи: ковёр, схватка (id или имена) и время начала."""
+    key = _slug(match_id) if match_id else _slug("_".join(n for n in names if n))
+    stamp = cluster_datetime().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"mat{mat}_{key or 'bout'}_{stamp}.jsonl")
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+class BoutRecorder:
+    """Запись одной схватки: только дозапись, строка на событие."""
+
+    def __init__(self, path: str, header: Optional[Dict[str, Any]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self._clock = clock
+        self.t0 = clock()
+        self._board: Dict[str, Any] = {}
+        self.records = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._write(dict(header or {}, started_ts=cluster_time(), t0=self.t0))
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def record(self, kind: str, **fields: Any) -> None:
+        self._write(dict(fields, t=round(self._clock() - self.t0, 4), k=kind))
+        self.records += 1
+
+    def board(self, data: Dict[str, Any]) -> None:
+        """scoreboard_update: пишутся только изменившиеся поля."""
+        delta = {k: v for k, v in data.items() if self._board.get(k) != v}
+        removed = [k for k in self._board if k not in data]
+        if not delta and not removed:
+            return
+        self._board = dict(data)
+        if removed:
+            delta["_removed"] = removed
+        self.record(REC_BOARD, data=delta)
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            return
+        self._file.write(_dumps(record) + "\n")
+        self._file.flush()
+
+
+def read_bout(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Заголовок и записи схватки; у REC_BOARD в data — полное сообщение табло.
+    Оборванная последняя строка (сбой при записи) пропускается.
+    """
+    header: Dict[str, Any] = {}
+    records: List[Dict[str, Any]] = []
+    board: Dict[str, Any] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f):
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"[bouts] {path}: пропущена повреждённая строка {number + 1}")
+                continue
+            if number == 0:
+                header = item
+                continue
+            if item.get("k") == REC_BOARD:
+                delta = dict(item.get("data") or {})
+                for key in delta.pop("_removed", []):
+                    board.pop(key, None)
+                board.update(delta)
+                item = dict(item, data=dict(board))
+            records.append(item)
+    return header, records
+
+
+class HeadlessScoreboard:
+    """Табло без Qt: то же, что ScoreboardWindow.handle_scoreboard_update, но в данных."""
+
+    def __init__(self, mat: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.mat = mat
+        self._clock = clock
+        self.clock = ClockFollower()
+        self.data: Dict[str, Any] = {}
+        self.updates = 0
+
+    def handle_scoreboard_update(self, data: Dict[str, Any]) -> bool:
+        if not data or (self.mat and data.get("mat") != self.mat):
+            return False
+        self.data = data
+        if data.get("clock"):
+            self.clock.apply(data["clock"], received_at=self._clock())
+        self.updates += 1
+        return True
+
+    def display(self) -> Dict[str, Any]:
+        """Показания табло на текущий момент."""
+        data = self.data
+        if self.clock.has_state():
+            seconds = self.clock.seconds(self._clock())
+        else:
+            seconds = int(data.get("time_remaining", 0) or 0)
+
+        def corner(key: str) -> Dict[str, Any]:
+            values = data.get(key) or {}
+            shown = {field: values.get(field, 0) for field in ("points", "cautions", "passivity")}
+            shown["name"] = values.get("name", "")
+            return shown
+
+        return {
+            "red": corner("red"),
+            "blue": corner("blue"),
+            "period": data.get("period", 1),
+            "is_break": bool(data.get("is_break", False)),
+            "time": f"{seconds // 60:02d}:{seconds % 60:02d}",
+            "category": data.get("category", ""),
+        }
+
+
+class BoutReplay:
+    """Воспроизведение записи схватки с ускорением 1×–MAX_SPEED× (None — без пауз)."""
+
+    def __init__(
+        self,
+        path: str,
+        speed: Optional[float] = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if speed is not None and not 1.0 <= speed <= MAX_SPEED:
+            raise ValueError(f"Скорость воспроизведения от 1 до {MAX_SPEED:g}, указано {speed}")
+        self.header, self.records = read_bout(path)
+        self.speed = speed
+        self._clock = clock
+        self._sleep = sleep
+        self._started: Optional[float] = None
+        self._position = 0.0   # секунды записи, уже воспроизведённые
+
+    @property
+    def duration(self) -> float:
+        return self.records[-1]["t"] if self.records else 0.0
+
+    def now(self) -> float:
+        """Текущий момент воспроизведения в монотонных часах панели при записи."""
+        t0 = float(self.header.get("t0", 0.0))
+        if self._started is None or self.speed is None:
+            return t0 + self._position
+        return t0 + min(self.duration, (self._clock() - self._started) * self.speed)
+
+    def play(self, sink: Callable[[Dict[str, Any]], Any], kinds: Optional[Iterable[str]] = None) -> int:
+        """Отдаёт записи в sink в исходном темпе × speed; возвращает число отданных."""
+        kinds = set(kinds) if kinds else None
+        self._started = self._clock()
+        sent = 0
+        for record in self.records:
+            if self.speed is not None:
+                delay = self._started + record["t"] / self.speed - self._clock()
+                if delay > 0:
+                    self._sleep(delay)
+            self._position = record["t"]
+            if kinds is None or record["k"] in kinds:
+                sink(record)
+                sent += 1
+        self._position = self.duration
+        self._started = None
+        return sent
+
+
+def replay_to_scoreboard(replay: BoutReplay, scoreboard: HeadlessScoreboard) -> List[Dict[str, Any]]:
+    """Проигрывает запись в табло; возвращает показания после каждого сообщения."""
+    frames = []
+
+    def sink(record: Dict[str, Any]) -> None:
+        if scoreboard.handle_scoreboard_update(record["data"]):
+            frames.append(dict(scoreboard.display(), t=record["t"]))
+
+    replay.play(sink, kinds=(REC_BOARD,))
+    return frames
+
+
+def network_sink(network_manager: Any, replay: BoutReplay) -> Callable[[Dict[str, Any]], None]:
+    """
+    Получатель для play(): рассылает записанные scoreboard_update по сети.
+    Отметки часов сдвигаются в текущие монотонные часы, чтобы табло
+    отсчитывали время от момента воспроизведения.
+    """
+    def sink(record: Dict[str, Any]) -> None:
+        if record.get("k") != REC_BOARD:
+            return
+        data = dict(record["data"])
+        clock = data.get("clock")
+        if clock:
+            shift = time.monotonic() - replay.now()
+            clock = dict(clock, stamp=clock["stamp"] + shift)
+            if clock.get("deadline") is not None:
+                clock["deadline"] += shift
+            data["clock"] = clock
+        try:
+            network_manager.send_message("scoreboard_update", data)
+        except Exception as e:
+            print(f"[bouts] Ошибка отправки воспроизводимого сообщения: {e}")
+
+    return sink
@@ -0,0 +1,193 @@
+"""
+Общие часы кластера: координатор и узлы ковров.
+
+Опорные часы — у координатора. Узел на каждом heartbeat (core.constants.
+SCHEDULE_SYNC_HEARTBEAT) отправляет координатору пробу clock_probe с
+отметкой t1 своих часов; координатор отвечает clock_reply с моментом
+приёма t2 и отправки t3 по своим часам, узел отмечает приём t4 (как в NTP):
+
+    смещение = ((t2 - t1) + (t3 - t4)) / 2
+    задержка = (t4 - t1) - (t3 - t2)
+
+Отдельная проба искажена очередями ОС и сети, поэтому смещение — медиана
+по половине проб окна с наименьшей задержкой, а уход частоты (skew) —
+медиана наклонов между этими пробами.
+
+Локальные часы — time.monotonic(), один раз привязанный к time.time():
+перевод системного времени их не сдвигает. Время кластера не идёт назад:
+первая синхронизация применяется скачком, дальнейшие поправки — плавно
+(SLEW_RATE), большой скачок вперёд (координатор перезапущен с другими
+часами) — сразу.
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from statistics import median
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+PROBE_WINDOW = 64          # проб в окне оценки (~3 мин при heartbeat 3 с)
+PROBE_BURST = 4            # проб за heartbeat, пока окно не набрано
+SLEW_RATE = 0.05           # секунд поправки на секунду хода часов
+STEP_THRESHOLD = 2.0       # поправка вперёд больше этой — скачком
+MIN_SKEW_SPAN = 30.0       # секунд между пробами для оценки ухода частоты
+MAX_SKEW = 500e-6          # кварц ПК уходит не больше 500 ppm
+
+
+class ClusterClock:
+    """Монотонные часы, согласованные с координатором."""
+
+    def __init__(self, monotonic: Callable[[], float] = time.monotonic, wall: Callable[[], float] = time.time):
+        self._monotonic = monotonic
+        self._epoch = wall() - monotonic()
+        self._lock = threading.Lock()
+        self.is_reference = False
+        self.synced = False
+        # (локальное время приёма t4, смещение, задержка)
+        self._samples: Deque[Tuple[float, float, float]] = deque(maxlen=PROBE_WINDOW)
+        # Оценка: смещение offset в момент base (локальное время) и skew
+        self._estimate: Optional[Tuple[float, float, float]] = None
+        self._offset = 0.0
+        self._applied_at: Optional[float] = None
+        self._last = float("-inf")
+
+    # ------------------------------------------------------------------ #
+    #  Время
+    # ------------------------------------------------------------------ #
+    def local_time(self) -> float:
+        """Локальные монотонные часы в секундах эпохи (для проб)."""
+        return self._epoch + self._monotonic()
+
+    def now(self) -> float:
+        """Время кластера, секунды эпохи; не убывает."""
+        with self._lock:
+            local = self.local_time()
+            self._slew(local)
+            value = max(local + self._offset, self._last)
+            self._last = value
+            return value
+
+    def now_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.now())
+
+    # ------------------------------------------------------------------ #
+    #  Синхронизация
+    # ------------------------------------------------------------------ #
+    def set_reference(self, is_reference: bool) -> None:
+        """Координатор — источник времени: его часы кластера равны локальным."""
+        with self._lock:
+            self.is_reference = bool(is_reference)
+            self._samples.clear()
+            self._estimate = None
+            self.synced = self.is_reference
+
+    def probes_wanted(self) -> int:
+        """Сколько проб отправить на этом heartbeat."""
+        if self.is_reference:
+            return 0
+        with self._lock:
+            return PROBE_BURST if len(self._samples) < PROBE_BURST else 1
+
+    def add_probe(self, t1: float, t2: float, t3: float, t4: float) -> Tuple[float, float]:
+        """
+        Учитывает пробу (t1, t4 — локальные часы, t2, t3 — часы координатора).
+        Возвращает (смещение, задержка) этой пробы.
+        """
+        offset = ((t2 - t1) + (t3 - t4)) / 2.0
+        delay = max(0.0, (t4 - t1) - (t3 - t2))
+        with self._lock:
+            if self.is_reference:
+                return offset, delay
+            self._samples.append((t4, offset, delay))
+            self._estimate = self._fit()
+            if not self.synced:
+                # Первая оценка — скачком: до неё время кластера было локальным
+                self._offset = self._target(t4)
+                self._applied_at = t4
+                self.synced = True
+        return offset, delay
+
+    def status(self) -> Dict[str, Any]:
+        """Состояние для heartbeat и вкладки сети."""
+        with self._lock:
+            delays = [s[2] for s in self._samples]
+            return {
+                "synced": self.synced,
+                "reference": self.is_reference,
+                "offset_ms": round(self._offset * 1000.0, 1),
+                "skew_ppm": round(self._estimate[2] * 1e6, 1) if self._estimate else 0.0,
+                "delay_ms": round(min(delays) * 1000.0, 1) if delays else None,
+                "samples": len(delays),
+            }
+
+    # ------------------------------------------------------------------ #
+    #  Internal
+    # ------------------------------------------------------------------ #
+    def _fit(self) -> Tuple[float, float, float]:
+        best = sorted(self._samples, key=lambda s: s[2])[: max(1, (len(self._samples) + 1) // 2)]
+        base = median(s[0] for s in best)
+        offset = median(s[1] for s in best)
+        slopes = [
+            (b[1] - a[1]) / (b[0] - a[0])
+            for i, a in enumerate(best)
+            for b in best[i + 1:]
+            if abs(b[0] - a[0]) >= MIN_SKEW_SPAN
+        ]
+        skew = max(-MAX_SKEW, min(MAX_SKEW, median(slopes))) if slopes else 0.0
+        return base, offset, skew
+
+    def _target(self, local: float) -> float:
+        if self.is_reference:
+            return 0.0
+        if self._estimate is None:
+            return self._offset
+        base, offset, skew = self._estimate
+        return offset + skew * (local - base)
+
+    def _slew(self, local: float) -> None:
+        target = self._target(local)
+        elapsed = local - self._applied_at if self._applied_at is not None else 0.0
+        self._applied_at = local
+        diff = target - self._offset
+        if diff > STEP_THRESHOLD:
+            self._offset = target
+        else:
+            step = SLEW_RATE * max(0.0, elapsed)
+            self._offset += max(-step, min(step, diff))
+
+
+_clock: Optional[ClusterClock] = None
+
+
+def get_cluster_clock() -> ClusterClock:
+    """Общие часы процесса."""
+    global _clock
+    if _clock is None:
+        _clock = ClusterClock()
+    return _clock
+
+
+def cluster_time() -> float:
+    """Время кластера в секундах эпохи (вместо time.time())."""
+    return get_cluster_clock().now()
+
+
+def cluster_datetime() -> datetime:
+    """Время кластера как datetime (вместо datetime.now())."""
+    return get_cluster_clock().now_datetime()
+
+
+def is_stale_update(current: Dict[str, Any], incoming: Dict[str, Any]) -> bool:
+    """
+    Обновление записи расписания старше уже применённого (по updated_ts —
+    времени кластера на момент отправки). Без отметки у любой из сторон
+    обновление применяется, как раньше.
+    """
+    current_ts, incoming_ts = current.get("updated_ts"), incoming.get("updated_ts")
+    if current_ts is None or incoming_ts is None:
+        return False
+    try:
+        return float(incoming_ts) < float(current_ts)
+    except (TypeError, ValueError):
+        return False
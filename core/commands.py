@@ -0,0 +1,166 @@
+"""
+Стек команд начисления: точная отмена и повтор действий судьи.
+
+Каждое действие (очки, предупреждение, пассивность) — ScoreCommand: событие
+правил (core.rules.ScoringEvent), значения полей обоих углов до и после
+применения и строки, которые действие добавило в историю борцов. Отмена
+возвращает поля «до» и убирает свои строки, повтор — ставит «после» и
+строки обратно. Текст истории не разбирается и правила повторно не
+прогоняются, поэтому отмена и повтор — O(1) и не зависят от языка подписей.
+
+Стек ограничен (MAX_COMMANDS, старые команды вытесняются); новая команда
+сбрасывает ветку повтора. to_list()/from_list() — для записи схватки.
+Модуль без Qt: углы — любые объекты с полями FIELDS и action_history
+(core.models.Wrestler панели управления или CornerState).
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from core.rules import BLUE, RED, BoutState, RulesEngine, ScoringEvent
+
+
+FIELDS = ("points", "cautions", "passivity", "last_scored")
+MAX_COMMANDS = 200
+
+
+def snapshot(state: BoutState) -> Dict[str, Dict[str, Any]]:
+    """Значения FIELDS обоих углов."""
+    return {
+        corner: {name: getattr(state.corner(corner), name) for name in FIELDS}
+        for corner in (RED, BLUE)
+    }
+
+
+def restore(state: BoutState, values: Dict[str, Dict[str, Any]]) -> None:
+    for corner, fields in values.items():
+        target = state.corner(corner)
+        for name, value in fields.items():
+            setattr(target, name, value)
+
+
+@dataclass
+class ScoreCommand:
+    """Применённое событие с состояниями до/после и своими строками истории."""
+    event: ScoringEvent
+    before: Dict[str, Dict[str, Any]]
+    after: Dict[str, Dict[str, Any]]
+    end_reason: Optional[str] = None
+    lines: Dict[str, List[str]] = field(default_factory=lambda: {RED: [], BLUE: []})
+
+    def log(self, state: BoutState, corner: str, text: str) -> None:
+        """Добавляет строку в историю угла и запоминает её за командой."""
+        state.corner(corner).action_history.append(text)
+        self.lines[corner].append(text)
+
+    def undo(self, state: BoutState) -> None:
+        restore(state, self.before)
+        for corner, lines in self.lines.items():
+            _remove_lines(state.corner(corner).action_history, lines)
+
+    def redo(self, state: BoutState) -> None:
+        restore(state, self.after)
+        for corner, lines in self.lines.items():
+            state.corner(corner).action_history.extend(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event": self.event.to_dict(),
+            "before": self.before,
+            "after": self.after,
+            "end_reason": self.end_reason,
+            "lines": self.lines,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScoreCommand":
+        lines = data.get("lines") or {}
+        return cls(
+            event=ScoringEvent.from_dict(data["event"]),
+            before=data["before"],
+            after=data["after"],
+            end_reason=data.get("end_reason"),
+            lines={RED: list(lines.get(RED, [])), BLUE: list(lines.get(BLUE, []))},
+        )
+
+
+def _remove_lines(history: List[str], lines: List[str]) -> None:
+    """
+    Убирает строки команды из истории. Обычно они в самом конце (O(1));
+    если после них записан итог схватки — ищутся с конца.
+    """
+    if not lines:
+        return
+    if history[-len(lines):] == lines:
+        del history[-len(lines):]
+        return
+    for line in reversed(lines):
+        for i in range(len(history) - 1, -1, -1):
+            if history[i] == line:
+                del history[i]
+                break
+
+
+class CommandStack:
+    """Ограниченный стек отмены и ветка повтора."""
+
+    def __init__(self, limit: int = MAX_COMMANDS):
+        self.limit = limit
+        self._undo: deque = deque(maxlen=limit)
+        self._redo: List[ScoreCommand] = []
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def execute(self, engine: RulesEngine, state: BoutState, event: ScoringEvent) -> ScoreCommand:
+        """Применяет событие через движок правил и кладёт команду в стек."""
+        before = snapshot(state)
+        end_reason = engine.apply(state, event)
+        command = ScoreCommand(event, before, snapshot(state), end_reason)
+        self._undo.append(command)
+        self._redo.clear()
+        return command
+
+    def undo(self, state: BoutState) -> Optional[ScoreCommand]:
+        """Отменяет последнюю команду; None — отменять нечего."""
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        command.undo(state)
+        self._redo.append(command)
+        return command
+
+    def redo(self, state: BoutState) -> Optional[ScoreCommand]:
+        """Повторяет последнюю отменённую команду; None — повторять нечего."""
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        command.redo(state)
+        self._undo.append(command)
+        return command
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Применённые команды по порядку (ветка повтора не сохраняется)."""
+        return [command.to_dict() for command in self._undo]
+
+    @classmethod
+    def from_list(cls, data: Optional[List[Dict[str, Any]]], limit: int = MAX_COMMANDS) -> "CommandStack":
+        stack = cls(limit)
+        for item in data or []:
+            try:
+                stack._undo.append(ScoreCommand.from_dict(item))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"[UNDO] Пропущена повреждённая команда записи схватки: {e}")
+        return stack
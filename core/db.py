@@ -1,7 +1,7 @@
 import os
 import sqlite3
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
 DB_FILENAME = "tournaments.db"
@@ -15,11 +15,11 @@ def get_db_path() -> str:
     return os.path.join(base_dir, DB_FILENAME)
 
 
-def get_connection():
+def get_connection(db_path: Optional[str] = None):
     """
     Открывает соединение с БД и инициализирует структуру при первом запуске.
     """
-    db_path = get_db_path()
+    db_path = db_path or get_db_path()
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     init_db(conn)
@@ -65,9 +65,271 @@ def init_db(conn: sqlite3.Connection) -> None:
         """
     )
 
+    # Колонки фактического времени схваток (добавлены позже — мигрируем старые БД)
+    _ensure_columns(
+        conn,
+        "matches",
+        {
+            "started_at": "TEXT",
+            "completed_at": "TEXT",
+            "duration_sec": "REAL",
+            "sport": "TEXT",
+            "age_group": "TEXT",
+        },
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_matches_duration ON matches(sport, age_group) WHERE duration_sec IS NOT NULL"
+    )
+
+    init_tournament_schema(conn)
+    init_results_schema(conn)
+
     conn.commit()
 
 
+def init_tournament_schema(conn: sqlite3.Connection) -> None:
+    """
+    Нормализованная схема полного турнира (участники, категории, состав
+    категорий, схватки, слоты расписания, события схваток).
+    Работа с ней — через core.repository.TournamentRepository.
+
+    Столбцы, по которым ищем и сортируем, вынесены отдельно; полная запись
+    (со всеми необязательными полями) хранится в JSON-колонке data.
+    """
+    cur = conn.cursor()
+
+    _ensure_columns(conn, "tournaments", {"sport": "TEXT", "data": "TEXT", "updated_at": "TEXT"})
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS participants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tournament_id INTEGER NOT NULL,
+            uid TEXT NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            name TEXT NOT NULL,
+            club TEXT,
+            weight REAL,
+            age INTEGER,
+            gender TEXT,
+            data TEXT NOT NULL,
+            UNIQUE(tournament_id, uid),
+            FOREIGN KEY (tournament_id) REFERENCES tournaments(id) ON DELETE CASCADE
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_participants_name ON participants(tournament_id, name)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_participants_club ON participants(tournament_id, club)")
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tournament_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            gender TEXT,
+            weight_min REAL,
+            weight_max REAL,
+            age_min INTEGER,
+            age_max INTEGER,
+            bracket_type TEXT,
+            members_hash TEXT,
+            data TEXT NOT NULL,
+            UNIQUE(tournament_id, name),
+            FOREIGN KEY (tournament_id) REFERENCES tournaments(id) ON DELETE CASCADE
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS category_members (
+            category_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            participant_id INTEGER,
+            data TEXT NOT NULL,
+            PRIMARY KEY (category_id, position),
+            FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE,
+            FOREIGN KEY (participant_id) REFERENCES participants(id) ON DELETE SET NULL
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_category_members_participant ON category_members(participant_id)")
+
+    # Таблица matches уже есть (результаты); добавляем связь с категорией и полную запись
+    _ensure_columns(
+        conn,
+        "matches",
+        {"category_id": "INTEGER", "round": "INTEGER", "position": "INTEGER", "data": "TEXT"},
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_matches_category ON matches(category_id, round, position)")
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schedule_slots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tournament_id INTEGER NOT NULL,
+            match_uid TEXT NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            mat INTEGER,
+            start_min INTEGER,
+            status TEXT,
+            data TEXT NOT NULL,
+            UNIQUE(tournament_id, match_uid),
+            FOREIGN KEY (tournament_id) REFERENCES tournaments(id) ON DELETE CASCADE
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_schedule_mat_time ON schedule_slots(tournament_id, mat, start_min)")
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS match_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tournament_id INTEGER NOT NULL,
+            match_uid TEXT NOT NULL,
+            ts REAL NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT,
+            FOREIGN KEY (tournament_id) REFERENCES tournaments(id) ON DELETE CASCADE
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_match_events_match ON match_events(tournament_id, match_uid, ts)")
+
+
+def init_results_schema(conn: sqlite3.Connection) -> None:
+    """
+    Аналитика результатов по всем турнирам (core.warehouse):
+    спортсмены с единым ключом между турнирами, таблица фактов схваток
+    и агрегаты, которые обновляются при каждом save_match_result.
+    """
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS athletes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            identity_key TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            name_norm TEXT NOT NULL,
+            birth_year INTEGER,
+            club TEXT
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_athletes_name ON athletes(name_norm)")
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bout_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tournament_id INTEGER NOT NULL,
+            match_uid TEXT NOT NULL,
+            category TEXT,
+            round INTEGER,
+            season INTEGER,
+            athlete1_id INTEGER NOT NULL,
+            athlete2_id INTEGER NOT NULL,
+            club1 TEXT,
+            club2 TEXT,
+            score1 INTEGER NOT NULL DEFAULT 0,
+            score2 INTEGER NOT NULL DEFAULT 0,
+            winner_id INTEGER,
+            UNIQUE(tournament_id, match_uid),
+            FOREIGN KEY (tournament_id) REFERENCES tournaments(id) ON DELETE CASCADE
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bout_results_athlete1 ON bout_results(athlete1_id, season)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bout_results_athlete2 ON bout_results(athlete2_id, season)")
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS athlete_stats (
+            athlete_id INTEGER PRIMARY KEY,
+            bouts INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            points_for INTEGER NOT NULL DEFAULT 0,
+            points_against INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+    # Пара хранится один раз: athlete_lo < athlete_hi
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS head_to_head (
+            athlete_lo INTEGER NOT NULL,
+            athlete_hi INTEGER NOT NULL,
+            bouts INTEGER NOT NULL DEFAULT 0,
+            lo_wins INTEGER NOT NULL DEFAULT 0,
+            hi_wins INTEGER NOT NULL DEFAULT 0,
+            lo_points INTEGER NOT NULL DEFAULT 0,
+            hi_points INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (athlete_lo, athlete_hi)
+        ) WITHOUT ROWID
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS placements (
+            tournament_id INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            athlete_id INTEGER NOT NULL,
+            season INTEGER,
+            club TEXT,
+            place INTEGER NOT NULL,
+            PRIMARY KEY (tournament_id, category, athlete_id)
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS club_medals (
+            season INTEGER NOT NULL,
+            club TEXT NOT NULL,
+            gold INTEGER NOT NULL DEFAULT 0,
+            silver INTEGER NOT NULL DEFAULT 0,
+            bronze INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (season, club)
+        ) WITHOUT ROWID
+        """
+    )
+
+    # Рейтинги Glicko (core.ratings)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ratings (
+            athlete_id INTEGER PRIMARY KEY,
+            rating REAL NOT NULL,
+            rd REAL NOT NULL,
+            bouts INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT,
+            last_period INTEGER NOT NULL DEFAULT -1
+        )
+        """
+    )
+    # Период (номер турнира) последнего обновления — для роста RD за пропуски
+    _ensure_columns(conn, "ratings", {"last_period": "INTEGER NOT NULL DEFAULT -1"})
+
+
+def _ensure_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
+    """
+    Добавляет недостающие колонки в существующую таблицу.
+    """
+    cur = conn.cursor()
+    cur.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cur.fetchall()}
+    for name, col_type in columns.items():
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+
+
 def _get_tournament_key(tournament_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Формирует ключ турнира на основе его метаданных.
@@ -121,9 +383,17 @@ def save_tournament_metadata(tournament_data: Dict[str, Any]) -> None:
         print(f"[DB] Ошибка при сохранении метаданных турнира: {e}")
 
 
-def save_match_result(tournament_data: Dict[str, Any], category_name: str, match: Dict[str, Any]) -> None:
+def save_match_result(
+    tournament_data: Dict[str, Any],
+    category_name: str,
+    match: Dict[str, Any],
+    timing: Optional[Dict[str, Any]] = None,
+) -> None:
     """
     Сохраняет результат конкретного матча в БД (upsert по match_uid).
+
+    timing — фактическое время схватки: started_ts/completed_ts (unix-время),
+    sport и age_group. Используется для прогноза длительности схваток.
     """
     try:
         conn = get_connection()
@@ -140,13 +410,23 @@ def save_match_result(tournament_data: Dict[str, Any], category_name: str, match
             completed = 1 if match.get("completed") else 0
             updated_at = datetime.utcnow().isoformat()
 
+            timing = timing or {}
+            started_ts = timing.get("started_ts")
+            completed_ts = timing.get("completed_ts")
+            started_at = datetime.utcfromtimestamp(started_ts).isoformat() if started_ts else None
+            completed_at = datetime.utcfromtimestamp(completed_ts).isoformat() if completed_ts else None
+            duration_sec = None
+            if started_ts and completed_ts and completed_ts > started_ts:
+                duration_sec = float(completed_ts - started_ts)
+
             cur.execute(
                 """
                 INSERT INTO matches (
                     tournament_id, category, match_uid, wrestler1, wrestler2,
-                    score1, score2, winner, completed, updated_at
+                    score1, score2, winner, completed, updated_at,
+                    started_at, completed_at, duration_sec, sport, age_group
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(tournament_id, match_uid) DO UPDATE SET
                     category = excluded.category,
                     wrestler1 = excluded.wrestler1,
@@ -155,7 +435,12 @@ def save_match_result(tournament_data: Dict[str, Any], category_name: str, match
                     score2   = excluded.score2,
                     winner   = excluded.winner,
                     completed = excluded.completed,
-                    updated_at = excluded.updated_at
+                    updated_at = excluded.updated_at,
+                    started_at = COALESCE(excluded.started_at, matches.started_at),
+                    completed_at = COALESCE(excluded.completed_at, matches.completed_at),
+                    duration_sec = COALESCE(excluded.duration_sec, matches.duration_sec),
+                    sport = COALESCE(excluded.sport, matches.sport),
+                    age_group = COALESCE(excluded.age_group, matches.age_group)
                 """,
                 (
                     tournament_id,
@@ -168,10 +453,46 @@ def save_match_result(tournament_data: Dict[str, Any], category_name: str, match
                     winner,
                     completed,
                     updated_at,
+                    started_at,
+                    completed_at,
+                    duration_sec,
+                    timing.get("sport"),
+                    timing.get("age_group"),
                 ),
             )
     except Exception as e:
         print(f"[DB] Ошибка при сохранении результата матча: {e}")
+        return
+
+    # Аналитика по всем турнирам — отдельной транзакцией после фиксации результата:
+    # её ошибка откатывает только аналитику, а не результат судей
+    try:
+        from core.warehouse import record_bout
+        with conn:
+            record_bout(conn, tournament_id, tournament_data, category_name, match)
+    except Exception as e:
+        print(f"[DB] Ошибка обновления аналитики результатов: {e}")
+
+
+def load_duration_samples() -> List[Dict[str, Any]]:
+    """
+    Возвращает фактические длительности схваток: [{"sport", "age_group", "duration_sec"}].
+    Безопасно: при ошибке возвращает пустой список.
+    """
+    try:
+        conn = get_connection()
+        with conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT sport, age_group, duration_sec FROM matches
+                WHERE duration_sec IS NOT NULL AND duration_sec > 0
+                """
+            )
+            return [dict(row) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"[DB] Ошибка при чтении длительностей схваток: {e}")
+        return []
 
 
 def apply_db_results_to_tournament(tournament_data: Dict[str, Any]) -> None:
@@ -0,0 +1,257 @@
+"""
+Прогноз длительности схваток.
+
+Фактические длительности (от вызова на ковёр до результата) пишутся в БД
+(core.db.save_match_result с параметром timing). По ним оценивается
+длительность схватки для пары (вид спорта, возрастная группа): медиана
+выборки, «притянутая» к оценке уровнем выше (вид спорта -> общий приоритет),
+пока данных мало. Оценки используются при генерации расписания и для
+пересчёта ожидаемого времени начала (ETA) ожидающих схваток ковра.
+"""
+from collections import deque
+from datetime import datetime
+from statistics import median
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from core.cluster_clock import cluster_datetime, cluster_time
+from core.schedule_time import MINUTES_PER_DAY, format_minutes
+
+
+DEFAULT_SPORT = "greco_roman"
+# Приоритет: 7 минут схватка + 1 минута на смену пары = прежние 8 минут слота
+DEFAULT_BOUT_MINUTES = 7.0
+CHANGEOVER_MINUTES = 1.0
+# Вес приоритета в «псевдонаблюдениях»: при n образцах вклад данных n / (n + k)
+PRIOR_STRENGTH = 5
+# Сколько последних образцов храним на группу
+MAX_SAMPLES_PER_GROUP = 200
+# Отбрасываем явно ошибочные замеры (забыли завершить схватку и т.п.)
+MIN_SAMPLE_SEC = 30
+MAX_SAMPLE_SEC = 30 * 60
+
+# Верхние границы возрастных групп (лет включительно)
+AGE_GROUPS: List[Tuple[int, str]] = [
+    (10, "U11"),
+    (12, "U13"),
+    (14, "U15"),
+    (16, "U17"),
+    (19, "U20"),
+]
+SENIOR_AGE_GROUP = "Взрослые"
+UNKNOWN_AGE_GROUP = ""
+
+
+def age_group_for_age(age: Any) -> str:
+    """Возрастная группа по возрасту в годах."""
+    try:
+        age = float(age)
+    except (TypeError, ValueError):
+        return UNKNOWN_AGE_GROUP
+    if age <= 0:
+        return UNKNOWN_AGE_GROUP
+    for upper, name in AGE_GROUPS:
+        if age <= upper:
+            return name
+    return SENIOR_AGE_GROUP
+
+
+def category_age_group(cat_data: Optional[Dict[str, Any]]) -> str:
+    """
+    Возрастная группа категории: поле age, середина диапазона age_min/age_max
+    или медиана возрастов участников.
+    """
+    if not isinstance(cat_data, dict):
+        return UNKNOWN_AGE_GROUP
+    if cat_data.get("age") not in (None, ""):
+        return age_group_for_age(cat_data.get("age"))
+    age_min, age_max = cat_data.get("age_min"), cat_data.get("age_max")
+    try:
+        if age_max is not None and int(age_max) < 99:
+            return age_group_for_age((int(age_min or 0) + int(age_max)) / 2)
+    except (TypeError, ValueError):
+        pass
+    ages = []
+    for p in cat_data.get("participants", []) or []:
+        try:
+            ages.append(float(p.get("age")))
+        except (TypeError, ValueError, AttributeError):
+            continue
+    return age_group_for_age(median(ages)) if ages else UNKNOWN_AGE_GROUP
+
+
+def tournament_sport(tournament_data: Optional[Dict[str, Any]]) -> str:
+    if isinstance(tournament_data, dict):
+        return str(tournament_data.get("sport") or DEFAULT_SPORT)
+    return DEFAULT_SPORT
+
+
+class DurationModel:
+    """Оценки длительности схваток по (вид спорта, возрастная группа)."""
+
+    def __init__(self, prior_minutes: float = DEFAULT_BOUT_MINUTES, changeover_minutes: float = CHANGEOVER_MINUTES):
+        self.prior_minutes = prior_minutes
+        self.changeover_minutes = changeover_minutes
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._by_sport: Dict[str, Deque[float]] = {}
+        self._cache: Dict[Tuple[str, str], float] = {}
+
+    def fit(self, samples: List[Dict[str, Any]]) -> "DurationModel":
+        """Заполняет модель образцами из БД (см. core.db.load_duration_samples)."""
+        for sample in samples:
+            self.record(sample.get("sport"), sample.get("age_group"), sample.get("duration_sec"))
+        return self
+
+    def record(self, sport: Optional[str], age_group: Optional[str], duration_sec: Any) -> bool:
+        """Добавляет один замер (инкрементально). Возвращает False, если замер отброшен."""
+        try:
+            duration_sec = float(duration_sec)
+        except (TypeError, ValueError):
+            return False
+        if not MIN_SAMPLE_SEC <= duration_sec <= MAX_SAMPLE_SEC:
+            return False
+        sport = sport or DEFAULT_SPORT
+        key = (sport, age_group or UNKNOWN_AGE_GROUP)
+        minutes = duration_sec / 60.0
+        self._samples.setdefault(key, deque(maxlen=MAX_SAMPLES_PER_GROUP)).append(minutes)
+        self._by_sport.setdefault(sport, deque(maxlen=MAX_SAMPLES_PER_GROUP)).append(minutes)
+        # Меняются оценки только этого вида спорта
+        for cached in [k for k in self._cache if k[0] == sport]:
+            del self._cache[cached]
+        return True
+
+    def sample_count(self, sport: Optional[str] = None, age_group: Optional[str] = None) -> int:
+        if sport is None:
+            return sum(len(s) for s in self._samples.values())
+        if age_group is None:
+            return len(self._by_sport.get(sport, ()))
+        return len(self._samples.get((sport, age_group), ()))
+
+    def bout_minutes(self, sport: Optional[str] = None, age_group: Optional[str] = None) -> float:
+        """Ожидаемая длительность самой схватки в минутах."""
+        sport = sport or DEFAULT_SPORT
+        key = (sport, age_group or UNKNOWN_AGE_GROUP)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        sport_estimate = self._shrink(self._by_sport.get(sport), self.prior_minutes)
+        estimate = self._shrink(self._samples.get(key), sport_estimate)
+        self._cache[key] = estimate
+        return estimate
+
+    def slot_minutes(self, sport: Optional[str] = None, age_group: Optional[str] = None) -> int:
+        """Длина слота в расписании (схватка + смена пары), целые минуты, не меньше 1."""
+        return max(1, int(round(self.bout_minutes(sport, age_group) + self.changeover_minutes)))
+
+    @staticmethod
+    def _shrink(samples: Optional[Deque[float]], prior: float) -> float:
+        if not samples:
+            return prior
+        n = len(samples)
+        return (n * median(samples) + PRIOR_STRENGTH * prior) / (n + PRIOR_STRENGTH)
+
+
+_model: Optional[DurationModel] = None
+
+
+def get_duration_model(reload: bool = False) -> DurationModel:
+    """Общая модель, лениво обучаемая по БД при первом обращении."""
+    global _model
+    if _model is None or reload:
+        model = DurationModel()
+        try:
+            from core.db import load_duration_samples
+            model.fit(load_duration_samples())
+        except Exception as e:
+            print(f"[durations] Не удалось загрузить длительности схваток: {e}")
+        _model = model
+    return _model
+
+
+def match_timing(
+    tournament_data: Optional[Dict[str, Any]],
+    category_name: Optional[str],
+    schedule_match: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Данные о фактическом времени схватки для core.db.save_match_result
+    и заодно инкрементальное обновление модели.
+    """
+    schedule_match = schedule_match or {}
+    cat_data = ((tournament_data or {}).get("categories") or {}).get(category_name or "")
+    timing = {
+        "started_ts": schedule_match.get("started_ts"),
+        "completed_ts": schedule_match.get("completed_ts"),
+        "sport": tournament_sport(tournament_data),
+        "age_group": category_age_group(cat_data),
+    }
+    started, completed = timing["started_ts"], timing["completed_ts"]
+    if started and completed and not schedule_match.get("duration_recorded"):
+        if get_duration_model().record(timing["sport"], timing["age_group"], completed - started):
+            schedule_match["duration_recorded"] = True
+    return timing
+
+
+# ---------------------------------------------------------------------- #
+#  Прогноз ETA
+# ---------------------------------------------------------------------- #
+def current_schedule_minutes(tournament_data: Optional[Dict[str, Any]], now: Optional[datetime] = None) -> int:
+    """Текущее время в минутах расписания (от полуночи первого дня турнира)."""
+    now = now or cluster_datetime()
+    day_offset = 0
+    date_text = str((tournament_data or {}).get("date", "") or "").strip()
+    for fmt in ("%d.%m.%Y", "%Y-%m-%d"):
+        try:
+            first_day = datetime.strptime(date_text, fmt).date()
+        except ValueError:
+            continue
+        day_offset = max(0, (now.date() - first_day).days)
+        break
+    return day_offset * MINUTES_PER_DAY + now.hour * 60 + now.minute
+
+
+def forecast_mat(
+    tournament_data: Dict[str, Any],
+    mat: Any,
+    current_match: Optional[Dict[str, Any]] = None,
+    model: Optional[DurationModel] = None,
+    now_ts: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Пересчитывает ETA (поле eta_min, минуты расписания) ожидающих схваток
+    одного ковра по порядку очереди вызова. Остальные ковры не затрагиваются.
+    current_match — идущая сейчас схватка ковра (если есть).
+    Возвращает схватки, у которых ETA изменилось.
+    """
+    from core.mat_queue import get_mat_queue
+
+    model = model or get_duration_model()
+    sport = tournament_sport(tournament_data)
+    categories = tournament_data.get("categories") or {}
+    age_groups: Dict[str, str] = {}
+
+    def slot(match: Dict[str, Any]) -> float:
+        category = match.get("category", "")
+        if category not in age_groups:
+            age_groups[category] = category_age_group(categories.get(category))
+        return model.bout_minutes(sport, age_groups[category]) + model.changeover_minutes
+
+    now_ts = now_ts if now_ts is not None else cluster_time()
+    cursor = float(current_schedule_minutes(tournament_data, datetime.fromtimestamp(now_ts)))
+    if current_match and current_match.get("started_ts"):
+        elapsed = (now_ts - float(current_match["started_ts"])) / 60.0
+        cursor += max(0.0, slot(current_match) - elapsed)
+
+    changed = []
+    for match in get_mat_queue(tournament_data).pending(mat):
+        eta = int(round(cursor))
+        if match.get("eta_min") != eta:
+            match["eta_min"] = eta
+            changed.append(match)
+        cursor += slot(match)
+    return changed
+
+
+def format_eta(match: Dict[str, Any]) -> str:
+    """Отображаемое ETA схватки или пустая строка."""
+    eta = match.get("eta_min")
+    return format_minutes(eta) if isinstance(eta, int) else ""
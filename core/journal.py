@@ -0,0 +1,428 @@
+"""
+Журнал изменений турнира (write-ahead log) и восстановление после сбоя.
+
+Каждое изменение (результат, статус, перенос схватки) дописывается строкой
+JSON в <турнир>.journal.jsonl. Запись на диск идёт пачками в фоновом потоке
+с os.fsync: изменения, пришедшие за FLUSH_INTERVAL, фиксируются одной
+записью, поэтому UI не ждёт диска. Периодическая компактизация пишет снимок
+<турнир>.snapshot.json (через временный файл и os.replace; первая строка —
+номер последней учтённой операции) и убирает из журнала учтённые в нём
+операции. В потоке UI снимается только pickle-снимок данных; разбор, запись
+и fsync выполняет тот же фоновый поток. При запуске снимок и хвост журнала
+воспроизводятся, восстанавливая состояние на момент сбоя.
+"""
+import json
+import os
+import pickle
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.autosave import take_snapshot
+from core.cluster_clock import cluster_time
+from core.schedule_time import sort_schedule
+
+
+JOURNAL_DIR = "journal"
+FLUSH_INTERVAL = 0.5          # секунды между пакетными fsync
+FLUSH_BATCH = 64              # или раньше, если накопилось столько операций
+COMPACT_AFTER_OPS = 2000      # компактизация по числу операций после снимка
+CLOSE_TIMEOUT = 30            # секунды ожидания фонового потока при закрытии
+
+OP_MATCH_UPDATE = "match_update"          # поля записи расписания (по match_id)
+OP_CATEGORY_MATCH = "category_match"      # поля схватки в категории (по id)
+OP_SCHEDULE = "schedule"                  # расписание целиком (генерация)
+OP_SCHEDULE_DELTA = "schedule_delta"      # изменённые и удалённые записи (слияние)
+
+
+def _slug(text: str) -> str:
+    slug = re.sub(r"[^\w\-]+", "_", text, flags=re.UNICODE).strip("_")
+    return slug or "tournament"
+
+
+def tournament_journal_key(tournament_data: Dict[str, Any]) -> str:
+    """Имя файлов журнала: название, дата и место турнира."""
+    parts = [str(tournament_data.get(k, "") or "").strip() for k in ("name", "date", "location")]
+    return _slug("_".join(p for p in parts if p))
+
+
+def apply_op(tournament_data: Dict[str, Any], op: Dict[str, Any]) -> None:
+    """Применяет одну операцию журнала к tournament_data."""
+    kind = op.get("op")
+    if kind == OP_MATCH_UPDATE:
+        fields = op.get("match") or {}
+        match_id = fields.get("match_id") or fields.get("id")
+        if not match_id:
+            return
+        schedule = tournament_data.setdefault("schedule", [])
+        for item in schedule:
+            if item.get("match_id") == match_id or item.get("id") == match_id:
+                item.update(fields)
+                return
+        schedule.append(dict(fields))
+    elif kind == OP_CATEGORY_MATCH:
+        cat = (tournament_data.get("categories") or {}).get(op.get("category"))
+        if not cat:
+            return
+        for match in cat.get("matches", []):
+            if match.get("id") == op.get("match_id"):
+                match.update(op.get("fields") or {})
+                return
+        # Схватка, созданная по результатам (core.progression), — добавляем
+        fields = op.get("fields") or {}
+        if fields.get("sources"):
+            cat.setdefault("matches", []).append(dict(fields, id=op.get("match_id")))
+    elif kind == OP_SCHEDULE:
+        tournament_data["schedule"] = op.get("schedule") or []
+    elif kind == OP_SCHEDULE_DELTA:
+        removed = set(op.get("removed") or [])
+        schedule = [item for item in tournament_data.get("schedule") or [] if item.get("match_id") not in removed]
+        index = {item.get("match_id"): i for i, item in enumerate(schedule) if item.get("match_id")}
+        for fields in op.get("matches") or []:
+            match_id = fields.get("match_id")
+            if match_id in index:
+                schedule[index[match_id]] = dict(fields)
+            else:
+                index[match_id] = len(schedule)
+                schedule.append(dict(fields))
+        tournament_data["schedule"] = sort_schedule(schedule)
+
+
+def schedule_delta(
+    previous: Optional[List[Dict[str, Any]]], current: Optional[List[Dict[str, Any]]]
+) -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+    """
+    Разница расписаний по match_id: (изменённые и новые записи, удалённые match_id).
+    None, если у какой-то записи нет match_id — тогда нужна запись целиком.
+    """
+    before = {}
+    for item in previous or []:
+        if not item.get("match_id"):
+            return None
+        before[item["match_id"]] = item
+    changed = []
+    seen = set()
+    for item in current or []:
+        match_id = item.get("match_id")
+        if not match_id:
+            return None
+        seen.add(match_id)
+        if before.get(match_id) != item:
+            changed.append(dict(item))
+    return changed, [match_id for match_id in before if match_id not in seen]
+
+
+class TournamentJournal:
+    """Журнал одного турнира: пакетная запись, компактизация, восстановление."""
+
+    def __init__(self, key: str, directory: str = JOURNAL_DIR):
+        self.key = key
+        self.directory = directory
+        self.journal_path = os.path.join(directory, f"{key}.journal.jsonl")
+        self.snapshot_path = os.path.join(directory, f"{key}.snapshot.json")
+        self._lock = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._seq = 0
+        self._snapshot_seq = 0
+        # Запрошенная компактизация (номер операции, снимок) и флаг её выполнения
+        self._compaction: Optional[Tuple[int, Any]] = None
+        self._compacting = False
+        self._file = None
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+        self._seq, self._snapshot_seq = self._scan_seq()
+
+    # ------------------------------------------------------------------ #
+    #  Запись
+    # ------------------------------------------------------------------ #
+    def append(self, op: str, **payload: Any) -> int:
+        """Добавляет операцию в очередь записи. Возвращает её номер."""
+        with self._lock:
+            self._seq += 1
+            record = {"seq": self._seq, "ts": cluster_time(), "op": op}
+            record.update(payload)
+            self._buffer.append(json.dumps(record, ensure_ascii=False, default=str))
+            self._ensure_writer()
+            if len(self._buffer) >= FLUSH_BATCH:
+                self._lock.notify_all()
+            return self._seq
+
+    def flush(self) -> None:
+        """Синхронно записывает накопленные операции (с fsync)."""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        self._write(lines)
+
+    def pending_ops(self) -> int:
+        """Операций после последнего снимка."""
+        return self._seq - self._snapshot_seq
+
+    def needs_compaction(self) -> bool:
+        with self._lock:
+            if self._compaction is not None or self._compacting:
+                return False
+        return self.pending_ops() >= COMPACT_AFTER_OPS
+
+    def compact(self, tournament_data: Dict[str, Any], wait: bool = False) -> None:
+        """
+        Ставит компактизацию в очередь фонового потока: в вызывающем потоке
+        под блокировкой записи берутся только номер последней операции и
+        pickle-снимок данных, поэтому операция из другого потока не попадёт
+        между ними. Безопасно при сбое на любом шаге: снимок заменяется
+        атомарно, а операции с номером не больше номера снимка при
+        воспроизведении пропускаются. wait=True — дождаться записи снимка.
+        """
+        with self._lock:
+            seq = self._seq
+            self._compaction = (seq, take_snapshot(tournament_data))
+            self._ensure_writer()
+            self._lock.notify_all()
+            while wait and (self._compaction is not None or self._compacting):
+                self._lock.wait(FLUSH_INTERVAL)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        if self._writer is not None:
+            # Поток дописывает журнал и завершает запрошенную компактизацию
+            self._writer.join(timeout=CLOSE_TIMEOUT)
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._closed = False
+            self._writer = threading.Thread(target=self._writer_loop, name=f"journal-{self.key}", daemon=True)
+            self._writer.start()
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._lock:
+                # Ждём, пока наберётся пачка или пройдёт интервал: один fsync на пачку
+                if len(self._buffer) < FLUSH_BATCH and not self._closed and self._compaction is None:
+                    self._lock.wait(FLUSH_INTERVAL)
+                if self._closed and not self._buffer and self._compaction is None:
+                    return
+                lines, self._buffer = self._buffer, []
+                request, self._compaction = self._compaction, None
+                self._compacting = request is not None
+            self._write(lines)
+            if request is not None:
+                self._write_snapshot(*request)
+                with self._lock:
+                    self._compacting = False
+                    self._lock.notify_all()
+
+    def _write(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        try:
+            # Отдельная блокировка файла: append из UI не ждёт fsync
+            with self._io_lock:
+                if self._file is None:
+                    os.makedirs(self.directory, exist_ok=True)
+                    self._file = open(self.journal_path, "a", encoding="utf-8")
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+        except Exception as e:
+            print(f"[journal] Ошибка записи журнала {self.journal_path}: {e}")
+
+    def _write_snapshot(self, seq: int, snapshot: Any) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            header = {"journal_seq": seq, "saved_at": cluster_time()}
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                # Первая строка — заголовок, чтобы номер снимка читался без разбора турнира
+                f.write(json.dumps(header) + "\n")
+                if isinstance(snapshot, bytes):
+                    json.dump(pickle.loads(snapshot), f, ensure_ascii=False, default=str)
+                else:
+                    f.write(snapshot)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            with self._io_lock:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                # Операции новее снимка (flush из другого потока) остаются в журнале
+                tail = self._read_ops(seq)
+                tmp_path = self.journal_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for record in tail:
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.journal_path)
+            with self._lock:
+                self._snapshot_seq = max(self._snapshot_seq, seq)
+        except Exception as e:
+            print(f"[journal] Ошибка компактизации журнала {self.journal_path}: {e}")
+
+    # ------------------------------------------------------------------ #
+    #  Восстановление
+    # ------------------------------------------------------------------ #
+    def _read_snapshot_seq(self) -> int:
+        if not os.path.exists(self.snapshot_path):
+            return 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                return int(json.loads(f.readline()).get("journal_seq", 0))
+        except Exception:
+            return 0
+
+    def _read_snapshot(self) -> Tuple[Optional[Dict[str, Any]], int]:
+        if not os.path.exists(self.snapshot_path):
+            return None, 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                return json.loads(f.read()), int(header.get("journal_seq", 0))
+        except Exception as e:
+            print(f"[journal] Снимок {self.snapshot_path} повреждён: {e}")
+            return None, 0
+
+    def _read_ops(self, after_seq: int) -> List[Dict[str, Any]]:
+        ops = []
+        if not os.path.exists(self.journal_path):
+            return ops
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Оборванная последняя строка при сбое во время записи
+                    print(f"[journal] Пропущена повреждённая запись в {self.journal_path}")
+                    continue
+                if int(record.get("seq", 0)) > after_seq:
+                    ops.append(record)
+        return ops
+
+    def _scan_seq(self) -> Tuple[int, int]:
+        snapshot_seq = self._read_snapshot_seq()
+        last = snapshot_seq
+        for record in self._read_ops(snapshot_seq):
+            last = max(last, int(record.get("seq", 0)))
+        return last, snapshot_seq
+
+    def recover(self) -> Optional[Dict[str, Any]]:
+        """Снимок + операции журнала после него. None, если снимка нет."""
+        tournament_data, snapshot_seq = self._read_snapshot()
+        if tournament_data is None:
+            return None
+        ops = self._read_ops(snapshot_seq)
+        for op in ops:
+            apply_op(tournament_data, op)
+        if ops:
+            print(f"[journal] Восстановлено операций из журнала: {len(ops)}")
+        return tournament_data
+
+
+_journals: Dict[str, TournamentJournal] = {}
+
+
+def get_journal(tournament_data: Optional[Dict[str, Any]]) -> Optional[TournamentJournal]:
+    """Журнал турнира (один на процесс для каждого турнира)."""
+    if not tournament_data or not tournament_data.get("name"):
+        return None
+    key = tournament_journal_key(tournament_data)
+    journal = _journals.get(key)
+    if journal is None:
+        journal = _journals[key] = TournamentJournal(key)
+    return journal
+
+
+def journal_match_update(tournament_data: Optional[Dict[str, Any]], match: Dict[str, Any]) -> None:
+    """Записывает изменение записи расписания. Безопасно: ошибки только логируются."""
+    try:
+        journal = get_journal(tournament_data)
+        if journal is not None and isinstance(match, dict):
+            journal.append(OP_MATCH_UPDATE, match=dict(match))
+    except Exception as e:
+        print(f"[journal] Ошибка записи изменения схватки: {e}")
+
+
+def journal_category_match(
+    tournament_data: Optional[Dict[str, Any]], category: str, match: Dict[str, Any], fields: Tuple[str, ...]
+) -> None:
+    """Записывает изменение схватки в категории (результат)."""
+    try:
+        journal = get_journal(tournament_data)
+        if journal is not None and isinstance(match, dict):
+            journal.append(
+                OP_CATEGORY_MATCH,
+                category=category,
+                match_id=match.get("id"),
+                fields={k: match.get(k) for k in fields if k in match},
+            )
+    except Exception as e:
+        print(f"[journal] Ошибка записи результата схватки: {e}")
+
+
+def journal_schedule(tournament_data: Optional[Dict[str, Any]]) -> None:
+    """Записывает расписание целиком (после генерации или слияния)."""
+    try:
+        journal = get_journal(tournament_data)
+        if journal is not None:
+            journal.append(OP_SCHEDULE, schedule=tournament_data.get("schedule") or [])
+    except Exception as e:
+        print(f"[journal] Ошибка записи расписания: {e}")
+
+
+def journal_schedule_delta(
+    tournament_data: Optional[Dict[str, Any]], previous: Optional[List[Dict[str, Any]]]
+) -> None:
+    """
+    Записывает только изменения расписания относительно previous (после слияния
+    по сети). Если у записей нет match_id, пишет расписание целиком.
+    """
+    try:
+        journal = get_journal(tournament_data)
+        if journal is None:
+            return
+        delta = schedule_delta(previous, tournament_data.get("schedule"))
+        if delta is None:
+            journal.append(OP_SCHEDULE, schedule=tournament_data.get("schedule") or [])
+            return
+        changed, removed = delta
+        if changed or removed:
+            journal.append(OP_SCHEDULE_DELTA, matches=changed, removed=removed)
+    except Exception as e:
+        print(f"[journal] Ошибка записи изменений расписания: {e}")
+
+
+def find_recoverable_journals(directory: str = JOURNAL_DIR) -> List[Tuple[float, str]]:
+    """Журналы с несохранёнными операциями: [(время изменения, ключ)], новые первыми."""
+    result = []
+    if not os.path.isdir(directory):
+        return result
+    for filename in os.listdir(directory):
+        if not filename.endswith(".journal.jsonl"):
+            continue
+        path = os.path.join(directory, filename)
+        if os.path.getsize(path) == 0:
+            continue
+        key = filename[: -len(".journal.jsonl")]
+        if os.path.exists(os.path.join(directory, f"{key}.snapshot.json")):
+            result.append((os.path.getmtime(path), key))
+    result.sort(reverse=True)
+    return result
+
+
+def recover_tournament(key: str) -> Optional[Dict[str, Any]]:
+    """Восстанавливает турнир по ключу журнала."""
+    journal = _journals.get(key)
+    if journal is None:
+        journal = _journals[key] = TournamentJournal(key)
+    return journal.recover()
@@ -9,11 +9,12 @@ import threading
 import time
 import json
 import socket
-from datetime import datetime
 from typing import Optional, Callable, Dict, Any
 from pathlib import Path
 import re
 
+from core.cluster_clock import cluster_datetime
+
 # Глобальные переменные для логирования
 _logger_instance = None
 _log_lock = threading.Lock()
@@ -97,7 +98,7 @@ class DeviceLogger:
             recursion_detected = self._check_recursion(tb_text)
             
             log_entry = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": cluster_datetime().isoformat(),
                 "device": self.device_name,
                 "device_id": self.device_id,
                 "type": "UNHANDLED_EXCEPTION",
@@ -129,7 +130,7 @@ class DeviceLogger:
                 recursion_detected = self._check_recursion(tb_text)
                 
                 log_entry = {
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": cluster_datetime().isoformat(),
                     "device": self.device_name,
                     "device_id": self.device_id,
                     "type": "THREAD_EXCEPTION",
@@ -244,7 +245,7 @@ class DeviceLogger:
             return
         
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": cluster_datetime().isoformat(),
             "device": self.device_name,
             "device_id": self.device_id,
             "type": "ERROR",
@@ -267,7 +268,7 @@ class DeviceLogger:
             return
         
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": cluster_datetime().isoformat(),
             "device": self.device_name,
             "device_id": self.device_id,
             "type": "WARNING",
@@ -285,7 +286,7 @@ class DeviceLogger:
             return
         
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": cluster_datetime().isoformat(),
             "device": self.device_name,
             "device_id": self.device_id,
             "type": "INFO",
@@ -300,7 +301,7 @@ class DeviceLogger:
     def log_exit_dialog(self, dialog_type: str, message: str, result: Optional[str] = None):
         """Логирует появление окна завершения программы"""
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": cluster_datetime().isoformat(),
             "device": self.device_name,
             "device_id": self.device_id,
             "type": "EXIT_DIALOG",
@@ -314,7 +315,7 @@ class DeviceLogger:
     def log_crash(self, reason: str, traceback_text: Optional[str] = None):
         """Логирует вылет приложения"""
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": cluster_datetime().isoformat(),
             "device": self.device_name,
             "device_id": self.device_id,
             "type": "CRASH",
@@ -330,7 +331,7 @@ class DeviceLogger:
     def log_recursion(self, function_name: str, depth: int, traceback_text: Optional[str] = None):
         """Логирует обнаруженную рекурсию"""
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": cluster_datetime().isoformat(),
             "device": self.device_name,
             "device_id": self.device_id,
             "type": "RECURSION",
@@ -0,0 +1,262 @@
+"""
+Очередь вызова схваток по коврам.
+
+Для каждого ковра держится куча (heapq) ожидающих схваток, упорядоченная по
+времени и раунду. Изменения статусов (локальные и пришедшие по сети)
+применяются инкрементально: устаревшие записи кучи не удаляются сразу,
+а пропускаются при чтении (ленивое удаление), поэтому update/pop — O(log n).
+
+Если схватку изменили без notify_match_changed (статус, ковёр или время),
+запись кучи при чтении сверяется со схваткой; расхождение помечает ковёр,
+и его куча лениво перестраивается по расписанию перед следующим чтением.
+Схватку, которая уже покинула очередь (вызвана или завершена), очередь
+не видит: возврат её в ожидание нужно сообщить через notify_match_changed.
+Пустая очередь ковра расписание не перечитывает — «следующая схватка» на
+отработавшем ковре отвечает за O(1) при любом размере расписания.
+"""
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.schedule_time import schedule_minutes
+
+
+STATUS_COMPLETED = "Завершен"
+STATUS_IN_PROGRESS = "В процессе"
+
+# Сколько последних турниров держим в кэше очередей (обычно активен один)
+_MAX_CACHED_QUEUES = 4
+
+
+def schedule_sort_key(match: Dict[str, Any]) -> Tuple[int, int]:
+    """Ключ порядка вызова схваток на ковре: время (целые минуты), затем раунд."""
+    try:
+        round_num = int(match.get("round", 0) or 0)
+    except (TypeError, ValueError):
+        round_num = 0
+    return (schedule_minutes(match), round_num)
+
+
+def is_pending(match: Dict[str, Any]) -> bool:
+    """Схватка ждёт вызова: не завершена и не идёт сейчас."""
+    status = match.get("status")
+    if status in (STATUS_COMPLETED, STATUS_IN_PROGRESS):
+        return False
+    return not match.get("completed", False)
+
+
+def _normalize_mat(mat: Any) -> Optional[int]:
+    try:
+        return int(mat)
+    except (TypeError, ValueError):
+        return None
+
+
+def _match_key(match: Dict[str, Any]) -> Any:
+    return match.get("match_id") or match.get("id") or ("obj", id(match))
+
+
+class MatCallQueue:
+    """Приоритетные очереди ожидающих схваток по коврам."""
+
+    def __init__(self, schedule: Optional[List[Dict[str, Any]]] = None):
+        self.schedule: List[Dict[str, Any]] = []
+        self._heaps: Dict[int, List[Tuple[Any, int, Any]]] = {}
+        # ключ матча -> (seq, ковёр, матч, ключ сортировки); запись в куче актуальна,
+        # только если seq совпадает, а ковёр и ключ сортировки не разошлись со схваткой
+        self._entries: Dict[Any, Tuple[int, int, Dict[str, Any], Tuple[int, int]]] = {}
+        # ковёр -> число актуальных записей (для порога чистки кучи)
+        self._live: Dict[int, int] = {}
+        # ковры, чьи кучи разошлись с расписанием и ждут перестройки
+        self._dirty: Set[int] = set()
+        self._seq = itertools.count()
+        self.rebuild(schedule or [])
+
+    def rebuild(self, schedule: List[Dict[str, Any]]) -> None:
+        """Полная перестройка очередей по расписанию (O(n))."""
+        self.schedule = schedule
+        self._heaps = {}
+        self._entries = {}
+        self._live = {}
+        self._dirty = set()
+        for match in schedule:
+            if not isinstance(match, dict) or not is_pending(match):
+                continue
+            mat = _normalize_mat(match.get("mat"))
+            if mat is None:
+                continue
+            self._heaps.setdefault(mat, []).append(self._add_entry(mat, match))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+    def update(self, match: Dict[str, Any]) -> None:
+        """Учитывает изменение статуса/ковра/времени одной схватки (O(log n))."""
+        if not isinstance(match, dict):
+            return
+        key = _match_key(match)
+        mat = _normalize_mat(match.get("mat"))
+        if not is_pending(match) or mat is None:
+            self._drop_entry(key)
+            return
+        heap = self._heaps.setdefault(mat, [])
+        heapq.heappush(heap, self._add_entry(mat, match))
+        self._compact_if_needed(mat)
+
+    def remove(self, match: Dict[str, Any]) -> None:
+        """Убирает схватку из очереди (например, при удалении из расписания)."""
+        self._drop_entry(_match_key(match))
+
+    def peek(self, mat: Any, n: int = 1) -> List[Dict[str, Any]]:
+        """Первые n ожидающих схваток ковра без извлечения (для табло «на подходе»)."""
+        mat = _normalize_mat(mat)
+        if n <= 0:
+            return []
+        while True:
+            heap = self._fresh_heap(mat)
+            self._drop_stale_top(heap)
+            # Берём с запасом на устаревшие записи; обычно хватает одного прохода
+            limit = n
+            while True:
+                candidates = heapq.nsmallest(limit, heap)
+                result = [m for m in (self._resolve(item) for item in candidates) if m is not None]
+                if len(result) >= n or limit >= len(heap):
+                    break
+                limit *= 2
+            if mat not in self._dirty:
+                return result[:n]
+
+    def pop(self, mat: Any) -> Optional[Dict[str, Any]]:
+        """
+        Извлекает ближайшую ожидающую схватку ковра (O(log n)) или None.
+        Расписание перечитывается, только если ковёр помечен как разошедшийся.
+        """
+        mat = _normalize_mat(mat)
+        if mat is None:
+            return None
+        while True:
+            heap = self._fresh_heap(mat)
+            while heap and mat not in self._dirty:
+                item = heapq.heappop(heap)
+                match = self._resolve(item)
+                if match is not None:
+                    self._drop_entry(item[2])
+                    return match
+            if mat not in self._dirty:
+                return None
+
+    def pending(self, mat: Any) -> List[Dict[str, Any]]:
+        """Все ожидающие схватки ковра в порядке вызова (O(k log k), k — размер очереди ковра)."""
+        mat = _normalize_mat(mat)
+        while True:
+            heap = self._fresh_heap(mat)
+            live = [item for item in heap if self._resolve(item) is not None]
+            if mat not in self._dirty:
+                live.sort()
+                return [self._entries[item[2]][2] for item in live]
+
+    def pending_count(self, mat: Any = None) -> int:
+        if mat is None:
+            return len(self._entries)
+        return self._live.get(_normalize_mat(mat), 0)
+
+    # ------------------------------------------------------------------ #
+    #  Internal
+    # ------------------------------------------------------------------ #
+    def _add_entry(self, mat: int, match: Dict[str, Any]) -> Tuple[Any, int, Any]:
+        key = _match_key(match)
+        self._drop_entry(key)
+        seq = next(self._seq)
+        sort_key = schedule_sort_key(match)
+        self._entries[key] = (seq, mat, match, sort_key)
+        self._live[mat] = self._live.get(mat, 0) + 1
+        return (sort_key, seq, key)
+
+    def _drop_entry(self, key: Any) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._live[entry[1]] -= 1
+
+    def _resolve(self, item: Tuple[Any, int, Any]) -> Optional[Dict[str, Any]]:
+        _, seq, key = item
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != seq:
+            return None
+        _, mat, match, sort_key = entry
+        # Страховка от изменений, о которых очередь не уведомили
+        if not is_pending(match):
+            self._drop_entry(key)
+            self._dirty.add(mat)
+            return None
+        current_mat = _normalize_mat(match.get("mat"))
+        if current_mat != mat or schedule_sort_key(match) != sort_key:
+            self._drop_entry(key)
+            self._dirty.add(mat)
+            if current_mat is not None:
+                self._dirty.add(current_mat)
+            return None
+        return match
+
+    def _fresh_heap(self, mat: Optional[int]) -> List[Tuple[Any, int, Any]]:
+        if mat in self._dirty:
+            self._rebuild_mat(mat)
+        return self._heaps.get(mat, [])
+
+    def _rebuild_mat(self, mat: int) -> None:
+        """Перестраивает кучу одного ковра по расписанию (O(n) по расписанию)."""
+        self._dirty.discard(mat)
+        for key in [k for k, entry in self._entries.items() if entry[1] == mat]:
+            self._drop_entry(key)
+        heap = []
+        for match in self.schedule:
+            if isinstance(match, dict) and is_pending(match) and _normalize_mat(match.get("mat")) == mat:
+                heap.append(self._add_entry(mat, match))
+        heapq.heapify(heap)
+        self._heaps[mat] = heap
+
+    def _drop_stale_top(self, heap: List[Tuple[Any, int, Any]]) -> None:
+        while heap and self._resolve(heap[0]) is None:
+            heapq.heappop(heap)
+
+    def _compact_if_needed(self, mat: int) -> None:
+        # Амортизированно O(1): чистим кучу, только когда устаревших записей ковра стало много
+        heap = self._heaps.get(mat, [])
+        if len(heap) > 2 * self._live.get(mat, 0) + 64:
+            fresh = [item for item in heap if self._resolve(item) is not None]
+            heapq.heapify(fresh)
+            self._heaps[mat] = fresh
+
+
+_queues: Dict[int, MatCallQueue] = {}
+_owners: Dict[int, Dict[str, Any]] = {}
+
+
+def get_mat_queue(tournament_data: Dict[str, Any]) -> MatCallQueue:
+    """
+    Возвращает очередь вызова для турнира.
+
+    Очередь перестраивается автоматически, если список schedule был заменён
+    (генерация/слияние расписания); точечные изменения нужно сообщать через
+    notify_match_changed.
+    """
+    schedule = tournament_data.get("schedule") or []
+    key = id(tournament_data)
+    queue = _queues.get(key)
+    if queue is None or _owners.get(key) is not tournament_data or queue.schedule is not schedule:
+        queue = MatCallQueue(schedule)
+        if key not in _queues and len(_queues) >= _MAX_CACHED_QUEUES:
+            oldest = next(iter(_queues))
+            _queues.pop(oldest, None)
+            _owners.pop(oldest, None)
+        _queues[key] = queue
+        _owners[key] = tournament_data
+    return queue
+
+
+def notify_match_changed(tournament_data: Optional[Dict[str, Any]], match: Dict[str, Any]) -> None:
+    """Сообщает очереди об изменении схватки в расписании турнира."""
+    if not tournament_data or not isinstance(match, dict):
+        return
+    try:
+        get_mat_queue(tournament_data).update(match)
+    except Exception as e:
+        print(f"[mat_queue] Ошибка обновления очереди: {e}")
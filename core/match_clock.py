@@ -0,0 +1,143 @@
+"""
+Часы схватки: обратный отсчёт по дедлайну time.monotonic().
+
+Таймер периода, перерыва и ожидания соперника раньше уменьшали счётчик на 1
+по каждому тику QTimer(1000): тик, пришедший позже из-за загрузки UI,
+сдвигал всё оставшееся время, и за схватку набегали секунды. MatchClock
+хранит момент окончания отсчёта (или остаток на паузе) — сколько бы ни
+опаздывала отрисовка, остаток считается от монотонных часов, а UI
+опрашивает часы с любой частотой (poll) и перерисовывает только смену
+секунды.
+
+Отметки (marks) — остаток в секундах, при переходе через который
+вызывается on_mark(mark): 30/10 с — сигналы, 0 — окончание отсчёта (часы
+сами встают на паузу). Отметка срабатывает один раз за проход и только
+при ходе часов: правка времени ниже отметки её не вызывает.
+
+Модуль без Qt — проверяется на заданных значениях now.
+"""
+import time
+from typing import Callable, Iterable, List, Optional
+
+from core.scoreboard_clock import display_seconds
+
+
+# Период опроса часов в UI (мс); точность отсчёта от него не зависит
+RENDER_INTERVAL_MS = 50
+BEEP_MARKS = (30, 10, 0)
+
+
+class MatchClock:
+    """Обратный отсчёт с паузами, правкой времени и отметками."""
+
+    def __init__(
+        self,
+        duration: float,
+        marks: Iterable[float] = (0,),
+        on_mark: Optional[Callable[[float], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self.marks = sorted(set(marks) | {0}, reverse=True)
+        self.on_mark = on_mark
+        self.duration = float(duration)
+        self._deadline: Optional[float] = None
+        self._remaining = self.duration
+        self._armed: List[float] = []
+        # Учёт пауз: чистое время хода и число остановок с последнего сброса
+        self._run_started: Optional[float] = None
+        self._run_total = 0.0
+        self.pause_count = 0
+        self.reset()
+
+    # ------------------------------------------------------------------ #
+    #  Состояние
+    # ------------------------------------------------------------------ #
+    @property
+    def running(self) -> bool:
+        return self._deadline is not None
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        """Остаток в секундах (дробный)."""
+        if self._deadline is None:
+            return self._remaining
+        now = self._clock() if now is None else now
+        return max(0.0, self._deadline - now)
+
+    def seconds(self, now: Optional[float] = None) -> int:
+        """Остаток для показа: целые секунды с округлением вверх."""
+        return display_seconds(self.remaining(now))
+
+    def running_time(self, now: Optional[float] = None) -> float:
+        """Чистое время хода с последнего сброса (без пауз)."""
+        if self._run_started is None:
+            return self._run_total
+        now = self._clock() if now is None else now
+        return self._run_total + max(0.0, min(now, self._deadline) - self._run_started)
+
+    # ------------------------------------------------------------------ #
+    #  Управление
+    # ------------------------------------------------------------------ #
+    def start(self, now: Optional[float] = None) -> bool:
+        """Пуск или продолжение после паузы. False — уже идёт или время вышло."""
+        if self.running or self._remaining <= 0:
+            return False
+        now = self._clock() if now is None else now
+        self._deadline = now + self._remaining
+        self._run_started = now
+        return True
+
+    def pause(self, now: Optional[float] = None) -> bool:
+        """Остановка с сохранением остатка. False — часы уже стояли."""
+        if not self.running:
+            return False
+        self._stop(self._clock() if now is None else now)
+        self.pause_count += 1
+        return True
+
+    def set(self, remaining: float, now: Optional[float] = None) -> None:
+        """Правка остатка (в том числе на ходу); отметки ниже нового остатка снова активны."""
+        remaining = max(0.0, float(remaining))
+        if self.running:
+            now = self._clock() if now is None else now
+            self._deadline = now + remaining
+        else:
+            self._remaining = remaining
+        self._armed = [m for m in self.marks if m < remaining]
+
+    def reset(self, duration: Optional[float] = None) -> None:
+        """Остановка и полный остаток (новая длительность, если задана)."""
+        if duration is not None:
+            self.duration = float(duration)
+        self._deadline = None
+        self._run_started = None
+        self._run_total = 0.0
+        self.pause_count = 0
+        self.set(self.duration)
+
+    def poll(self, now: Optional[float] = None) -> List[float]:
+        """
+        Проверка отметок; вызывается из UI с любой частотой. Возвращает
+        сработавшие отметки (по убыванию) и вызывает для каждой on_mark.
+        На нуле часы останавливаются до вызова on_mark(0).
+        """
+        if not self.running or not self._armed:
+            return []
+        now = self._clock() if now is None else now
+        remaining = self.remaining(now)
+        fired = [m for m in self._armed if remaining <= m]
+        if not fired:
+            return []
+        self._armed = [m for m in self._armed if m not in fired]
+        if remaining <= 0:
+            self._stop(self._deadline)
+        for mark in fired:
+            if self.on_mark:
+                self.on_mark(mark)
+        return fired
+
+    def _stop(self, now: float) -> None:
+        self._remaining = self.remaining(now)
+        self._run_total += max(0.0, min(now, self._deadline) - self._run_started)
+        self._deadline = None
+        self._run_started = None
@@ -1,144 +1,436 @@
 import socket
 import threading
 import json
+import random
 import time
+from collections import deque
 from core.constants import NETWORK_PORT
 
+# Темы подписки. Клиент, который ни на что не подписался, получает всё (как раньше);
+# подписавшийся — только свои темы и TOPIC_BROADCAST.
+TOPIC_BROADCAST = "broadcast"
+TOPIC_TOURNAMENT = "tournament"
+TOPIC_SCHEDULE = "schedule"
+TOPIC_ALL = "*"
+
+# Переподключение клиента: пауза растёт вдвое от RECONNECT_BASE до RECONNECT_MAX
+# (со случайной долей, чтобы клиенты зала не ломились на сервер одновременно)
+RECONNECT_BASE = 0.5
+RECONNECT_MAX = 15.0
+CONNECT_TIMEOUT = 5.0
+# Досылка пропущенного после переподключения: последние сообщения каждой темы,
+# для сообщений-снимков (табло, турнир целиком) — только последнее
+RESYNC_BACKLOG = 256
+SNAPSHOT_TYPES = ('scoreboard_update', 'tournament_update')
+RECV_BUFFER = 65536
+
+
+def mat_topic(mat, channel="scoreboard"):
+    """Тема ковра: mat/<номер>/scoreboard, mat/<номер>/control."""
+    return f"mat/{mat}/{channel}"
+
+
+def message_topic(message_type, data=None):
+    """Тема сообщения по его типу (и номеру ковра для сообщений ковра)."""
+    mat = data.get('mat') if isinstance(data, dict) else None
+    if message_type == 'scoreboard_update' and mat:
+        return mat_topic(mat, "scoreboard")
+    if message_type == 'match_control' and mat:
+        return mat_topic(mat, "control")
+    if message_type == 'tournament_update':
+        return TOPIC_TOURNAMENT
+    if message_type in ('schedule_update', 'match_update'):
+        return TOPIC_SCHEDULE
+    return TOPIC_BROADCAST
+
+
 class NetworkManager:
-    def __init__(self):
+    def __init__(self, port=None):
+        # Порт по умолчанию берётся при создании, а не при определении функции
+        self.port = port if port is not None else NETWORK_PORT
         self.server_socket = None
         self.client_sockets = []
         self.is_server = False
         self.running = False
         self.message_handlers = {}
+        # Подписки (сервер): сокет -> темы и тема -> сокеты
+        self._lock = threading.RLock()
+        self._subscriptions = {}
+        self._subscribers = {}
+        # Счётчики по темам: сообщений, доставок, байт
+        self.topic_stats = {}
+        # Подписки и обработчики тем этого узла (клиент)
+        self.topic_handlers = {}
+        # Нумерация сообщений по темам (сервер): эпоха запуска, номер, что хранится для досылки
+        self.epoch = None
+        self._topic_seq = {}
+        self._backlog = {}
+        self._evicted = {}
+        self._snapshots = {}
+        # Последние полученные номера по темам и эпоха сервера (клиент) — для досылки
+        self.server_host = None
+        self.server_epoch = None
+        self.last_seq = {}
+        self.reconnect_base = RECONNECT_BASE
+        self.reconnect_max = RECONNECT_MAX
+        self.reconnects = 0
+        self.resync_gaps = []
+        # После переподключения нумерованные сообщения копятся до resync_done:
+        # живая рассылка приходит раньше досылки и иначе отсекла бы её как устаревшую
+        self._resync_pending = False
+        self._resync_buffer = []
+        self.auto_reconnect = False
+        self._reconnect_thread = None
         # Добавляем обработчик запросов обновления
         self.register_handler('request_scoreboard_update', self.handle_request_update)
         self.register_handler('scoreboard_update', self.handle_scoreboard_update)
+        self.register_handler('subscribe', self.handle_subscribe)
+        self.register_handler('unsubscribe', self.handle_unsubscribe)
+        self.register_handler('resync', self.handle_resync)
+        self.register_handler('hello', self.handle_hello)
+        self.register_handler('resync_done', self.handle_resync_done)
 
     def handle_request_update(self, message, client_socket):
         """Обрабатывает запросы обновления от клиентов"""
         print(f"[СЕРВЕР] Получен запрос обновления от клиента")
-        
+
     def handle_scoreboard_update(self, message, client_socket):
         """Обрабатывает обновления табло"""
-        print(f"[СЕРВЕР] Получено обновление табло: {message}")
-        # Пересылаем сообщение всем клиентам
+        # Пересылаем сообщение подписчикам темы ковра
         if self.is_server:
-            message_bytes = json.dumps(message).encode('utf-8')
-            for client in self.client_sockets[:]:
-                try:
-                    if client != client_socket:
-                        client.send(message_bytes)
-                        print(f"[СЕРВЕР] Сообщение переслано клиенту")
-                except:
-                    self.client_sockets.remove(client)
+            topic = message.get('topic') or message_topic('scoreboard_update', message.get('data'))
+            self._publish(topic, message, exclude=client_socket)
+
+    def handle_subscribe(self, message, client_socket):
+        """Клиент подписывается на темы"""
+        topics = (message.get('data') or {}).get('topics') or []
+        with self._lock:
+            own = self._subscriptions.setdefault(client_socket, set())
+            for topic in topics:
+                own.add(topic)
+                self._subscribers.setdefault(topic, set()).add(client_socket)
+        print(f"[СЕРВЕР] Подписка клиента: {sorted(self._subscriptions.get(client_socket, ()))}")
+
+    def handle_unsubscribe(self, message, client_socket):
+        """Клиент отписывается от тем"""
+        topics = (message.get('data') or {}).get('topics') or []
+        with self._lock:
+            own = self._subscriptions.get(client_socket)
+            for topic in topics:
+                if own is not None:
+                    own.discard(topic)
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(client_socket)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def handle_hello(self, message, client_socket):
+        """Сервер сообщает эпоху запуска (клиент)"""
+        epoch = (message.get('data') or {}).get('epoch')
+        if epoch != self.server_epoch:
+            # Сервер перезапущен: его номера тем начались заново
+            self.server_epoch = epoch
+            self.last_seq = {}
+            self._resync_buffer = []
+
+    def handle_resync_done(self, message, client_socket):
+        """Досылка завершена (клиент); gaps — темы, где пропущенное уже не сохранилось у сервера"""
+        data = message.get('data') or {}
+        self.server_epoch = data.get('epoch', self.server_epoch)
+        self.resync_gaps = data.get('gaps') or []
+        print(f"Досылка после переподключения: {data.get('sent', 0)} сообщений"
+              + (f", не восстановлены темы: {self.resync_gaps}" if self.resync_gaps else ""))
+        # Досылка и живая рассылка вперемешку — по порядку номеров, повторы отсекаются
+        self._resync_pending = False
+        buffered, self._resync_buffer = self._resync_buffer, []
+        buffered.sort(key=lambda item: item['seq'])
+        for item in buffered:
+            self._handle_message(item, client_socket)
+
+    def handle_resync(self, message, client_socket):
+        """
+        Клиент переподключился и прислал последние полученные номера тем —
+        досылаем только пропущенное: последний снимок табло/турнира, если он
+        новее, и сообщения из хвоста темы. Темы, хвост которых уже не покрывает
+        пропуск, перечисляются в resync_done (gaps).
+        """
+        data = message.get('data') or {}
+        seqs = data.get('seqs') or {}
+        if data.get('epoch') != self.epoch:
+            seqs = {}
+        with self._lock:
+            own = self._subscriptions.get(client_socket)
+            topics = [
+                t for t in self._topic_seq
+                if not own or TOPIC_ALL in own or t in own or t == TOPIC_BROADCAST
+            ]
+            missed, gaps = [], []
+            for topic in topics:
+                last = int(seqs.get(topic) or 0)
+                if last >= self._topic_seq[topic]:
+                    continue
+                missed.extend(
+                    item for key, item in self._snapshots.items() if key[0] == topic and item[0] > last
+                )
+                missed.extend(item for item in self._backlog.get(topic, ()) if item[0] > last)
+                if self._evicted.get(topic, 0) > last:
+                    gaps.append(topic)
+        missed.sort(key=lambda item: item[0])
+        try:
+            for _, message_bytes in missed:
+                client_socket.sendall(message_bytes)
+            done = {'type': 'resync_done', 'data': {'epoch': self.epoch, 'sent': len(missed), 'gaps': gaps}}
+            client_socket.sendall(self._encode(done))
+        except OSError:
+            self._drop_client(client_socket)
+            return
+        print(f"[СЕРВЕР] Досылка клиенту: {len(missed)} сообщений, пропуски: {gaps or 'нет'}")
+
+    def subscribe(self, topic, handler=None):
+        """
+        Подписка этого узла на тему. handler(message, client_socket) вызывается
+        для сообщений темы (в потоке приёма). Клиент сообщает о подписке серверу.
+        """
+        handlers = self.topic_handlers.setdefault(topic, [])
+        if handler is not None and handler not in handlers:
+            handlers.append(handler)
+        if not self.is_server:
+            self._send_control('subscribe', [topic])
+
+    def unsubscribe(self, topic, handler=None):
+        """Снимает обработчик темы; без обработчиков тема отписывается на сервере."""
+        handlers = self.topic_handlers.get(topic)
+        if handlers is None:
+            return
+        if handler in handlers:
+            handlers.remove(handler)
+        if handler is None or not handlers:
+            del self.topic_handlers[topic]
+            if not self.is_server:
+                self._send_control('unsubscribe', [topic])
+
+    def get_topic_stats(self):
+        """Снимок счётчиков по темам: {тема: {messages, deliveries, bytes}}"""
+        with self._lock:
+            return {topic: dict(stats) for topic, stats in self.topic_stats.items()}
 
     def start_server(self, host='0.0.0.0'):
         """Запуск сервера"""
         try:
             self.is_server = True
             self.running = True
+            self.epoch = f"{time.time():.6f}-{random.getrandbits(32):08x}"
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((host, NETWORK_PORT))
+            self.server_socket.bind((host, self.port))
             self.server_socket.listen(5)
-            
+
             # Запуск потока для принятия подключений
             accept_thread = threading.Thread(target=self._accept_connections)
             accept_thread.daemon = True
             accept_thread.start()
-            print(f"Сервер запущен на {host}:{NETWORK_PORT}")
+            print(f"Сервер запущен на {host}:{self.port}")
             return True
         except Exception as e:
             print(f"Ошибка запуска сервера: {e}")
             return False
-    
-    def connect_to_server(self, host):
-        """Подключение к серверу"""
+
+    def connect_to_server(self, host, reconnect=True):
+        """
+        Подключение к серверу. При reconnect оборванное соединение (и неудачная
+        первая попытка) восстанавливается в фоне с досылкой пропущенного.
+        """
+        self.is_server = False
+        self.running = True
+        self.server_host = host
+        self.auto_reconnect = reconnect
         try:
-            self.is_server = False
-            self.running = True
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            client_socket.connect((host, NETWORK_PORT))
-            self.client_sockets.append(client_socket)
-            
-            # Запуск потока для приема сообщений
-            receive_thread = threading.Thread(target=self._receive_messages, args=(client_socket,))
-            receive_thread.daemon = True
-            receive_thread.start()
-            print(f"Успешно подключено к серверу {host}:{NETWORK_PORT}")
+            self._open_connection(host)
+            print(f"Успешно подключено к серверу {host}:{self.port}")
             return True
         except Exception as e:
-            print(f"Ошибка подключения к серверу {host}:{NETWORK_PORT}: {e}")
+            print(f"Ошибка подключения к серверу {host}:{self.port}: {e}")
+            if reconnect:
+                self._start_reconnect()
             return False
-    
+
+    def _open_connection(self, host):
+        client_socket = socket.create_connection((host, self.port), timeout=CONNECT_TIMEOUT)
+        client_socket.settimeout(None)
+        self._enable_keepalive(client_socket)
+        self.client_sockets.append(client_socket)
+
+        # Запуск потока для приема сообщений
+        receive_thread = threading.Thread(target=self._receive_messages, args=(client_socket,))
+        receive_thread.daemon = True
+        receive_thread.start()
+        # Подписки, сделанные до подключения
+        if self.topic_handlers:
+            self._send_control('subscribe', list(self.topic_handlers))
+        return client_socket
+
+    def _start_reconnect(self):
+        with self._lock:
+            if self._reconnect_thread is not None and self._reconnect_thread.is_alive():
+                return
+            self._reconnect_thread = threading.Thread(target=self._reconnect_loop, daemon=True)
+            self._reconnect_thread.start()
+
+    def _reconnect_loop(self):
+        """Переподключение с растущей паузой; после подключения — запрос досылки"""
+        attempt = 0
+        while self.running:
+            with self._lock:
+                if self.client_sockets:
+                    self._reconnect_thread = None
+                    return
+            delay = min(self.reconnect_max, self.reconnect_base * (2 ** attempt))
+            delay = random.uniform(delay / 2, delay)
+            print(f"Нет соединения с сервером {self.server_host}:{self.port}, повтор через {delay:.1f} с")
+            time.sleep(delay)
+            if not self.running:
+                return
+            self._resync_pending = True
+            try:
+                self._open_connection(self.server_host)
+            except OSError:
+                attempt += 1
+                continue
+            attempt = 0
+            self.reconnects += 1
+            self._send_resync()
+            print(f"Соединение с сервером {self.server_host}:{self.port} восстановлено")
+
+    def _send_resync(self):
+        """Последние полученные номера тем — сервер дошлёт только пропущенное"""
+        message = {
+            'type': 'resync',
+            'data': {'epoch': self.server_epoch, 'seqs': dict(self.last_seq)},
+            'timestamp': time.time(),
+        }
+        try:
+            self.client_sockets[0].sendall(self._encode(message))
+        except (OSError, IndexError) as e:
+            print(f"Ошибка запроса досылки: {e}")
+
+    @staticmethod
+    def _enable_keepalive(sock):
+        """Обрыв кабеля без закрытия соединения обнаруживается за десятки секунд, а не часы"""
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for name, value in (('TCP_KEEPIDLE', 10), ('TCP_KEEPINTVL', 3), ('TCP_KEEPCNT', 3)):
+            if hasattr(socket, name):
+                try:
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, name), value)
+                except OSError:
+                    pass
+
     def _accept_connections(self):
         """Принятие входящих подключений"""
         while self.running:
             try:
                 client_socket, addr = self.server_socket.accept()
                 print(f"Подключен клиент: {addr}")
+                # Эпоха сервера: по ней клиент после переподключения понимает, что номера тем начались заново.
+                # hello уходит раньше любой рассылки, иначе новые номера отсеклись бы как повторы
+                try:
+                    client_socket.sendall(self._encode({'type': 'hello', 'data': {'epoch': self.epoch}, 'timestamp': time.time()}))
+                except OSError:
+                    pass
                 self.client_sockets.append(client_socket)
-                
+
                 # Запуск потока для приема сообщений от клиента
                 receive_thread = threading.Thread(target=self._receive_messages, args=(client_socket,))
                 receive_thread.daemon = True
                 receive_thread.start()
             except:
                 break
-    
+
     def _receive_messages(self, client_socket):
-        """Прием сообщений от клиента"""
+        """Прием сообщений от клиента (одно сообщение JSON на строку)"""
+        # Куски ещё не завершённого сообщения: склеиваются один раз, когда придёт перевод строки
+        pending = []
+        # Узел уже присылал перевод строки — разбор без него (старые версии) не нужен
+        framed = False
         while self.running:
             try:
-                data = client_socket.recv(4096)
+                data = client_socket.recv(RECV_BUFFER)
                 if not data:
                     break
-                
-                message = json.loads(data.decode('utf-8'))
-                self._handle_message(message, client_socket)
+                start = 0
+                end = data.find(b"\n")
+                while end != -1:
+                    framed = True
+                    pending.append(data[start:end])
+                    line = b"".join(pending)
+                    pending = []
+                    if line.strip():
+                        self._handle_message(json.loads(line.decode('utf-8')), client_socket)
+                    start = end + 1
+                    end = data.find(b"\n", start)
+                if start < len(data):
+                    pending.append(data[start:])
+                # Узел старой версии шлёт сообщения без перевода строки. Разбор
+                # пробуем, только когда кусок похож на конец сообщения: оканчивается
+                # на "}" и recv вернул меньше буфера, — иначе большое первое
+                # сообщение разбиралось бы целиком на каждом куске (O(n^2))
+                if pending and not framed and len(data) < RECV_BUFFER and data.rstrip().endswith(b"}"):
+                    try:
+                        message = json.loads(b"".join(pending).decode('utf-8'))
+                    except ValueError:
+                        continue
+                    pending = []
+                    self._handle_message(message, client_socket)
             except:
                 break
-        
+
         # Удаляем отключившегося клиента
-        if client_socket in self.client_sockets:
-            self.client_sockets.remove(client_socket)
-            print("Клиент отключен")
-    
+        self._drop_client(client_socket)
+        if self.running and not self.is_server and self.auto_reconnect:
+            self._start_reconnect()
+
     def _handle_message(self, message, client_socket):
         """Обработка входящих сообщений"""
+        seq = message.get('seq')
+        if seq is not None and not self.is_server:
+            if self._resync_pending:
+                self._resync_buffer.append(message)
+                return
+            topic = message.get('topic')
+            # Повтор (живая рассылка и досылка после переподключения) или
+            # запоздавшее старое сообщение темы — обработчики уже видели новее
+            if seq <= self.last_seq.get(topic, 0):
+                return
+            self.last_seq[topic] = seq
+        for handler in list(self.topic_handlers.get(message.get('topic'), ())):
+            handler(message, client_socket)
         message_type = message.get('type')
         if message_type in self.message_handlers:
             self.message_handlers[message_type](message, client_socket)
-    
+
     def send_message(self, message_type, data):
         """Отправка сообщения"""
         message = {
             'type': message_type,
+            'topic': message_topic(message_type, data),
             'data': data,
             'timestamp': time.time()
         }
-        
+
         try:
-            message_bytes = json.dumps(message).encode('utf-8')
-            
             if self.is_server:
-                # Сервер рассылает всем клиентам
-                for client in self.client_sockets[:]:
-                    try:
-                        client.send(message_bytes)
-                    except:
-                        self.client_sockets.remove(client)
+                # Сервер рассылает подписчикам темы
+                self._publish(message['topic'], message)
             elif self.client_sockets:
                 # Клиент отправляет серверу
-                self.client_sockets[0].send(message_bytes)
+                self.client_sockets[0].sendall(self._encode(message))
         except Exception as e:
             print(f"Ошибка отправки сообщения: {e}")
-    
+
     def register_handler(self, message_type, handler):
         """Регистрация обработчика сообщений"""
         self.message_handlers[message_type] = handler
-    
+
     def stop(self):
         """Остановка сетевого менеджера"""
         self.running = False
@@ -151,4 +443,68 @@ class NetworkManager:
             try:
                 self.server_socket.close()
             except:
-                pass
\ No newline at end of file
+                pass
+
+    @staticmethod
+    def _encode(message):
+        return json.dumps(message).encode('utf-8') + b"\n"
+
+    def _send_control(self, message_type, topics):
+        if self.client_sockets:
+            message = {'type': message_type, 'data': {'topics': topics}, 'timestamp': time.time()}
+            try:
+                self.client_sockets[0].sendall(self._encode(message))
+            except Exception as e:
+                print(f"Ошибка отправки подписки: {e}")
+
+    def _recipients(self, topic):
+        """Сокеты, которым доставляется тема: подписчики и клиенты без подписок"""
+        with self._lock:
+            if topic == TOPIC_BROADCAST:
+                return list(self.client_sockets)
+            targets = set(self._subscribers.get(topic, ()))
+            targets.update(self._subscribers.get(TOPIC_ALL, ()))
+            targets.update(c for c in self.client_sockets if c not in self._subscriptions)
+            return list(targets)
+
+    def _publish(self, topic, message, exclude=None):
+        """Нумерует сообщение в теме, кодирует один раз и рассылает подписчикам"""
+        with self._lock:
+            seq = self._topic_seq.get(topic, 0) + 1
+            self._topic_seq[topic] = seq
+            message['seq'] = seq
+            message_bytes = self._encode(message)
+            # Для досылки после переподключения
+            if message.get('type') in SNAPSHOT_TYPES:
+                self._snapshots[(topic, message.get('type'))] = (seq, message_bytes)
+            else:
+                backlog = self._backlog.setdefault(topic, deque(maxlen=RESYNC_BACKLOG))
+                if len(backlog) == backlog.maxlen:
+                    self._evicted[topic] = backlog[0][0]
+                backlog.append((seq, message_bytes))
+        delivered = 0
+        for client in self._recipients(topic):
+            if client is exclude:
+                continue
+            try:
+                client.sendall(message_bytes)
+                delivered += 1
+            except:
+                self._drop_client(client)
+        with self._lock:
+            stats = self.topic_stats.setdefault(topic, {'messages': 0, 'deliveries': 0, 'bytes': 0})
+            stats['messages'] += 1
+            stats['deliveries'] += delivered
+            stats['bytes'] += len(message_bytes) * delivered
+
+    def _drop_client(self, client_socket):
+        with self._lock:
+            if client_socket in self.client_sockets:
+                self.client_sockets.remove(client_socket)
+                print("Клиент отключен")
+            for topic in self._subscriptions.pop(client_socket, ()):
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(client_socket)
+                    if not subscribers:
+                        del self._subscribers[topic]
@@ -0,0 +1,502 @@
+"""
+Схватки, зависящие от результатов (следующие раунды олимпийки, утешительные
+схватки, сетка проигравших), создаются по мере появления результатов.
+
+План категории (category["progression"]) хранит ожидающие схватки с их
+входами: sources = [[id схватки, "winner" | "loser"], ...] и обратный индекс
+dependents (id схватки -> id зависящих от неё). Когда схватка завершается,
+проверяются только зависящие от неё схватки; определившиеся создаются
+в category["matches"] и ставятся в ближайший свободный слот ковра
+(куча окончаний ковров — O(log m) на схватку). Схватка с пропуском
+(ПРОПУСК вместо одного из соперников) не создаётся — проход засчитывается
+сразу и передаётся дальше по цепочке.
+
+Форматы олимпийской сетки (tournament.elimination_format):
+- "single" — только основная сетка;
+- "repechage" — утешительные схватки: когда определились оба финалиста,
+  проигравшие каждому из них (в порядке раундов) встречаются по цепочке,
+  последняя схватка цепочки — против проигравшего полуфинал, её
+  победитель получает бронзу;
+- "double" — до двух поражений: сетка проигравших и финал победителя
+  основной сетки с победителем сетки проигравших (без повторного финала).
+
+Возвращаются только новые записи расписания — их и нужно разослать по сети.
+"""
+import heapq
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.durations import DurationModel, current_schedule_minutes
+from core.mat_queue import get_mat_queue, notify_match_changed
+from core.reflow import _SlotLookup, _mat_finish
+from core.schedule_time import set_schedule_minutes
+from core.seeding import BYE_NAME
+
+
+PROGRESSION_KEY = "progression"
+
+FORMAT_SINGLE = "single"
+FORMAT_REPECHAGE = "repechage"
+FORMAT_DOUBLE = "double"
+FORMATS = (FORMAT_SINGLE, FORMAT_REPECHAGE, FORMAT_DOUBLE)
+
+STAGE_MAIN = "main"
+STAGE_REPECHAGE = "repechage"
+STAGE_LOSERS = "losers"
+STAGE_FINAL = "grand_final"
+
+Outcome = Tuple[str, str]
+
+
+def _is_bye(name: Any) -> bool:
+    return not name or name == BYE_NAME
+
+
+def elimination_format() -> str:
+    """Формат олимпийской сетки из настроек (tournament.elimination_format)."""
+    try:
+        from core.settings import get_settings
+        fmt = get_settings().get("tournament", "elimination_format", FORMAT_REPECHAGE)
+    except Exception:
+        fmt = FORMAT_REPECHAGE
+    return fmt if fmt in FORMATS else FORMAT_REPECHAGE
+
+
+def _main_id(category_name: str, round_num: int, number: int) -> str:
+    return f"{category_name}_R{round_num}_M{number}"
+
+
+def _draw_signature(category: Dict[str, Any]) -> List[List[Any]]:
+    """Состав первого раунда: по нему видно, что сетку пересоздали и план устарел."""
+    return [
+        [m.get("id"), m.get("wrestler1"), m.get("wrestler2")]
+        for m in category.get("matches", []) or []
+        if int(m.get("round", 1) or 1) == 1 and not m.get("sources")
+    ]
+
+
+def _bracket_size(category_name: str, category: Dict[str, Any]) -> int:
+    prefix = f"{category_name}_R1_M"
+    positions = 0
+    for m in category.get("matches", []) or []:
+        match_id = str(m.get("id") or "")
+        if match_id.startswith(prefix) and match_id[len(prefix):].isdigit():
+            positions = max(positions, 2 * int(match_id[len(prefix):]))
+    real = [p for p in category.get("participants", []) or [] if not _is_bye(p.get("name"))]
+    size = 2
+    while size < max(positions, len(real)):
+        size *= 2
+    return size
+
+
+def _spec(match_id: str, round_num: int, stage: str, sources: List[List[str]], **extra: Any) -> Dict[str, Any]:
+    spec = {"id": match_id, "round": round_num, "stage": stage, "sources": sources}
+    spec.update(extra)
+    return spec
+
+
+def build_plan(category_name: str, category: Dict[str, Any], fmt: Optional[str] = None) -> Dict[str, Any]:
+    """
+    План олимпийской сетки по схваткам первого раунда: основная сетка до
+    финала и, для "double", сетка проигравших с финалом. Утешительные
+    схватки ("repechage") добавляются позже — когда известны финалисты.
+    """
+    fmt = fmt if fmt in FORMATS else elimination_format()
+    size = _bracket_size(category_name, category)
+    rounds = size.bit_length() - 1
+    existing = {m.get("id") for m in category.get("matches", []) or []}
+    specs: List[Dict[str, Any]] = []
+    walkovers: Dict[str, List[str]] = {}
+
+    # Позиции первого раунда без схватки — оба места пустые
+    for n in range(1, size // 2 + 1):
+        match_id = _main_id(category_name, 1, n)
+        if match_id not in existing:
+            walkovers[match_id] = [BYE_NAME, BYE_NAME]
+
+    for r in range(2, rounds + 1):
+        for n in range(1, size // 2 ** r + 1):
+            specs.append(_spec(
+                _main_id(category_name, r, n), r, STAGE_MAIN,
+                [[_main_id(category_name, r - 1, 2 * n - 1), "winner"],
+                 [_main_id(category_name, r - 1, 2 * n), "winner"]],
+            ))
+
+    final_id = _main_id(category_name, rounds, 1)
+    if fmt == FORMAT_DOUBLE and rounds >= 2:
+        specs.extend(_losers_bracket(category_name, size, rounds))
+        final_id = specs[-1]["id"]
+
+    plan = {
+        "format": fmt,
+        "size": size,
+        "rounds": rounds,
+        "final": final_id,
+        "draw": _draw_signature(category),
+        "pending": {spec["id"]: spec for spec in specs},
+        "dependents": {},
+        "walkovers": walkovers,
+        "bronze": [],
+    }
+    for spec in specs:
+        _index_spec(plan, spec)
+    return plan
+
+
+def _losers_bracket(category_name: str, size: int, rounds: int) -> List[Dict[str, Any]]:
+    """
+    Сетка проигравших для size = 2^rounds: проигравшие 1-го раунда встречаются
+    между собой, далее чередуются раунд «спуска» (победители сетки
+    проигравших против проигравших очередного раунда основной сетки, в
+    обратном порядке, чтобы не было повторных встреч) и раунд «сведения».
+    """
+    specs: List[Dict[str, Any]] = []
+    lb_round = 1
+
+    def lb_id(j: int, n: int) -> str:
+        return f"{category_name}_L{j}_M{n}"
+
+    previous = []
+    for n in range(1, size // 4 + 1):
+        specs.append(_spec(
+            lb_id(lb_round, n), 2, STAGE_LOSERS,
+            [[_main_id(category_name, 1, 2 * n - 1), "loser"], [_main_id(category_name, 1, 2 * n), "loser"]],
+        ))
+        previous.append(lb_id(lb_round, n))
+
+    for r in range(2, rounds + 1):
+        # Спуск: победители сетки проигравших против проигравших раунда r
+        lb_round += 1
+        count = len(previous)
+        dropped = []
+        for n in range(1, count + 1):
+            specs.append(_spec(
+                lb_id(lb_round, n), lb_round // 2 + 2, STAGE_LOSERS,
+                [[previous[n - 1], "winner"], [_main_id(category_name, r, count + 1 - n), "loser"]],
+            ))
+            dropped.append(lb_id(lb_round, n))
+        previous = dropped
+        if r == rounds:
+            break
+        # Сведение: победители спуска между собой
+        lb_round += 1
+        merged = []
+        for n in range(1, len(previous) // 2 + 1):
+            specs.append(_spec(
+                lb_id(lb_round, n), lb_round // 2 + 2, STAGE_LOSERS,
+                [[previous[2 * n - 2], "winner"], [previous[2 * n - 1], "winner"]],
+            ))
+            merged.append(lb_id(lb_round, n))
+        previous = merged
+
+    specs.append(_spec(
+        f"{category_name}_GF", rounds + 1, STAGE_FINAL,
+        [[_main_id(category_name, rounds, 1), "winner"], [previous[0], "winner"]],
+        medal="gold",
+    ))
+    return specs
+
+
+def _index_spec(plan: Dict[str, Any], spec: Dict[str, Any]) -> None:
+    for source, _ in spec["sources"]:
+        dependents = plan["dependents"].setdefault(source, [])
+        if spec["id"] not in dependents:
+            dependents.append(spec["id"])
+
+
+def get_plan(category_name: str, category: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """План категории; создаётся при первом обращении и заново, если сетку пересоздали."""
+    if not isinstance(category, dict) or category.get("type") != "elimination":
+        return None
+    plan = category.get(PROGRESSION_KEY)
+    if not isinstance(plan, dict) or plan.get("draw") != _draw_signature(category):
+        # Сетку пересоздали — созданные по старому плану схватки больше не нужны
+        if isinstance(plan, dict):
+            category["matches"] = [m for m in category.get("matches", []) or [] if not m.get("sources")]
+        plan = category[PROGRESSION_KEY] = build_plan(category_name, category)
+    return plan
+
+
+def _outcome(plan: Dict[str, Any], by_id: Dict[str, Dict[str, Any]], match_id: str) -> Optional[Outcome]:
+    """(победитель, проигравший) схватки или None, если результата ещё нет."""
+    walkover = plan["walkovers"].get(match_id)
+    if walkover:
+        return walkover[0], walkover[1]
+    match = by_id.get(match_id)
+    if match is None:
+        return None
+    w1, w2 = match.get("wrestler1"), match.get("wrestler2")
+    if _is_bye(w1) or _is_bye(w2):
+        real = w2 if _is_bye(w1) else w1
+        return (real if not _is_bye(real) else BYE_NAME), BYE_NAME
+    winner = match.get("winner")
+    if not match.get("completed") or winner not in (w1, w2):
+        return None
+    return winner, (w2 if winner == w1 else w1)
+
+
+def _new_match(category: Dict[str, Any], spec: Dict[str, Any], names: List[str]) -> Dict[str, Any]:
+    clubs = {
+        p.get("name"): p.get("club", "")
+        for p in category.get("participants", []) or []
+        if isinstance(p, dict)
+    }
+    match = {
+        "id": spec["id"],
+        "wrestler1": names[0],
+        "wrestler2": names[1],
+        "club1": clubs.get(names[0], ""),
+        "club2": clubs.get(names[1], ""),
+        "completed": False,
+        "score1": 0,
+        "score2": 0,
+        "winner": None,
+        "round": spec["round"],
+        "stage": spec["stage"],
+        "sources": [list(source) for source in spec["sources"]],
+    }
+    if spec.get("medal"):
+        match["medal"] = spec["medal"]
+    return match
+
+
+def _plan_repechage(
+    category_name: str, plan: Dict[str, Any], by_id: Dict[str, Dict[str, Any]], finalists: List[str]
+) -> List[str]:
+    """
+    Цепочки утешительных схваток для проигравших финалистам. Возвращает id
+    добавленных в план схваток.
+    """
+    rounds = plan["rounds"]
+    added = []
+    for side, finalist in enumerate(finalists, start=1):
+        if _is_bye(finalist):
+            continue
+        # Путь финалиста вниз по сетке: полуфинал — source финала, дальше по победителю
+        number = side
+        path = [_main_id(category_name, rounds - 1, number)]
+        for r in range(rounds - 1, 1, -1):
+            upper = _main_id(category_name, r - 1, 2 * number - 1)
+            outcome = _outcome(plan, by_id, upper)
+            number = 2 * number - 1 if outcome and outcome[0] == finalist else 2 * number
+            path.append(_main_id(category_name, r - 1, number))
+        path.reverse()
+        losers = [match_id for match_id in path if not _is_bye((_outcome(plan, by_id, match_id) or ("", ""))[1])]
+        if len(losers) < 2:
+            # Проигравший полуфинал без соперников по утешительным — сразу бронза
+            if losers:
+                plan["bronze"].append(_outcome(plan, by_id, losers[0])[1])
+            continue
+        previous = [losers[0], "loser"]
+        for n, match_id in enumerate(losers[1:], start=1):
+            spec = _spec(
+                f"{category_name}_REP{side}_M{n}", rounds, STAGE_REPECHAGE,
+                [previous, [match_id, "loser"]],
+            )
+            if n == len(losers) - 1:
+                spec["medal"] = "bronze"
+            plan["pending"][spec["id"]] = spec
+            _index_spec(plan, spec)
+            added.append(spec["id"])
+            previous = [spec["id"], "winner"]
+    return added
+
+
+def advance_category(
+    category_name: str, category: Dict[str, Any], finished_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Создаёт схватки, которые определились после результата finished_id
+    (None — проверить все ожидающие, например после загрузки турнира).
+    Проходы без соперника засчитываются сразу. Возвращает новые схватки категории.
+    """
+    plan = get_plan(category_name, category)
+    if plan is None:
+        return []
+    matches = category.setdefault("matches", [])
+    by_id = {m.get("id"): m for m in matches}
+    if finished_id is None:
+        work = deque(plan["pending"])
+    else:
+        work = deque(plan["dependents"].get(finished_id, []))
+
+    created = []
+    while work:
+        spec_id = work.popleft()
+        spec = plan["pending"].get(spec_id)
+        if spec is None:
+            continue
+        if spec_id in by_id:
+            # Уже создана (например, пришла с другого ковра или восстановлена из журнала)
+            del plan["pending"][spec_id]
+            continue
+        outcomes = [_outcome(plan, by_id, source) for source, _ in spec["sources"]]
+        if any(outcome is None for outcome in outcomes):
+            continue
+        names = [outcome[0 if take == "winner" else 1] for outcome, (_, take) in zip(outcomes, spec["sources"])]
+        del plan["pending"][spec_id]
+
+        real = [name for name in names if not _is_bye(name)]
+        if len(real) == 2:
+            match = _new_match(category, spec, names)
+            matches.append(match)
+            by_id[spec_id] = match
+            created.append(match)
+        else:
+            plan["walkovers"][spec_id] = [real[0] if real else BYE_NAME, BYE_NAME]
+            if spec.get("medal") == "bronze" and real:
+                plan["bronze"].append(real[0])
+            work.extend(plan["dependents"].get(spec_id, []))
+
+        if (
+            plan["format"] == FORMAT_REPECHAGE
+            and spec["stage"] == STAGE_MAIN
+            and spec["round"] == plan["rounds"]
+            and plan["rounds"] >= 3
+        ):
+            work.extend(_plan_repechage(category_name, plan, by_id, names))
+    return created
+
+
+def _schedule_entry(category_name: str, match: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {
+        "category": category_name,
+        "wrestler1": match["wrestler1"],
+        "wrestler2": match["wrestler2"],
+        "club1": match.get("club1", ""),
+        "club2": match.get("club2", ""),
+        "match_id": match["id"],
+        "round": match.get("round", 1),
+        "stage": match.get("stage", STAGE_MAIN),
+        "sources": match.get("sources", []),
+    }
+    if match.get("medal"):
+        entry["medal"] = match["medal"]
+    return entry
+
+
+def slot_bouts(
+    tournament_data: Dict[str, Any],
+    category_name: str,
+    matches: List[Dict[str, Any]],
+    mats: Iterable[Any],
+    model: Optional[DurationModel] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Ставит новые схватки в ближайшие свободные слоты ковров: окончания очередей
+    ковров собираются в кучу один раз, каждая схватка — heappop/heappush.
+    Возвращает добавленные записи расписания.
+    """
+    if not matches:
+        return []
+    slot = _SlotLookup(tournament_data, model)
+    queue = get_mat_queue(tournament_data)
+    now = current_schedule_minutes(tournament_data)
+    finish: List[Tuple[int, int]] = []
+    for mat in mats:
+        try:
+            mat = int(mat)
+        except (TypeError, ValueError):
+            continue
+        finish.append((_mat_finish(queue.pending(mat), slot, now), mat))
+    if not finish:
+        finish = [(now, 1)]
+    heapq.heapify(finish)
+
+    schedule = tournament_data.setdefault("schedule", [])
+    entries = []
+    for match in matches:
+        start, mat = heapq.heappop(finish)
+        entry = _schedule_entry(category_name, match)
+        entry["mat"] = mat
+        set_schedule_minutes(entry, start)
+        schedule.append(entry)
+        notify_match_changed(tournament_data, entry)
+        entries.append(entry)
+        heapq.heappush(finish, (start + slot(entry), mat))
+    return entries
+
+
+def on_result(
+    tournament_data: Dict[str, Any],
+    category_name: str,
+    match_id: str,
+    mats: Iterable[Any],
+    model: Optional[DurationModel] = None,
+) -> List[Dict[str, Any]]:
+    """
+    После результата схватки match_id создаёт определившиеся схватки категории
+    и ставит их в расписание. Возвращает новые записи расписания.
+    """
+    category = (tournament_data.get("categories") or {}).get(category_name)
+    if not category:
+        return []
+    created = advance_category(category_name, category, match_id)
+    return slot_bouts(tournament_data, category_name, created, mats, model=model)
+
+
+def adopt_bout(tournament_data: Dict[str, Any], entry: Dict[str, Any]) -> Optional[str]:
+    """
+    Добавляет в категорию схватку, созданную на другом узле (пришла записью
+    расписания с полем sources). Возвращает название категории или None.
+    """
+    category_name = entry.get("category")
+    category = (tournament_data.get("categories") or {}).get(category_name)
+    match_id = entry.get("match_id") or entry.get("id")
+    if not category or not match_id or not entry.get("sources"):
+        return None
+    matches = category.setdefault("matches", [])
+    if any(m.get("id") == match_id for m in matches):
+        return None
+    spec = {
+        "id": match_id,
+        "round": entry.get("round", 1),
+        "stage": entry.get("stage", STAGE_MAIN),
+        "sources": entry.get("sources"),
+        "medal": entry.get("medal"),
+    }
+    matches.append(_new_match(category, spec, [entry.get("wrestler1", ""), entry.get("wrestler2", "")]))
+    plan = category.get(PROGRESSION_KEY)
+    if isinstance(plan, dict):
+        plan["pending"].pop(match_id, None)
+    return category_name
+
+
+def final_placements(category: Dict[str, Any]) -> Optional[List[Tuple[str, int]]]:
+    """
+    Места олимпийской сетки с утешительными схватками или сеткой проигравших.
+    None — формат "single" или плана нет (места считаются по основной сетке);
+    пустой список — ещё не всё определено.
+    """
+    plan = category.get(PROGRESSION_KEY)
+    if not isinstance(plan, dict) or plan.get("format") == FORMAT_SINGLE:
+        return None
+    if plan.get("pending"):
+        return []
+    by_id = {m.get("id"): m for m in category.get("matches", []) or []}
+    final = _outcome(plan, by_id, plan.get("final"))
+    if final is None:
+        return []
+    placements = [(final[0], 1), (final[1], 2)]
+
+    if plan["format"] == FORMAT_DOUBLE:
+        # Бронза — у проигравшего финал сетки проигравших (второй вход общего финала)
+        grand_final = by_id.get(plan.get("final"))
+        if grand_final and grand_final.get("sources"):
+            lb_final = _outcome(plan, by_id, grand_final["sources"][1][0])
+            if lb_final:
+                placements.append((lb_final[1], 3))
+    elif plan.get("rounds", 1) < 3:
+        # Утешительных нет — бронза у проигравших полуфинал
+        final_match = by_id.get(plan.get("final"))
+        for source, _ in (final_match or {}).get("sources", []):
+            semi = _outcome(plan, by_id, source)
+            if semi:
+                placements.append((semi[1], 3))
+    else:
+        placements.extend((name, 3) for name in plan.get("bronze", []))
+        placements.extend(
+            (m["winner"], 3) for m in category.get("matches", [])
+            if m.get("medal") == "bronze" and m.get("completed") and m.get("winner")
+        )
+    return [(name, place) for name, place in placements if not _is_bye(name)]
@@ -0,0 +1,266 @@
+"""
+Рейтинги борцов (Glicko-1) по истории результатов из core.warehouse.
+
+- rebuild_ratings() пересчитывает рейтинги всех спортсменов по всей истории
+  bout_results. Период рейтинга — турнир: все схватки периода считаются
+  по рейтингам на его начало, поэтому период обрабатывается одним проходом
+  с накоплением сумм по спортсменам, а не схватка за схваткой.
+- update_after_bout() — инкрементальное обновление после каждой новой
+  схватки (вызывается из core.warehouse.record_bout): обе стороны
+  пересчитываются как период из одной схватки с номером периода турнира,
+  поэтому RD растёт за пропущенные турниры так же, как при полном пересчёте.
+  Исправление или отмена уже учтённой схватки инкрементально не откатить:
+  record_bout пересчитывает рейтинги целиком (recompute_ratings()).
+- seed_ratings() отдаёт рейтинги участников для посева сеток
+  (core.utils.create_bracket с параметром ratings).
+"""
+import math
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.db import get_connection
+from core.warehouse import normalize_name, participant_key
+
+
+INITIAL_RATING = 1500.0
+INITIAL_RD = 350.0
+MIN_RD = 30.0
+# Рост неопределённости за каждый турнир, пропущенный спортсменом
+RD_GROWTH_PER_PERIOD = 10.0
+# Посев — по консервативной оценке: рейтинг минус SEED_RD_FACTOR * RD
+SEED_RD_FACTOR = 2.0
+
+_Q = math.log(10) / 400.0
+_PI2 = math.pi ** 2
+
+# Схватка периода: (спортсмен, соперник, результат спортсмена: 1 / 0.5 / 0)
+Bout = Tuple[int, int, float]
+
+
+def _g(rd: float) -> float:
+    return 1.0 / math.sqrt(1.0 + 3.0 * _Q * _Q * rd * rd / _PI2)
+
+
+def expected_score(rating: float, opponent_rating: float, opponent_rd: float) -> float:
+    # 10 ** (x / 400) == exp(_Q * x)
+    return 1.0 / (1.0 + math.exp(-_Q * _g(opponent_rd) * (rating - opponent_rating)))
+
+
+class RatingState:
+    """Рейтинги в памяти: id -> [рейтинг, RD, число схваток, последний период]."""
+
+    def __init__(self, initial: Optional[Dict[int, List[float]]] = None):
+        self.table: Dict[int, List[float]] = initial or {}
+
+    def get(self, athlete: int) -> List[float]:
+        entry = self.table.get(athlete)
+        if entry is None:
+            entry = self.table[athlete] = [INITIAL_RATING, INITIAL_RD, 0, -1]
+        return entry
+
+    def apply_period(self, period: int, bouts: Iterable[Bout]) -> None:
+        """
+        Один период Glicko: ожидания считаются по рейтингам на начало периода,
+        суммы накапливаются по спортсменам, затем все обновления применяются разом.
+        """
+        # Снимок (рейтинг, RD, g(RD)) на начало периода с ростом RD за пропуски
+        start: Dict[int, Tuple[float, float, float]] = {}
+        acc: Dict[int, List[float]] = {}
+
+        def snapshot(athlete: int) -> Tuple[float, float, float]:
+            state = start.get(athlete)
+            if state is None:
+                rating, rd, _, last = self.get(athlete)
+                if last >= 0 and period > last:
+                    rd = min(INITIAL_RD, math.sqrt(rd * rd + RD_GROWTH_PER_PERIOD ** 2 * (period - last)))
+                state = start[athlete] = (rating, rd, _g(rd))
+            return state
+
+        for athlete, opponent, score in bouts:
+            r1, _, g1 = snapshot(athlete)
+            r2, _, g2 = snapshot(opponent)
+            # Ожидание каждой стороны зависит от RD соперника
+            e1 = 1.0 / (1.0 + math.exp(-_Q * g2 * (r1 - r2)))
+            e2 = 1.0 / (1.0 + math.exp(-_Q * g1 * (r2 - r1)))
+            sums = acc.get(athlete)
+            if sums is None:
+                sums = acc[athlete] = [0.0, 0.0, 0]
+            sums[0] += g2 * g2 * e1 * (1.0 - e1)
+            sums[1] += g2 * (score - e1)
+            sums[2] += 1
+            sums = acc.get(opponent)
+            if sums is None:
+                sums = acc[opponent] = [0.0, 0.0, 0]
+            sums[0] += g1 * g1 * e2 * (1.0 - e2)
+            sums[1] += g1 * (1.0 - score - e2)
+            sums[2] += 1
+
+        for athlete, (v_sum, delta_sum, count) in acc.items():
+            rating, rd, _ = start[athlete]
+            inv = 1.0 / (rd * rd) + _Q * _Q * v_sum
+            entry = self.get(athlete)
+            entry[0] = rating + _Q / inv * delta_sum
+            entry[1] = max(MIN_RD, math.sqrt(1.0 / inv))
+            entry[2] += count
+            entry[3] = period
+
+
+def compute_ratings(periods: Iterable[Iterable[Bout]]) -> RatingState:
+    """Рейтинги по последовательности периодов (чистая функция, без БД)."""
+    state = RatingState()
+    for index, bouts in enumerate(periods):
+        state.apply_period(index, bouts)
+    return state
+
+
+def _season_key(date_text: Any, tournament_id: int) -> Tuple[int, int]:
+    try:
+        return int(datetime.strptime(str(date_text), "%d.%m.%Y").strftime("%Y%m%d")), tournament_id
+    except (TypeError, ValueError):
+        return 99999999, tournament_id
+
+
+def _tournament_order(conn: sqlite3.Connection) -> List[int]:
+    """Id турниров в хронологическом порядке; индекс в списке — номер периода."""
+    rows = conn.execute("SELECT id, date FROM tournaments").fetchall()
+    return [row[0] for row in sorted(rows, key=lambda row: _season_key(row[1], row[0]))]
+
+
+def tournament_period(conn: sqlite3.Connection, tournament_id: int) -> int:
+    """Номер периода рейтинга (турнира) — тот же, что при полном пересчёте."""
+    order = _tournament_order(conn)
+    return order.index(tournament_id) if tournament_id in order else len(order)
+
+
+def _load_periods(conn: sqlite3.Connection) -> List[List[Bout]]:
+    """
+    Схватки из bout_results по турнирам в хронологическом порядке. Турнир
+    без схваток — пустой период: номера периодов совпадают с tournament_period().
+    """
+    order = _tournament_order(conn)
+    grouped: Dict[int, List[Bout]] = {}
+    for tournament_id, a, b, winner in conn.execute(
+        "SELECT tournament_id, athlete1_id, athlete2_id, winner_id FROM bout_results"
+    ):
+        score = 1.0 if winner == a else 0.0 if winner == b else 0.5
+        grouped.setdefault(tournament_id, []).append((a, b, score))
+    known = set(order)
+    order += sorted(t for t in grouped if t not in known)
+    return [grouped.get(t, []) for t in order]
+
+
+def _write_state(conn: sqlite3.Connection, state: RatingState) -> None:
+    now = datetime.utcnow().isoformat()
+    conn.execute("DELETE FROM ratings")
+    conn.executemany(
+        "INSERT INTO ratings (athlete_id, rating, rd, bouts, updated_at, last_period) VALUES (?, ?, ?, ?, ?, ?)",
+        ((athlete, r, rd, int(n), now, int(last)) for athlete, (r, rd, n, last) in state.table.items()),
+    )
+
+
+def recompute_ratings(conn: sqlite3.Connection) -> int:
+    """
+    Полный пересчёт в транзакции вызывающего (исправление уже учтённой
+    схватки). Возвращает число спортсменов.
+    """
+    state = compute_ratings(_load_periods(conn))
+    _write_state(conn, state)
+    return len(state.table)
+
+
+def rebuild_ratings(db_path: Optional[str] = None) -> int:
+    """Полный пересчёт рейтингов по истории. Возвращает число спортсменов."""
+    conn = get_connection(db_path)
+    try:
+        with conn:
+            return recompute_ratings(conn)
+    finally:
+        conn.close()
+
+
+def update_after_bout(
+    conn: sqlite3.Connection, athlete1: int, athlete2: int, winner_id: Optional[int], period: int
+) -> None:
+    """
+    Инкрементальное обновление рейтингов двух спортсменов после новой схватки.
+    period — номер турнира (tournament_period()).
+    """
+    rows = {
+        row[0]: [row[1], row[2], row[3], row[4]]
+        for row in conn.execute(
+            "SELECT athlete_id, rating, rd, bouts, last_period FROM ratings WHERE athlete_id IN (?, ?)",
+            (athlete1, athlete2),
+        ).fetchall()
+    }
+    state = RatingState(rows)
+    score = 1.0 if winner_id == athlete1 else 0.0 if winner_id == athlete2 else 0.5
+    state.apply_period(period, [(athlete1, athlete2, score)])
+    now = datetime.utcnow().isoformat()
+    conn.executemany(
+        """
+        INSERT INTO ratings (athlete_id, rating, rd, bouts, updated_at, last_period) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(athlete_id) DO UPDATE SET
+            rating = excluded.rating, rd = excluded.rd, bouts = excluded.bouts,
+            updated_at = excluded.updated_at, last_period = excluded.last_period
+        """,
+        [
+            (a, state.table[a][0], state.table[a][1], int(state.table[a][2]), now, int(state.table[a][3]))
+            for a in (athlete1, athlete2)
+        ],
+    )
+
+
+def seed_ratings(participants: Iterable[Dict[str, Any]], db_path: Optional[str] = None) -> Dict[str, float]:
+    """
+    Рейтинги для посева: {имя: рейтинг - SEED_RD_FACTOR * RD} только для
+    участников с историей. Спортсмен ищется по имени и году рождения,
+    а если года нет — по имени, если тёзок в базе нет.
+    """
+    participants = [p for p in participants if isinstance(p, dict) and p.get("name")]
+    if not participants:
+        return {}
+    result: Dict[str, float] = {}
+    try:
+        conn = get_connection(db_path)
+    except Exception as e:
+        print(f"[ratings] БД недоступна: {e}")
+        return result
+    try:
+        for p in participants:
+            name = p["name"]
+            row = conn.execute(
+                """
+                SELECT r.rating, r.rd FROM athletes a JOIN ratings r ON r.athlete_id = a.id
+                WHERE a.identity_key = ?
+                """,
+                (participant_key(p),),
+            ).fetchone()
+            if row is None:
+                rows = conn.execute(
+                    "SELECT r.rating, r.rd FROM athletes a JOIN ratings r ON r.athlete_id = a.id WHERE a.name_norm = ?",
+                    (normalize_name(name),),
+                ).fetchall()
+                row = rows[0] if len(rows) == 1 else None
+            if row is not None:
+                result[name] = row[0] - SEED_RD_FACTOR * row[1]
+    except Exception as e:
+        print(f"[ratings] Ошибка чтения рейтингов: {e}")
+    finally:
+        conn.close()
+    return result
+
+
+def seeding_ratings(categories: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, float]]:
+    """
+    Рейтинги участников всех категорий для create_bracket(s_batch), если
+    посев по рейтингу включён в настройках (tournament.seed_by_rating).
+    """
+    try:
+        from core.settings import get_settings
+        if not get_settings().get("tournament", "seed_by_rating", True):
+            return None
+    except Exception:
+        pass
+    participants = [p for cat in categories.values() for p in cat.get("participants", []) or []]
+    return seed_ratings(participants) or None
@@ -0,0 +1,243 @@
+"""
+Инкрементальный пересчёт расписания ковра.
+
+Когда схватка закончилась раньше или позже плана, пересчитываются времена
+только ожидающих схваток этого ковра (хвост его очереди вызова) — O(k) для
+k затронутых схваток, остальные ковры и порядок схваток не меняются.
+Дополнительно ковёр, который сильно опережает самый загруженный ковёр,
+может забрать у него последние ожидающие схватки — если борцы схватки не
+заняты в это время на другом ковре и предыдущие раунды категории завершены.
+
+Функции возвращают только изменённые записи расписания — их и нужно
+разослать по сети (send_match_update), а не всё расписание целиком.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.durations import (
+    DurationModel,
+    category_age_group,
+    current_schedule_minutes,
+    get_duration_model,
+    tournament_sport,
+)
+from core.mat_queue import STATUS_COMPLETED, get_mat_queue
+from core.schedule_time import schedule_minutes, set_schedule_minutes
+
+
+# Разница прогнозируемого окончания ковров (минуты), после которой переносим схватки
+DEFAULT_REBALANCE_THRESHOLD = 20
+
+
+class _SlotLookup:
+    """Длина слота схватки по категории с кэшем возрастных групп."""
+
+    def __init__(self, tournament_data: Dict[str, Any], model: Optional[DurationModel]):
+        self.model = model or get_duration_model()
+        self.sport = tournament_sport(tournament_data)
+        self.categories = tournament_data.get("categories") or {}
+        self._cache: Dict[str, int] = {}
+
+    def __call__(self, match: Dict[str, Any]) -> int:
+        category = match.get("category", "")
+        slot = self._cache.get(category)
+        if slot is None:
+            age_group = category_age_group(self.categories.get(category))
+            slot = self._cache[category] = self.model.slot_minutes(self.sport, age_group)
+        return slot
+
+
+def reflow_mat(
+    tournament_data: Dict[str, Any],
+    mat: Any,
+    anchor_minutes: Optional[int] = None,
+    model: Optional[DurationModel] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Пересчитывает start_min/time ожидающих схваток ковра подряд, начиная
+    с anchor_minutes (по умолчанию — текущее время). Порядок вызова сохраняется.
+    Возвращает схватки, время которых изменилось.
+    """
+    if anchor_minutes is None:
+        anchor_minutes = current_schedule_minutes(tournament_data)
+    slot = _SlotLookup(tournament_data, model)
+    queue = get_mat_queue(tournament_data)
+
+    changed = []
+    cursor = int(anchor_minutes)
+    for match in queue.pending(mat):
+        if schedule_minutes(match) != cursor:
+            set_schedule_minutes(match, cursor)
+            changed.append(match)
+        cursor += slot(match)
+    # Ключи кучи зависят от времени — обновляем только изменённые записи
+    for match in changed:
+        queue.update(match)
+    return changed
+
+
+def _mat_finish(pending: List[Dict[str, Any]], slot: _SlotLookup, now: int) -> int:
+    if not pending:
+        return now
+    last = pending[-1]
+    return max(now, schedule_minutes(last) + slot(last))
+
+
+def _is_finished(match: Dict[str, Any]) -> bool:
+    return match.get("status") == STATUS_COMPLETED or bool(match.get("completed", False))
+
+
+def _round(match: Dict[str, Any]) -> int:
+    try:
+        return int(match.get("round", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class _MoveGuard:
+    """
+    Проверки переноса схватки: незавершённые схватки борцов по времени
+    (ни один борец не должен оказаться на двух коврах сразу) и самый ранний
+    незавершённый раунд каждой категории (раунд N+1 не раньше раунда N).
+    """
+
+    def __init__(self, schedule: List[Dict[str, Any]], slot: _SlotLookup):
+        self._slot = slot
+        self._busy: Dict[str, List[Tuple[int, int, Dict[str, Any]]]] = {}
+        self._first_round: Dict[str, int] = {}
+        for match in schedule:
+            if not isinstance(match, dict) or _is_finished(match):
+                continue
+            self._occupy(match)
+            category = match.get("category", "")
+            round_num = _round(match)
+            if round_num < self._first_round.get(category, round_num + 1):
+                self._first_round[category] = round_num
+
+    @staticmethod
+    def _wrestlers(match: Dict[str, Any]) -> List[str]:
+        return [name for name in (match.get("wrestler1"), match.get("wrestler2")) if name]
+
+    def _occupy(self, match: Dict[str, Any]) -> None:
+        start = schedule_minutes(match)
+        end = start + self._slot(match)
+        for name in self._wrestlers(match):
+            self._busy.setdefault(name, []).append((start, end, match))
+
+    def _release(self, match: Dict[str, Any]) -> None:
+        for name in self._wrestlers(match):
+            self._busy[name] = [item for item in self._busy.get(name, []) if item[2] is not match]
+
+    def allows(self, match: Dict[str, Any], start: int) -> bool:
+        if _round(match) > self._first_round.get(match.get("category", ""), _round(match)):
+            return False
+        end = start + self._slot(match)
+        for name in self._wrestlers(match):
+            for other_start, other_end, other in self._busy.get(name, []):
+                if other is not match and other_start < end and start < other_end:
+                    return False
+        return True
+
+    def moved(self, match: Dict[str, Any]) -> None:
+        """Вызывается после записи нового времени схватки."""
+        self._release(match)
+        self._occupy(match)
+
+
+def pull_pending_bouts(
+    tournament_data: Dict[str, Any],
+    target_mat: Any,
+    mats: Iterable[Any],
+    threshold_minutes: int = DEFAULT_REBALANCE_THRESHOLD,
+    model: Optional[DurationModel] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Переносит на ковёр target_mat последние ожидающие схватки самого
+    загруженного ковра, пока разница прогнозируемого окончания больше порога
+    и перенос сокращает общее время. Схватки добавляются в конец очереди
+    target_mat. Схватка, борец которой занят в новое время на другом ковре
+    или у категории которой не завершён предыдущий раунд, остаётся на месте,
+    и хвост этого ковра больше не разбирается. Возвращает перенесённые схватки.
+
+    Переносит в свою очередь только сам target_mat (ковёр, на котором
+    закончилась схватка), поэтому узлы разных ковров не конфликтуют.
+    """
+    if not threshold_minutes or threshold_minutes <= 0:
+        return []
+    try:
+        target_mat = int(target_mat)
+    except (TypeError, ValueError):
+        return []
+
+    slot = _SlotLookup(tournament_data, model)
+    queue = get_mat_queue(tournament_data)
+    now = current_schedule_minutes(tournament_data)
+
+    pending: Dict[int, List[Dict[str, Any]]] = {}
+    for mat in mats:
+        try:
+            mat = int(mat)
+        except (TypeError, ValueError):
+            continue
+        pending[mat] = queue.pending(mat)
+    pending.setdefault(target_mat, queue.pending(target_mat))
+    finish = {mat: _mat_finish(items, slot, now) for mat, items in pending.items()}
+
+    # Проверки переноса просматривают всё расписание — строим их, только
+    # когда какой-то ковёр действительно отстаёт больше порога
+    guard: Optional[_MoveGuard] = None
+    blocked = set()
+    moved = []
+    while True:
+        candidates = [mat for mat in finish if mat not in blocked]
+        if not candidates:
+            break
+        busiest = max(candidates, key=finish.get)
+        if busiest == target_mat or not pending[busiest]:
+            break
+        if finish[busiest] - finish[target_mat] <= threshold_minutes:
+            break
+        match = pending[busiest][-1]
+        start = finish[target_mat]
+        duration = slot(match)
+        # Перенос имеет смысл, только если на новом месте схватка закончится раньше
+        if start + duration >= finish[busiest]:
+            break
+        if guard is None:
+            guard = _MoveGuard(tournament_data.get("schedule") or [], slot)
+        if not guard.allows(match, start):
+            blocked.add(busiest)
+            continue
+        pending[busiest].pop()
+        finish[busiest] = _mat_finish(pending[busiest], slot, now)
+        finish[target_mat] += duration
+        match["mat"] = target_mat
+        set_schedule_minutes(match, start)
+        guard.moved(match)
+        queue.update(match)
+        moved.append(match)
+
+    if moved:
+        print(f"[reflow] На ковёр {target_mat} перенесено схваток: {len(moved)}")
+    return moved
+
+
+def reflow_after_bout(
+    tournament_data: Dict[str, Any],
+    mat: Any,
+    mats: Optional[Iterable[Any]] = None,
+    threshold_minutes: int = 0,
+    model: Optional[DurationModel] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Пересчёт после завершения схватки на ковре mat: сдвиг хвоста очереди
+    к текущему времени и, если задан порог и список ковров, перенос схваток
+    с перегруженного ковра. Возвращает изменённые записи без повторов.
+    """
+    changed = reflow_mat(tournament_data, mat, model=model)
+    if mats is not None and threshold_minutes:
+        changed.extend(pull_pending_bouts(tournament_data, mat, mats, threshold_minutes, model=model))
+
+    unique: Dict[int, Dict[str, Any]] = {}
+    for match in changed:
+        unique[id(match)] = match
+    return list(unique.values())
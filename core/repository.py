@@ -0,0 +1,716 @@
+"""
+Репозиторий турнира поверх нормализованной схемы SQLite (см. core.db.init_tournament_schema).
+
+- load() читает метаданные турнира, участников и расписание, а категории
+  подгружаются лениво — состав и схватки категории читаются из БД при первом
+  обращении к ней (LazyCategories).
+- save() пишет только изменившиеся строки: для каждой строки хранится её
+  последнее записанное JSON-представление, и строка переписывается, лишь если
+  оно изменилось. Не открытые (не подгруженные) категории не трогаются вовсе.
+- save_async() пишет в фоновом потоке: в потоке UI снимается только
+  pickle-копия подгруженных данных, у рабочего потока своё соединение SQLite.
+"""
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.db import get_connection, get_or_create_tournament_id
+
+
+_META_KEYS = ("name", "date", "location", "sport")
+_CATEGORY_ROW_KEYS = ("participants", "matches")
+
+
+# Один кодировщик на модуль: json.dumps с параметрами создаёт его на каждый вызов.
+# Порядок ключей не сортируем — dict сохраняет порядок вставки, а лишняя
+# перезапись строки при его смене дешевле сортировки на каждом сохранении.
+_ENCODER = json.JSONEncoder(ensure_ascii=False, default=str)
+
+
+def _dumps(obj: Any) -> str:
+    return _ENCODER.encode(obj)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _participant_uids(participants: List[Dict[str, Any]]) -> List[str]:
+    """Ключи участников: имя, при повторах — имя#N."""
+    seen: Dict[str, int] = {}
+    uids = []
+    for p in participants:
+        name = str(p.get("name", "") or "").strip()
+        seen[name] = seen.get(name, 0) + 1
+        uids.append(name if seen[name] == 1 else f"{name}#{seen[name]}")
+    return uids
+
+
+def _schedule_uid(item: Dict[str, Any]) -> str:
+    return str(
+        item.get("match_id")
+        or item.get("id")
+        or f"{item.get('category')}_{item.get('wrestler1')}_{item.get('wrestler2')}"
+    )
+
+
+def _match_uid(category_name: str, match: Dict[str, Any]) -> str:
+    # Тот же ключ, что и в core.db.save_match_result
+    return str(match.get("id") or f"{category_name}_{match.get('wrestler1')}_{match.get('wrestler2')}")
+
+
+class LazyCategories(dict):
+    """
+    Словарь категорий, который дочитывает состав и схватки категории из БД
+    при первом обращении. Для остального кода выглядит как обычный dict
+    (json.dump, copy.deepcopy, items()/values() подгружают категории сами).
+
+    source — откуда дочитываются категории (снимок строк турнира в БД для
+    TournamentRepository, None для файла-контейнера): пропускать не
+    подгруженные категории при сохранении можно, только если их источник —
+    та же БД.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str, Dict[str, Any]], None],
+        categories: Dict[str, Dict[str, Any]],
+        source: Any = None,
+    ):
+        super().__init__(categories)
+        self._loader = loader
+        self._pending = set(categories)
+        self.source = source
+
+    def is_loaded(self, name: str) -> bool:
+        return name not in self._pending
+
+    def _ensure(self, name: Any) -> None:
+        if name in self._pending:
+            self._pending.discard(name)
+            self._loader(name, dict.__getitem__(self, name))
+
+    def materialize(self) -> None:
+        for name in list(self._pending):
+            self._ensure(name)
+
+    def __getitem__(self, name):
+        self._ensure(name)
+        return dict.__getitem__(self, name)
+
+    def __iter__(self):
+        # Собственный __iter__ отключает «быструю» копию dict(...)/{**...},
+        # которая обошла бы подгрузку
+        return iter(list(dict.keys(self)))
+
+    def get(self, name, default=None):
+        if name in self:
+            return self[name]
+        return default
+
+    def items(self):
+        self.materialize()
+        return dict.items(self)
+
+    def values(self):
+        self.materialize()
+        return dict.values(self)
+
+    def pop(self, name, *default):
+        self._pending.discard(name)
+        return dict.pop(self, name, *default)
+
+    def __delitem__(self, name):
+        self._pending.discard(name)
+        dict.__delitem__(self, name)
+
+    def __setitem__(self, name, value):
+        self._pending.discard(name)
+        dict.__setitem__(self, name, value)
+
+    def setdefault(self, name, default=None):
+        if name in self:
+            return self[name]
+        self[name] = default
+        return default
+
+    def copy(self):
+        self.materialize()
+        return dict(dict.items(self))
+
+    def __reduce__(self):
+        # pickle (снимки автосохранения) сохраняет категории обычным dict без загрузчика
+        return (dict, (), None, None, iter(self.items()))
+
+
+class _Snapshot:
+    """Последние записанные представления строк одного турнира."""
+
+    def __init__(self):
+        self.meta: Optional[str] = None
+        self.participants: Dict[str, Tuple[int, str]] = {}
+        self.categories: Dict[str, Tuple[int, str, Optional[str]]] = {}
+        self.category_ids: Dict[str, int] = {}
+        self.matches: Dict[str, Dict[str, Tuple[int, str]]] = {}
+        self.schedule: Dict[str, Tuple[int, str]] = {}
+        # JSON целых списков (участники, расписание, схватки категории): если
+        # список не изменился, построчное сравнение не нужно
+        self.blobs: Dict[str, str] = {}
+
+
+def _detach(tournament_data: Dict[str, Any]) -> Tuple[bytes, Optional[List[str]], Any]:
+    """
+    Копия турнира для записи в другом потоке: pickle без не подгруженных
+    категорий своей БД (их не нужно ни читать, ни писать). Возвращает
+    (байты, порядок категорий или None, источник категорий).
+    """
+    categories = tournament_data.get("categories")
+    if not isinstance(categories, LazyCategories) or categories.source is None:
+        return pickle.dumps(tournament_data, protocol=pickle.HIGHEST_PROTOCOL), None, None
+    rest = {k: v for k, v in tournament_data.items() if k != "categories"}
+    loaded = {name: dict.__getitem__(categories, name) for name in dict.keys(categories) if categories.is_loaded(name)}
+    data = pickle.dumps((rest, loaded), protocol=pickle.HIGHEST_PROTOCOL)
+    return data, list(dict.keys(categories)), categories.source
+
+
+def _attach(data: bytes, order: Optional[List[str]], source: Any) -> Dict[str, Any]:
+    """Обратно к _detach: не подгруженные категории остаются не подгруженными."""
+    if order is None:
+        return pickle.loads(data)
+    tournament_data, loaded = pickle.loads(data)
+
+    def not_loaded(name: str, cat: Dict[str, Any]) -> None:
+        raise KeyError(f"Категория {name} не подгружена")
+
+    tournament_data["categories"] = categories = LazyCategories(
+        not_loaded, {name: loaded.get(name, {}) for name in order}, source=source
+    )
+    categories._pending = set(order) - set(loaded)
+    return tournament_data
+
+
+class TournamentRepository:
+    """
+    Загрузка и сохранение турнира в нормализованной схеме SQLite. У каждого
+    потока своё соединение; снимки строк общие и защищены блокировкой.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._snapshots: Dict[int, _Snapshot] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = get_connection(self.db_path)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def close(self) -> None:
+        """Дожидается фоновых записей и закрывает соединение текущего потока."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------ #
+    #  Чтение
+    # ------------------------------------------------------------------ #
+    def list_tournaments(self) -> List[Dict[str, Any]]:
+        """Турниры в БД (новые первыми) с числом участников."""
+        cur = self.conn.execute(
+            """
+            SELECT t.id, t.name, t.date, t.location, t.updated_at,
+                   (SELECT COUNT(*) FROM participants p WHERE p.tournament_id = t.id) AS participants
+            FROM tournaments t
+            ORDER BY COALESCE(t.updated_at, t.created_at) DESC
+            """
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+    def load(self, tournament_id: int, lazy: bool = True) -> Dict[str, Any]:
+        """
+        Загружает турнир. При lazy=True категории дочитываются по мере обращения.
+        """
+        with self._lock:
+            return self._load(tournament_id, lazy)
+
+    def _load(self, tournament_id: int, lazy: bool) -> Dict[str, Any]:
+        conn = self.conn
+        row = conn.execute("SELECT * FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Турнир {tournament_id} не найден в БД")
+
+        snapshot = _Snapshot()
+        self._snapshots[tournament_id] = snapshot
+
+        tournament_data: Dict[str, Any] = json.loads(row["data"]) if row["data"] else {}
+        for key in _META_KEYS:
+            if row[key] is not None:
+                tournament_data[key] = row[key]
+        tournament_data.setdefault("date", "")
+        tournament_data.setdefault("location", "")
+        snapshot.meta = row["data"]
+
+        participants = []
+        for p in conn.execute(
+            "SELECT uid, position, data FROM participants WHERE tournament_id = ? ORDER BY position",
+            (tournament_id,),
+        ):
+            participants.append(json.loads(p["data"]))
+            snapshot.participants[p["uid"]] = (p["position"], p["data"])
+        tournament_data["participants"] = participants
+        snapshot.blobs["participants"] = _dumps(participants)
+
+        categories: Dict[str, Dict[str, Any]] = {}
+        for c in conn.execute(
+            "SELECT id, name, position, members_hash, data FROM categories WHERE tournament_id = ? ORDER BY position",
+            (tournament_id,),
+        ):
+            cat = json.loads(c["data"])
+            cat["participants"] = []
+            cat["matches"] = []
+            categories[c["name"]] = cat
+            snapshot.categories[c["name"]] = (c["position"], c["data"], c["members_hash"])
+            snapshot.category_ids[c["name"]] = c["id"]
+
+        def load_category(name: str, cat: Dict[str, Any]) -> None:
+            with self._lock:
+                self._load_category(snapshot, name, cat)
+
+        lazy_categories = LazyCategories(load_category, categories, source=snapshot)
+        tournament_data["categories"] = lazy_categories
+
+        schedule = []
+        for s in conn.execute(
+            "SELECT match_uid, position, data FROM schedule_slots WHERE tournament_id = ? ORDER BY position",
+            (tournament_id,),
+        ):
+            schedule.append(json.loads(s["data"]))
+            snapshot.schedule[s["match_uid"]] = (s["position"], s["data"])
+        if schedule or "schedule" in tournament_data:
+            tournament_data["schedule"] = schedule
+        snapshot.blobs["schedule"] = _dumps(schedule)
+
+        if not lazy:
+            lazy_categories.materialize()
+        return tournament_data
+
+    def _load_category(self, snapshot: _Snapshot, name: str, cat: Dict[str, Any]) -> None:
+        category_id = snapshot.category_ids.get(name)
+        if category_id is None:
+            return
+        conn = self.conn
+        cat["participants"] = [
+            json.loads(m["data"])
+            for m in conn.execute(
+                "SELECT data FROM category_members WHERE category_id = ? ORDER BY position",
+                (category_id,),
+            )
+        ]
+        matches = []
+        rows: Dict[str, Tuple[int, str]] = {}
+        for m in conn.execute(
+            """
+            SELECT match_uid, position, data, score1, score2, winner, completed
+            FROM matches WHERE category_id = ? ORDER BY position
+            """,
+            (category_id,),
+        ):
+            if not m["data"]:
+                continue
+            match = json.loads(m["data"])
+            # Результаты могли прийти через save_match_result позже, чем запись data
+            if m["completed"]:
+                match["completed"] = True
+                match["winner"] = m["winner"]
+                match["score1"] = m["score1"] if m["score1"] is not None else 0
+                match["score2"] = m["score2"] if m["score2"] is not None else 0
+            matches.append(match)
+            # Строка сравнивается с тем, что лежит в памяти, иначе дописанные
+            # результатом поля переписывали бы схватку при каждом сохранении категории
+            rows[m["match_uid"]] = (m["position"], _dumps(match) if m["completed"] else m["data"])
+        cat["matches"] = matches
+        snapshot.matches[name] = rows
+        snapshot.blobs[f"matches:{name}"] = _dumps(matches)
+
+    # ------------------------------------------------------------------ #
+    #  Запись
+    # ------------------------------------------------------------------ #
+    def save(self, tournament_data: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Сохраняет турнир, записывая только изменённые строки, одной транзакцией.
+        Возвращает число записанных/удалённых строк по таблицам.
+        """
+        with self._lock:
+            return self._save(tournament_data)
+
+    def save_async(self, tournament_data: Dict[str, Any]) -> Future:
+        """
+        Сохранение в фоновом потоке (записи идут по порядку). В вызывающем
+        потоке — только pickle-копия подгруженных данных. Future возвращает
+        статистику save() или исключение.
+        """
+        detached = _detach(tournament_data)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-save")
+        return self._executor.submit(lambda: self.save(_attach(*detached)))
+
+    def _save(self, tournament_data: Dict[str, Any]) -> Dict[str, int]:
+        conn = self.conn
+        stats = {"participants": 0, "categories": 0, "members": 0, "matches": 0, "schedule": 0, "deleted": 0}
+        with conn:
+            tournament_id = get_or_create_tournament_id(conn, tournament_data)
+            snapshot = self._snapshots.get(tournament_id)
+            if snapshot is None:
+                snapshot = self._snapshots[tournament_id] = self._read_snapshot(tournament_id)
+            now = datetime.utcnow().isoformat()
+
+            meta = {
+                k: v for k, v in tournament_data.items()
+                if k not in _META_KEYS and k not in ("participants", "categories", "schedule")
+            }
+            meta_data = _dumps(meta)
+            if meta_data != snapshot.meta:
+                conn.execute(
+                    "UPDATE tournaments SET sport = ?, data = ? WHERE id = ?",
+                    (tournament_data.get("sport"), meta_data, tournament_id),
+                )
+                snapshot.meta = meta_data
+
+            stats["participants"], deleted = self._save_participants(
+                tournament_id, snapshot, tournament_data.get("participants") or []
+            )
+            stats["deleted"] += deleted
+            cat_stats = self._save_categories(tournament_id, snapshot, tournament_data.get("categories") or {}, now)
+            for key, value in cat_stats.items():
+                stats[key] += value
+            stats["schedule"], deleted = self._save_schedule(
+                tournament_id, snapshot, tournament_data.get("schedule") or []
+            )
+            stats["deleted"] += deleted
+
+            if any(stats.values()):
+                conn.execute("UPDATE tournaments SET updated_at = ? WHERE id = ?", (now, tournament_id))
+        return stats
+
+    def _read_snapshot(self, tournament_id: int) -> _Snapshot:
+        """Состояние строк в БД для турнира, который в этом процессе ещё не читали."""
+        conn = self.conn
+        snapshot = _Snapshot()
+        row = conn.execute("SELECT data FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+        snapshot.meta = row["data"] if row else None
+        for p in conn.execute("SELECT uid, position, data FROM participants WHERE tournament_id = ?", (tournament_id,)):
+            snapshot.participants[p["uid"]] = (p["position"], p["data"])
+        for c in conn.execute(
+            "SELECT id, name, position, members_hash, data FROM categories WHERE tournament_id = ?", (tournament_id,)
+        ):
+            snapshot.categories[c["name"]] = (c["position"], c["data"], c["members_hash"])
+            snapshot.category_ids[c["name"]] = c["id"]
+        names_by_id = {cid: name for name, cid in snapshot.category_ids.items()}
+        for m in conn.execute(
+            "SELECT category_id, match_uid, position, data FROM matches WHERE tournament_id = ? AND category_id IS NOT NULL",
+            (tournament_id,),
+        ):
+            name = names_by_id.get(m["category_id"])
+            if name is not None and m["data"]:
+                snapshot.matches.setdefault(name, {})[m["match_uid"]] = (m["position"], m["data"])
+        for s in conn.execute("SELECT match_uid, position, data FROM schedule_slots WHERE tournament_id = ?", (tournament_id,)):
+            snapshot.schedule[s["match_uid"]] = (s["position"], s["data"])
+        return snapshot
+
+    def _save_participants(
+        self, tournament_id: int, snapshot: _Snapshot, participants: List[Dict[str, Any]]
+    ) -> Tuple[int, int]:
+        blob = _dumps(participants)
+        if snapshot.blobs.get("participants") == blob:
+            return 0, 0
+        rows = []
+        current = {}
+        valid = [p for p in participants if isinstance(p, dict)]
+        for position, (uid, p) in enumerate(zip(_participant_uids(valid), valid)):
+            data = _dumps(p)
+            current[uid] = (position, data)
+            if snapshot.participants.get(uid) != (position, data):
+                rows.append((
+                    tournament_id, uid, position, str(p.get("name", "") or ""), p.get("club"),
+                    _to_float(p.get("weight")), _to_int(p.get("age")), p.get("gender"), data,
+                ))
+        if rows:
+            self.conn.executemany(
+                """
+                INSERT INTO participants (tournament_id, uid, position, name, club, weight, age, gender, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(tournament_id, uid) DO UPDATE SET
+                    position = excluded.position, name = excluded.name, club = excluded.club,
+                    weight = excluded.weight, age = excluded.age, gender = excluded.gender,
+                    data = excluded.data
+                """,
+                rows,
+            )
+        removed = [uid for uid in snapshot.participants if uid not in current]
+        if removed:
+            self.conn.executemany(
+                "DELETE FROM participants WHERE tournament_id = ? AND uid = ?",
+                [(tournament_id, uid) for uid in removed],
+            )
+        snapshot.participants = current
+        snapshot.blobs["participants"] = blob
+        return len(rows), len(removed)
+
+    def _save_categories(
+        self, tournament_id: int, snapshot: _Snapshot, categories: Dict[str, Any], now: str
+    ) -> Dict[str, int]:
+        conn = self.conn
+        stats = {"categories": 0, "members": 0, "matches": 0, "deleted": 0}
+        # Не подгруженные категории этого же турнира в БД никто не менял — пропускаем;
+        # категории из другого источника (файл-контейнер) дочитываются и пишутся
+        same_source = isinstance(categories, LazyCategories) and categories.source is snapshot
+        participant_ids: Optional[Dict[str, int]] = None
+
+        for position, name in enumerate(dict.keys(categories)):
+            if same_source:
+                if not categories.is_loaded(name):
+                    continue
+                cat = dict.__getitem__(categories, name)
+            else:
+                cat = categories[name]
+            if not isinstance(cat, dict):
+                continue
+            meta = {k: v for k, v in cat.items() if k not in _CATEGORY_ROW_KEYS}
+            data = _dumps(meta)
+            members = [m for m in cat.get("participants", []) or [] if isinstance(m, dict)]
+            members_hash = hashlib.sha1(_dumps(members).encode("utf-8")).hexdigest()
+
+            previous = snapshot.categories.get(name)
+            if previous is None or previous[:2] != (position, data):
+                conn.execute(
+                    """
+                    INSERT INTO categories (
+                        tournament_id, name, position, gender, weight_min, weight_max,
+                        age_min, age_max, bracket_type, members_hash, data
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(tournament_id, name) DO UPDATE SET
+                        position = excluded.position, gender = excluded.gender,
+                        weight_min = excluded.weight_min, weight_max = excluded.weight_max,
+                        age_min = excluded.age_min, age_max = excluded.age_max,
+                        bracket_type = excluded.bracket_type, data = excluded.data
+                    """,
+                    (
+                        tournament_id, name, position, cat.get("gender"),
+                        _to_float(cat.get("weight_min")), _to_float(cat.get("weight_max")),
+                        _to_int(cat.get("age_min", cat.get("age"))), _to_int(cat.get("age_max", cat.get("age"))),
+                        cat.get("bracket_type"), previous[2] if previous else None, data,
+                    ),
+                )
+                stats["categories"] += 1
+            category_id = snapshot.category_ids.get(name)
+            if category_id is None:
+                category_id = conn.execute(
+                    "SELECT id FROM categories WHERE tournament_id = ? AND name = ?", (tournament_id, name)
+                ).fetchone()["id"]
+                snapshot.category_ids[name] = category_id
+
+            if previous is None or previous[2] != members_hash:
+                if participant_ids is None:
+                    participant_ids = {
+                        row["name"]: row["id"]
+                        for row in conn.execute(
+                            "SELECT id, name FROM participants WHERE tournament_id = ?", (tournament_id,)
+                        )
+                    }
+                conn.execute("DELETE FROM category_members WHERE category_id = ?", (category_id,))
+                conn.executemany(
+                    "INSERT INTO category_members (category_id, position, participant_id, data) VALUES (?, ?, ?, ?)",
+                    [
+                        (category_id, idx, participant_ids.get(str(m.get("name", "") or "").strip()), _dumps(m))
+                        for idx, m in enumerate(members)
+                    ],
+                )
+                conn.execute("UPDATE categories SET members_hash = ? WHERE id = ?", (members_hash, category_id))
+                stats["members"] += len(members)
+            snapshot.categories[name] = (position, data, members_hash)
+
+            written, deleted = self._save_matches(tournament_id, snapshot, name, category_id, cat, now)
+            stats["matches"] += written
+            stats["deleted"] += deleted
+
+        removed = [name for name in snapshot.categories if name not in categories]
+        for name in removed:
+            category_id = snapshot.category_ids.pop(name, None)
+            if category_id is not None:
+                conn.execute("DELETE FROM category_members WHERE category_id = ?", (category_id,))
+                conn.execute("DELETE FROM matches WHERE category_id = ?", (category_id,))
+                conn.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+            snapshot.categories.pop(name, None)
+            snapshot.matches.pop(name, None)
+            snapshot.blobs.pop(f"matches:{name}", None)
+            stats["deleted"] += 1
+        return stats
+
+    def _save_matches(
+        self, tournament_id: int, snapshot: _Snapshot, name: str, category_id: int, cat: Dict[str, Any], now: str
+    ) -> Tuple[int, int]:
+        blob_key = f"matches:{name}"
+        blob = _dumps(cat.get("matches", []) or [])
+        if snapshot.blobs.get(blob_key) == blob:
+            return 0, 0
+        previous = snapshot.matches.get(name, {})
+        current: Dict[str, Tuple[int, str]] = {}
+        rows = []
+        for position, match in enumerate(m for m in cat.get("matches", []) or [] if isinstance(m, dict)):
+            uid = _match_uid(name, match)
+            data = _dumps(match)
+            current[uid] = (position, data)
+            if previous.get(uid) != (position, data):
+                rows.append((
+                    tournament_id, name, uid, match.get("wrestler1"), match.get("wrestler2"),
+                    match.get("score1"), match.get("score2"), match.get("winner"),
+                    1 if match.get("completed") else 0, now,
+                    category_id, _to_int(match.get("round")), position, data,
+                ))
+        if rows:
+            self.conn.executemany(
+                """
+                INSERT INTO matches (
+                    tournament_id, category, match_uid, wrestler1, wrestler2,
+                    score1, score2, winner, completed, updated_at,
+                    category_id, round, position, data
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(tournament_id, match_uid) DO UPDATE SET
+                    category = excluded.category, wrestler1 = excluded.wrestler1,
+                    wrestler2 = excluded.wrestler2, score1 = excluded.score1,
+                    score2 = excluded.score2, winner = excluded.winner,
+                    completed = excluded.completed, updated_at = excluded.updated_at,
+                    category_id = excluded.category_id, round = excluded.round,
+                    position = excluded.position, data = excluded.data
+                """,
+                rows,
+            )
+        removed = [uid for uid in previous if uid not in current]
+        if removed:
+            self.conn.executemany(
+                "DELETE FROM matches WHERE tournament_id = ? AND match_uid = ?",
+                [(tournament_id, uid) for uid in removed],
+            )
+        snapshot.matches[name] = current
+        snapshot.blobs[blob_key] = blob
+        return len(rows), len(removed)
+
+    def _save_schedule(
+        self, tournament_id: int, snapshot: _Snapshot, schedule: List[Dict[str, Any]]
+    ) -> Tuple[int, int]:
+        blob = _dumps(schedule)
+        if snapshot.blobs.get("schedule") == blob:
+            return 0, 0
+        current: Dict[str, Tuple[int, str]] = {}
+        rows = []
+        for position, item in enumerate(s for s in schedule if isinstance(s, dict)):
+            uid = _schedule_uid(item)
+            if uid in current:
+                continue
+            data = _dumps(item)
+            current[uid] = (position, data)
+            if snapshot.schedule.get(uid) != (position, data):
+                rows.append((
+                    tournament_id, uid, position, _to_int(item.get("mat")),
+                    _to_int(item.get("start_min")), item.get("status"), data,
+                ))
+        if rows:
+            self.conn.executemany(
+                """
+                INSERT INTO schedule_slots (tournament_id, match_uid, position, mat, start_min, status, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(tournament_id, match_uid) DO UPDATE SET
+                    position = excluded.position, mat = excluded.mat,
+                    start_min = excluded.start_min, status = excluded.status, data = excluded.data
+                """,
+                rows,
+            )
+        removed = [uid for uid in snapshot.schedule if uid not in current]
+        if removed:
+            self.conn.executemany(
+                "DELETE FROM schedule_slots WHERE tournament_id = ? AND match_uid = ?",
+                [(tournament_id, uid) for uid in removed],
+            )
+        snapshot.schedule = current
+        snapshot.blobs["schedule"] = blob
+        return len(rows), len(removed)
+
+    def record_match_event(
+        self, tournament_data: Dict[str, Any], match_uid: str, kind: str, payload: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Добавляет событие схватки (баллы, предупреждения, результат) в match_events."""
+        with self.conn:
+            tournament_id = get_or_create_tournament_id(self.conn, tournament_data)
+            self.conn.execute(
+                "INSERT INTO match_events (tournament_id, match_uid, ts, kind, payload) VALUES (?, ?, ?, ?, ?)",
+                (tournament_id, str(match_uid), time.time(), kind, _dumps(payload) if payload is not None else None),
+            )
+
+
+_repository: Optional[TournamentRepository] = None
+
+
+def get_repository() -> TournamentRepository:
+    """Общий репозиторий приложения (БД core/tournaments.db)."""
+    global _repository
+    if _repository is None:
+        _repository = TournamentRepository()
+    return _repository
+
+
+def save_tournament_to_db(tournament_data: Dict[str, Any]) -> Optional[Future]:
+    """
+    Сохраняет турнир в БД (только изменения) в фоновом потоке.
+    Безопасно: при ошибке не ломает работу программы. Future — чтобы при
+    закрытии дождаться записи (None, если сохранять нечего или не удалось).
+    """
+    if not tournament_data:
+        return None
+    started = time.perf_counter()
+
+    def report(future: Future) -> None:
+        try:
+            stats = future.result()
+        except Exception as e:
+            print(f"[DB] Ошибка при сохранении турнира: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if any(stats.values()):
+            print(f"[DB] Турнир сохранён за {elapsed_ms:.1f} мс, изменено строк: {stats}")
+
+    try:
+        future = get_repository().save_async(tournament_data)
+    except Exception as e:
+        print(f"[DB] Ошибка при сохранении турнира: {e}")
+        return None
+    future.add_done_callback(report)
+    return future
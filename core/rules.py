@@ -0,0 +1,238 @@
+"""
+Правила схватки без Qt: начисление очков, предупреждения, пассивность,
+техническое превосходство и определение победителя.
+
+Параметры вида спорта (SportRules) берутся из sports/<вид>/constants.py,
+движок — RulesEngine или его наследник из sports/<вид>/rules.py (загрузка —
+core.sport_loader.SportLoader.load_rules). Движок принимает события
+ScoringEvent и меняет состояние BoutState; углы — любые объекты с полями
+points, cautions, passivity, last_scored (CornerState или core.models.Wrestler
+панели управления). Без UI движок проводит тысячи схваток в секунду —
+для регрессионных прогонов и воспроизведения записанных схваток.
+"""
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from core import constants as default_constants
+
+
+RED = "red"
+BLUE = "blue"
+CORNER_NAMES = {RED: "Красный", BLUE: "Синий"}
+
+EVENT_POINTS = "points"
+EVENT_CAUTION = "caution"
+EVENT_PASSIVITY = "passivity"
+EVENT_TIME_UP = "time_up"        # истекло время последнего периода
+EVENT_END = "end"                # судья остановил схватку (description — причина)
+
+
+@dataclass(frozen=True)
+class SportRules:
+    """Параметры правил вида спорта."""
+    key: str
+    name: str
+    periods: int
+    period_duration: int
+    break_duration: int
+    technical_superiority: int
+    caution_limit: int
+    passivity_enabled: bool = True   # показывать ли кнопку пассивности на панели
+    passivity_point_limit: int = 2   # очко сопернику за первые N пассивностей
+
+    @classmethod
+    def from_constants(cls, key: str, module: Optional[ModuleType] = None) -> "SportRules":
+        """Правила из модуля констант вида спорта; недостающее — из core.constants."""
+        def value(name: str, default: Any) -> Any:
+            return getattr(module, name, getattr(default_constants, name, default))
+
+        return cls(
+            key=key,
+            name=value("SPORT_NAME", key),
+            periods=int(value("PERIODS", 2)),
+            period_duration=int(value("PERIOD_DURATION", 180)),
+            break_duration=int(value("BREAK_DURATION", 30)),
+            technical_superiority=int(value("TECHNICAL_SUPERIORITY", 8)),
+            caution_limit=int(value("CAUTION_LIMIT", 3)),
+            passivity_enabled=bool(value("PASSIVITY_ENABLED", True)),
+            passivity_point_limit=int(value("PASSIVITY_POINT_LIMIT", 2)),
+        )
+
+
+@dataclass(frozen=True)
+class ScoringEvent:
+    """Событие схватки. corner — RED/BLUE, для EVENT_END — победитель (или None)."""
+    kind: str
+    corner: Optional[str] = None
+    points: int = 0
+    description: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "corner": self.corner, "points": self.points, "description": self.description}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScoringEvent":
+        return cls(
+            kind=data["kind"],
+            corner=data.get("corner"),
+            points=int(data.get("points") or 0),
+            description=data.get("description") or "",
+        )
+
+
+@dataclass
+class CornerState:
+    points: int = 0
+    cautions: int = 0
+    passivity: int = 0
+    last_scored: bool = False
+    action_history: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BoutState:
+    """Состояние схватки; finished/winner/reason заполняет движок."""
+    red: Any = field(default_factory=CornerState)
+    blue: Any = field(default_factory=CornerState)
+    finished: bool = False
+    winner: Optional[str] = None   # RED, BLUE или None (ничья)
+    reason: str = ""
+    events: List[ScoringEvent] = field(default_factory=list)
+
+    def corner(self, corner: str) -> Any:
+        return self.red if corner == RED else self.blue
+
+    def opponent(self, corner: str) -> Any:
+        return self.blue if corner == RED else self.red
+
+
+def other_corner(corner: str) -> str:
+    return BLUE if corner == RED else RED
+
+
+class RulesEngine:
+    """
+    Правила по умолчанию (греко-римская и вольная борьба). Наследник вида
+    спорта переопределяет отдельные шаги (on_points, on_caution, ...).
+    """
+
+    def __init__(self, rules: SportRules):
+        self.rules = rules
+        # Порог может менять судья на панели (поле «Техн. превосходство»)
+        self.technical_superiority = rules.technical_superiority
+
+    def new_bout(self) -> BoutState:
+        return BoutState()
+
+    def apply(self, state: BoutState, event: ScoringEvent) -> Optional[str]:
+        """
+        Применяет событие. Возвращает причину окончания схватки, если событие
+        её завершило (победитель — в state.winner), иначе None.
+        """
+        if state.finished:
+            return None
+        state.events.append(event)
+        handler = {
+            EVENT_POINTS: self.on_points,
+            EVENT_CAUTION: self.on_caution,
+            EVENT_PASSIVITY: self.on_passivity,
+            EVENT_TIME_UP: self.on_time_up,
+            EVENT_END: self.on_end,
+        }.get(event.kind)
+        if handler is None:
+            raise ValueError(f"Неизвестное событие схватки: {event.kind}")
+        return handler(state, event)
+
+    # ------------------------------------------------------------------ #
+    #  Шаги правил
+    # ------------------------------------------------------------------ #
+    def on_points(self, state: BoutState, event: ScoringEvent) -> Optional[str]:
+        self._score(state, event.corner, event.points)
+        return self.check_technical_superiority(state)
+
+    def on_caution(self, state: BoutState, event: ScoringEvent) -> Optional[str]:
+        """Предупреждение: очко сопернику, по лимиту — дисквалификация."""
+        state.corner(event.corner).cautions += 1
+        self._score(state, other_corner(event.corner), 1)
+        if state.corner(event.corner).cautions >= self.rules.caution_limit:
+            winner = other_corner(event.corner)
+            return self.finish(
+                state, winner,
+                f"Дисквалификация {CORNER_NAMES[event.corner]} ({self.rules.caution_limit} предупреждения). "
+                f"Победа {CORNER_NAMES[winner]}",
+            )
+        return None
+
+    def on_passivity(self, state: BoutState, event: ScoringEvent) -> Optional[str]:
+        """Пассивность: очко сопернику за первые passivity_point_limit замечаний."""
+        wrestler = state.corner(event.corner)
+        wrestler.passivity += 1
+        if self.passivity_scores(wrestler.passivity):
+            self._score(state, other_corner(event.corner), 1)
+        return None
+
+    def on_time_up(self, state: BoutState, event: ScoringEvent) -> Optional[str]:
+        return self.finish(state, self.decide(state), event.description or "Время схватки истекло")
+
+    def on_end(self, state: BoutState, event: ScoringEvent) -> Optional[str]:
+        winner = event.corner if event.corner in (RED, BLUE) else self.decide(state)
+        return self.finish(state, winner, event.description)
+
+    # ------------------------------------------------------------------ #
+    #  Решения
+    # ------------------------------------------------------------------ #
+    def passivity_scores(self, passivity_count: int) -> bool:
+        """
+        Даёт ли passivity_count-я пассивность очко сопернику. Как и прежняя
+        панель, не зависит от passivity_enabled: в видах спорта без
+        пассивности панель просто не показывает кнопку.
+        """
+        return passivity_count <= self.rules.passivity_point_limit
+
+    def check_technical_superiority(self, state: BoutState) -> Optional[str]:
+        diff = state.red.points - state.blue.points
+        if abs(diff) >= self.technical_superiority:
+            winner = RED if diff > 0 else BLUE
+            return self.finish(state, winner, f"Техническое превосходство {CORNER_NAMES[winner]}")
+        return None
+
+    def decide(self, state: BoutState) -> Optional[str]:
+        """
+        Победитель по очкам; при равенстве — у кого меньше предупреждений,
+        затем — кто набрал последнее очко. None — ничья.
+        """
+        red, blue = state.red, state.blue
+        if red.points != blue.points:
+            return RED if red.points > blue.points else BLUE
+        if red.cautions != blue.cautions:
+            return RED if red.cautions < blue.cautions else BLUE
+        if red.last_scored:
+            return RED
+        if blue.last_scored:
+            return BLUE
+        return None
+
+    def finish(self, state: BoutState, winner: Optional[str], reason: str) -> str:
+        state.finished = True
+        state.winner = winner
+        state.reason = reason
+        return reason
+
+    @staticmethod
+    def _score(state: BoutState, corner: str, points: int) -> None:
+        state.corner(corner).points += points
+        state.corner(corner).last_scored = True
+        state.opponent(corner).last_scored = False
+
+
+def simulate_bout(engine: RulesEngine, events: List[ScoringEvent]) -> BoutState:
+    """Проводит схватку по списку событий; после окончания события игнорируются."""
+    state = engine.new_bout()
+    for event in events:
+        if state.finished:
+            break
+        engine.apply(state, event)
+    if not state.finished:
+        engine.apply(state, ScoringEvent(EVENT_TIME_UP))
+    return state
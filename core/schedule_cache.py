@@ -0,0 +1,177 @@
+"""
+Повторное использование сохранённого расписания при загрузке турнира.
+
+Вместе с расписанием в данных турнира хранится отпечаток его входов
+(SCHEDULE_INPUTS_KEY): хеш параметров генерации и по хешу на категорию —
+от состава её схваток (id, раунд, борцы). При загрузке расписание
+пересобирается не целиком:
+
+- отпечатки совпали — сохранённое расписание (с переносами между коврами,
+  статусами и результатами) используется как есть;
+- изменились отдельные категории — их записи удаляются, а схватки
+  раскладываются заново и ставятся после последней незавершённой схватки
+  каждого ковра; записи остальных категорий не трогаются;
+- изменились параметры генерации или отпечатка нет (старый файл) —
+  расписание генерируется заново.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.mat_queue import STATUS_COMPLETED
+from core.schedule_time import UNKNOWN_MINUTES, parse_hhmm, schedule_minutes, set_schedule_minutes
+from core.utils import generate_schedule, schedule_order_key
+
+
+SCHEDULE_INPUTS_KEY = "schedule_inputs"
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, default=str, sort_keys=True)
+
+
+def _digest(obj: Any) -> str:
+    return hashlib.sha1(_ENCODER.encode(obj).encode("utf-8")).hexdigest()
+
+
+def _preferred_mat() -> Any:
+    """Предпочитаемый ковёр из настроек сети — тоже вход generate_schedule."""
+    try:
+        from core.settings import get_settings
+        return get_settings().get("network", "mat_number", 1)
+    except Exception:
+        return None
+
+
+def settings_fingerprint(n_mats: int, start_time: str, match_duration: int) -> str:
+    """Хеш параметров генерации расписания."""
+    return _digest([n_mats, start_time, match_duration, _preferred_mat()])
+
+
+def category_fingerprint(category: Dict[str, Any]) -> str:
+    """
+    Хеш входов расписания категории. Результаты схваток не входят:
+    они меняют записи расписания, но не требуют его пересборки. Схватки,
+    созданные по результатам (core.progression, с полем sources), тоже
+    не входят — они сами ставятся в расписание.
+    """
+    return _digest([
+        [m.get("id"), m.get("round"), m.get("wrestler1"), m.get("wrestler2")]
+        for m in category.get("matches", [])
+        if not m.get("sources")
+    ])
+
+
+def schedule_inputs(tournament_data: Dict[str, Any], settings_key: str) -> Dict[str, Any]:
+    categories = tournament_data.get("categories") or {}
+    return {
+        "settings": settings_key,
+        "categories": {name: category_fingerprint(cat) for name, cat in categories.items()},
+    }
+
+
+def diff_schedule_inputs(
+    tournament_data: Dict[str, Any], current: Dict[str, Any]
+) -> Optional[Set[str]]:
+    """
+    Категории, расписание которых нужно пересобрать. None — если сохранённое
+    расписание нельзя использовать вовсе и нужна полная генерация.
+    """
+    stored = tournament_data.get(SCHEDULE_INPUTS_KEY)
+    if not isinstance(stored, dict) or not tournament_data.get("schedule"):
+        return None
+    if stored.get("settings") != current["settings"]:
+        return None
+    stored_categories = stored.get("categories") or {}
+    changed = {name for name, fp in current["categories"].items() if stored_categories.get(name) != fp}
+    changed.update(name for name in stored_categories if name not in current["categories"])
+    return changed
+
+
+def _place_after_tails(
+    kept: List[Dict[str, Any]], fresh: List[Dict[str, Any]], start_minutes: int, slot_of
+) -> None:
+    """
+    Сдвигает новые записи каждого ковра так, чтобы они шли после его последней
+    незавершённой схватки. Завершённые схватки очередь не занимают: иначе
+    пересобранная категория уезжала бы в конец дня за уже сыгранные.
+    """
+    mat_end: Dict[Any, int] = {}
+    for item in kept:
+        if item.get("status") == STATUS_COMPLETED or item.get("completed"):
+            continue
+        minutes = schedule_minutes(item)
+        if minutes >= UNKNOWN_MINUTES:
+            continue
+        end = minutes + slot_of(item)
+        if end > mat_end.get(item.get("mat"), start_minutes):
+            mat_end[item.get("mat")] = end
+    for item in fresh:
+        minutes = schedule_minutes(item)
+        shift = mat_end.get(item.get("mat"), start_minutes) - start_minutes
+        if minutes < UNKNOWN_MINUTES and shift:
+            set_schedule_minutes(item, minutes + shift)
+
+
+def update_schedule(
+    tournament_data: Dict[str, Any],
+    n_mats: int,
+    start_time: str = "10:00",
+    match_duration: int = 8,
+    duration_model=None,
+    force: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[Set[str]]]:
+    """
+    Обновляет tournament_data["schedule"] с учётом сохранённого отпечатка.
+    Возвращает (расписание, пересобранные категории); None вместо множества
+    категорий означает полную генерацию, пустое множество — расписание
+    использовано без изменений.
+    """
+    current = schedule_inputs(tournament_data, settings_fingerprint(n_mats, start_time, match_duration))
+    changed = None if force else diff_schedule_inputs(tournament_data, current)
+
+    if changed is None:
+        schedule = generate_schedule(
+            tournament_data, start_time=start_time, match_duration=match_duration,
+            n_mats=n_mats, duration_model=duration_model,
+        )
+        tournament_data[SCHEDULE_INPUTS_KEY] = current
+        return schedule, None
+
+    if not changed:
+        tournament_data[SCHEDULE_INPUTS_KEY] = current
+        return tournament_data["schedule"], changed
+
+    categories = tournament_data.get("categories") or {}
+    kept = [m for m in tournament_data["schedule"] if m.get("category") not in changed]
+    partial = {
+        k: v for k, v in tournament_data.items() if k not in ("categories", "schedule")
+    }
+    partial["categories"] = {name: categories[name] for name in changed if name in categories}
+    fresh = generate_schedule(
+        partial, start_time=start_time, match_duration=match_duration,
+        n_mats=n_mats, duration_model=duration_model,
+    ) if partial["categories"] else []
+
+    slots: Dict[str, int] = {}
+
+    def slot_of(item: Dict[str, Any]) -> int:
+        category = item.get("category", "")
+        if category not in slots:
+            slots[category] = match_duration
+            if duration_model is not None:
+                from core.durations import category_age_group, tournament_sport
+                slots[category] = duration_model.slot_minutes(
+                    tournament_sport(tournament_data), category_age_group(categories.get(category))
+                )
+        return slots[category]
+
+    start_minutes = parse_hhmm(start_time)
+    if start_minutes is None:
+        start_minutes = 10 * 60
+    _place_after_tails(kept, fresh, start_minutes, slot_of)
+
+    schedule = kept + fresh
+    schedule.sort(key=schedule_order_key)
+    tournament_data["schedule"] = schedule
+    tournament_data[SCHEDULE_INPUTS_KEY] = current
+    print(f"[schedule] Пересобрано категорий: {len(changed)}, схваток добавлено: {len(fresh)}, сохранено записей: {len(kept)}")
+    return schedule, changed
@@ -0,0 +1,138 @@
+"""
+Модель времени расписания.
+
+Внутри время схватки хранится целым числом минут от полуночи первого дня
+турнира (поле "start_min"): день = start_min // 1440, минуты дня = start_min % 1440.
+Это корректно работает для сессий после полуночи и многодневных турниров,
+а сортировка идёт по целочисленным кортежам вместо строк "HH:MM".
+Строка "time" — всегда "HH:MM" времени суток, без дня: её сравнивают и
+разбирают старые файлы и узлы сети (и ключи слияния расписания). День
+хранится только в start_min; для показа — format_schedule_time().
+"""
+import re
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+MINUTES_PER_DAY = 24 * 60
+# Для записей без времени — в конец списка
+UNKNOWN_MINUTES = 10 ** 9
+# Откат времени на ковре больше этого (минуты) при миграции — переход через полночь
+ROLLOVER_GAP = MINUTES_PER_DAY // 2
+
+_TIME_RE = re.compile(r"^\s*(?:Д(\d+)\s+)?(\d{1,2}):(\d{2})")
+
+
+def parse_hhmm(text: Any) -> Optional[int]:
+    """
+    Разбирает "HH:MM" (или отображаемое "Д2 HH:MM" для следующих дней) в минуты от полуночи первого дня.
+    Возвращает None, если строку разобрать нельзя.
+    """
+    if text is None:
+        return None
+    m = _TIME_RE.match(str(text))
+    if not m:
+        return None
+    day = int(m.group(1)) - 1 if m.group(1) else 0
+    hours, minutes = int(m.group(2)), int(m.group(3))
+    if hours > 23 or minutes > 59 or day < 0:
+        return None
+    return day * MINUTES_PER_DAY + hours * 60 + minutes
+
+
+def format_minutes(total: Optional[int]) -> str:
+    """Форматирует минуты для UI/экспорта: "HH:MM", для 2-го и следующих дней — "Д2 HH:MM"."""
+    if total is None or total >= UNKNOWN_MINUTES:
+        return ""
+    day, minute_of_day = divmod(int(total), MINUTES_PER_DAY)
+    text = f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+    if day > 0:
+        text = f"Д{day + 1} {text}"
+    return text
+
+
+def split_day(total: int) -> Tuple[int, int]:
+    """(индекс дня, минуты от начала дня)."""
+    return divmod(int(total), MINUTES_PER_DAY)
+
+
+def schedule_minutes(match: Dict[str, Any]) -> int:
+    """Время начала схватки в минутах; для старых записей — из строки "time"."""
+    value = match.get("start_min")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    parsed = parse_hhmm(match.get("time"))
+    return parsed if parsed is not None else UNKNOWN_MINUTES
+
+
+def format_schedule_time(match: Dict[str, Any]) -> str:
+    """Отображаемое время схватки."""
+    minutes = schedule_minutes(match)
+    if minutes >= UNKNOWN_MINUTES:
+        return str(match.get("time", "") or "")
+    return format_minutes(minutes)
+
+
+def set_schedule_minutes(match: Dict[str, Any], total: int) -> None:
+    """Записывает время схватки: start_min с днём и "time" — "HH:MM" времени суток."""
+    match["start_min"] = int(total)
+    match["time"] = format_minutes(int(total) % MINUTES_PER_DAY)
+
+
+def _int_or_zero(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def schedule_sort_key(match: Dict[str, Any]) -> Tuple[int, int, int, str]:
+    """Ключ сортировки расписания: время, ковёр, раунд, id."""
+    return (
+        schedule_minutes(match),
+        _int_or_zero(match.get("mat")),
+        _int_or_zero(match.get("round")),
+        str(match.get("match_id", "") or ""),
+    )
+
+
+def sort_schedule(schedule: Iterable[Dict[str, Any]]) -> list:
+    """Сортирует расписание по предвычисленным целочисленным ключам."""
+    keyed = [(schedule_sort_key(m), idx, m) for idx, m in enumerate(schedule)]
+    keyed.sort(key=lambda item: (item[0], item[1]))
+    return [m for _, _, m in keyed]
+
+
+def migrate_schedule(schedule: Any) -> int:
+    """
+    Дописывает start_min записям старых файлов, где есть только строка "time".
+    Старые файлы не знают дня: если время на ковре в исходном порядке
+    откатывается больше чем на ROLLOVER_GAP ("23:50", затем "00:10"),
+    эта и следующие схватки ковра переносятся на следующий день.
+    Возвращает число мигрированных записей.
+    """
+    if not isinstance(schedule, list):
+        return 0
+    migrated = 0
+    previous: Dict[Any, int] = {}   # ковёр -> время предыдущей схватки
+    shift: Dict[Any, int] = {}      # ковёр -> добавленные дни (минуты)
+    for match in schedule:
+        if not isinstance(match, dict):
+            continue
+        mat = match.get("mat")
+        if isinstance(match.get("start_min"), int):
+            previous[mat] = match["start_min"]
+            continue
+        parsed = parse_hhmm(match.get("time"))
+        if parsed is None:
+            continue
+        value = parsed + shift.get(mat, 0)
+        last = previous.get(mat)
+        if last is not None and last - value > ROLLOVER_GAP:
+            shift[mat] = shift.get(mat, 0) + MINUTES_PER_DAY
+            value += MINUTES_PER_DAY
+        match["start_min"] = value
+        previous[mat] = value
+        migrated += 1
+    return migrated
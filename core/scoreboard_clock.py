@@ -0,0 +1,216 @@
+"""
+Часы табло без периодической рассылки времени.
+
+Панель управления публикует только переходы состояния таймера (пуск/пауза,
+период, перерыв, правка времени) — ClockPublisher решает, когда состояние
+нужно разослать: при переходе, когда очередная секунда на панели сменилась
+позже или раньше прогноза больше чем на RESYNC_TOLERANCE, и раз
+в KEEPALIVE_SECONDS (для табло, подключившихся позже). В состоянии —
+отметка времени панели (time.monotonic()) и момент окончания отсчёта
+в тех же часах.
+
+Табло (ClockFollower) отсчитывает время само с частотой перерисовки.
+Монотонные часы разных ПК не совпадают, поэтому табло оценивает смещение
+своих часов относительно часов панели: минимум (время получения − отметка
+отправителя) по последним сообщениям — это смещение плюс минимальная
+задержка сети (в локальной сети — единицы миллисекунд).
+
+Один ковёр могут вести два публикатора (панель второго ПК и зеркалирующая
+её панель главного), поэтому в состоянии есть source — идентификатор
+экземпляра ClockPublisher. Отметки разных источников несравнимы: порядок
+(по seq) и смещение часов табло ведёт отдельно для каждого источника, а
+перезапуск источника (отметки ушли назад, долгая тишина) сбрасывает их.
+"""
+import math
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+
+KEEPALIVE_SECONDS = 5.0
+# Расхождение смены секунды на панели с прогнозом, после которого состояние рассылается заново
+RESYNC_TOLERANCE = 0.05
+OFFSET_WINDOW = 32
+# Пауза или откат отметок источника (с), после которых он считается перезапущенным
+RESTART_SILENCE = 2 * KEEPALIVE_SECONDS
+# Сколько источников помнит табло
+MAX_SOURCES = 8
+
+
+def clock_state(
+    running: bool,
+    remaining: float,
+    period: int,
+    is_break: bool,
+    seq: int,
+    now: Optional[float] = None,
+    source: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Состояние таймера для рассылки (поле clock в scoreboard_update)."""
+    now = time.monotonic() if now is None else now
+    remaining = max(0.0, float(remaining))
+    return {
+        "running": bool(running),
+        "remaining": remaining,
+        "period": period,
+        "is_break": bool(is_break),
+        "stamp": now,
+        "deadline": now + remaining if running else None,
+        "seq": seq,
+        "source": source,
+    }
+
+
+def state_remaining(state: Dict[str, Any], now: float) -> float:
+    """Оставшееся время по состоянию в часах отправителя."""
+    if state.get("running") and state.get("deadline") is not None:
+        return max(0.0, state["deadline"] - now)
+    return max(0.0, float(state.get("remaining", 0)))
+
+
+def display_seconds(remaining: float) -> int:
+    """
+    Секунды для показа: округление вверх, как у таймера панели
+    (03:00 показывается всю первую секунду отсчёта).
+    """
+    return max(0, int(math.ceil(remaining - 1e-6)))
+
+
+class ClockPublisher:
+    """Решает, когда панели нужно разослать состояние таймера."""
+
+    def __init__(self, source: Optional[str] = None):
+        self.state: Optional[Dict[str, Any]] = None
+        # Новый идентификатор у каждого экземпляра: перезапуск панели — новый источник
+        self.source = source or uuid.uuid4().hex[:12]
+        self._seq = 0
+        self._last_remaining: Optional[float] = None
+
+    def observe(
+        self,
+        running: bool,
+        remaining: float,
+        period: int,
+        is_break: bool,
+        now: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Текущие показания таймера панели. Возвращает новое состояние, если его
+        нужно разослать, иначе None.
+
+        Целые показания точны только в момент смены секунды (тик), дробные
+        (core.match_clock) — всегда; с прогнозом сверяется изменившееся
+        показание или показание остановленного таймера.
+        """
+        now = time.monotonic() if now is None else now
+        last = self.state
+        ticked = self._last_remaining is not None and remaining != self._last_remaining
+        self._last_remaining = remaining
+        if last is not None:
+            transition = (
+                bool(running) != last["running"]
+                or period != last["period"]
+                or bool(is_break) != last["is_break"]
+            )
+            in_sync = True
+            if ticked or not running:
+                in_sync = abs(state_remaining(last, now) - remaining) <= RESYNC_TOLERANCE
+            if not transition and in_sync and now - last["stamp"] < KEEPALIVE_SECONDS:
+                return None
+            if not transition and in_sync and running:
+                # Проверка связи: якорь не сдвигаем, чтобы не дёргать отсчёт на табло
+                remaining = state_remaining(last, now)
+        self._seq += 1
+        self.state = clock_state(running, remaining, period, is_break, self._seq, now, self.source)
+        return self.state
+
+
+class OffsetEstimator:
+    """Смещение локальных монотонных часов относительно часов отправителя."""
+
+    def __init__(self, window: int = OFFSET_WINDOW):
+        self._samples = deque(maxlen=window)
+
+    def add(self, remote_stamp: float, received_at: float) -> None:
+        self._samples.append(received_at - remote_stamp)
+
+    @property
+    def offset(self) -> Optional[float]:
+        return min(self._samples) if self._samples else None
+
+
+class ClockFollower:
+    """Локальный отсчёт табло по состояниям, присланным панелью."""
+
+    def __init__(self):
+        self.state: Optional[Dict[str, Any]] = None
+        self._estimators: Dict[Any, OffsetEstimator] = {}
+        # источник -> (seq, отметка, момент получения) последнего принятого состояния
+        self._last: Dict[Any, Tuple[Any, float, float]] = {}
+
+    @property
+    def estimator(self) -> OffsetEstimator:
+        """Смещение часов источника текущего состояния."""
+        return self._estimator((self.state or {}).get("source"))
+
+    def _estimator(self, source: Any) -> OffsetEstimator:
+        estimator = self._estimators.get(source)
+        if estimator is None:
+            estimator = self._estimators[source] = OffsetEstimator()
+        return estimator
+
+    def apply(self, state: Dict[str, Any], received_at: Optional[float] = None) -> bool:
+        """
+        Учитывает состояние; пришедшее позже более нового того же источника
+        (по seq, без seq — по отметке) игнорируется. Состояние другого
+        источника принимается сразу. True — состояние принято.
+        """
+        if not isinstance(state, dict) or "stamp" not in state:
+            return False
+        received_at = time.monotonic() if received_at is None else received_at
+        source = state.get("source")
+        stamp = state["stamp"]
+        order = state.get("seq", stamp)
+        last = self._last.get(source)
+        if last is not None:
+            last_order, last_stamp, last_received = last
+            restarted = stamp < last_stamp - RESTART_SILENCE or received_at - last_received > RESTART_SILENCE
+            if restarted:
+                # Другие монотонные часы и счётчик с нуля: прежние оценки не годятся
+                self._estimators.pop(source, None)
+            elif order is not None and last_order is not None and order < last_order:
+                self._estimator(source).add(stamp, received_at)
+                return False
+        self._estimator(source).add(stamp, received_at)
+        self._last.pop(source, None)
+        self._last[source] = (order, stamp, received_at)
+        while len(self._last) > MAX_SOURCES:
+            oldest = next(iter(self._last))
+            self._last.pop(oldest)
+            self._estimators.pop(oldest, None)
+        self.state = state
+        return True
+
+    def has_state(self) -> bool:
+        return self.state is not None
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        """Оставшееся время в секундах (дробное) по локальным часам."""
+        if self.state is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        offset = self.estimator.offset or 0.0
+        # Переводим локальное время в часы панели
+        return state_remaining(self.state, now - offset)
+
+    def seconds(self, now: Optional[float] = None) -> int:
+        return display_seconds(self.remaining(now))
+
+    @property
+    def period(self) -> int:
+        return (self.state or {}).get("period", 1)
+
+    @property
+    def is_break(self) -> bool:
+        return bool((self.state or {}).get("is_break", False))
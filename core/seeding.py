@@ -0,0 +1,201 @@
+"""
+Жеребьёвка олимпийской сетки: посев и разведение одноклубников.
+
+1. Сеяные (первые n_seeds по рейтингу или по разряду) ставятся на
+   стандартные позиции посева (1 против N, 1-й и 2-й — в разных половинах,
+   1–4 — в разных четвертях), пропуски достаются первым номерам.
+2. Остальные раскладываются рекурсивным делением сетки пополам: на каждом
+   уровне участники клуба, начиная с самых многочисленных клубов,
+   поочерёдно отправляются в ту половину, где одноклубников (с учётом уже
+   поставленных сеяных) меньше. Это жадное распределение по дереву сетки —
+   O(n log n), без перебора перестановок: сетка на 128 строится за
+   миллисекунды.
+
+Качество жеребьёвки — club_collisions(): сколько пар одноклубников могут
+встретиться в каждом раунде (встреча в раннем раунде весит больше).
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+BYE_NAME = "ПРОПУСК"
+
+
+def seed_positions(bracket_size: int) -> List[int]:
+    """
+    Номера посева по позициям сетки (1 против N, 8 против 9 ...): сильнейшие
+    встречаются как можно позже, а пропуски достаются первым номерам.
+    """
+    order = [1]
+    while len(order) < bracket_size:
+        size = len(order) * 2
+        order = [seed for s in order for seed in (s, size + 1 - s)]
+    return order
+
+
+def _bye() -> Dict[str, Any]:
+    return {"name": BYE_NAME, "club": "", "rank": "", "weight": 0}
+
+
+def _group_key(wrestler: Dict[str, Any], separate_by: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(str(wrestler.get(key) or "").strip().lower() for key in separate_by)
+
+
+def default_seed_count(bracket_size: int) -> int:
+    """Сеяных — четверть сетки (1 на 4 участника), но не меньше одного."""
+    return max(1, bracket_size // 4)
+
+
+def build_draw(
+    wrestlers: List[Dict[str, Any]],
+    bracket_size: int,
+    separate_by: Sequence[str] = ("club",),
+    n_seeds: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Раскладывает участников (уже упорядоченных по силе: первые — сильнейшие)
+    по позициям сетки размера bracket_size. Возвращает список длины
+    bracket_size, пары позиций (0, 1), (2, 3), ... — схватки первого раунда.
+    separate_by — поля участника, по которым разводятся соперники
+    (клуб; дополнительно, например, город). Первое поле важнее следующих.
+    """
+    n = len(wrestlers)
+    order = seed_positions(bracket_size)
+    slots: List[Optional[Dict[str, Any]]] = [None] * bracket_size
+
+    # Позиции пропусков и сеяных фиксированы схемой посева
+    if n_seeds is None:
+        n_seeds = default_seed_count(bracket_size)
+    n_seeds = max(0, min(n_seeds, n))
+    for position, seed in enumerate(order):
+        if seed > n:
+            slots[position] = _bye()
+        elif seed <= n_seeds:
+            slots[position] = wrestlers[seed - 1]
+
+    rest = wrestlers[n_seeds:]
+    if not separate_by:
+        free = [p for p, w in enumerate(slots) if w is None]
+        for position, wrestler in zip(free, rest):
+            slots[position] = wrestler
+        return slots
+
+    keys = [_group_key(w, separate_by) for w in rest]
+    _split(slots, 0, bracket_size, list(range(len(rest))), rest, keys, separate_by)
+    return slots
+
+
+def _split(
+    slots: List[Optional[Dict[str, Any]]],
+    lo: int,
+    hi: int,
+    members: List[int],
+    rest: List[Dict[str, Any]],
+    keys: List[Tuple[str, ...]],
+    separate_by: Sequence[str],
+) -> None:
+    """Распределяет участников members (индексы в rest) по свободным позициям [lo, hi)."""
+    if not members:
+        return
+    if hi - lo == 1:
+        slots[lo] = rest[members[0]]
+        return
+    mid = (lo + hi) // 2
+    capacity = [
+        sum(1 for p in range(lo, mid) if slots[p] is None),
+        sum(1 for p in range(mid, hi) if slots[p] is None),
+    ]
+    # Счётчики по каждому полю разведения в половинах (сеяные уже учтены)
+    counts: List[List[Dict[str, int]]] = [[{} for _ in separate_by] for _ in range(2)]
+    for side, (a, b) in enumerate(((lo, mid), (mid, hi))):
+        for p in range(a, b):
+            w = slots[p]
+            if w is not None and w.get("name") != BYE_NAME:
+                for level, value in enumerate(_group_key(w, separate_by)):
+                    if value:
+                        counts[side][level][value] = counts[side][level].get(value, 0) + 1
+
+    # Сначала самые многочисленные клубы: их труднее всего развести
+    groups: Dict[str, List[int]] = {}
+    for idx in members:
+        groups.setdefault(keys[idx][0], []).append(idx)
+    ordered = sorted(groups.values(), key=lambda g: (-len(g), g[0]))
+
+    def load(side: int, idx: int) -> Tuple:
+        # Пустое значение поля (клуб не указан) не разводим
+        per_level = tuple(
+            counts[side][level].get(value, 0) if value else 0
+            for level, value in enumerate(keys[idx])
+        )
+        return per_level + (-capacity[side],)
+
+    halves: List[List[int]] = [[], []]
+    flip = 0
+    for group in ordered:
+        for idx in group:
+            if capacity[0] == 0 or capacity[1] == 0:
+                side = 1 if capacity[0] == 0 else 0
+            else:
+                left, right = load(0, idx), load(1, idx)
+                if left == right:
+                    # При равенстве — по очереди, чтобы не копить всех в одной половине
+                    side, flip = flip, flip ^ 1
+                else:
+                    side = 0 if left < right else 1
+            halves[side].append(idx)
+            capacity[side] -= 1
+            for level, value in enumerate(keys[idx]):
+                if value:
+                    counts[side][level][value] = counts[side][level].get(value, 0) + 1
+
+    _split(slots, lo, mid, halves[0], rest, keys, separate_by)
+    _split(slots, mid, hi, halves[1], rest, keys, separate_by)
+
+
+def club_collisions(draw: List[Dict[str, Any]], key: str = "club") -> Dict[int, int]:
+    """
+    {раунд: число пар одноклубников, которые впервые могут встретиться в
+    этом раунде}. Раунд 1 — соседние позиции, последний — финал.
+    """
+    size = len(draw)
+    result: Dict[int, int] = {}
+    values = [
+        str(w.get(key) or "").strip().lower() if w and w.get("name") != BYE_NAME else ""
+        for w in draw
+    ]
+    for i in range(size):
+        if not values[i]:
+            continue
+        for j in range(i + 1, size):
+            if values[j] == values[i]:
+                # Раунд встречи — номер старшего различающегося бита позиций
+                round_num = (i ^ j).bit_length()
+                result[round_num] = result.get(round_num, 0) + 1
+    return result
+
+
+def collision_score(draw: List[Dict[str, Any]], key: str = "club") -> int:
+    """
+    Одно число для сравнения жеребьёвок: пары одноклубников, взвешенные
+    по раунду встречи (в финале — 1, в полуфинале — 2, ... в 1-м раунде
+    сетки на 2^k — 2^(k-1)). Меньше — лучше.
+    """
+    rounds = max(1, (len(draw) - 1).bit_length())
+    return sum(count * 2 ** (rounds - r) for r, count in club_collisions(draw, key).items())
+
+
+def bracket_separation() -> Tuple[str, ...]:
+    """
+    Поля разведения из настроек: клуб (tournament.separate_clubs) и,
+    дополнительно, город (tournament.separate_regions).
+    """
+    try:
+        from core.settings import get_settings
+        settings = get_settings()
+        fields: Tuple[str, ...] = ()
+        if settings.get("tournament", "separate_clubs", True):
+            fields += ("club",)
+        if settings.get("tournament", "separate_regions", False):
+            fields += ("city",)
+        return fields
+    except Exception:
+        return ("club",)
@@ -15,7 +15,15 @@ DEFAULT_SETTINGS = {
         "show_opponent_wait_timer": False
     },
     "tournament": {
-        "number_of_mats": 2
+        "number_of_mats": 2,
+        "auto_reflow": True,            # пересчитывать время схваток ковра после каждого результата
+        "rebalance_threshold_min": 20,  # 0 — не переносить схватки между коврами
+        "autosave_interval_min": 5,     # 0 — без периодического автосохранения
+        "autosave_keep": 10,            # сколько последних автосохранений хранить
+        "seed_by_rating": True,         # посев олимпийских сеток по рейтингу из истории результатов
+        "separate_clubs": True,         # разводить одноклубников по разным частям олимпийской сетки
+        "separate_regions": False,      # дополнительно разводить участников из одного города
+        "elimination_format": "repechage"  # олимпийка: "single", "repechage" (утешительные) или "double" (до двух поражений)
     },
     "timers": {
         "period_duration": 180,
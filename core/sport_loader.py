@@ -1,12 +1,30 @@
 # core/sport_loader.py
 from importlib import import_module
+from core.rules import RulesEngine, SportRules
 from sports import SPORTS
 
+DEFAULT_SPORT_KEY = "greco_roman"
+
 class SportLoader:
     @staticmethod
     def get_sport_config(sport_key):
         return SPORTS.get(sport_key, SPORTS.get("greco_roman"))
 
+    @staticmethod
+    def load_rules(sport_key):
+        """Движок правил вида спорта (core.rules): константы из sports/<вид>/constants.py,
+        свой движок — класс RulesEngine в sports/<вид>/rules.py, если он есть"""
+        if sport_key not in SPORTS:
+            sport_key = DEFAULT_SPORT_KEY
+        rules = SportRules.from_constants(sport_key, import_module(f"sports.{sport_key}.constants"))
+        try:
+            engine_cls = import_module(f"sports.{sport_key}.rules").RulesEngine
+        except ModuleNotFoundError as e:
+            if e.name != f"sports.{sport_key}.rules":
+                raise
+            engine_cls = RulesEngine
+        return engine_cls(rules)
+
     @staticmethod
     def load_control_panel(sport_key, *args, **kwargs):
         try:
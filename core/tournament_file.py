@@ -0,0 +1,160 @@
+"""
+Компактный файл турнира (.mvpz) с ленивой загрузкой категорий.
+
+Файл — zip-контейнер (ZIP_DEFLATED):
+- toc.json           — оглавление: версия формата, поля турнира и список
+                       категорий с их метаданными (без состава и схваток)
+                       и именем блока категории;
+- participants.json  — общий список участников;
+- schedule.json      — расписание;
+- categories/<n>.json — состав и схватки одной категории.
+
+Zip хранит центральный каталог, поэтому блок категории читается и
+распаковывается отдельно, не трогая остальные: при ленивой загрузке
+категория разбирается при первом обращении к ней (LazyCategories).
+Файл пишется во временный рядом с целевым и подменяется через os.replace.
+"""
+import io
+import json
+import os
+import zipfile
+from typing import Any, Dict, Optional
+
+from core.repository import LazyCategories
+
+
+CONTAINER_EXT = ".mvpz"
+TOURNAMENT_FILE_FILTER = "Турнир (*.json *.mvpz);;JSON (*.json);;Компактный турнир (*.mvpz)"
+FORMAT_NAME = "mvpsport-tournament"
+FORMAT_VERSION = 1
+
+TOC_ENTRY = "toc.json"
+PARTICIPANTS_ENTRY = "participants.json"
+SCHEDULE_ENTRY = "schedule.json"
+
+_CATEGORY_BLOCK_KEYS = ("participants", "matches")
+_BLOCK_KEYS = ("participants", "categories", "schedule")
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+def _dumps(obj: Any) -> bytes:
+    return _ENCODER.encode(obj).encode("utf-8")
+
+
+def is_container_path(path: str) -> bool:
+    return str(path).lower().endswith(CONTAINER_EXT)
+
+
+def is_container_file(path: str) -> bool:
+    """Файл — контейнер .mvpz (проверяется по содержимому, а не только по расширению)."""
+    try:
+        return zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+
+def save_container(tournament_data: Dict[str, Any], path: str) -> str:
+    """Сохраняет турнир в контейнер .mvpz (атомарно)."""
+    categories = tournament_data.get("categories") or {}
+    toc = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "meta": {k: v for k, v in tournament_data.items() if k not in _BLOCK_KEYS},
+        "categories": [],
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for index, (name, cat) in enumerate(categories.items()):
+                entry = f"categories/{index}.json"
+                toc["categories"].append({
+                    "name": name,
+                    "entry": entry,
+                    "meta": {k: v for k, v in cat.items() if k not in _CATEGORY_BLOCK_KEYS},
+                })
+                zf.writestr(entry, _dumps({k: cat.get(k, []) for k in _CATEGORY_BLOCK_KEYS}))
+            zf.writestr(PARTICIPANTS_ENTRY, _dumps(tournament_data.get("participants") or []))
+            zf.writestr(SCHEDULE_ENTRY, _dumps(tournament_data.get("schedule") or []))
+            # Оглавление последним: в него уже попали имена всех блоков
+            zf.writestr(TOC_ENTRY, _dumps(toc))
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def load_container(path: str, lazy: bool = True) -> Dict[str, Any]:
+    """
+    Загружает турнир из контейнера. При lazy=True категории распаковываются
+    при первом обращении; файл читается в память целиком один раз, поэтому
+    он не остаётся открытым и его можно перезаписать.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    zf = zipfile.ZipFile(io.BytesIO(raw))
+    toc = json.loads(zf.read(TOC_ENTRY))
+    if toc.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path}: не файл турнира")
+    if int(toc.get("version", 0)) > FORMAT_VERSION:
+        raise ValueError(f"{path}: версия формата {toc.get('version')} не поддерживается")
+
+    tournament_data: Dict[str, Any] = dict(toc.get("meta") or {})
+    tournament_data["participants"] = json.loads(zf.read(PARTICIPANTS_ENTRY))
+    tournament_data["schedule"] = json.loads(zf.read(SCHEDULE_ENTRY))
+
+    entries = {}
+    categories: Dict[str, Dict[str, Any]] = {}
+    for item in toc.get("categories", []):
+        entries[item["name"]] = item["entry"]
+        categories[item["name"]] = dict(item.get("meta") or {})
+
+    def load_block(name: str, category: Dict[str, Any]) -> None:
+        category.update(json.loads(zf.read(entries[name])))
+
+    if lazy:
+        tournament_data["categories"] = LazyCategories(load_block, categories)
+    else:
+        for name, category in categories.items():
+            load_block(name, category)
+        tournament_data["categories"] = categories
+    return tournament_data
+
+
+def load_tournament_file(path: str, lazy: bool = True) -> Dict[str, Any]:
+    """Загружает турнир из .mvpz или JSON — по содержимому файла."""
+    if is_container_file(path):
+        return load_container(path, lazy=lazy)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_tournament_file(tournament_data: Dict[str, Any], path: str, indent: Optional[int] = 2) -> str:
+    """Сохраняет турнир в формате, заданном расширением пути (.mvpz или JSON)."""
+    if is_container_path(path):
+        return save_container(tournament_data, path)
+    from core.autosave import take_snapshot, write_json_atomic
+    return write_json_atomic(path, take_snapshot(tournament_data), indent=indent)
+
+
+def json_to_container(json_path: str, container_path: Optional[str] = None) -> str:
+    """Преобразует JSON-файл турнира в .mvpz. Возвращает путь контейнера."""
+    if container_path is None:
+        container_path = os.path.splitext(json_path)[0] + CONTAINER_EXT
+    with open(json_path, "r", encoding="utf-8") as f:
+        tournament_data = json.load(f)
+    return save_container(tournament_data, container_path)
+
+
+def container_to_json(container_path: str, json_path: Optional[str] = None, indent: Optional[int] = 2) -> str:
+    """Преобразует .mvpz обратно в JSON. Возвращает путь JSON-файла."""
+    if json_path is None:
+        json_path = os.path.splitext(container_path)[0] + ".json"
+    tournament_data = load_container(container_path, lazy=False)
+    return save_tournament_file(tournament_data, json_path, indent=indent)
@@ -2,10 +2,10 @@ import sys
 import math
 import socket
 import re
-from datetime import datetime, timedelta
+from core.schedule_time import parse_hhmm, set_schedule_minutes
+from core.seeding import bracket_separation, build_draw
 
-
-def create_bracket(wrestlers, category_name, bracket_type=None):
+def create_bracket(wrestlers, category_name, bracket_type=None, ratings=None, separate_by=None):
     """
     Создаёт турнирную сетку для категории.
 
@@ -13,6 +13,10 @@ def create_bracket(wrestlers, category_name, bracket_type=None):
     :param category_name: название категории
     :param bracket_type: если 'round_robin', принудительно создаётся круговая система.
                          Если None, то до 5 участников — круговая, иначе олимпийка.
+    :param ratings: {имя: рейтинг} (core.ratings.seed_ratings). Если у кого-то
+                    из участников есть рейтинг, олимпийская сетка сеется по нему.
+    :param separate_by: поля участника, по которым разводятся соперники в олимпийской
+                        сетке (core.seeding.build_draw); None — из настроек, () — не разводить.
     """
     # Определяем тип сетки
     if bracket_type is None:
@@ -128,10 +132,26 @@ def create_bracket(wrestlers, category_name, bracket_type=None):
     while bracket_size < len(real_wrestlers):
         bracket_size *= 2
 
-    # Добавляем "ПРОПУСК" только для заполнения сетки
-    padded_wrestlers = real_wrestlers[:]
-    while len(padded_wrestlers) < bracket_size:
-        padded_wrestlers.append({"name": "ПРОПУСК", "club": "", "rank": "", "weight": 0})
+    # Посев по рейтингу: участники без истории — после рейтинговых,
+    # между собой в прежнем порядке (сортировка устойчивая)
+    rated = bool(ratings) and any(w["name"] in ratings for w in real_wrestlers)
+    if rated:
+        real_wrestlers = sorted(real_wrestlers, key=lambda w: -ratings.get(w["name"], float("-inf")))
+
+    if separate_by is None:
+        separate_by = bracket_separation()
+    if separate_by or rated:
+        # Сеяные на стандартных позициях, остальные — с разведением одноклубников;
+        # без разведения по рейтингу сеются все
+        padded_wrestlers = build_draw(
+            real_wrestlers, bracket_size, separate_by,
+            n_seeds=None if separate_by else len(real_wrestlers),
+        )
+    else:
+        # Добавляем "ПРОПУСК" только для заполнения сетки
+        padded_wrestlers = real_wrestlers[:]
+        while len(padded_wrestlers) < bracket_size:
+            padded_wrestlers.append({"name": "ПРОПУСК", "club": "", "rank": "", "weight": 0})
 
     # Создаём матчи первого раунда
     matches = []
@@ -160,11 +180,54 @@ def create_bracket(wrestlers, category_name, bracket_type=None):
     bracket["matches"] = matches
     return bracket
 
-def generate_schedule(tournament_data, start_time="10:00", match_duration=8, n_mats=3):
+
+def create_brackets_batch(categories, bracket_type=None, ratings=None, separate_by=None):
+    """
+    Создаёт сетки для набора категорий и записывает matches/type в данные категорий.
+    Настройки разведения читаются один раз на весь набор; расписание вызывающий
+    перестраивает один раз после всех сеток. Сетки строятся последовательно:
+    одна сетка — десятки микросекунд, а запуск пула процессов дороже всего
+    построения даже на тысячах категорий (см. benchmarks/bench_brackets.py).
+
+    :param categories: dict {название: данные категории с ключом "participants"}
+    :param bracket_type: тип сетки для всех категорий (None — автовыбор, как в create_bracket)
+    :param ratings: {имя: рейтинг} для посева олимпийских сеток (см. create_bracket)
+    :param separate_by: разведение одноклубников (см. create_bracket); None — из настроек
+    :return: dict {название: {"matches": [...], "type": str}} в порядке категорий
+    """
+    if separate_by is None:
+        separate_by = bracket_separation()
+    brackets = {}
+    for name, category in categories.items():
+        participants = category.get("participants", [])
+        bracket = create_bracket(participants, name, bracket_type, ratings, separate_by)
+        category["matches"] = bracket["matches"]
+        category["type"] = bracket["type"]
+        brackets[name] = {"matches": bracket["matches"], "type": bracket["type"]}
+    return brackets
+
+def category_weight(category_name):
+    """Извлекает вес из названия категории (например, '22 кг' -> 22, '28 кг №2' -> 28)"""
+    # Ищем число в начале названия категории
+    match = re.search(r'(\d+)', str(category_name))
+    if match:
+        return int(match.group(1))
+    return 9999  # Если не найдено, ставим в конец
+
+
+def schedule_order_key(item):
+    """Порядок записей расписания: вес категории, время, ковёр."""
+    return (category_weight(item.get("category")), item.get("start_min", 0), item.get("mat", 0))
+
+
+def generate_schedule(tournament_data, start_time="10:00", match_duration=8, n_mats=3, duration_model=None):
     """
     Формирует расписание матчей для всех категорий турнира в формате как на фото.
     Распределяет матчи равномерно по коврам и номерам схваток.
     Сортирует категории по весу (от меньшей к большей).
+    Если передана duration_model (core.durations.DurationModel), длина слота
+    берётся из прогноза для вида спорта и возрастной группы категории,
+    иначе для всех схваток используется match_duration.
     """
     # Убеждаемся, что n_mats - это целое число и минимум 1
     try:
@@ -199,19 +262,10 @@ def generate_schedule(tournament_data, start_time="10:00", match_duration=8, n_m
     print(f"[DEBUG generate_schedule] Начало генерации расписания, n_mats={n_mats} (тип: {type(n_mats).__name__}), preferred_mat_index={preferred_mat_index}")
     schedule = []
     
-    # Функция для извлечения веса из названия категории
-    def extract_weight(category_name):
-        """Извлекает вес из названия категории (например, '22 кг' -> 22, '28 кг №2' -> 28)"""
-        # Ищем число в начале названия категории
-        match = re.search(r'(\d+)', str(category_name))
-        if match:
-            return int(match.group(1))
-        return 9999  # Если не найдено, ставим в конец
-    
     # Сортируем категории по весу (от меньшей к большей)
     categories_sorted = sorted(
         tournament_data["categories"].items(),
-        key=lambda x: extract_weight(x[0])
+        key=lambda x: category_weight(x[0])
     )
     
     # Подготовим быстрый поиск участников по имени (игнорируем пустые имена)
@@ -279,7 +333,7 @@ def generate_schedule(tournament_data, start_time="10:00", match_duration=8, n_m
     all_matches_with_rounds = []
     categories_list = sorted(
         matches_by_category.keys(),
-        key=lambda cat: extract_weight(cat)
+        key=lambda cat: category_weight(cat)
     )
     
     for category in categories_list:
@@ -324,6 +378,16 @@ def generate_schedule(tournament_data, start_time="10:00", match_duration=8, n_m
     print(f"[DEBUG generate_schedule] Распределение матчей по коврам: {mat_match_counts}")
     print(f"[DEBUG generate_schedule] Начальный ковёр: {start_mat_index + 1} (индекс {start_mat_index}), preferred_mat_index={preferred_mat_index}")
     
+    # Длина слота по категориям (прогноз по фактическим длительностям схваток)
+    slot_minutes = {}
+    if duration_model is not None:
+        from core.durations import category_age_group, tournament_sport
+        sport = tournament_sport(tournament_data)
+        for category in categories_list:
+            age_group = category_age_group(tournament_data["categories"].get(category))
+            slot_minutes[category] = duration_model.slot_minutes(sport, age_group)
+        print(f"[DEBUG generate_schedule] Длительности слотов по прогнозу: {slot_minutes}")
+
     # Генерируем расписание: для каждого ковра распределяем матчи по времени
     for mat_index in range(n_mats):
         print(f"[DEBUG generate_schedule] Обработка ковра {mat_index + 1} (индекс {mat_index}), матчей на ковре: {len(matches_per_mat[mat_index])}")
@@ -331,14 +395,16 @@ def generate_schedule(tournament_data, start_time="10:00", match_duration=8, n_m
             print(f"[DEBUG generate_schedule] На ковре {mat_index + 1} нет матчей, пропускаем")
             continue
         
-        current_time = datetime.strptime(start_time, "%H:%M")
+        # Время считаем в целых минутах от полуночи первого дня (см. core.schedule_time)
+        current_minutes = parse_hhmm(start_time)
+        if current_minutes is None:
+            current_minutes = 10 * 60
         
         # Добавляем матчи этого ковра в расписание
         for match_info in matches_per_mat[mat_index]:
             match = match_info["match"]
             mat_number = mat_index + 1
             schedule_item = {
-                "time": current_time.strftime("%H:%M"),
                 "mat": mat_number,
                 "category": match["category"],
                 "wrestler1": match["wrestler1"],
@@ -348,12 +414,13 @@ def generate_schedule(tournament_data, start_time="10:00", match_duration=8, n_m
                 "match_id": match["match_id"],
                 "round": match_info["round"]
             }
+            set_schedule_minutes(schedule_item, current_minutes)
             schedule.append(schedule_item)
             if len(schedule) <= 5:  # Выводим только первые 5 для отладки
                 print(f"[DEBUG generate_schedule] Добавлен матч #{len(schedule)}: категория '{match['category']}', ковёр {mat_number} (mat_index={mat_index}), время {schedule_item['time']}")
             
             # Увеличиваем время для следующего матча
-            current_time += timedelta(minutes=match_duration)
+            current_minutes += slot_minutes.get(match["category"], match_duration)
     
     # Отладочная информация о результате
     mats_in_result = {}
@@ -364,11 +431,7 @@ def generate_schedule(tournament_data, start_time="10:00", match_duration=8, n_m
     
     # Сортируем расписание по весу категории, затем по времени и ковру
     # Это гарантирует, что категории идут от меньшей к большей
-    schedule.sort(key=lambda x: (
-        extract_weight(x["category"]),  # Сначала по весу категории
-        x["time"],  # Затем по времени
-        x["mat"]  # Затем по ковру
-    ))
+    schedule.sort(key=schedule_order_key)
     
     # Сохраняем в данные турнира
     tournament_data["schedule"] = schedule
@@ -0,0 +1,458 @@
+"""
+Аналитика результатов по всем турнирам.
+
+- athletes — спортсмен с единым ключом между турнирами: нормализованное
+  имя и год рождения (если известен).
+- bout_results — таблица фактов: одна строка на завершённую схватку.
+- athlete_stats, head_to_head, placements, club_medals — агрегаты. Они не
+  пересчитываются запросами по фактам, а обновляются приращениями при каждом
+  core.db.save_match_result: вклад прежней версии схватки вычитается,
+  новой — прибавляется, поэтому исправление результата тоже учитывается.
+
+Запросы («X против Y», «медали клубов за сезон», «послужной список»)
+читают агрегаты по первичному ключу/индексу — время не зависит от
+числа схваток в истории.
+"""
+import math
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.db import get_connection, get_or_create_tournament_id
+from core.progression import final_placements
+
+
+BYE_NAME = "ПРОПУСК"
+MEDAL_PLACES = 3
+
+_YEAR_RE = re.compile(r"(\d{4})")
+
+
+def normalize_name(name: Any) -> str:
+    """Имя для сравнения: без регистра, «ё» -> «е», одиночные пробелы."""
+    return " ".join(str(name or "").lower().replace("ё", "е").split())
+
+
+def _birth_year(participant: Optional[Dict[str, Any]]) -> Optional[int]:
+    if not participant:
+        return None
+    for key in ("birth_year", "birth_date", "dob"):
+        value = participant.get(key)
+        if value:
+            found = _YEAR_RE.search(str(value))
+            if found:
+                return int(found.group(1))
+    return None
+
+
+def identity_key(name: Any, birth_year: Optional[int] = None) -> str:
+    """Ключ спортсмена между турнирами."""
+    return f"{normalize_name(name)}|{birth_year or ''}"
+
+
+def participant_key(participant: Dict[str, Any]) -> str:
+    """Ключ спортсмена для записи участника турнира."""
+    return identity_key(participant.get("name"), _birth_year(participant))
+
+
+def tournament_season(tournament_data: Dict[str, Any]) -> int:
+    """Сезон — год даты турнира ("%d.%m.%Y"), иначе текущий год."""
+    found = _YEAR_RE.search(str(tournament_data.get("date") or ""))
+    return int(found.group(1)) if found else datetime.now().year
+
+
+def _find_participant(tournament_data: Dict[str, Any], category: Dict[str, Any], name: str) -> Optional[Dict[str, Any]]:
+    for p in category.get("participants", []) or []:
+        if p.get("name") == name:
+            return p
+    for p in tournament_data.get("participants", []) or []:
+        if isinstance(p, dict) and p.get("name") == name:
+            return p
+    return None
+
+
+def _athlete_id(cur: sqlite3.Cursor, name: str, participant: Optional[Dict[str, Any]], club: Optional[str]) -> int:
+    key = identity_key(name, _birth_year(participant))
+    cur.execute("SELECT id, club FROM athletes WHERE identity_key = ?", (key,))
+    row = cur.fetchone()
+    if row:
+        if club and row[1] != club:
+            cur.execute("UPDATE athletes SET club = ? WHERE id = ?", (club, row[0]))
+        return row[0]
+    cur.execute(
+        "INSERT INTO athletes (identity_key, name, name_norm, birth_year, club) VALUES (?, ?, ?, ?, ?)",
+        (key, name, normalize_name(name), _birth_year(participant), club),
+    )
+    return cur.lastrowid
+
+
+# ---------------------------------------------------------------------- #
+#  Приращения агрегатов
+# ---------------------------------------------------------------------- #
+def _apply_bout(cur: sqlite3.Cursor, bout: Tuple, sign: int) -> None:
+    """Прибавляет (sign=1) или вычитает (sign=-1) вклад схватки в агрегаты."""
+    athlete1, athlete2, score1, score2, winner = bout
+    for me, other, pf, pa in ((athlete1, athlete2, score1, score2), (athlete2, athlete1, score2, score1)):
+        win = 1 if winner == me else 0
+        loss = 1 if winner == other else 0
+        cur.execute(
+            """
+            INSERT INTO athlete_stats (athlete_id, bouts, wins, losses, points_for, points_against)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(athlete_id) DO UPDATE SET
+                bouts = bouts + excluded.bouts,
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                points_for = points_for + excluded.points_for,
+                points_against = points_against + excluded.points_against
+            """,
+            (me, sign, sign * win, sign * loss, sign * pf, sign * pa),
+        )
+
+    if athlete1 <= athlete2:
+        lo, hi, lo_points, hi_points = athlete1, athlete2, score1, score2
+    else:
+        lo, hi, lo_points, hi_points = athlete2, athlete1, score2, score1
+    cur.execute(
+        """
+        INSERT INTO head_to_head (athlete_lo, athlete_hi, bouts, lo_wins, hi_wins, lo_points, hi_points)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(athlete_lo, athlete_hi) DO UPDATE SET
+            bouts = bouts + excluded.bouts,
+            lo_wins = lo_wins + excluded.lo_wins,
+            hi_wins = hi_wins + excluded.hi_wins,
+            lo_points = lo_points + excluded.lo_points,
+            hi_points = hi_points + excluded.hi_points
+        """,
+        (
+            lo, hi, sign,
+            sign * (1 if winner == lo else 0),
+            sign * (1 if winner == hi else 0),
+            sign * lo_points, sign * hi_points,
+        ),
+    )
+
+
+def _apply_medals(cur: sqlite3.Cursor, rows: List[Tuple], sign: int) -> None:
+    """rows: [(season, club, place)]."""
+    for season, club, place in rows:
+        if not club or place > MEDAL_PLACES:
+            continue
+        medal = ("gold", "silver", "bronze")[place - 1]
+        cur.execute(
+            f"""
+            INSERT INTO club_medals (season, club, {medal}) VALUES (?, ?, ?)
+            ON CONFLICT(season, club) DO UPDATE SET {medal} = {medal} + excluded.{medal}
+            """,
+            (season, club, sign),
+        )
+
+
+# ---------------------------------------------------------------------- #
+#  Места в категории
+# ---------------------------------------------------------------------- #
+def _is_bye(name: Any) -> bool:
+    return not name or name == BYE_NAME
+
+
+def category_placements(category: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """
+    Итоговые места категории [(имя, место)] — только когда все схватки
+    завершены, иначе пустой список. Круговая система: по победам, затем
+    по набранным баллам. Олимпийская: финал даёт 1–2 место, проигравшие
+    в полуфиналах — 3; с утешительными схватками или сеткой проигравших
+    места считает core.progression.final_placements.
+    """
+    matches = [m for m in category.get("matches", []) or [] if not (_is_bye(m.get("wrestler1")) or _is_bye(m.get("wrestler2")))]
+    if not matches or not all(m.get("completed") for m in matches):
+        return []
+
+    def loser(m):
+        return m.get("wrestler2") if m.get("winner") == m.get("wrestler1") else m.get("wrestler1")
+
+    if category.get("type") == "round_robin":
+        stats: Dict[str, List[int]] = {}
+        for m in matches:
+            for side, score in (("wrestler1", "score1"), ("wrestler2", "score2")):
+                entry = stats.setdefault(m[side], [0, 0])
+                entry[1] += int(m.get(score, 0) or 0)
+            if m.get("winner") in stats:
+                stats[m["winner"]][0] += 1
+        ordered = sorted(stats.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+        placements, prev_key, place = [], None, 0
+        for idx, (name, (wins, points)) in enumerate(ordered):
+            if (wins, points) != prev_key:
+                place, prev_key = idx + 1, (wins, points)
+            placements.append((name, place))
+        return placements
+
+    progression = final_placements(category)
+    if progression is not None:
+        return progression
+
+    last_round = max(int(m.get("round", 1) or 1) for m in matches)
+    # Финал — раунд log2(размер сетки); пока он не сыгран, мест нет
+    real = [p for p in category.get("participants", []) or [] if not _is_bye(p.get("name"))]
+    rounds_needed = max(1, math.ceil(math.log2(len(real)))) if len(real) > 1 else 1
+    finals = [m for m in matches if int(m.get("round", 1) or 1) == last_round]
+    if last_round < rounds_needed or len(finals) != 1 or not finals[0].get("winner"):
+        return []
+    final = finals[0]
+    placements = [(final["winner"], 1), (loser(final), 2)]
+    for m in matches:
+        if int(m.get("round", 1) or 1) == last_round - 1 and m.get("winner"):
+            placements.append((loser(m), 3))
+    return placements
+
+
+def _update_placements(
+    cur: sqlite3.Cursor,
+    tournament_id: int,
+    tournament_data: Dict[str, Any],
+    category_name: str,
+    season: int,
+) -> None:
+    category = (tournament_data.get("categories") or {}).get(category_name)
+    if not category:
+        return
+    cur.execute(
+        "SELECT season, club, place FROM placements WHERE tournament_id = ? AND category = ?",
+        (tournament_id, category_name),
+    )
+    _apply_medals(cur, [tuple(row) for row in cur.fetchall()], -1)
+    cur.execute("DELETE FROM placements WHERE tournament_id = ? AND category = ?", (tournament_id, category_name))
+
+    rows = []
+    for name, place in category_placements(category):
+        participant = _find_participant(tournament_data, category, name)
+        club = (participant or {}).get("club") or None
+        athlete = _athlete_id(cur, name, participant, club)
+        rows.append((tournament_id, category_name, athlete, season, club, place))
+    cur.executemany(
+        "INSERT OR REPLACE INTO placements (tournament_id, category, athlete_id, season, club, place) VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    _apply_medals(cur, [(r[3], r[4], r[5]) for r in rows], 1)
+
+
+def record_bout(
+    conn: sqlite3.Connection,
+    tournament_id: int,
+    tournament_data: Dict[str, Any],
+    category_name: str,
+    match: Dict[str, Any],
+    update_placements: bool = True,
+    rating_period: Optional[int] = None,
+) -> None:
+    """
+    Заносит схватку в таблицу фактов и обновляет агрегаты приращениями.
+    Незавершённая (или отменённая) схватка убирает свой прежний вклад.
+    Новая схватка обновляет рейтинги соперников инкрементально, исправление
+    соперников или победителя уже учтённой — полным пересчётом рейтингов.
+    Вызывается из core.db.save_match_result отдельной транзакцией, после
+    того как сам результат уже зафиксирован.
+    update_placements=False — места категории пересчитает вызывающий
+    (пакетная загрузка); rating_period — заранее найденный номер периода
+    рейтинга турнира (core.ratings.tournament_period).
+    """
+    cur = conn.cursor()
+    match_uid = str(match.get("id") or f"{category_name}_{match.get('wrestler1')}_{match.get('wrestler2')}")
+    season = tournament_season(tournament_data)
+
+    cur.execute(
+        "SELECT id, athlete1_id, athlete2_id, score1, score2, winner_id FROM bout_results WHERE tournament_id = ? AND match_uid = ?",
+        (tournament_id, match_uid),
+    )
+    old = cur.fetchone()
+    if old:
+        _apply_bout(cur, tuple(old)[1:], -1)
+
+    name1, name2 = match.get("wrestler1"), match.get("wrestler2")
+    counted = bool(match.get("completed")) and not _is_bye(name1) and not _is_bye(name2)
+    if counted:
+        category = (tournament_data.get("categories") or {}).get(category_name) or {}
+        p1 = _find_participant(tournament_data, category, name1)
+        p2 = _find_participant(tournament_data, category, name2)
+        club1 = match.get("club1") or (p1 or {}).get("club") or None
+        club2 = match.get("club2") or (p2 or {}).get("club") or None
+        athlete1 = _athlete_id(cur, name1, p1, club1)
+        athlete2 = _athlete_id(cur, name2, p2, club2)
+        score1 = int(match.get("score1", 0) or 0)
+        score2 = int(match.get("score2", 0) or 0)
+        winner = match.get("winner")
+        winner_id = athlete1 if winner == name1 else athlete2 if winner == name2 else None
+        cur.execute(
+            """
+            INSERT INTO bout_results (
+                tournament_id, match_uid, category, round, season,
+                athlete1_id, athlete2_id, club1, club2, score1, score2, winner_id
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(tournament_id, match_uid) DO UPDATE SET
+                category = excluded.category, round = excluded.round, season = excluded.season,
+                athlete1_id = excluded.athlete1_id, athlete2_id = excluded.athlete2_id,
+                club1 = excluded.club1, club2 = excluded.club2,
+                score1 = excluded.score1, score2 = excluded.score2, winner_id = excluded.winner_id
+            """,
+            (
+                tournament_id, match_uid, category_name, match.get("round"), season,
+                athlete1, athlete2, club1, club2, score1, score2, winner_id,
+            ),
+        )
+        _apply_bout(cur, (athlete1, athlete2, score1, score2, winner_id), 1)
+    elif old:
+        cur.execute("DELETE FROM bout_results WHERE id = ?", (old[0],))
+
+    # На рейтинг влияют только соперники и победитель, счёт — нет
+    rated_old = (old[1], old[2], old[5]) if old else None
+    rated_new = (athlete1, athlete2, winner_id) if counted else None
+    if rated_new != rated_old:
+        from core.ratings import recompute_ratings, tournament_period, update_after_bout
+        if rated_old is None:
+            if rating_period is None:
+                rating_period = tournament_period(conn, tournament_id)
+            update_after_bout(conn, athlete1, athlete2, winner_id, rating_period)
+        else:
+            # Исправление или отмена учтённой схватки: вклад Glicko не вычесть
+            recompute_ratings(conn)
+
+    if update_placements:
+        _update_placements(cur, tournament_id, tournament_data, category_name, season)
+
+
+def rebuild_aggregates(conn: sqlite3.Connection) -> None:
+    """Полный пересчёт athlete_stats/head_to_head/club_medals из фактов (обслуживание)."""
+    with conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM athlete_stats")
+        cur.execute("DELETE FROM head_to_head")
+        cur.execute("DELETE FROM club_medals")
+        cur.execute("SELECT athlete1_id, athlete2_id, score1, score2, winner_id FROM bout_results")
+        for bout in cur.fetchall():
+            _apply_bout(conn.cursor(), tuple(bout), 1)
+        cur.execute("SELECT season, club, place FROM placements")
+        _apply_medals(conn.cursor(), [tuple(row) for row in cur.fetchall()], 1)
+
+
+# ---------------------------------------------------------------------- #
+#  Запросы
+# ---------------------------------------------------------------------- #
+class ResultsWarehouse:
+    """Запросы к аналитике результатов."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.conn = get_connection(db_path)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def find_athletes(self, name: str) -> List[Dict[str, Any]]:
+        """Спортсмены с таким именем (тёзки различаются годом рождения)."""
+        cur = self.conn.execute(
+            "SELECT id, name, birth_year, club FROM athletes WHERE name_norm = ?", (normalize_name(name),)
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+    def _ids(self, athlete: Any) -> List[int]:
+        if isinstance(athlete, int):
+            return [athlete]
+        return [a["id"] for a in self.find_athletes(athlete)]
+
+    def athlete_record(self, athlete: Any) -> Dict[str, int]:
+        """Итог спортсмена (имя или id): схватки, победы, поражения, баллы."""
+        record = {"bouts": 0, "wins": 0, "losses": 0, "points_for": 0, "points_against": 0}
+        ids = self._ids(athlete)
+        if not ids:
+            return record
+        cur = self.conn.execute(
+            f"SELECT * FROM athlete_stats WHERE athlete_id IN ({','.join('?' * len(ids))})", ids
+        )
+        for row in cur.fetchall():
+            for key in record:
+                record[key] += row[key]
+        return record
+
+    def head_to_head(self, athlete_a: Any, athlete_b: Any) -> Dict[str, int]:
+        """Личные встречи A и B: {"bouts", "wins_a", "wins_b", "points_a", "points_b"}."""
+        result = {"bouts": 0, "wins_a": 0, "wins_b": 0, "points_a": 0, "points_b": 0}
+        for a in self._ids(athlete_a):
+            for b in self._ids(athlete_b):
+                if a == b:
+                    continue
+                lo, hi = (a, b) if a < b else (b, a)
+                row = self.conn.execute(
+                    "SELECT * FROM head_to_head WHERE athlete_lo = ? AND athlete_hi = ?", (lo, hi)
+                ).fetchone()
+                if not row:
+                    continue
+                a_side, b_side = ("lo", "hi") if a == lo else ("hi", "lo")
+                result["bouts"] += row["bouts"]
+                result["wins_a"] += row[f"{a_side}_wins"]
+                result["wins_b"] += row[f"{b_side}_wins"]
+                result["points_a"] += row[f"{a_side}_points"]
+                result["points_b"] += row[f"{b_side}_points"]
+        return result
+
+    def club_medals(self, season: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Медальный зачёт клубов за сезон (по умолчанию — текущий год)."""
+        season = season or datetime.now().year
+        sql = (
+            "SELECT club, gold, silver, bronze FROM club_medals WHERE season = ? "
+            "AND gold + silver + bronze > 0 ORDER BY gold DESC, silver DESC, bronze DESC, club"
+        )
+        params: List[Any] = [season]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def athlete_history(self, athlete: Any, limit: int = 50) -> List[Dict[str, Any]]:
+        """Последние схватки спортсмена во всех турнирах."""
+        ids = self._ids(athlete)
+        if not ids:
+            return []
+        marks = ",".join("?" * len(ids))
+        cur = self.conn.execute(
+            f"""
+            SELECT b.*, t.name AS tournament, t.date AS date,
+                   a1.name AS wrestler1, a2.name AS wrestler2, w.name AS winner
+            FROM bout_results b
+            JOIN tournaments t ON t.id = b.tournament_id
+            JOIN athletes a1 ON a1.id = b.athlete1_id
+            JOIN athletes a2 ON a2.id = b.athlete2_id
+            LEFT JOIN athletes w ON w.id = b.winner_id
+            WHERE b.athlete1_id IN ({marks}) OR b.athlete2_id IN ({marks})
+            ORDER BY b.id DESC LIMIT ?
+            """,
+            ids + ids + [limit],
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+
+def record_tournament_results(tournament_data: Dict[str, Any], db_path: Optional[str] = None) -> int:
+    """
+    Заносит в аналитику все завершённые схватки турнира (импорт истории
+    из файлов прошлых турниров). Возвращает число учтённых схваток.
+    """
+    from core.ratings import tournament_period
+
+    conn = get_connection(db_path)
+    count = 0
+    try:
+        with conn:
+            tournament_id = get_or_create_tournament_id(conn, tournament_data)
+            season = tournament_season(tournament_data)
+            period = tournament_period(conn, tournament_id)
+            for name, category in (tournament_data.get("categories") or {}).items():
+                for match in category.get("matches", []) or []:
+                    if match.get("completed"):
+                        record_bout(
+                            conn, tournament_id, tournament_data, name, match,
+                            update_placements=False, rating_period=period,
+                        )
+                        count += 1
+                _update_placements(conn.cursor(), tournament_id, tournament_data, name, season)
+    finally:
+        conn.close()
+    return count
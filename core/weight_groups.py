@@ -0,0 +1,165 @@
+"""
+Автоматическое разбиение участников на весовые группы.
+
+Участники делятся по полу и возрасту, внутри каждой пары (пол, возраст)
+сортируются по весу и режутся на подряд идущие группы заданного размера
+(например, 3–5 человек) так, чтобы максимальный разброс веса внутри группы
+был минимальным. Используется динамическое программирование за O(n·k),
+где k — число допустимых размеров группы.
+"""
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_MIN_GROUP_SIZE = 3
+DEFAULT_MAX_GROUP_SIZE = 5
+
+
+def _to_weight(value: Any) -> float:
+    try:
+        weight = float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(weight) else weight
+
+
+def _to_age(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def partition_sorted_weights(
+    weights: List[float],
+    min_size: int = DEFAULT_MIN_GROUP_SIZE,
+    max_size: int = DEFAULT_MAX_GROUP_SIZE,
+) -> List[Tuple[int, int]]:
+    """
+    Разбивает отсортированный список весов на подряд идущие отрезки [start, end).
+
+    Размер каждого отрезка лежит в [min_size, max_size], а максимальный
+    разброс (max - min) по отрезкам минимален. При равном разбросе
+    предпочитается меньшее число групп (больше схваток у каждого участника).
+    Если точное разбиение невозможно, нижняя граница размера ослабляется.
+    """
+    n = len(weights)
+    if n == 0:
+        return []
+    min_size = max(1, int(min_size))
+    max_size = max(min_size, int(max_size))
+    if n <= max_size:
+        return [(0, n)]
+
+    inf = float("inf")
+    # best[i] = (макс. разброс, число групп) для первых i участников
+    best: List[Tuple[float, int]] = [(inf, 0)] * (n + 1)
+    best[0] = (0.0, 0)
+    cut = [0] * (n + 1)
+
+    for i in range(1, n + 1):
+        for size in range(min_size, min(max_size, i) + 1):
+            prev = best[i - size]
+            if prev[0] == inf:
+                continue
+            spread = weights[i - 1] - weights[i - size]
+            candidate = (max(prev[0], spread), prev[1] + 1)
+            if candidate < best[i]:
+                best[i] = candidate
+                cut[i] = i - size
+
+    if best[n][0] == inf:
+        return partition_sorted_weights(weights, min_size - 1, max_size)
+
+    bounds = []
+    end = n
+    while end > 0:
+        start = cut[end]
+        bounds.append((start, end))
+        end = start
+    bounds.reverse()
+    return bounds
+
+
+def propose_category_name(
+    wrestlers: List[Dict[str, Any]],
+    gender: Optional[str] = None,
+    age: Optional[int] = None,
+) -> str:
+    """
+    Предлагает название категории: верхняя граница веса группы (с округлением вверх),
+    затем пол/возраст. Вес стоит первым, чтобы generate_schedule сортировал по нему.
+    """
+    max_weight = max((_to_weight(w.get("weight")) for w in wrestlers), default=0.0)
+    name = f"{math.ceil(max_weight)} кг"
+    details = []
+    if gender:
+        details.append(str(gender))
+    if age is not None:
+        details.append(f"{age} лет")
+    if details:
+        name += f" ({', '.join(details)})"
+    return name
+
+
+def partition_participants(
+    participants: List[Dict[str, Any]],
+    min_size: int = DEFAULT_MIN_GROUP_SIZE,
+    max_size: int = DEFAULT_MAX_GROUP_SIZE,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Формирует категории из плоского списка участников.
+
+    Возвращает словарь {название: данные категории} в формате ExcelImporter
+    (gender, age, weight_min, weight_max, experience, participants, matches).
+    Сетки не создаются — это делает вызывающий код.
+    """
+    buckets: Dict[Tuple[str, Optional[int]], List[Dict[str, Any]]] = {}
+    for wrestler in participants:
+        if not isinstance(wrestler, dict):
+            continue
+        name = str(wrestler.get("name", "") or "").strip()
+        if not name or name == "ПРОПУСК":
+            continue
+        key = (str(wrestler.get("gender", "М") or "М"), _to_age(wrestler.get("age")))
+        buckets.setdefault(key, []).append(wrestler)
+
+    # Пол/возраст добавляем в название, только если групп по ним несколько
+    show_gender = len({g for g, _ in buckets}) > 1
+    show_age = len({a for _, a in buckets}) > 1
+
+    categories: Dict[str, Dict[str, Any]] = {}
+    name_counts: Dict[str, int] = {}
+
+    for gender, age in sorted(buckets, key=lambda k: (k[0], k[1] is None, k[1] or 0)):
+        wrestlers = sorted(buckets[(gender, age)], key=lambda w: _to_weight(w.get("weight")))
+        weights = [_to_weight(w.get("weight")) for w in wrestlers]
+
+        for start, end in partition_sorted_weights(weights, min_size, max_size):
+            group = wrestlers[start:end]
+            base_name = propose_category_name(
+                group,
+                gender if show_gender else None,
+                age if show_age else None,
+            )
+            name_counts[base_name] = name_counts.get(base_name, 0) + 1
+            if name_counts[base_name] > 1:
+                category_name = f"{base_name} №{name_counts[base_name]}"
+            else:
+                category_name = base_name
+
+            categories[category_name] = {
+                "gender": gender,
+                "age": age,
+                "weight_min": weights[start],
+                "weight_max": weights[end - 1],
+                "experience": group[0].get("experience", ""),
+                "participants": group,
+                "matches": [],
+            }
+
+    return categories
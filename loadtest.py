@@ -0,0 +1,13 @@
+"""
+Нагрузочный стенд сети (network.loadtest): координатор, панели ковров и
+табло на одном ПК через loopback, с потерями, задержкой и перестановкой
+пакетов.
+
+    python loadtest.py --mats 8 --scoreboards 16 --duration 60 \
+        --loss 0.05 --latency-ms 20 --jitter-ms 10 --reorder 0.1
+"""
+from network.loadtest import main
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,532 @@
+"""
+Нагрузочный стенд сети: площадка турнира на одном ПК через loopback.
+
+Venue поднимает координатора (сервер NetworkManager и ScheduleSyncService
+с ролью coordinator), N панелей ковров и M табло:
+- панель ковра проводит схватки по модели (движок правил, часы схватки и
+  ClockPublisher, как ControlPanel), публикует scoreboard_update через
+  клиент NetworkManager и по окончании схватки шлёт match_update через свой
+  узел синхронизации расписания;
+- табло — клиент NetworkManager, подписанный на тему своего ковра
+  (HeadlessScoreboard из core.bout_recorder);
+- координатор периодически рассылает изменённое расписание.
+
+Узлы синхронизации слушают отдельные адреса 127.0.0.x (Linux и Windows
+направляют всю сеть 127/8 на loopback): у каждого свой адрес отправителя,
+а широковещательная рассылка заменяется отправкой каждому узлу. Пакеты UDP
+проходят через FaultyLink — потери, задержка, перестановка и общая полоса
+канала (пакеты ждут очереди на передачу, как в Wi-Fi площадки). Для TCP
+(панель → сервер) — только задержка с сохранением порядка: потери TCP
+повторяет сам.
+
+Отчёт: задержка «панель → табло» и «результат → каждый узел»
+(перцентили), время сходимости результатов и расписания, трафик по типам
+сообщений, расхождение часов узлов с координатором.
+Запуск: python loadtest.py --help
+"""
+import argparse
+import contextlib
+import heapq
+import io
+import json
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from core.bout_recorder import HeadlessScoreboard
+from core.cluster_clock import ClusterClock
+from core.match_clock import MatchClock
+from core.network import NetworkManager, mat_topic
+from core.rules import BLUE, EVENT_CAUTION, EVENT_PASSIVITY, EVENT_POINTS, RED, ScoringEvent
+from core.scoreboard_clock import KEEPALIVE_SECONDS, ClockPublisher
+from core.sport_loader import SportLoader
+from network.schedule_sync import ScheduleSyncService, _deduplicate_schedule, _hash_schedule
+
+
+SYNC_ADDRESS = "127.0.0.{}"
+COORDINATOR_HOST = 10          # 127.0.0.10 — координатор, далее ковры
+REORDER_HOLD = 0.05            # на столько задерживается «переставленный» пакет
+STEP = 0.05                    # шаг модели панели (как RENDER_INTERVAL_MS)
+BOUT_PAUSE = 2.0               # секунд между схватками на ковре
+
+
+def percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+
+def free_port(kind: int) -> int:
+    with socket.socket(socket.AF_INET, kind) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class FaultyLink:
+    """
+    Доставка с потерями, задержкой и перестановкой. deliver() вызывается из
+    потока канала; для stream (TCP-поток) — без потерь и в порядке отправки.
+    bandwidth (байт/с, 0 — без ограничения) — общая полоса для UDP: пакет
+    размером size передаётся после всех отправленных раньше.
+    """
+
+    def __init__(self, loss: float = 0.0, latency: float = 0.0, jitter: float = 0.0,
+                 reorder: float = 0.0, seed: Optional[int] = None, bandwidth: float = 0.0):
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self.reorder = reorder
+        self.bandwidth = bandwidth
+        self._busy_until = 0.0
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._queue: List[Any] = []
+        self._seq = 0
+        self._last_due: Dict[Any, float] = {}
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, deliver: Callable[[], None], stream: Any = None, size: int = 0) -> bool:
+        """False — пакет потерян."""
+        with self._cond:
+            self.stats["sent"] += 1
+            now = time.perf_counter()
+            if stream is None and self.bandwidth:
+                # Очередь на передачу: и потерянный пакет занимает эфир
+                self._busy_until = max(self._busy_until, now) + size / self.bandwidth
+                self.stats["queued"] = max(self.stats["queued"], round((self._busy_until - now) * 1000))
+            if stream is None and self.loss and self._rng.random() < self.loss:
+                self.stats["dropped"] += 1
+                return False
+            delay = self.latency + (self._rng.uniform(0.0, self.jitter) if self.jitter else 0.0)
+            if stream is None and self.reorder and self._rng.random() < self.reorder:
+                delay += REORDER_HOLD
+                self.stats["reordered"] += 1
+            if stream is None and self.bandwidth:
+                delay += self._busy_until - now
+            due = now + delay
+            if stream is not None:
+                due = max(due, self._last_due.get(stream, 0.0))
+                self._last_due[stream] = due
+            if due > now:
+                self._seq += 1
+                heapq.heappush(self._queue, (due, self._seq, deliver))
+                self._cond.notify()
+                return True
+        self._deliver(deliver)
+        return True
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and (not self._queue or self._queue[0][0] > time.perf_counter()):
+                    timeout = self._queue[0][0] - time.perf_counter() if self._queue else None
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                _, _, deliver = heapq.heappop(self._queue)
+            self._deliver(deliver)
+
+    @staticmethod
+    def _deliver(deliver: Callable[[], None]) -> None:
+        try:
+            deliver()
+        except OSError:
+            pass   # узел уже остановлен
+
+
+class SimulatedSync(ScheduleSyncService):
+    """Узел синхронизации стенда: свой адрес 127.0.0.x, отправка через FaultyLink."""
+
+    def __init__(self, venue: "Venue", address: str, **callbacks: Any):
+        super().__init__(**callbacks)
+        self.venue = venue
+        self.bind_host = address
+        self.port = venue.sync_port
+        # Свои часы у каждого узла (в приложении — одни на процесс)
+        self.clock = ClusterClock()
+
+    def _transmit(self, raw: bytes, target: Optional[str], message_type: Optional[str] = None) -> int:
+        sock = self._sock
+        if not sock:
+            return 0
+        targets = [target] if target else [a for a in self.venue.sync_addresses if a != self.bind_host]
+        for address in targets:
+            self.venue.count_udp(message_type, len(raw))
+            self.venue.link.submit(lambda address=address: sock.sendto(raw, (address, self.port)), size=len(raw))
+        # Широковещательный пакет здесь — по пакету каждому узлу
+        return len(raw) * len(targets)
+
+
+class SimulatedMat(threading.Thread):
+    """Панель ковра: схватки по модели, scoreboard_update и match_update."""
+
+    def __init__(self, venue: "Venue", mat: int, seed: int):
+        super().__init__(daemon=True)
+        self.venue = venue
+        self.mat = mat
+        self.rng = random.Random(seed)
+        self.engine = SportLoader.load_rules("greco_roman")
+        self.network = NetworkManager(port=venue.tcp_port)
+        self.address = SYNC_ADDRESS.format(COORDINATOR_HOST + mat)
+        self.sync = SimulatedSync(
+            venue, self.address,
+            on_match_update=lambda match, ip: venue.match_received(self.address, match),
+            on_schedule_received=lambda schedule, ip: venue.schedule_received(self.address, self.sync.schedule_hash),
+        )
+        self.bouts = 0
+        self._signature = None
+        self._sent_at = 0.0
+
+    def connect(self) -> None:
+        if not self.network.connect_to_server("127.0.0.1"):
+            raise OSError(f"ковёр {self.mat}: нет подключения к серверу")
+        self.sync.start(role="node", mat_number=self.mat, coordinator_host=self.venue.coordinator_address,
+                        device_name=f"mat{self.mat}")
+
+    def run(self) -> None:
+        while not self.venue.stopping.is_set():
+            self._bout()
+            self.venue.stopping.wait(BOUT_PAUSE)
+
+    def _bout(self) -> None:
+        state = self.engine.new_bout()
+        publisher = ClockPublisher()
+        period_clock = MatchClock(self.venue.period)
+        per_step = self.venue.events_per_minute / 60.0 * STEP
+        period = 1
+        for period in range(1, self.engine.rules.periods + 1):
+            period_clock.reset()
+            period_clock.start()
+            while period_clock.running and not state.finished:
+                if self.venue.stopping.wait(STEP):
+                    return
+                period_clock.poll()
+                roll = self.rng.random()
+                if roll < per_step:
+                    corner = self.rng.choice((RED, BLUE))
+                    if self.rng.random() < 0.85:
+                        event = ScoringEvent(EVENT_POINTS, corner, points=self.rng.choice((1, 1, 2, 2, 4)))
+                    else:
+                        event = ScoringEvent(self.rng.choice((EVENT_CAUTION, EVENT_PASSIVITY)), corner)
+                    self.engine.apply(state, event)
+                self._publish(state, period_clock, publisher, period)
+            if state.finished:
+                break
+        period_clock.pause()
+        self._publish(state, period_clock, publisher, period)
+        self.bouts += 1
+        self.sync.send_match_update({
+            "match_id": f"mat{self.mat}-{self.bouts}",
+            "mat": self.mat,
+            "score1": state.red.points,
+            "score2": state.blue.points,
+            "completed": True,
+            "sent_at": time.perf_counter(),
+        })
+        self.venue.match_sent(f"mat{self.mat}-{self.bouts}", self.address)
+
+    def _publish(self, state, period_clock: MatchClock, publisher: ClockPublisher, period: int) -> None:
+        """Как ControlPanel.send_scoreboard_update: переходы часов, смена данных, keepalive."""
+        data = {
+            "type": "scoreboard_update",
+            "mat": self.mat,
+            "red": {"name": f"Красный {self.mat}", "region": "", "points": state.red.points,
+                    "cautions": state.red.cautions, "passivity": state.red.passivity},
+            "blue": {"name": f"Синий {self.mat}", "region": "", "points": state.blue.points,
+                     "cautions": state.blue.cautions, "passivity": state.blue.passivity},
+            "period": period,
+            "time_remaining": period_clock.seconds(),
+            "is_break": False,
+            "break_time_remaining": 0,
+            "category": "Нагрузочный тест",
+            "opponent_wait_time": 0,
+        }
+        clock = publisher.observe(period_clock.running, period_clock.remaining(), period, False)
+        signature = json.dumps({k: v for k, v in data.items() if k != "time_remaining"}, sort_keys=True)
+        now = time.monotonic()
+        if clock is None and signature == self._signature and now - self._sent_at < KEEPALIVE_SECONDS:
+            return
+        self._signature = signature
+        self._sent_at = now
+        data["clock"] = publisher.state
+        data["sent_at"] = time.perf_counter()
+        self.venue.count_tcp_uplink(len(json.dumps(data)))
+        self.venue.link.submit(lambda: self.network.send_message("scoreboard_update", data), stream=self.mat)
+
+
+class SimulatedScoreboard:
+    """Табло ковра: подписка на тему ковра, задержка от отправки панелью."""
+
+    def __init__(self, venue: "Venue", mat: int):
+        self.venue = venue
+        self.mat = mat
+        self.display = HeadlessScoreboard(mat=mat)
+        self.network = NetworkManager(port=venue.tcp_port)
+        self.network.subscribe(mat_topic(mat), self._on_update)
+
+    def connect(self) -> None:
+        if not self.network.connect_to_server("127.0.0.1"):
+            raise OSError(f"табло ковра {self.mat}: нет подключения к серверу")
+
+    def _on_update(self, message: Dict[str, Any], client_socket: Any) -> None:
+        data = message.get("data") or {}
+        if "sent_at" in data:
+            self.venue.scoreboard_latency(time.perf_counter() - data["sent_at"])
+        self.display.handle_scoreboard_update(data)
+
+
+class Venue:
+    """Площадка: координатор, ковры, табло и сбор метрик."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.period = args.period
+        self.events_per_minute = args.events_per_minute
+        self.tcp_port = free_port(socket.SOCK_STREAM)
+        self.sync_port = free_port(socket.SOCK_DGRAM)
+        self.link = FaultyLink(args.loss, args.latency_ms / 1000.0, args.jitter_ms / 1000.0, args.reorder,
+                               seed=args.seed, bandwidth=args.bandwidth_kbps * 1024 / 8)
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+
+        self.coordinator_address = SYNC_ADDRESS.format(COORDINATOR_HOST)
+        self.sync_addresses = [SYNC_ADDRESS.format(COORDINATOR_HOST + i) for i in range(args.mats + 1)]
+        self.server = NetworkManager(port=self.tcp_port)
+        self.coordinator = SimulatedSync(
+            self, self.coordinator_address,
+            on_match_update=lambda match, ip: self.match_received(self.coordinator_address, match),
+        )
+        self.mats = [SimulatedMat(self, mat, args.seed + mat) for mat in range(1, args.mats + 1)]
+        self.scoreboards = [SimulatedScoreboard(self, 1 + i % args.mats) for i in range(args.scoreboards)]
+
+        # Метрики
+        self.udp_bytes = Counter()
+        self.udp_packets = Counter()
+        self.tcp_uplink_bytes = 0
+        self.scoreboard_latencies: List[float] = []
+        self.match_latencies: List[float] = []
+        self.match_duplicates = 0
+        self._matches: Dict[str, Dict[str, Any]] = {}
+        self._pushes: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------ #
+    #  Метрики (вызываются из потоков узлов)
+    # ------------------------------------------------------------------ #
+    def count_udp(self, message_type: Optional[str], size: int) -> None:
+        with self._lock:
+            self.udp_bytes[message_type] += size
+            self.udp_packets[message_type] += 1
+
+    def count_tcp_uplink(self, size: int) -> None:
+        with self._lock:
+            self.tcp_uplink_bytes += size
+
+    def scoreboard_latency(self, latency: float) -> None:
+        with self._lock:
+            self.scoreboard_latencies.append(latency)
+
+    def match_sent(self, match_id: str, sender: str) -> None:
+        with self._lock:
+            entry = self._matches.setdefault(match_id, {"received": {}})
+            entry["sender"] = sender
+
+    def match_received(self, receiver: str, match: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            entry = self._matches.setdefault(match.get("match_id"), {"received": {}})
+            entry.setdefault("sent_at", match.get("sent_at", now))
+            if receiver in entry["received"]:
+                self.match_duplicates += 1
+                return
+            entry["received"][receiver] = now
+            self.match_latencies.append(now - entry["sent_at"])
+
+    def schedule_received(self, receiver: str, schedule_hash: str) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            entry = self._pushes.get(schedule_hash)
+            if entry is not None:
+                entry["received"].setdefault(receiver, now)
+
+    # ------------------------------------------------------------------ #
+    #  Ход теста
+    # ------------------------------------------------------------------ #
+    def run(self) -> Dict[str, Any]:
+        if not self.server.start_server("127.0.0.1"):
+            raise OSError("сервер NetworkManager не запустился")
+        started = []
+        try:
+            try:
+                self.coordinator.start(role="coordinator", mat_number=0, device_name="coordinator")
+                started.append(self.coordinator)
+                for mat in self.mats:
+                    mat.connect()
+                    started.append(mat.sync)
+            except OSError as e:
+                raise OSError(f"{e}; стенду нужны адреса 127.0.0.x на loopback (Linux, Windows)") from e
+            for board in self.scoreboards:
+                board.connect()
+            time.sleep(0.5)   # подписки табло доходят до сервера
+
+            begin = time.perf_counter()
+            for mat in self.mats:
+                mat.start()
+            next_push = begin + 1.0
+            pushes = 0
+            while time.perf_counter() - begin < self.args.duration:
+                if time.perf_counter() >= next_push:
+                    self._push_schedule(pushes)
+                    pushes += 1
+                    next_push += self.args.schedule_every
+                time.sleep(0.05)
+            elapsed = time.perf_counter() - begin
+            self.stopping.set()
+            # Хвост доставки: задержка канала и ретрансляции
+            time.sleep(max(1.0, 3 * (self.args.latency_ms + self.args.jitter_ms) / 1000.0 + REORDER_HOLD))
+            return self._report(elapsed)
+        finally:
+            self.stopping.set()
+            for mat in self.mats:
+                mat.join(timeout=1.0)
+            for service in started:
+                service.stop()
+            for node in [m.network for m in self.mats] + [b.network for b in self.scoreboards] + [self.server]:
+                node.stop()
+            self.link.stop()
+
+    def _push_schedule(self, version: int) -> None:
+        schedule = [
+            {"match_id": f"s{mat}-{n}", "mat": mat, "category": "Нагрузочный тест", "round": n,
+             "wrestler1": f"Борец {mat}-{2 * n}", "wrestler2": f"Борец {mat}-{2 * n + 1}",
+             "time": f"{10 + n // 6:02d}:{(n % 6) * 10:02d}", "status": "pending", "version": version}
+            for mat in range(1, self.args.mats + 1)
+            for n in range(self.args.schedule_per_mat)
+        ]
+        # Хеш считается так же, как в push_schedule, до отправки
+        schedule_hash = _hash_schedule(_deduplicate_schedule(schedule))
+        with self._lock:
+            self._pushes[schedule_hash] = {"sent_at": time.perf_counter(), "received": {}}
+        self.coordinator.push_schedule({"schedule": schedule})
+
+    def _report(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            nodes = len(self.sync_addresses)
+            convergence, unconverged = [], 0
+            for entry in self._matches.values():
+                expected = nodes - 1
+                if len(entry["received"]) < expected or "sent_at" not in entry:
+                    unconverged += 1
+                else:
+                    convergence.append(max(entry["received"].values()) - entry["sent_at"])
+            schedule_convergence, schedule_unconverged = [], 0
+            for entry in self._pushes.values():
+                if len(entry["received"]) < len(self.mats):
+                    schedule_unconverged += 1
+                else:
+                    schedule_convergence.append(max(entry["received"].values()) - entry["sent_at"])
+            tcp_downlink = sum(s["bytes"] for s in self.server.get_topic_stats().values())
+            lanes = Counter()
+            for service in [self.coordinator] + [mat.sync for mat in self.mats]:
+                lanes.update(service.lane_stats)
+            clock_errors = [
+                abs(mat.sync.clock.now() - self.coordinator.clock.now())
+                for mat in self.mats if mat.sync.clock.synced
+            ]
+            return {
+                "elapsed": elapsed,
+                "scoreboard_latencies": list(self.scoreboard_latencies),
+                "match_latencies": list(self.match_latencies),
+                "match_duplicates": self.match_duplicates,
+                "matches": len(self._matches),
+                "match_convergence": convergence,
+                "match_unconverged": unconverged,
+                "schedule_pushes": len(self._pushes),
+                "schedule_convergence": schedule_convergence,
+                "schedule_unconverged": schedule_unconverged,
+                "tcp_bytes": self.tcp_uplink_bytes + tcp_downlink,
+                "udp_bytes": dict(self.udp_bytes),
+                "udp_packets": dict(self.udp_packets),
+                "link": dict(self.link.stats),
+                "lanes": dict(lanes),
+                "clock_errors": clock_errors,
+            }
+
+
+def format_latencies(values: List[float]) -> str:
+    if not values:
+        return "нет данных"
+    return (f"p50 {percentile(values, 0.5) * 1000:7.1f} мс, p95 {percentile(values, 0.95) * 1000:7.1f} мс, "
+            f"p99 {percentile(values, 0.99) * 1000:7.1f} мс, макс {max(values) * 1000:7.1f} мс")
+
+
+def print_report(args: argparse.Namespace, report: Dict[str, Any]) -> None:
+    elapsed = report["elapsed"]
+    print(f"Площадка: ковров {args.mats}, табло {args.scoreboards}, {elapsed:.0f} с; "
+          f"потери {args.loss * 100:.0f}%, задержка {args.latency_ms:g}±{args.jitter_ms:g} мс, "
+          f"перестановка {args.reorder * 100:.0f}%")
+    print(f"Табло (TCP): сообщений {len(report['scoreboard_latencies'])}, "
+          f"{format_latencies(report['scoreboard_latencies'])}")
+    print(f"Результаты (UDP): схваток {report['matches']}, доставок узлам {len(report['match_latencies'])}, "
+          f"повторных {report['match_duplicates']}")
+    print(f"    задержка до узла:   {format_latencies(report['match_latencies'])}")
+    print(f"    сходимость (все узлы): {format_latencies(report['match_convergence'])}; "
+          f"не сошлось {report['match_unconverged']}")
+    print(f"Расписание: рассылок {report['schedule_pushes']}, "
+          f"сходимость {format_latencies(report['schedule_convergence'])}; "
+          f"не сошлось {report['schedule_unconverged']}")
+    udp_total = sum(report["udp_bytes"].values())
+    print(f"Трафик: TCP {report['tcp_bytes'] / elapsed / 1024:8.1f} КБ/с, UDP {udp_total / elapsed / 1024:8.1f} КБ/с "
+          f"({sum(report['udp_packets'].values()) / elapsed:,.0f} пакетов/с)")
+    for kind, size in sorted(report["udp_bytes"].items(), key=lambda item: -item[1]):
+        print(f"    {str(kind):<16} {size / elapsed / 1024:8.1f} КБ/с, {report['udp_packets'][kind] / elapsed:8.1f} пакетов/с")
+    link = report["link"]
+    print(f"Канал: пакетов {link.get('sent', 0)}, потеряно {link.get('dropped', 0)}, "
+          f"переставлено {link.get('reordered', 0)}, наибольшая очередь на передачу {link.get('queued', 0)} мс")
+    lanes = report["lanes"]
+    print(f"Очереди отправки узлов: расписание {lanes.get('bulk_sent', 0)} пакетов "
+          f"(отброшено {lanes.get('bulk_dropped', 0)}), логи {lanes.get('log_sent', 0)} "
+          f"(отброшено {lanes.get('log_dropped', 0)}), не принято {lanes.get('inbox_dropped', 0)}")
+    if report["clock_errors"]:
+        print(f"Часы узлов относительно координатора: макс {max(report['clock_errors']) * 1000:.2f} мс")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Нагрузочный стенд: координатор, ковры и табло на loopback")
+    parser.add_argument("--mats", type=int, default=4, help="число панелей ковров")
+    parser.add_argument("--scoreboards", type=int, default=8, help="число табло (по коврам по кругу)")
+    parser.add_argument("--duration", type=float, default=30.0, help="длительность теста, с")
+    parser.add_argument("--period", type=float, default=20.0, help="длительность периода схватки, с")
+    parser.add_argument("--events-per-minute", type=float, default=6.0, help="действий судьи на ковре в минуту")
+    parser.add_argument("--schedule-every", type=float, default=10.0, help="интервал рассылки расписания, с")
+    parser.add_argument("--schedule-per-mat", type=int, default=40, help="схваток в расписании на ковёр")
+    parser.add_argument("--loss", type=float, default=0.0, help="доля потерянных пакетов UDP")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="задержка канала, мс")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="случайная добавка к задержке, мс")
+    parser.add_argument("--reorder", type=float, default=0.0, help="доля пакетов UDP, приходящих не по порядку")
+    parser.add_argument("--bandwidth-kbps", type=float, default=0.0,
+                        help="общая полоса канала для UDP, Кбит/с (0 — без ограничения)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="не скрывать вывод узлов")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    venue = Venue(args)
+    if args.verbose:
+        report = venue.run()
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = venue.run()
+    print_report(args, report)
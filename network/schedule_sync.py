@@ -1,10 +1,13 @@
 import json
+import queue
 import socket
 import threading
 import time
 import hashlib
-from typing import Any, Callable, Dict, Optional, List
+from collections import Counter, OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional, List, Tuple
 
+from core.cluster_clock import cluster_time, get_cluster_clock
 from core.constants import (
     SCHEDULE_SYNC_PORT,
     SCHEDULE_SYNC_HEARTBEAT,
@@ -53,6 +56,52 @@ def _deduplicate_schedule(schedule: Any) -> Any:
 
 MAX_UDP_PAYLOAD = 60000  # небольшой запас от системного лимита ~64К для UDP
 DEFAULT_SCHEDULE_CHUNK = 80  # кол-во матчей в одном пакете (держим размером < MAX_UDP_PAYLOAD)
+SEEN_MESSAGES = 4096  # сколько последних ретранслируемых сообщений помнить для отсечки повторов
+
+# Классы трафика. Результаты, пульс и пробы часов (LANE_LIVE) отправляются сразу
+# из вызывающего потока; расписание (LANE_BULK) и логи (LANE_LOG) — потоком
+# отправки через ограничитель скорости, чтобы рассылка расписания не задерживала
+# результаты схваток. Принятые bulk/log разбираются отдельным потоком.
+LANE_LIVE = 0
+LANE_BULK = 1
+LANE_LOG = 2
+LANE_NAMES = {LANE_LIVE: "live", LANE_BULK: "bulk", LANE_LOG: "log"}
+MESSAGE_LANES = {"schedule_full": LANE_BULK, "schedule_chunk": LANE_BULK, "log_entry": LANE_LOG}
+BULK_RATE = 256 * 1024            # байт/с расписания с одного узла
+BULK_BURST = 2 * MAX_UDP_PAYLOAD
+LOG_RATE = 32 * 1024              # байт/с логов с одного узла
+LOG_BURST = 16 * 1024
+# Пакетов в очереди. При переполнении теряется самый старый пакет, а если это
+# чанк расписания — вся его передача: без одного чанка она не соберётся ни на одном узле
+LANE_QUEUE = {LANE_BULK: 4096, LANE_LOG: 1024}
+DROPPED_TRANSFERS = 64  # сколько отброшенных передач помнить, чтобы не ставить в очередь их хвосты
+
+
+class TokenBucket:
+    """Ограничитель скорости: rate байт/с, запас до burst байт."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._clock = clock
+        self.tokens = self.burst
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, size: int) -> float:
+        """Через сколько секунд можно отправить size байт (0 — сейчас)."""
+        self._refill()
+        # Пакет больше запаса уходит при полном запасе, остаток — в долг
+        need = min(float(size), self.burst)
+        return 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+
+    def take(self, size: int) -> None:
+        self._refill()
+        self.tokens -= size
 
 
 class ScheduleSyncService:
@@ -85,16 +134,43 @@ class ScheduleSyncService:
         self.mat_number = 1
         self.allow_relay = True
         self.coordinator_host: Optional[str] = None
+        # Порт и адреса UDP (другие — только для нагрузочного стенда на loopback)
+        self.port = SCHEDULE_SYNC_PORT
+        self.bind_host = ""
+        self.broadcast_address = "<broadcast>"
 
         self._sock: Optional[socket.socket] = None
         self._receiver_thread: Optional[threading.Thread] = None
         self._heartbeat_thread: Optional[threading.Thread] = None
+        self._sender_thread: Optional[threading.Thread] = None
+        self._inbox_thread: Optional[threading.Thread] = None
         self.running = False
 
+        # Классы трафика (см. MESSAGE_LANES): скорость (байт/с, запас) применяется при start()
+        self.lane_rates: Dict[int, Tuple[float, float]] = {
+            LANE_BULK: (BULK_RATE, BULK_BURST),
+            LANE_LOG: (LOG_RATE, LOG_BURST),
+        }
+        # Пакеты очереди: (raw, target, message_type, transfer_id или None)
+        self._lanes: Dict[int, Deque[tuple]] = {lane: deque() for lane in LANE_QUEUE}
+        self._dropped_transfers: Deque[str] = deque(maxlen=DROPPED_TRANSFERS)
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._send_cond = threading.Condition()
+        self._inbox: "queue.Queue[tuple]" = queue.Queue(maxsize=LANE_QUEUE[LANE_BULK])
+        # Счётчики: "<класс>_sent", "<класс>_dropped", "inbox_dropped"
+        self.lane_stats: Counter = Counter()
+
         self.schedule_hash = ""
+        # peers и _incoming_schedule_parts меняются и потоком приёма, и _inbox_loop
+        self._state_lock = threading.Lock()
         self.peers: Dict[str, Dict[str, Any]] = {}
+        # Часы кластера: опорные у координатора, узлы подстраиваются пробами
+        self.clock = get_cluster_clock()
         # Хранилище собираемых чанков расписания: transfer_id -> {"total": int, "received": {idx: part}, "hash": str}
         self._incoming_schedule_parts: Dict[str, Dict[str, Any]] = {}
+        # Ключи уже полученных ретранслируемых сообщений: каждое обрабатывается и ретранслируется один раз
+        self._seen: "OrderedDict[tuple, None]" = OrderedDict()
+        self._seen_lock = threading.Lock()
 
     # ------------------------------------------------------------------ #
     #  Public API
@@ -119,6 +195,7 @@ class ScheduleSyncService:
         if device_name:
             self.device_name = device_name
             self.device_id = f"{self.device_name}-{int(time.time()*1000)}"
+        self.clock.set_reference(self.role == "coordinator")
 
         self.running = True
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
@@ -129,10 +206,10 @@ class ScheduleSyncService:
         
         # Пытаемся привязать порт с обработкой ошибки "Address already in use"
         try:
-            self._sock.bind(("", SCHEDULE_SYNC_PORT))
+            self._sock.bind((self.bind_host, self.port))
         except OSError as e:
             if e.errno == 98 or "Address already in use" in str(e):  # Linux errno 98, Windows может быть другой текст
-                self._log(f"[sync] Порт {SCHEDULE_SYNC_PORT} занят, ожидание освобождения...")
+                self._log(f"[sync] Порт {self.port} занят, ожидание освобождения...")
                 time.sleep(0.5)
                 try:
                     self._sock.close()
@@ -142,18 +219,31 @@ class ScheduleSyncService:
                 self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
                 self._sock.settimeout(1.0)
-                self._sock.bind(("", SCHEDULE_SYNC_PORT))
+                self._sock.bind((self.bind_host, self.port))
             else:
                 raise
 
+        with self._send_cond:
+            for lane in self._lanes.values():
+                lane.clear()
+            self._dropped_transfers.clear()
+            self._buckets = {lane: TokenBucket(rate, burst) for lane, (rate, burst) in self.lane_rates.items()}
+        self._inbox = queue.Queue(maxsize=LANE_QUEUE[LANE_BULK])
+
         try:
             self._receiver_thread = threading.Thread(target=self._receiver_loop, daemon=True)
             self._receiver_thread.start()
 
+            self._sender_thread = threading.Thread(target=self._sender_loop, daemon=True)
+            self._sender_thread.start()
+
+            self._inbox_thread = threading.Thread(target=self._inbox_loop, daemon=True)
+            self._inbox_thread.start()
+
             self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
             self._heartbeat_thread.start()
 
-            self._log(f"[sync] старт модуля ({self.role}), порт {SCHEDULE_SYNC_PORT}")
+            self._log(f"[sync] старт модуля ({self.role}), порт {self.port}")
         except Exception as e:
             self.running = False
             self._log(f"[sync] Ошибка при запуске потоков: {e}")
@@ -171,12 +261,13 @@ class ScheduleSyncService:
             except Exception:
                 pass
             self._sock = None
+        with self._send_cond:
+            self._send_cond.notify_all()
         
         # Даем потокам время завершиться
-        if self._receiver_thread and self._receiver_thread.is_alive():
-            self._receiver_thread.join(timeout=0.5)
-        if self._heartbeat_thread and self._heartbeat_thread.is_alive():
-            self._heartbeat_thread.join(timeout=0.5)
+        for thread in (self._receiver_thread, self._heartbeat_thread, self._sender_thread, self._inbox_thread):
+            if thread and thread.is_alive():
+                thread.join(timeout=0.5)
 
     def push_schedule(self, tournament_data: Dict[str, Any]):
         """Отправка полного расписания всем узлам."""
@@ -190,7 +281,7 @@ class ScheduleSyncService:
             "mat": self.mat_number,
             "device": self.device_name,
             "device_id": self.device_id,
-            "ts": time.time(),
+            "ts": cluster_time(),
         }
 
         # Пробуем отправить одним пакетом; если не помещается в безопасный размер UDP — шлем чанками
@@ -211,7 +302,7 @@ class ScheduleSyncService:
             "role": self.role,
             "device": self.device_name,
             "device_id": self.device_id,
-            "ts": time.time(),
+            "ts": cluster_time(),
             "schedule_hash": self.schedule_hash,
         }
         self._send(payload, target=self.coordinator_host)
@@ -227,14 +318,16 @@ class ScheduleSyncService:
             self._log("[WARNING] send_match_update вызван без match_id")
             return
         
+        ts = cluster_time()
         payload = {
             "type": "match_update",
-            "match": match_data,
+            # Отметка времени кластера: по ней получатели отбрасывают устаревшие обновления
+            "match": dict(match_data, updated_ts=ts),
             "mat": self.mat_number,
             "role": self.role,
             "device": self.device_name,
             "device_id": self.device_id,
-            "ts": time.time(),
+            "ts": ts,
         }
         
         try:
@@ -250,7 +343,17 @@ class ScheduleSyncService:
 
     def get_peers(self) -> Dict[str, Dict[str, Any]]:
         """Возвращает актуальный список узлов."""
-        return dict(self.peers)
+        with self._state_lock:
+            return dict(self.peers)
+
+    def coordinator_address(self) -> Optional[str]:
+        """Адрес координатора: заданный вручную или найденный по heartbeat."""
+        if self.coordinator_host:
+            return self.coordinator_host
+        for info in self.get_peers().values():
+            if info.get("role") == "coordinator" and info.get("ip"):
+                return info["ip"]
+        return None
 
     # ------------------------------------------------------------------ #
     #  Internal
@@ -259,6 +362,8 @@ class ScheduleSyncService:
         while self.running and self._sock:
             try:
                 data, addr = self._sock.recvfrom(65535)
+                # Момент приёма для проб часов — до разбора JSON
+                received_at = self.clock.local_time() if self.role != "coordinator" else self.clock.now()
             except socket.timeout:
                 continue
             except OSError:
@@ -269,10 +374,52 @@ class ScheduleSyncService:
             except Exception:
                 continue
 
-            self._handle_message(message, addr[0])
+            # Расписание и логи разбираются отдельным потоком, результаты — сразу
+            if isinstance(message, dict) and message.get("type") in MESSAGE_LANES:
+                try:
+                    self._inbox.put_nowait((message, addr[0], received_at))
+                except queue.Full:
+                    self.lane_stats["inbox_dropped"] += 1
+                continue
+
+            self._handle_message(message, addr[0], received_at)
 
         self._log("[sync] прием остановлен")
 
+    def _inbox_loop(self):
+        while self.running:
+            try:
+                message, sender_ip, received_at = self._inbox.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            try:
+                self._handle_message(message, sender_ip, received_at)
+            except Exception as e:
+                self._log(f"[sync] ошибка обработки {message.get('type')}: {e}")
+
+    def _sender_loop(self):
+        """Отправка bulk и log: сначала расписание, затем логи, каждый класс в пределах своей скорости."""
+        while self.running and self._sock:
+            with self._send_cond:
+                item = None
+                wait: Optional[float] = None
+                for lane in (LANE_BULK, LANE_LOG):
+                    pending = self._lanes[lane]
+                    if not pending:
+                        continue
+                    delay = self._buckets[lane].wait_time(len(pending[0][0]))
+                    if delay == 0.0:
+                        item = pending.popleft() + (lane,)
+                        break
+                    wait = delay if wait is None else min(wait, delay)
+                if item is None:
+                    self._send_cond.wait(wait if wait is not None else 1.0)
+                    continue
+            raw, target, message_type, _, lane = item
+            sent = self._transmit(raw, target, message_type)
+            self._buckets[lane].take(sent)
+            self.lane_stats[f"{LANE_NAMES[lane]}_sent"] += 1
+
     def _heartbeat_loop(self):
         while self.running and self._sock:
             hb = {
@@ -283,21 +430,88 @@ class ScheduleSyncService:
                 "device_id": self.device_id,
                 "ip": get_local_ip(),
                 "schedule_hash": self.schedule_hash,
-                "ts": time.time(),
+                "ts": cluster_time(),
+                "clock": self.clock.status(),
             }
             self._send(hb)
+            self._send_clock_probes()
             self._drop_stale_peers()
             time.sleep(SCHEDULE_SYNC_HEARTBEAT)
 
+    def _send_clock_probes(self):
+        """Пробы часов координатору (см. core.cluster_clock)."""
+        target = self.coordinator_address()
+        if not target:
+            return
+        for _ in range(self.clock.probes_wanted()):
+            self._send(
+                {"type": "clock_probe", "device_id": self.device_id, "t1": self.clock.local_time()},
+                target=target,
+            )
+
     def _send(self, payload: Dict[str, Any], target: Optional[str] = None):
         if not self._sock:
             return
         try:
             raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-            addr = (target or "<broadcast>", SCHEDULE_SYNC_PORT)
-            self._sock.sendto(raw, addr)
         except Exception as e:
             self._log(f"[sync] ошибка отправки: {e}")
+            return
+        message_type = payload.get("type")
+        lane = MESSAGE_LANES.get(message_type, LANE_LIVE)
+        if lane == LANE_LIVE:
+            self._transmit(raw, target, message_type)
+            return
+        transfer_id = payload.get("transfer_id") if message_type == "schedule_chunk" else None
+        dropped: Optional[Tuple[str, int]] = None
+        with self._send_cond:
+            pending = self._lanes[lane]
+            if transfer_id is not None and transfer_id in self._dropped_transfers:
+                # Передача уже отброшена целиком — её оставшиеся чанки бесполезны
+                self.lane_stats[f"{LANE_NAMES[lane]}_dropped"] += 1
+                return
+            if len(pending) >= LANE_QUEUE[lane]:
+                dropped = self._drop_oldest(lane)
+            if dropped is None or dropped[0] != transfer_id:
+                pending.append((raw, target, message_type, transfer_id))
+                self._send_cond.notify()
+            else:
+                self.lane_stats[f"{LANE_NAMES[lane]}_dropped"] += 1
+        if dropped is not None:
+            self._log(
+                f"[sync] очередь {LANE_NAMES[lane]} переполнена: передача расписания "
+                f"{dropped[0]} отброшена целиком (пакетов: {dropped[1]})"
+            )
+
+    def _drop_oldest(self, lane: int) -> Optional[Tuple[str, int]]:
+        """
+        Освобождает место в очереди (под _send_cond): убирает самый старый пакет,
+        а если это чанк расписания — все чанки его передачи. Возвращает
+        (transfer_id, число убранных пакетов) для отброшенной передачи.
+        """
+        pending = self._lanes[lane]
+        transfer_id = pending.popleft()[3]
+        removed = 1
+        if transfer_id is not None:
+            kept = [item for item in pending if item[3] != transfer_id]
+            removed += len(pending) - len(kept)
+            pending.clear()
+            pending.extend(kept)
+            self._dropped_transfers.append(transfer_id)
+        self.lane_stats[f"{LANE_NAMES[lane]}_dropped"] += removed
+        return (transfer_id, removed) if transfer_id is not None else None
+
+    def _transmit(self, raw: bytes, target: Optional[str], message_type: Optional[str] = None) -> int:
+        """Отправка готового пакета; возвращает число байт, ушедших в сеть."""
+        sock = self._sock
+        if not sock:
+            return 0
+        try:
+            sock.sendto(raw, (target or self.broadcast_address, self.port))
+            return len(raw)
+        except Exception as e:
+            self._log(f"[sync] ошибка отправки: {e}")
+            return 0
     
     def send_log(self, log_data: Dict[str, Any]):
         """Отправляет лог-запись на coordinator"""
@@ -313,7 +527,7 @@ class ScheduleSyncService:
             "log_data": log_data,
             "device": self.device_name,
             "device_id": self.device_id,
-            "ts": time.time(),
+            "ts": cluster_time(),
         }
         self._send(payload, target=self.coordinator_host)
 
@@ -336,7 +550,7 @@ class ScheduleSyncService:
                 "device": self.device_name,
                 "device_id": self.device_id,
                 "transfer_id": transfer_id,
-                "ts": time.time(),
+                "ts": cluster_time(),
             }
             self._send(payload)
 
@@ -344,7 +558,7 @@ class ScheduleSyncService:
             f"[sync] отправлено расписание чанками ({len(schedule)} записей, {total_chunks} пакетов)"
         )
 
-    def _handle_message(self, message: Dict[str, Any], sender_ip: str):
+    def _handle_message(self, message: Dict[str, Any], sender_ip: str, received_at: Optional[float] = None):
         if not isinstance(message, dict):
             return
         # Не обрабатываем свои сообщения
@@ -352,24 +566,47 @@ class ScheduleSyncService:
             return
 
         msg_type = message.get("type")
+        # Пробы часов не меняют состояние узлов и не ретранслируются
+        if msg_type == "clock_probe":
+            if self.role == "coordinator" and "t1" in message:
+                t2 = received_at if received_at is not None else self.clock.now()
+                self._send(
+                    {"type": "clock_reply", "to": message.get("device_id"), "device_id": self.device_id,
+                     "t1": message["t1"], "t2": t2, "t3": self.clock.now()},
+                    target=sender_ip,
+                )
+            return
+        if msg_type == "clock_reply":
+            if message.get("to") == self.device_id and self.role != "coordinator":
+                t4 = received_at if received_at is not None else self.clock.local_time()
+                try:
+                    self.clock.add_probe(float(message["t1"]), float(message["t2"]), float(message["t3"]), t4)
+                except (KeyError, TypeError, ValueError):
+                    pass
+            return
+
         device_id = message.get("device_id", sender_ip)
         now = time.time()
 
-        # Обновляем peers
-        peer_info = self.peers.get(device_id, {})
-        peer_info.update(
-            {
-                "device": message.get("device"),
-                "ip": sender_ip,
-                "role": message.get("role"),
-                "mat": message.get("mat"),
-                "schedule_hash": message.get("schedule_hash"),
-                "last_seen": now,
-                "status": message.get("status"),
-                "current_match": message.get("current_match"),
-            }
-        )
-        self.peers[device_id] = peer_info
+        # Обновляем peers; запись заменяется копией, а не меняется на месте:
+        # её мог получить через get_peers() другой поток
+        with self._state_lock:
+            peer_info = dict(self.peers.get(device_id, {}))
+            peer_info.update(
+                {
+                    "device": message.get("device"),
+                    "ip": sender_ip,
+                    "role": message.get("role"),
+                    "mat": message.get("mat"),
+                    "schedule_hash": message.get("schedule_hash"),
+                    "last_seen": now,
+                    "status": message.get("status"),
+                    "current_match": message.get("current_match"),
+                }
+            )
+            if "clock" in message:
+                peer_info["clock"] = message["clock"]
+            self.peers[device_id] = peer_info
         if self.on_peer_update:
             self.on_peer_update(self.get_peers())
 
@@ -389,6 +626,8 @@ class ScheduleSyncService:
                     relay_message["mat"] = self.mat_number
                     self._send(relay_message)
         elif msg_type == "schedule_chunk":
+            if not self._first_seen(message):
+                return
             transfer_id = message.get("transfer_id") or message.get("schedule_hash") or ""
             chunk_idx = message.get("chunk_index")
             total_chunks = message.get("total_chunks") or 1
@@ -399,14 +638,18 @@ class ScheduleSyncService:
             if chunk_idx is None or chunk_idx < 0 or chunk_idx >= total_chunks:
                 return
 
-            # Сохраняем кусок
-            entry = self._incoming_schedule_parts.setdefault(
-                transfer_id,
-                {"total": total_chunks, "received": {}, "hash": incoming_hash, "ts": time.time()},
-            )
-            entry["received"][chunk_idx] = part
-            entry["total"] = total_chunks  # на случай, если первый пакет пришел не первым
-            entry["hash"] = incoming_hash or entry.get("hash", "")
+            # Сохраняем кусок; собранную передачу забирает из хранилища один поток
+            with self._state_lock:
+                entry = self._incoming_schedule_parts.setdefault(
+                    transfer_id,
+                    {"total": total_chunks, "received": {}, "hash": incoming_hash, "ts": time.time()},
+                )
+                entry["received"][chunk_idx] = part
+                entry["total"] = total_chunks  # на случай, если первый пакет пришел не первым
+                entry["hash"] = incoming_hash or entry.get("hash", "")
+                complete = len(entry["received"]) >= entry["total"]
+                if complete:
+                    self._incoming_schedule_parts.pop(transfer_id, None)
 
             # Ретрансляция чанка для покрытия сети (аналогично полной отправке)
             if self.allow_relay and self.role != "coordinator":
@@ -416,26 +659,24 @@ class ScheduleSyncService:
                 self._send(relay_message)
 
             # Проверяем, собрали ли всё
-            if len(entry["received"]) >= entry["total"]:
+            if complete:
                 combined: List[Any] = []
                 for idx in range(entry["total"]):
                     combined.extend(entry["received"].get(idx, []))
 
-                self._incoming_schedule_parts.pop(transfer_id, None)
-
+                # Дальше собранное расписание не рассылается: каждый чанк уже
+                # ретранслирован выше, повторная передача умножала трафик на число узлов
                 if entry["hash"] and entry["hash"] != self.schedule_hash:
                     self.schedule_hash = entry["hash"]
                     if self.on_schedule_received:
                         self.on_schedule_received(_deduplicate_schedule(combined), sender_ip)
-                    # Ретрансляция при необходимости (только для node/relay, НЕ для coordinator)
-                    # Coordinator принимает расписание, но не отправляет его обратно, чтобы избежать циклов
-                    if self.allow_relay and self.role != "coordinator":
-                        # Рассылаем дальше уже собранное расписание, соблюдая лимит
-                        self._send_schedule_chunks(_deduplicate_schedule(combined))
         elif msg_type == "mat_status":
             # Координатор обновляет статус ковра
             pass  # статус уже записан в peers
         elif msg_type == "match_update":
+            # Копия, вернувшаяся через ретрансляцию другого узла, — уже учтена
+            if not self._first_seen(message):
+                return
             # Обновление одного матча в реальном времени
             match_data = message.get("match")
             if match_data:
@@ -462,14 +703,36 @@ class ScheduleSyncService:
             if self.role == "coordinator" and self.on_log_received:
                 self.on_log_received(message.get("log_data", {}))
 
+    def _first_seen(self, message: Dict[str, Any]) -> bool:
+        """
+        True — сообщение пришло впервые. Ретранслированные копии сохраняют
+        device_id и ts отправителя; без отсечки узлы пересылают их друг другу
+        бесконечно.
+        """
+        key = (
+            message.get("device_id"),
+            message.get("type"),
+            message.get("ts"),
+            message.get("transfer_id"),
+            message.get("chunk_index"),
+        )
+        with self._seen_lock:
+            if key in self._seen:
+                return False
+            self._seen[key] = None
+            if len(self._seen) > SEEN_MESSAGES:
+                self._seen.popitem(last=False)
+            return True
+
     def _drop_stale_peers(self):
         """Убираем узлы, которые давно не отвечали."""
         now = time.time()
         removed = []
-        for device_id, info in list(self.peers.items()):
-            if now - info.get("last_seen", 0) > SCHEDULE_SYNC_TIMEOUT:
-                removed.append(device_id)
-                self.peers.pop(device_id, None)
+        with self._state_lock:
+            for device_id, info in list(self.peers.items()):
+                if now - info.get("last_seen", 0) > SCHEDULE_SYNC_TIMEOUT:
+                    removed.append(device_id)
+                    self.peers.pop(device_id, None)
         if removed and self.on_peer_update:
             self.on_peer_update(self.get_peers())
 
@@ -1,10 +1,11 @@
 # sports/greco_roman/constants.py
-SPORT_NAME = "Вольная борьба"
+SPORT_NAME = "Греко-римская борьба"
 SPORT_ICON = "🤼"
 
-PERIOD_DURATION = 120  # 2 минуты
+PERIOD_DURATION = 180  # 3 минуты
 BREAK_DURATION = 30
-PERIODS = 3
-TECHNICAL_SUPERIORITY = 10
-CAUTION_LIMIT = 4
-PASSIVITY_ENABLED = False
\ No newline at end of file
+PERIODS = 2
+TECHNICAL_SUPERIORITY = 8
+CAUTION_LIMIT = 3
+PASSIVITY_ENABLED = True
+PASSIVITY_POINT_LIMIT = 2  # очко сопернику за первые две пассивности
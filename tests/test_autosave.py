@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+import core.autosave as autosave
+from core.autosave import SnapshotService, take_snapshot, write_json_atomic
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = SnapshotService(autosave_dir=str(tmp_path / "autosave"), keep=3)
+    yield service
+    service.shutdown()
+
+
+def test_snapshot_is_detached_from_later_edits(tmp_path):
+    data = {"name": "Кубок", "categories": {"A": {"participants": [1, 2]}}}
+    snapshot = take_snapshot(data)
+    data["categories"]["A"]["participants"].append(3)
+    path = write_json_atomic(str(tmp_path / "t.json"), snapshot)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["categories"]["A"]["participants"] == [1, 2]
+    assert os.listdir(tmp_path) == ["t.json"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "t.json")
+    write_json_atomic(path, take_snapshot({"v": 1}))
+
+    def broken_dump(*args, **kwargs):
+        raise ValueError("сбой сериализации")
+
+    monkeypatch.setattr(autosave.json, "dump", broken_dump)
+    with pytest.raises(ValueError):
+        write_json_atomic(path, take_snapshot({"v": 2}))
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"v": 1}
+    # Временный файл не остаётся рядом с целевым
+    assert os.listdir(tmp_path) == ["t.json"]
+
+
+def test_autosave_skips_unchanged_data(service):
+    data = {"name": "Кубок города", "categories": {}}
+    path = service.autosave(data).result(timeout=10)
+    assert os.path.basename(path).startswith("autosave_Кубок_города_")
+    assert service.autosave(data) is None
+    data["categories"]["A"] = {}
+    assert service.autosave(data) is not None
+    assert service.autosave(None) is None
+
+
+def test_prune_keeps_latest_files_of_one_tournament(service):
+    os.makedirs(service.autosave_dir)
+    names = [f"autosave_cup_20261019_1000{i}.json" for i in range(5)] + ["autosave_other_20261019_100000.json"]
+    for name in names:
+        open(os.path.join(service.autosave_dir, name), "w").close()
+    service._prune("cup")
+    assert sorted(os.listdir(service.autosave_dir)) == sorted(names[2:])
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from core.bout_recorder import REC_BOARD, REC_END, REC_EVENT, BoutRecorder, BoutReplay, read_bout
+
+
+class FakeClock:
+    def __init__(self, value=100.0):
+        self.value = value
+        self.slept = []
+
+    def __call__(self):
+        return self.value
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.value += seconds
+
+
+def record_bout(path, clock):
+    recorder = BoutRecorder(str(path), header={"mat": 1, "match_id": "m1"}, clock=clock)
+    board = {"mat": 1, "category": "55 кг", "red": {"points": 0}, "blue": {"points": 0}, "hint": "старт"}
+    recorder.board(board)
+    clock.value += 2.0
+    recorder.record(REC_EVENT, event={"kind": "points", "corner": "red", "points": 2})
+    recorder.board(dict(board, red={"points": 2}, hint="старт"))
+    recorder.board(dict(board, red={"points": 2}, hint="старт"))
+    clock.value += 3.0
+    recorder.board({"mat": 1, "category": "55 кг", "red": {"points": 2}, "blue": {"points": 1}})
+    recorder.record(REC_END, reason="points", winner="red")
+    recorder.close()
+    return recorder
+
+
+def test_board_deltas_round_trip_to_full_messages(tmp_path):
+    path = tmp_path / "bouts" / "m1.jsonl"
+    recorder = record_bout(path, FakeClock())
+    # Повтор без изменений не пишется
+    assert recorder.records == 5 and recorder.closed
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines[3]["data"] == {"red": {"points": 2}}
+    assert lines[4]["data"] == {"blue": {"points": 1}, "_removed": ["hint"]}
+
+    header, records = read_bout(str(path))
+    assert header["match_id"] == "m1" and header["t0"] == 100.0
+    assert [r["k"] for r in records] == [REC_BOARD, REC_EVENT, REC_BOARD, REC_BOARD, REC_END]
+    assert [r["t"] for r in records] == [0.0, 2.0, 2.0, 5.0, 5.0]
+    assert records[2]["data"]["hint"] == "старт"
+    assert records[3]["data"] == {"mat": 1, "category": "55 кг", "red": {"points": 2}, "blue": {"points": 1}}
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    path = tmp_path / "m1.jsonl"
+    record_bout(path, FakeClock())
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"t": 6.0, "k": "ev')
+    _, records = read_bout(str(path))
+    assert len(records) == 5 and records[-1]["k"] == REC_END
+
+
+def test_replay_keeps_intervals_scaled_by_speed(tmp_path):
+    path = tmp_path / "m1.jsonl"
+    record_bout(path, FakeClock())
+    clock = FakeClock(0.0)
+    replay = BoutReplay(str(path), speed=10.0, clock=clock, sleep=clock.sleep)
+    seen = []
+    assert replay.play(lambda r: seen.append((clock.value, r["k"])), kinds=(REC_BOARD,)) == 3
+    assert seen == [(0.0, REC_BOARD), (pytest.approx(0.2), REC_BOARD), (pytest.approx(0.5), REC_BOARD)]
+    assert sum(clock.slept) == pytest.approx(0.5)
+    # После воспроизведения часы записи стоят на её конце
+    assert replay.now() == pytest.approx(105.0)
+
+
+def test_replay_without_pauses_and_speed_limits(tmp_path):
+    path = tmp_path / "m1.jsonl"
+    record_bout(path, FakeClock())
+    clock = FakeClock(0.0)
+    replay = BoutReplay(str(path), speed=None, clock=clock, sleep=clock.sleep)
+    assert replay.play(lambda r: None) == 5 and clock.slept == []
+    for speed in (0.5, 101.0):
+        with pytest.raises(ValueError):
+            BoutReplay(str(path), speed=speed)
@@ -0,0 +1,94 @@
+import pytest
+
+from core.cluster_clock import SLEW_RATE, ClusterClock, is_stale_update
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.value = 0.0
+
+    def __call__(self):
+        return self.value
+
+
+def make_clock():
+    mono = FakeMonotonic()
+    return ClusterClock(monotonic=mono, wall=lambda: 1000.0), mono
+
+
+def probe(clock, mono, offset, delay=0.02, at=None):
+    """Проба к координатору, чьи часы впереди на offset; задержка делится поровну."""
+    if at is not None:
+        mono.value = at
+    t1 = clock.local_time()
+    t2 = t1 + offset + delay / 2
+    return clock.add_probe(t1, t2, t2, t1 + delay)
+
+
+def test_first_probe_steps_to_coordinator():
+    clock, mono = make_clock()
+    assert clock.now() == 1000.0 and not clock.synced
+    assert probe(clock, mono, 5.0) == pytest.approx((5.0, 0.02))
+    assert clock.synced
+    assert clock.now() == pytest.approx(1005.0)
+
+
+def test_backward_correction_is_slewed_and_time_never_decreases():
+    clock, mono = make_clock()
+    probe(clock, mono, 5.0)
+    for _ in range(3):
+        probe(clock, mono, 4.0, delay=0.01)
+    before = clock.now()
+    mono.value += 1.0
+    after = clock.now()
+    # За секунду хода поправка не больше SLEW_RATE
+    assert after - before == pytest.approx(1.0 - SLEW_RATE)
+    # Секунда поправки набирается за 1 / SLEW_RATE секунд хода
+    for _ in range(250):
+        mono.value += 0.1
+        value = clock.now()
+        assert value >= after
+        after = value
+    assert clock.status()["offset_ms"] == pytest.approx(4000.0)
+
+
+def test_large_forward_jump_is_applied_at_once():
+    clock, mono = make_clock()
+    probe(clock, mono, 0.0)
+    for _ in range(3):
+        probe(clock, mono, 60.0, delay=0.01)
+    assert clock.now() == pytest.approx(1060.0)
+
+
+def test_high_delay_probes_do_not_move_the_estimate():
+    clock, mono = make_clock()
+    for _ in range(3):
+        probe(clock, mono, 1.0, delay=0.01)
+    for _ in range(3):
+        probe(clock, mono, 3.0, delay=0.5)
+    mono.value += 60.0
+    clock.now()
+    assert clock.status()["offset_ms"] == pytest.approx(1000.0)
+    assert clock.status()["delay_ms"] == pytest.approx(10.0)
+
+
+def test_skew_is_estimated_from_spread_probes():
+    clock, mono = make_clock()
+    for i in range(6):
+        probe(clock, mono, 1.0 + 100e-6 * 60.0 * i, at=60.0 * i)
+    assert clock.status()["skew_ppm"] == pytest.approx(100.0, abs=0.5)
+
+
+def test_reference_ignores_probes():
+    clock, mono = make_clock()
+    clock.set_reference(True)
+    assert clock.probes_wanted() == 0
+    probe(clock, mono, 5.0)
+    assert clock.now() == 1000.0 and clock.status()["samples"] == 0
+
+
+def test_stale_update_by_cluster_timestamp():
+    assert is_stale_update({"updated_ts": 10.0}, {"updated_ts": 9.5})
+    assert not is_stale_update({"updated_ts": 10.0}, {"updated_ts": 10.0})
+    assert not is_stale_update({}, {"updated_ts": 9.5})
+    assert not is_stale_update({"updated_ts": "—"}, {"updated_ts": 9.5})
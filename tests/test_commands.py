@@ -0,0 +1,66 @@
+from core.commands import MAX_COMMANDS, CommandStack
+from core.rules import BLUE, EVENT_CAUTION, EVENT_POINTS, RED, BoutState, ScoringEvent
+from core.sport_loader import SportLoader
+
+
+def points(corner, value):
+    return ScoringEvent(EVENT_POINTS, corner, points=value)
+
+
+def fields(state):
+    return [(c.points, c.cautions, c.passivity, c.last_scored) for c in (state.red, state.blue)]
+
+
+def test_undo_redo_restore_exact_fields_and_history():
+    engine = SportLoader.load_rules("greco_roman")
+    state = BoutState()
+    stack = CommandStack()
+    stack.execute(engine, state, points(RED, 2))
+    command = stack.execute(engine, state, ScoringEvent(EVENT_CAUTION, BLUE))
+    command.log(state, BLUE, "Предупреждение")
+    after = fields(state)
+
+    assert stack.undo(state) is command
+    assert fields(state) == [(2, 0, 0, True), (0, 0, 0, False)]
+    assert state.blue.action_history == []
+    assert stack.can_redo
+
+    stack.redo(state)
+    assert fields(state) == after
+    assert state.blue.action_history == ["Предупреждение"]
+
+
+def test_new_command_drops_redo_branch():
+    engine = SportLoader.load_rules("freestyle")
+    state = BoutState()
+    stack = CommandStack()
+    stack.execute(engine, state, points(RED, 1))
+    stack.undo(state)
+    stack.execute(engine, state, points(BLUE, 2))
+    assert not stack.can_redo and stack.redo(state) is None
+    assert len(stack) == 1
+
+
+def test_undo_keeps_result_line_written_after_command():
+    engine = SportLoader.load_rules("greco_roman")
+    state = BoutState()
+    stack = CommandStack()
+    command = stack.execute(engine, state, points(RED, 1))
+    command.log(state, RED, "+1")
+    state.red.action_history.append("Итог: победа")
+    stack.undo(state)
+    assert state.red.action_history == ["Итог: победа"]
+
+
+def test_stack_is_bounded_and_round_trips():
+    engine = SportLoader.load_rules("greco_roman")
+    state = BoutState()
+    stack = CommandStack(limit=3)
+    for corner in (RED, BLUE, RED, BLUE):
+        stack.execute(engine, state, points(corner, 1))
+    assert len(stack) == 3
+
+    restored = CommandStack.from_list(stack.to_list() + [{"event": {}}])
+    assert restored.limit == MAX_COMMANDS and len(restored) == 3
+    restored.undo(state)
+    assert (state.red.points, state.blue.points) == (2, 1)
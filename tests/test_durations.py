@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from core.durations import (
+    DEFAULT_BOUT_MINUTES,
+    PRIOR_STRENGTH,
+    DurationModel,
+    age_group_for_age,
+    category_age_group,
+    current_schedule_minutes,
+)
+
+
+def test_age_groups_from_age_range_and_participants():
+    assert [age_group_for_age(a) for a in (10, 11, 16, 19, 25, None, 0)] == [
+        "U11", "U13", "U17", "U20", "Взрослые", "", ""]
+    assert category_age_group({"age_min": 15, "age_max": 16}) == "U17"
+    # age_max = 99 означает «без ограничения» — берём медиану участников
+    participants = [{"age": 12}, {"age": 13}, {"age": "нет"}, {"age": 14}]
+    assert category_age_group({"age_min": 0, "age_max": 99, "participants": participants}) == "U15"
+
+
+def test_estimate_moves_from_prior_to_median_with_samples():
+    model = DurationModel()
+    assert model.bout_minutes("greco_roman", "U17") == DEFAULT_BOUT_MINUTES
+    assert model.slot_minutes("greco_roman", "U17") == 8
+    for _ in range(PRIOR_STRENGTH):
+        model.record("greco_roman", "U17", 4 * 60)
+    # Вид спорта: (5 * 4 + 5 * 7) / 10; группа тянется уже к оценке вида спорта
+    assert model.bout_minutes("greco_roman", "U20") == 5.5
+    assert model.bout_minutes("greco_roman", "U17") == (5 * 4 + 5 * 5.5) / 10
+    assert model.bout_minutes("freestyle", "U17") == DEFAULT_BOUT_MINUTES
+
+
+def test_record_rejects_outliers_and_invalidates_only_its_sport():
+    model = DurationModel()
+    assert not model.record("greco_roman", "U17", 5)
+    assert not model.record("greco_roman", "U17", 2 * 60 * 60)
+    assert not model.record("greco_roman", "U17", "—")
+    assert model.sample_count() == 0
+
+    model.bout_minutes("freestyle", "U17")
+    model.bout_minutes("greco_roman", "U17")
+    assert model.record("greco_roman", "U17", 3 * 60)
+    assert set(model._cache) == {("freestyle", "U17")}
+    assert model.sample_count("greco_roman") == 1
+    assert model.bout_minutes("greco_roman", "U17") < DEFAULT_BOUT_MINUTES
+
+
+def test_current_schedule_minutes_counts_tournament_days():
+    data = {"date": "18.10.2026"}
+    assert current_schedule_minutes(data, datetime(2026, 10, 18, 9, 30)) == 570
+    assert current_schedule_minutes(data, datetime(2026, 10, 19, 0, 15)) == 24 * 60 + 15
+    # До начала турнира и без даты — минуты текущих суток
+    assert current_schedule_minutes(data, datetime(2026, 10, 17, 9, 30)) == 570
+    assert current_schedule_minutes({}, datetime(2026, 10, 19, 9, 30)) == 570
@@ -0,0 +1,73 @@
+import threading
+
+import core.journal
+from core.journal import (
+    OP_MATCH_UPDATE, OP_SCHEDULE_DELTA, TournamentJournal, apply_op, schedule_delta,
+)
+
+
+def entry(match_id, minutes, **fields):
+    return dict({"match_id": match_id, "mat": 1, "start_min": minutes, "status": "Ожидание"}, **fields)
+
+
+def test_compaction_keeps_ops_appended_after_snapshot(tmp_path):
+    journal = TournamentJournal("t", directory=str(tmp_path))
+    data = {"name": "Т", "schedule": [entry("a", 600), entry("b", 610)]}
+    journal.append(OP_MATCH_UPDATE, match={"match_id": "a", "status": "Завершен"})
+    data["schedule"][0]["status"] = "Завершен"
+    journal.compact(data)
+    journal.append(OP_MATCH_UPDATE, match={"match_id": "b", "status": "В процессе"})
+    journal.close()
+
+    recovered = TournamentJournal("t", directory=str(tmp_path)).recover()
+    assert [m["status"] for m in recovered["schedule"]] == ["Завершен", "В процессе"]
+    assert journal.pending_ops() == 1
+
+
+def test_append_from_other_thread_waits_for_snapshot(tmp_path, monkeypatch):
+    journal = TournamentJournal("t", directory=str(tmp_path))
+    data = {"name": "Т", "schedule": [entry("a", 600)]}
+    real_snapshot = core.journal.take_snapshot
+
+    def racing_snapshot(tournament_data):
+        # Запись из сетевого потока в момент снимка: без блокировки она
+        # получила бы номер, уже «учтённый» снимком, и пропала бы при очистке
+        writer = threading.Thread(
+            target=journal.append, args=(OP_MATCH_UPDATE,),
+            kwargs={"match": {"match_id": "a", "status": "Завершен"}},
+        )
+        writer.start()
+        writer.join(0.1)
+        return real_snapshot(tournament_data)
+
+    monkeypatch.setattr(core.journal, "take_snapshot", racing_snapshot)
+    journal.compact(data)
+    journal.close()
+
+    recovered = TournamentJournal("t", directory=str(tmp_path)).recover()
+    assert recovered["schedule"][0]["status"] == "Завершен"
+
+
+def test_compact_wait_writes_snapshot_on_writer_thread(tmp_path):
+    journal = TournamentJournal("t", directory=str(tmp_path))
+    for i in range(5):
+        journal.append(OP_MATCH_UPDATE, match={"match_id": f"m{i}"})
+    journal.compact({"name": "Т", "schedule": []}, wait=True)
+    assert journal.pending_ops() == 0
+    assert (tmp_path / "t.journal.jsonl").read_text(encoding="utf-8") == ""
+    journal.close()
+
+
+def test_schedule_delta_round_trip():
+    previous = [entry("a", 600), entry("b", 610), entry("c", 620)]
+    current = [entry("a", 600), entry("c", 605, status="Завершен"), entry("d", 630)]
+    changed, removed = schedule_delta(previous, current)
+    assert [m["match_id"] for m in changed] == ["c", "d"] and removed == ["b"]
+
+    data = {"schedule": [dict(m) for m in previous]}
+    apply_op(data, {"op": OP_SCHEDULE_DELTA, "matches": changed, "removed": removed})
+    assert data["schedule"] == current
+
+
+def test_schedule_delta_needs_match_ids():
+    assert schedule_delta([{"mat": 1, "time": "10:00"}], []) is None
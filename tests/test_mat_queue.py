@@ -0,0 +1,88 @@
+from core.mat_queue import STATUS_COMPLETED, STATUS_IN_PROGRESS, MatCallQueue
+from core.schedule_time import set_schedule_minutes
+
+
+def bout(match_id, mat, minutes, round_num=1, status="Ожидание"):
+    match = {"match_id": match_id, "mat": mat, "round": round_num, "status": status}
+    set_schedule_minutes(match, minutes)
+    return match
+
+
+def call(queue, mat):
+    """Как load_next_match: извлечь схватку и перевести её в «В процессе»."""
+    match = queue.pop(mat)
+    if match is not None:
+        match["status"] = STATUS_IN_PROGRESS
+    return match
+
+
+def test_pop_follows_time_then_round_per_mat():
+    schedule = [bout("b", 1, 610), bout("a", 1, 600, 2), bout("c", 1, 600, 1), bout("x", 2, 590)]
+    queue = MatCallQueue(schedule)
+    assert [m["match_id"] for m in queue.peek(1, 3)] == ["c", "a", "b"]
+    assert queue.pop(1)["match_id"] == "c"
+    assert queue.pending_count(1) == 2 and queue.pending_count() == 3
+
+
+def test_notified_changes_reorder_queue():
+    schedule = [bout("a", 1, 600), bout("b", 1, 610)]
+    queue = MatCallQueue(schedule)
+    set_schedule_minutes(schedule[1], 590)
+    queue.update(schedule[1])
+    schedule[0]["status"] = STATUS_COMPLETED
+    queue.update(schedule[0])
+    assert [m["match_id"] for m in queue.pending(1)] == ["b"]
+
+
+def test_time_edit_without_notify_rebuilds_mat():
+    schedule = [bout("a", 1, 600), bout("b", 1, 610), bout("c", 1, 620)]
+    queue = MatCallQueue(schedule)
+    set_schedule_minutes(schedule[0], 630)
+    assert [call(queue, 1)["match_id"] for _ in range(3)] == ["b", "c", "a"]
+    assert call(queue, 1) is None
+
+
+def test_unnotified_revert_to_pending_is_found():
+    schedule = [bout("a", 1, 600), bout("b", 1, 610), bout("c", 1, 620)]
+    queue = MatCallQueue(schedule)
+    first = call(queue, 1)
+    # Другая схватка ушла с ковра без уведомления — чтение замечает расхождение
+    schedule[1]["mat"] = 2
+    first["status"] = "Ожидание"
+    assert queue.pop(1)["match_id"] == "a"
+    assert queue.pop(1)["match_id"] == "c"
+    assert queue.pop(2)["match_id"] == "b"
+
+
+def test_drained_mat_does_not_rescan_schedule(monkeypatch):
+    schedule = [bout("a", 1, 600)] + [bout(f"m{i}", 2, 600 + i) for i in range(100)]
+    queue = MatCallQueue(schedule)
+    assert call(queue, 1)["match_id"] == "a"
+
+    def no_scan(mat):
+        raise AssertionError("пустая очередь не должна перечитывать расписание")
+
+    monkeypatch.setattr(queue, "_rebuild_mat", no_scan)
+    assert call(queue, 1) is None
+    assert call(queue, 1) is None
+
+
+def test_notified_revert_after_queue_drained():
+    schedule = [bout("a", 1, 600)]
+    queue = MatCallQueue(schedule)
+    assert call(queue, 1)["match_id"] == "a"
+    assert call(queue, 1) is None
+    schedule[0]["status"] = "Ожидание"
+    queue.update(schedule[0])
+    assert queue.pop(1)["match_id"] == "a"
+
+
+def test_compaction_uses_mat_live_entries():
+    schedule = [bout("a", 1, 600)] + [bout(f"m{i}", 2, 600 + i) for i in range(500)]
+    queue = MatCallQueue(schedule)
+    for minute in range(200):
+        set_schedule_minutes(schedule[0], 700 + minute)
+        queue.update(schedule[0])
+    # Порог считается по одной живой записи ковра 1, а не по 501 записи всех ковров
+    assert len(queue._heaps[1]) <= 2 * 1 + 64 + 1
+    assert queue.pop(1)["match_id"] == "a"
@@ -0,0 +1,71 @@
+from core.match_clock import MatchClock
+
+
+def make_clock(duration=180, marks=(30, 10, 0)):
+    fired = []
+    clock = MatchClock(duration, marks=marks, on_mark=fired.append, clock=lambda: 0.0)
+    return clock, fired
+
+
+def test_pause_resume_accounting():
+    clock, _ = make_clock()
+    assert clock.start(now=100.0)
+    assert not clock.start(now=101.0)
+    assert clock.pause(now=130.5)
+    assert not clock.pause(now=131.0)
+    # На паузе остаток и чистое время не идут
+    assert clock.remaining(now=500.0) == 149.5
+    assert clock.running_time(now=500.0) == 30.5
+    clock.start(now=600.0)
+    clock.pause(now=610.0)
+    assert (clock.remaining(), clock.running_time(), clock.pause_count) == (139.5, 40.5, 2)
+    assert clock.seconds() == 140
+
+
+def test_edit_while_running_moves_deadline():
+    clock, _ = make_clock()
+    clock.start(now=0.0)
+    clock.set(60, now=10.0)
+    assert clock.running and clock.remaining(now=15.0) == 55.0
+    # Правка не меняет учёт чистого времени хода
+    assert clock.running_time(now=15.0) == 15.0
+
+
+def test_marks_fire_once_and_rearm_after_set():
+    clock, fired = make_clock(duration=40)
+    clock.start(now=0.0)
+    assert clock.poll(now=5.0) == []
+    assert clock.poll(now=10.2) == [30]
+    assert clock.poll(now=11.0) == []
+    # Правка выше отметки снова её включает
+    clock.set(35, now=12.0)
+    assert clock.poll(now=17.0) == [30]
+    assert fired == [30, 30]
+
+
+def test_set_below_mark_does_not_fire_it():
+    clock, fired = make_clock(duration=60)
+    clock.start(now=0.0)
+    clock.set(20, now=1.0)
+    assert clock.poll(now=2.0) == []
+    assert clock.poll(now=11.5) == [10]
+    assert fired == [10]
+
+
+def test_stop_at_zero():
+    clock, fired = make_clock(duration=40)
+    clock.start(now=0.0)
+    # Опрос с опозданием: все пройденные отметки сразу, по убыванию
+    assert clock.poll(now=45.0) == [30, 10, 0]
+    assert not clock.running
+    assert (clock.remaining(now=50.0), clock.running_time(now=50.0)) == (0.0, 40.0)
+    assert not clock.start(now=50.0)
+    assert fired == [30, 10, 0]
+
+
+def test_reset_restores_duration_and_counters():
+    clock, _ = make_clock(duration=40)
+    clock.start(now=0.0)
+    clock.pause(now=5.0)
+    clock.reset(120)
+    assert (clock.remaining(), clock.running_time(), clock.pause_count, clock.running) == (120.0, 0.0, 0, False)
@@ -0,0 +1,146 @@
+import contextlib
+import io
+import socket
+import threading
+import time
+
+import core.network as network
+from core.network import TOPIC_SCHEDULE, NetworkManager
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_client_drops_repeated_and_stale_seqs():
+    client = NetworkManager(port=free_port())
+    seen = []
+    client.subscribe(TOPIC_SCHEDULE, lambda message, sock: seen.append(message["seq"]))
+    for seq in (1, 2, 2, 1, 4, 3, 5):
+        client._handle_message({"type": "match_update", "topic": TOPIC_SCHEDULE, "seq": seq, "data": {}}, None)
+    assert seen == [1, 2, 4, 5]
+
+
+def test_reconnect_delivers_each_message_once():
+    port = free_port()
+    server, client = NetworkManager(port=port), NetworkManager(port=port)
+    client.reconnect_base = 0.05
+    received = []
+    client.subscribe(TOPIC_SCHEDULE, lambda message, sock: received.append(message["data"]["n"]))
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            assert server.start_server("127.0.0.1")
+            assert client.connect_to_server("127.0.0.1")
+            assert wait_for(lambda: server._subscriptions)
+            for n in range(20):
+                server.send_message("match_update", {"n": n})
+            assert wait_for(lambda: len(received) == 20)
+
+            client.client_sockets[0].shutdown(socket.SHUT_RDWR)
+            for n in range(20, 30):
+                server.send_message("match_update", {"n": n})
+            assert wait_for(lambda: client.reconnects == 1 and len(received) >= 30)
+            for n in range(30, 35):
+                server.send_message("match_update", {"n": n})
+            assert wait_for(lambda: len(received) >= 35)
+            time.sleep(0.1)
+        finally:
+            client.stop()
+            server.stop()
+    assert received == list(range(35))
+
+
+def test_reconnect_under_continuous_publishing_loses_nothing():
+    port = free_port()
+    server, client = NetworkManager(port=port), NetworkManager(port=port)
+    client.reconnect_base = 0.02
+    received = []
+    client.subscribe(TOPIC_SCHEDULE, lambda message, sock: received.append(message["data"]["n"]))
+    total = 300
+
+    def publish():
+        for n in range(total):
+            server.send_message("match_update", {"n": n})
+            if n == 50:
+                client.client_sockets[0].shutdown(socket.SHUT_RDWR)
+            time.sleep(0.0005)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            assert server.start_server("127.0.0.1")
+            assert client.connect_to_server("127.0.0.1")
+            assert wait_for(lambda: server._subscriptions)
+            # Живая рассылка идёт и между accept и запросом досылки
+            publisher = threading.Thread(target=publish)
+            publisher.start()
+            publisher.join()
+            assert wait_for(lambda: client.reconnects == 1 and len(received) >= total)
+            time.sleep(0.1)
+        finally:
+            client.stop()
+            server.stop()
+    assert received == list(range(total))
+
+
+def test_receive_reassembles_split_lines_and_legacy_messages():
+    manager = NetworkManager(port=free_port())
+    manager.running = True
+    received = []
+    manager.register_handler("match_update", lambda message, sock: received.append(message["data"]["n"]))
+    framed = b"".join(NetworkManager._encode({"type": "match_update", "data": {"n": n, "pad": "x" * 5000}})
+                      for n in range(3))
+    legacy_sender, legacy_receiver = socket.socketpair()
+    sender, receiver = socket.socketpair()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for sock in (receiver, legacy_receiver):
+                threading.Thread(target=manager._receive_messages, args=(sock,), daemon=True).start()
+            for i in range(0, len(framed), 1000):
+                sender.sendall(framed[i:i + 1000])
+            assert wait_for(lambda: received == [0, 1, 2])
+            # Узел старой версии: сообщение без перевода строки
+            legacy_sender.sendall(b'{"type": "match_update", "data": {"n": 3}}')
+            assert wait_for(lambda: received == [0, 1, 2, 3])
+    finally:
+        manager.running = False
+        for sock in (sender, receiver, legacy_sender, legacy_receiver):
+            sock.close()
+
+
+class ChunkedSocket:
+    """Сокет, отдающий заранее нарезанные куски и затем конец потока."""
+
+    def __init__(self, payload, size):
+        self.chunks = [payload[i:i + size] for i in range(0, len(payload), size)]
+
+    def recv(self, bufsize):
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+def test_large_first_message_is_parsed_once(monkeypatch):
+    manager = NetworkManager(port=free_port())
+    manager.running = True
+    received = []
+    manager.register_handler("tournament_update", lambda message, sock: received.append(message))
+    categories = {f"{w} кг": {"matches": [{"id": i, "wrestler1": "a", "wrestler2": "b"} for i in range(50)]}
+                  for w in range(30, 130)}
+    payload = NetworkManager._encode({"type": "tournament_update", "data": {"categories": categories}})
+    parses = []
+    real_loads = network.json.loads
+    monkeypatch.setattr(network.json, "loads", lambda text: parses.append(len(text)) or real_loads(text))
+    # Куски меньше буфера, некоторые из них оканчиваются на "}"
+    manager._receive_messages(ChunkedSocket(payload, 997))
+    assert len(received) == 1 and received[0]["data"]["categories"] == categories
+    assert len(payload) // 997 > 200
+    assert len(parses) < 20
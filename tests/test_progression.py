@@ -0,0 +1,106 @@
+import pytest
+
+import core.progression as progression
+from core.durations import DurationModel
+from core.progression import (
+    FORMAT_DOUBLE, FORMAT_REPECHAGE, FORMAT_SINGLE, advance_category, final_placements, on_result,
+)
+from core.schedule_time import schedule_minutes
+from core.seeding import BYE_NAME
+
+
+NAME = "60 кг"
+NOW = 600
+MODEL = DurationModel()
+
+
+def category(wrestlers):
+    """Олимпийская сетка: первый раунд по парам из списка (None — пропуск)."""
+    matches = []
+    for n in range(1, len(wrestlers) // 2 + 1):
+        w1, w2 = wrestlers[2 * n - 2], wrestlers[2 * n - 1]
+        matches.append({"id": f"{NAME}_R1_M{n}", "round": 1, "completed": False, "winner": None,
+                        "wrestler1": w1 or BYE_NAME, "wrestler2": w2 or BYE_NAME})
+    return {"type": "elimination", "matches": matches,
+            "participants": [{"name": w, "club": "СШ"} for w in wrestlers if w]}
+
+
+@pytest.fixture
+def fmt(monkeypatch):
+    def use(value):
+        monkeypatch.setattr(progression, "elimination_format", lambda: value)
+    return use
+
+
+def finish(cat, match, winner=None):
+    match["completed"] = True
+    match["winner"] = winner or match["wrestler1"]
+    return advance_category(NAME, cat, match["id"])
+
+
+def play_out(cat):
+    """Доигрывает сетку: побеждает красный угол; возвращает id созданных схваток."""
+    created = advance_category(NAME, cat)
+    ids = [m["id"] for m in created]
+    while True:
+        open_matches = [m for m in cat["matches"] if not m.get("completed") and BYE_NAME not in
+                        (m["wrestler1"], m["wrestler2"])]
+        if not open_matches:
+            return ids
+        ids.extend(m["id"] for m in finish(cat, open_matches[0]))
+
+
+def test_next_round_waits_for_both_sources(fmt):
+    fmt(FORMAT_SINGLE)
+    cat = category([f"Борец {i}" for i in range(8)])
+    assert advance_category(NAME, cat) == []
+    assert finish(cat, cat["matches"][0]) == []
+    created = finish(cat, cat["matches"][1], "Борец 3")
+    assert [(m["id"], m["wrestler1"], m["wrestler2"]) for m in created] == [
+        (f"{NAME}_R2_M1", "Борец 0", "Борец 3"),
+    ]
+    assert created[0]["sources"] == [[f"{NAME}_R1_M1", "winner"], [f"{NAME}_R1_M2", "winner"]]
+
+
+def test_byes_pass_through_without_bouts(fmt):
+    fmt(FORMAT_SINGLE)
+    cat = category(["A", "B", "C", None, "E", None, "G", None])
+    created = advance_category(NAME, cat)
+    # C, E, G проходят без схваток; E и G сразу встречаются во втором раунде
+    assert [(m["id"], m["wrestler1"], m["wrestler2"]) for m in created] == [(f"{NAME}_R2_M2", "E", "G")]
+    created = finish(cat, cat["matches"][0], "B")
+    assert [(m["wrestler1"], m["wrestler2"]) for m in created] == [("B", "C")]
+    assert final_placements(cat) is None
+
+
+def test_repechage_placements(fmt):
+    fmt(FORMAT_REPECHAGE)
+    cat = category([f"Борец {i}" for i in range(8)])
+    ids = play_out(cat)
+    assert f"{NAME}_REP1_M1" in ids and f"{NAME}_REP2_M1" in ids
+    placements = final_placements(cat)
+    assert placements[:2] == [("Борец 0", 1), ("Борец 4", 2)]
+    assert sorted(place for _, place in placements[2:]) == [3, 3]
+    assert len({name for name, _ in placements}) == 4
+
+
+def test_double_elimination_ends_with_grand_final(fmt):
+    fmt(FORMAT_DOUBLE)
+    cat = category([f"Борец {i}" for i in range(8)])
+    play_out(cat)
+    assert cat["matches"][-1]["stage"] == progression.STAGE_FINAL
+    placements = final_placements(cat)
+    assert [place for _, place in placements] == [1, 2, 3]
+
+
+def test_on_result_slots_bout_on_earliest_mat(fmt, monkeypatch):
+    fmt(FORMAT_SINGLE)
+    monkeypatch.setattr(progression, "current_schedule_minutes", lambda data: NOW)
+    cat = category(["A", "B", "C", "D"])
+    busy = {"match_id": "x", "mat": 1, "category": NAME, "round": 1, "status": "Ожидание", "start_min": NOW}
+    data = {"categories": {NAME: cat}, "schedule": [busy]}
+    for match in cat["matches"]:
+        match["completed"], match["winner"] = True, match["wrestler1"]
+    entries = on_result(data, NAME, cat["matches"][1]["id"], [1, 2], model=MODEL)
+    assert [(e["match_id"], e["mat"], schedule_minutes(e)) for e in entries] == [(f"{NAME}_R2_M1", 2, NOW)]
+    assert data["schedule"][-1] is entries[0]
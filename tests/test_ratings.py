@@ -0,0 +1,104 @@
+import pytest
+
+import core.db as db
+from core.db import save_match_result
+from core.ratings import INITIAL_RATING, INITIAL_RD, RatingState, compute_ratings, rebuild_ratings
+
+
+CATEGORY = "60 кг"
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.db")
+    monkeypatch.setattr(db, "get_db_path", lambda: path)
+    return path
+
+
+def tournament(index):
+    return {"name": f"Турнир {index}", "date": f"01.0{index + 1}.2026", "location": "Казань",
+            "participants": [], "categories": {CATEGORY: {"matches": []}}}
+
+
+def result(match_id, red, blue, winner, completed=True):
+    return {"id": match_id, "wrestler1": red, "wrestler2": blue, "score1": 3, "score2": 1,
+            "winner": winner, "completed": completed}
+
+
+def ratings(path):
+    conn = db.get_connection(path)
+    try:
+        rows = conn.execute(
+            "SELECT a.name, r.rating, r.rd, r.bouts, r.last_period FROM ratings r "
+            "JOIN athletes a ON a.id = r.athlete_id ORDER BY a.name"
+        ).fetchall()
+    finally:
+        conn.close()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        assert actual[name] == pytest.approx(expected[name]), name
+
+
+def test_winner_gains_and_uncertainty_shrinks():
+    state = compute_ratings([[(1, 2, 1.0)]])
+    (r1, rd1, n1, last1), (r2, rd2, _, _) = state.table[1], state.table[2]
+    assert r1 - INITIAL_RATING == pytest.approx(INITIAL_RATING - r2) and r1 > INITIAL_RATING
+    assert rd1 == rd2 < INITIAL_RD and (n1, last1) == (1, 0)
+
+
+def test_rd_grows_with_skipped_periods():
+    def after_gap(gap):
+        state = RatingState()
+        state.apply_period(0, [(1, 2, 1.0)] * 5)
+        state.apply_period(gap, [(1, 3, 0.0)])
+        return state.table[1]
+
+    # Чем дольше спортсмен не выступал, тем сильнее меняет рейтинг новая схватка
+    assert after_gap(1)[0] > after_gap(4)[0]
+    assert after_gap(4)[3] == 4
+
+
+def test_incremental_updates_match_full_rebuild(db_path):
+    history = [
+        [result("a", "Иванов", "Петров", "Иванов"), result("b", "Сидоров", "Козлов", "Козлов")],
+        [result("c", "Иванов", "Козлов", "Козлов")],
+        [],
+        [result("d", "Петров", "Сидоров", "Петров"), result("e", "Иванов", "Козлов", None)],
+    ]
+    for index, bouts in enumerate(history):
+        data = tournament(index)
+        db.save_tournament_metadata(data)
+        for match in bouts:
+            save_match_result(data, CATEGORY, match)
+    incremental = ratings(db_path)
+    # Петров и Сидоров пропустили два турнира: период — номер турнира, а не 0
+    assert incremental["Петров"][3] == 3
+    rebuild_ratings(db_path)
+    assert_same(incremental, ratings(db_path))
+
+
+def test_corrected_winner_is_rerated_not_added(db_path):
+    data = tournament(0)
+    save_match_result(data, CATEGORY, result("a", "Иванов", "Петров", "Иванов"))
+    save_match_result(data, CATEGORY, result("a", "Иванов", "Петров", "Петров"))
+    corrected = ratings(db_path)
+    assert corrected["Петров"][0] > INITIAL_RATING and corrected["Петров"][2] == 1
+    rebuild_ratings(db_path)
+    assert_same(corrected, ratings(db_path))
+
+
+def test_uncompleted_then_recompleted_bout_is_rated_once(db_path):
+    data = tournament(0)
+    save_match_result(data, CATEGORY, result("a", "Иванов", "Петров", "Иванов"))
+    once = ratings(db_path)
+    save_match_result(data, CATEGORY, result("a", "Иванов", "Петров", None, completed=False))
+    assert ratings(db_path) == {}
+    save_match_result(data, CATEGORY, result("a", "Иванов", "Петров", "Иванов"))
+    assert_same(ratings(db_path), once)
+    # Повторное сохранение того же результата рейтинг не трогает
+    save_match_result(data, CATEGORY, dict(result("a", "Иванов", "Петров", "Иванов"), score1=5))
+    assert_same(ratings(db_path), once)
@@ -0,0 +1,72 @@
+from core.durations import DurationModel
+from core.reflow import pull_pending_bouts
+from core.schedule_time import schedule_minutes, set_schedule_minutes
+import core.reflow as reflow
+
+
+NOW = 600
+MODEL = DurationModel()
+SLOT = MODEL.slot_minutes()
+
+
+def bout(match_id, mat, start, category="A", round_num=1, wrestlers=None):
+    w1, w2 = wrestlers or (f"{match_id}-red", f"{match_id}-blue")
+    match = {"match_id": match_id, "mat": mat, "category": category, "round": round_num,
+             "wrestler1": w1, "wrestler2": w2, "status": "Ожидает"}
+    set_schedule_minutes(match, start)
+    return match
+
+
+def loaded_mat(count=10, **tail):
+    """Ковёр 1 с очередью count схваток; последнюю можно переопределить через tail."""
+    schedule = [bout(f"m{i}", 1, NOW + i * SLOT) for i in range(count - 1)]
+    schedule.append(bout("tail", 1, NOW + (count - 1) * SLOT, **tail))
+    return schedule
+
+
+def pull(schedule, monkeypatch):
+    monkeypatch.setattr(reflow, "current_schedule_minutes", lambda data: NOW)
+    data = {"schedule": schedule, "categories": {}}
+    return pull_pending_bouts(data, 2, [1, 2, 3], threshold_minutes=20, model=MODEL)
+
+
+def test_free_tail_moves_to_idle_mat(monkeypatch):
+    schedule = loaded_mat()
+    moved = pull(schedule, monkeypatch)
+    assert moved and moved[0]["match_id"] == "tail"
+    assert moved[0]["mat"] == 2 and schedule_minutes(moved[0]) == NOW
+
+
+def test_wrestler_busy_on_other_mat_is_not_moved(monkeypatch):
+    schedule = loaded_mat(wrestlers=("Иванов", "Петров"))
+    schedule.append(bout("other", 3, NOW, category="C", wrestlers=("Иванов", "Сидоров")))
+    moved = pull(schedule, monkeypatch)
+    assert moved == []
+    assert schedule[-2]["mat"] == 1
+
+
+def test_later_round_waits_for_earlier_round(monkeypatch):
+    schedule = loaded_mat(category="B", round_num=2)
+    schedule.insert(0, bout("b-r1", 1, NOW - SLOT, category="B", round_num=1))
+    moved = pull(schedule, monkeypatch)
+    assert all(m["match_id"] != "tail" for m in moved)
+    assert next(m for m in schedule if m["match_id"] == "tail")["mat"] == 1
+
+
+def test_later_round_moves_once_earlier_round_finished(monkeypatch):
+    schedule = loaded_mat(category="B", round_num=2)
+    finished = bout("b-r1", 1, NOW - SLOT, category="B", round_num=1)
+    finished["status"] = "Завершен"
+    schedule.insert(0, finished)
+    moved = pull(schedule, monkeypatch)
+    assert moved and moved[0]["match_id"] == "tail"
+
+
+def test_balanced_mats_do_not_scan_schedule(monkeypatch):
+    def no_guard(*args, **kwargs):
+        raise AssertionError("проверки переноса не нужны, если ковры не отстают")
+
+    monkeypatch.setattr(reflow, "_MoveGuard", no_guard)
+    schedule = [bout(f"a{i}", 1, NOW + i * SLOT) for i in range(3)]
+    schedule += [bout(f"b{i}", 2, NOW + i * SLOT) for i in range(3)]
+    assert pull(schedule, monkeypatch) == []
@@ -0,0 +1,79 @@
+from core.repository import LazyCategories, TournamentRepository
+from core.tournament_file import load_container, save_container
+
+
+def make_tournament():
+    categories = {}
+    participants = []
+    for c in range(3):
+        name = f"Юноши {40 + c * 4} кг"
+        members = [{"name": f"Борец {c}-{i}", "weight": 40 + c * 4, "club": "СШ"} for i in range(4)]
+        participants.extend(members)
+        matches = [
+            {"id": f"{c}-{i}", "wrestler1": members[i]["name"], "wrestler2": members[i + 1]["name"],
+             "round": 1, "completed": i == 0, "winner": members[i]["name"] if i == 0 else None}
+            for i in range(3)
+        ]
+        categories[name] = {"gender": "М", "weight_min": 36 + c * 4, "weight_max": 40 + c * 4,
+                            "participants": members, "matches": matches}
+    schedule = [{"match_id": m["id"], "category": name, "mat": 1, "start_min": 600 + i}
+                for name, cat in categories.items() for i, m in enumerate(cat["matches"])]
+    return {"name": "Тест", "date": "01.01.2026", "location": "Казань",
+            "participants": participants, "categories": categories, "schedule": schedule}
+
+
+def test_container_round_trip_to_db_keeps_unopened_categories(tmp_path):
+    original = make_tournament()
+    path = save_container(original, str(tmp_path / "t.mvpz"))
+    loaded = load_container(path, lazy=True)
+    assert isinstance(loaded["categories"], LazyCategories)
+
+    db_path = str(tmp_path / "t.db")
+    repo = TournamentRepository(db_path)
+    repo.save(loaded)
+    repo.close()
+
+    repo = TournamentRepository(db_path)
+    tournament_id = repo.list_tournaments()[0]["id"]
+    restored = repo.load(tournament_id, lazy=False)
+    repo.close()
+    assert list(restored["categories"]) == list(original["categories"])
+    for name, cat in original["categories"].items():
+        assert restored["categories"][name]["participants"] == cat["participants"]
+        assert [m["id"] for m in restored["categories"][name]["matches"]] == [m["id"] for m in cat["matches"]]
+
+
+def test_unopened_categories_of_same_db_are_not_rewritten(tmp_path):
+    db_path = str(tmp_path / "t.db")
+    repo = TournamentRepository(db_path)
+    repo.save(make_tournament())
+    tournament_id = repo.list_tournaments()[0]["id"]
+    loaded = repo.load(tournament_id)
+    stats = repo.save(loaded)
+    repo.close()
+    assert not any(stats.values())
+
+
+def test_save_async_writes_a_detached_copy_on_worker_thread(tmp_path):
+    db_path = str(tmp_path / "t.db")
+    repo = TournamentRepository(db_path)
+    repo.save(make_tournament())
+    tournament_id = repo.list_tournaments()[0]["id"]
+    loaded = repo.load(tournament_id)
+    first = next(iter(loaded["categories"]))
+    loaded["categories"][first]["matches"][1]["winner"] = "Борец 0-2"
+
+    future = repo.save_async(loaded)
+    # Правка после вызова в снимок не попадает
+    loaded["categories"][first]["matches"][2]["winner"] = "поздно"
+    stats = future.result(timeout=10)
+    assert stats["matches"] == 1 and stats["categories"] == 0
+    # Не открытые категории так и не подгружены
+    assert [loaded["categories"].is_loaded(name) for name in dict.keys(loaded["categories"])] == [True, False, False]
+    repo.close()
+
+    repo = TournamentRepository(db_path)
+    restored = repo.load(tournament_id, lazy=False)
+    repo.close()
+    winners = [m["winner"] for m in restored["categories"][first]["matches"]]
+    assert winners == ["Борец 0-0", "Борец 0-2", None]
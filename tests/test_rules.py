@@ -0,0 +1,67 @@
+import pytest
+
+from core.rules import (
+    BLUE, EVENT_CAUTION, EVENT_PASSIVITY, EVENT_POINTS, RED, ScoringEvent, simulate_bout,
+)
+from core.sport_loader import SportLoader
+
+
+def points(corner, value):
+    return ScoringEvent(EVENT_POINTS, corner, points=value)
+
+
+def caution(corner):
+    return ScoringEvent(EVENT_CAUTION, corner)
+
+
+def passivity(corner):
+    return ScoringEvent(EVENT_PASSIVITY, corner)
+
+
+@pytest.mark.parametrize("sport, limit", [("greco_roman", 3), ("freestyle", 4)])
+def test_caution_limit_disqualifies(sport, limit):
+    engine = SportLoader.load_rules(sport)
+    before = simulate_bout(engine, [caution(RED)] * (limit - 1))
+    assert before.reason == "Время схватки истекло"
+    assert (before.blue.points, before.winner) == (limit - 1, BLUE)
+
+    state = simulate_bout(engine, [caution(RED)] * limit + [points(RED, 5)])
+    assert state.finished and state.winner == BLUE
+    assert state.reason.startswith("Дисквалификация")
+    assert (state.red.points, state.blue.points, state.red.cautions) == (0, limit, limit)
+
+
+@pytest.mark.parametrize("sport", ["greco_roman", "freestyle"])
+@pytest.mark.parametrize("count, awarded", [(1, 1), (2, 2), (3, 2), (5, 2)])
+def test_passivity_point_limit(sport, count, awarded):
+    state = simulate_bout(SportLoader.load_rules(sport), [passivity(BLUE)] * count)
+    assert (state.red.points, state.blue.passivity) == (awarded, count)
+    assert state.winner == RED
+
+
+@pytest.mark.parametrize("sport, gap", [("greco_roman", 8), ("freestyle", 10)])
+def test_technical_superiority(sport, gap):
+    engine = SportLoader.load_rules(sport)
+    short = simulate_bout(engine, [points(BLUE, gap - 1)])
+    assert short.reason == "Время схватки истекло"
+
+    state = simulate_bout(engine, [points(BLUE, gap - 2), points(RED, 1), points(BLUE, 3), points(RED, 4)])
+    assert state.finished and state.winner == BLUE
+    assert state.reason.startswith("Техническое превосходство")
+    assert (state.red.points, state.blue.points) == (1, gap + 1)
+
+
+@pytest.mark.parametrize("events, winner", [
+    ([points(RED, 2), points(BLUE, 1)], RED),
+    ([points(BLUE, 4), points(RED, 2)], BLUE),
+    # Равный счёт: меньше предупреждений
+    ([caution(RED), caution(RED), points(RED, 2)], BLUE),
+    # Равный счёт и предупреждения: последнее очко
+    ([points(RED, 2), points(BLUE, 2)], BLUE),
+    ([points(BLUE, 1), points(RED, 1)], RED),
+    ([], None),
+])
+@pytest.mark.parametrize("sport", ["greco_roman", "freestyle"])
+def test_decide_tie_breaks(sport, events, winner):
+    state = simulate_bout(SportLoader.load_rules(sport), events)
+    assert state.finished and state.winner == winner
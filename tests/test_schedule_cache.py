@@ -0,0 +1,88 @@
+import pytest
+
+import core.settings as settings
+from core.schedule_cache import SCHEDULE_INPUTS_KEY, update_schedule
+from core.schedule_time import schedule_minutes
+
+
+START = 10 * 60
+
+
+@pytest.fixture(autouse=True)
+def default_settings(tmp_path, monkeypatch):
+    # Настройки по умолчанию: предпочитаемый ковёр не зависит от settings.json рабочей копии
+    monkeypatch.setattr(settings, "SETTINGS_FILE", str(tmp_path / "settings.json"))
+    monkeypatch.setattr(settings, "_settings_instance", None)
+
+
+def category(prefix, count=4):
+    return {"matches": [
+        {"id": f"{prefix}{i}", "round": 1, "wrestler1": f"{prefix}{i}-red", "wrestler2": f"{prefix}{i}-blue"}
+        for i in range(count)
+    ]}
+
+
+def tournament():
+    data = {"name": "Кубок", "categories": {"55 кг": category("a"), "60 кг": category("b")}}
+    data["schedule"], _ = update_schedule(data, 2)
+    return data
+
+
+def entries(schedule, category_name):
+    return [m for m in schedule if m["category"] == category_name]
+
+
+def times(schedule, category_name, mat):
+    return [schedule_minutes(m) for m in entries(schedule, category_name) if m["mat"] == mat]
+
+
+def test_unchanged_inputs_reuse_saved_schedule():
+    data = tournament()
+    data["schedule"][0]["status"] = "Завершен"
+    saved = data["schedule"]
+    schedule, changed = update_schedule(data, 2)
+    assert schedule is saved and changed == set()
+    # Результаты схваток не входят в отпечаток
+    data["categories"]["55 кг"]["matches"][0]["winner"] = "a0-red"
+    assert update_schedule(data, 2)[1] == set()
+
+
+def test_settings_change_or_missing_fingerprint_regenerates():
+    data = tournament()
+    assert update_schedule(data, 3)[1] is None
+    del data[SCHEDULE_INPUTS_KEY]
+    assert update_schedule(data, 3)[1] is None
+
+
+def test_changed_category_is_rebuilt_after_pending_bouts():
+    data = tournament()
+    kept = entries(data["schedule"], "55 кг")
+    data["categories"]["60 кг"]["matches"][1]["wrestler2"] = "замена"
+    schedule, changed = update_schedule(data, 2)
+    assert changed == {"60 кг"}
+    # Записи неизменённой категории остаются теми же объектами
+    assert all(any(m is k for m in schedule) for k in kept)
+    assert [m["wrestler2"] for m in entries(schedule, "60 кг")].count("замена") == 1
+    assert times(schedule, "55 кг", 1) == [START, START + 8]
+    assert times(schedule, "60 кг", 1) == [START + 16, START + 24]
+
+
+def test_completed_bouts_do_not_push_rebuilt_category_to_the_end():
+    data = tournament()
+    for match in data["schedule"]:
+        if match["category"] == "55 кг" and match["mat"] == 1:
+            match["status"] = "Завершен"
+    data["categories"]["60 кг"]["matches"][1]["wrestler2"] = "замена"
+    schedule, _ = update_schedule(data, 2)
+    # Ковёр 1 свободен: пересобранная категория встаёт в начало его очереди
+    assert times(schedule, "60 кг", 1) == [START, START + 8]
+    # На ковре 2 схватки 55 кг ещё ждут — новые записи идут после них
+    assert times(schedule, "60 кг", 2) == [START + 16, START + 24]
+
+
+def test_removed_category_entries_are_dropped():
+    data = tournament()
+    del data["categories"]["60 кг"]
+    schedule, changed = update_schedule(data, 2)
+    assert changed == {"60 кг"}
+    assert {m["category"] for m in schedule} == {"55 кг"}
@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+import network.schedule_sync as schedule_sync
+from network.schedule_sync import LANE_BULK, LANE_LOG, ScheduleSyncService, TokenBucket
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, raw, address):
+        self.sent.append(raw)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setitem(schedule_sync.LANE_QUEUE, LANE_BULK, 8)
+    monkeypatch.setitem(schedule_sync.LANE_QUEUE, LANE_LOG, 2)
+    logs = []
+    service = ScheduleSyncService(on_log=logs.append)
+    service.logs = logs
+    service.allow_relay = False
+    # Без потока отправки: пакеты bulk и log остаются в очередях
+    service._sock = FakeSocket()
+    return service
+
+
+def chunk(transfer_id, index, total):
+    return {"type": "schedule_chunk", "transfer_id": transfer_id, "chunk_index": index, "total_chunks": total,
+            "schedule_part": [{"match_id": f"{transfer_id}-{index}"}], "schedule_hash": transfer_id,
+            "device_id": "coordinator-1", "ts": 1.0}
+
+
+def queued(service, lane=LANE_BULK):
+    return [(item[3], item[2]) for item in service._lanes[lane]]
+
+
+def test_overflow_drops_oldest_transfer_whole(service):
+    for i in range(5):
+        service._send(chunk("a", i, 6))
+    for i in range(3):
+        service._send(chunk("b", i, 3))
+    service._send(chunk("c", 0, 1))
+    assert [t for t, _ in queued(service)] == ["b", "b", "b", "c"]
+    assert service.lane_stats["bulk_dropped"] == 5
+    assert any("a" in line and "5" in line for line in service.logs)
+    # Хвост отброшенной передачи в очередь не ставится
+    service._send(chunk("a", 5, 6))
+    assert len(queued(service)) == 4 and service.lane_stats["bulk_dropped"] == 6
+
+
+def test_transfer_larger_than_queue_is_dropped(service):
+    for i in range(12):
+        service._send(chunk("big", i, 12))
+    assert queued(service) == []
+    assert service.lane_stats["bulk_dropped"] == 12
+    service._send(chunk("next", 0, 1))
+    assert queued(service) == [("next", "schedule_chunk")]
+
+
+def test_log_overflow_drops_single_oldest(service):
+    service.coordinator_host = "127.0.0.1"
+    for n in range(3):
+        service.send_log({"n": n})
+    assert len(service._lanes[LANE_LOG]) == 2
+    assert service.lane_stats["log_dropped"] == 1 and service.logs == []
+
+
+def test_live_messages_bypass_lanes(service):
+    service.send_mat_status("busy")
+    assert len(service._sock.sent) == 1 and queued(service) == []
+
+
+def test_token_bucket_paces_to_rate():
+    now = [0.0]
+    bucket = TokenBucket(rate=1000, burst=500, clock=lambda: now[0])
+    assert bucket.wait_time(500) == 0.0
+    bucket.take(500)
+    assert bucket.wait_time(200) == pytest.approx(0.2)
+    now[0] = 0.2
+    assert bucket.wait_time(200) == 0.0
+    # Пакет больше запаса ждёт только полного запаса
+    bucket.take(200)
+    assert bucket.wait_time(5000) == pytest.approx(0.5)
+
+
+def test_chunks_from_two_threads_assemble_once(service):
+    received = []
+    service.on_schedule_received = lambda schedule, ip: received.append(schedule)
+    total = 400
+    chunks = [chunk("t", i, total) for i in range(total)]
+    barrier = threading.Barrier(2)
+
+    def feed(part):
+        barrier.wait()
+        for message in part:
+            service._handle_message(message, "10.0.0.1")
+
+    threads = [threading.Thread(target=feed, args=(chunks[k::2],)) for k in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(received) == 1
+    assert [m["match_id"] for m in received[0]] == [f"t-{i}" for i in range(total)]
+    assert service._incoming_schedule_parts == {}
+    assert list(service.get_peers()) == ["coordinator-1"]
@@ -0,0 +1,61 @@
+from core.schedule_time import (
+    format_minutes, format_schedule_time, migrate_schedule, parse_hhmm, schedule_minutes,
+    set_schedule_minutes, sort_schedule,
+)
+
+
+def test_parse_and_format_round_trip():
+    assert parse_hhmm("09:05") == 545
+    assert parse_hhmm("Д2 00:10") == 1450
+    assert parse_hhmm("24:00") is None and parse_hhmm("") is None
+    assert format_minutes(1450) == "Д2 00:10"
+    assert format_minutes(545) == "09:05"
+
+
+def test_migration_rolls_over_midnight_per_mat():
+    schedule = [
+        {"match_id": "a", "mat": 1, "time": "23:30"},
+        {"match_id": "b", "mat": 2, "time": "23:40"},
+        {"match_id": "c", "mat": 1, "time": "23:50"},
+        {"match_id": "d", "mat": 1, "time": "00:10"},
+        {"match_id": "e", "mat": 2, "time": "23:58"},
+        {"match_id": "f", "mat": 1, "time": "00:20"},
+    ]
+    assert migrate_schedule(schedule) == 6
+    assert [m["start_min"] for m in schedule] == [1410, 1420, 1430, 1450, 1438, 1460]
+    assert [m["match_id"] for m in sort_schedule(schedule) if m["mat"] == 1] == ["a", "c", "d", "f"]
+
+
+def test_migration_keeps_small_backward_edits_on_same_day():
+    schedule = [{"mat": 1, "time": "10:30"}, {"mat": 1, "time": "10:20"}, {"mat": 1, "time": "16:00"}]
+    migrate_schedule(schedule)
+    assert [schedule_minutes(m) for m in schedule] == [630, 620, 960]
+
+
+def test_migration_leaves_existing_start_min():
+    schedule = [{"mat": 1, "time": "23:50", "start_min": 1430}, {"mat": 1, "time": "00:05"}]
+    assert migrate_schedule(schedule) == 1
+    assert schedule[1]["start_min"] == 1445
+
+
+def test_sort_uses_integer_minutes_across_days():
+    schedule = [
+        {"match_id": "late", "mat": 1, "start_min": 1450},
+        {"match_id": "none", "mat": 1},
+        {"match_id": "mat2", "mat": 2, "time": "23:50"},
+        {"match_id": "mat1", "mat": 1, "time": "23:50"},
+    ]
+    assert [m["match_id"] for m in sort_schedule(schedule)] == ["mat1", "mat2", "late", "none"]
+    assert format_schedule_time(schedule[0]) == "Д2 00:10"
+
+
+def test_set_schedule_minutes_keeps_time_of_day_string():
+    match = {}
+    set_schedule_minutes(match, 2 * 1440 + 65)
+    # "time" понятен старым узлам; день — только в start_min
+    assert match == {"start_min": 2945, "time": "01:05"}
+    assert format_schedule_time(match) == "Д3 01:05"
+    # Без start_min (старый узел вернул запись) день восстанавливает миграция
+    schedule = [{"mat": 1, "time": "23:50"}, {"mat": 1, "time": match["time"]}]
+    migrate_schedule(schedule)
+    assert format_schedule_time(schedule[1]) == "Д2 01:05"
@@ -0,0 +1,52 @@
+from core.scoreboard_clock import RESTART_SILENCE, ClockFollower, ClockPublisher
+
+
+PERIOD = 180.0
+
+
+def publish(publisher, elapsed, base):
+    """Состояние идущего таймера через elapsed секунд в часах ПК с отметкой base."""
+    return publisher.observe(True, PERIOD - elapsed, 1, False, now=base + elapsed) or publisher.state
+
+
+def test_display_follows_remaining_publisher_after_other_disappears():
+    # Панель второго ПК (давно включён) и зеркалирующая её панель главного ПК
+    secondary, primary = ClockPublisher(), ClockPublisher()
+    follower = ClockFollower()
+    local = 1000.0
+    for elapsed in (0.0, 5.0, 10.0):
+        follower.apply(publish(secondary, elapsed, 90000.0), received_at=local + elapsed)
+        follower.apply(publish(primary, elapsed, 20.0), received_at=local + elapsed)
+    # Второй ПК пропал, главный продолжает рассылать до конца периода
+    for elapsed in range(15, 181, 5):
+        assert follower.apply(publish(primary, elapsed, 20.0), received_at=local + elapsed)
+    assert follower.seconds(now=local + 94.0) == 86
+    assert follower.seconds(now=local + 180.0) == 0
+
+
+def test_stale_state_of_same_source_is_ignored():
+    publisher, follower = ClockPublisher(), ClockFollower()
+    first = publisher.observe(True, 100.0, 1, False, now=10.0)
+    second = publisher.observe(False, 90.0, 1, False, now=20.0)
+    assert follower.apply(second, received_at=500.0)
+    assert not follower.apply(first, received_at=500.1)
+    assert follower.seconds(now=600.0) == 90
+
+
+def test_restarted_source_resets_ordering_and_offset():
+    follower = ClockFollower()
+    before = ClockPublisher(source="mat1")
+    assert follower.apply(before.observe(False, 120.0, 1, False, now=5000.0), received_at=100.0)
+    # ПК перезагрузился: тот же идентификатор, монотонные часы и seq с нуля
+    after = ClockPublisher(source="mat1")
+    state = after.observe(True, 60.0, 2, False, now=3.0)
+    assert follower.apply(state, received_at=101.0)
+    assert follower.seconds(now=111.0) == 50
+
+
+def test_long_silence_resets_source():
+    publisher, follower = ClockPublisher(), ClockFollower()
+    late = publisher.observe(False, 30.0, 1, False, now=10.0)
+    newer = publisher.observe(False, 20.0, 1, False, now=11.0)
+    assert follower.apply(newer, received_at=100.0)
+    assert follower.apply(late, received_at=100.0 + RESTART_SILENCE + 1.0)
@@ -0,0 +1,52 @@
+from core.seeding import BYE_NAME, build_draw, club_collisions, collision_score, seed_positions
+
+
+def wrestlers(clubs, cities=None):
+    cities = cities or [""] * len(clubs)
+    return [{"name": f"w{i}", "club": club, "city": city} for i, (club, city) in enumerate(zip(clubs, cities))]
+
+
+def names(draw):
+    return [w["name"] for w in draw]
+
+
+def test_seed_positions_keep_top_seeds_apart():
+    assert seed_positions(8) == [1, 8, 4, 5, 2, 7, 3, 6]
+    order = seed_positions(16)
+    # 1-й и 2-й в разных половинах, 1–4 в разных четвертях
+    assert order.index(1) < 8 <= order.index(2)
+    assert sorted(order.index(s) // 4 for s in (1, 2, 3, 4)) == [0, 1, 2, 3]
+
+
+def test_byes_go_to_top_seeds():
+    draw = build_draw(wrestlers(["a", "b", "c", "d", "e", "f"]), 8, n_seeds=2)
+    assert draw[0]["name"] == "w0" and draw[1]["name"] == BYE_NAME
+    assert draw[4]["name"] == "w1" and draw[5]["name"] == BYE_NAME
+    assert sorted(n for n in names(draw) if n != BYE_NAME) == [f"w{i}" for i in range(6)]
+
+
+def test_clubmates_meet_as_late_as_possible():
+    # Четыре пары одноклубников в сетке на 8: разводятся до полуфинала
+    field = wrestlers(["a", "a", "b", "b", "c", "c", "d", "d"])
+    draw = build_draw(field, 8, n_seeds=0)
+    assert club_collisions(draw) == {3: 4}
+    # Без разведения порядок участников сохраняется и соседи встречаются сразу
+    unseparated = build_draw(field, 8, separate_by=(), n_seeds=0)
+    assert names(unseparated) == names(field)
+    assert collision_score(unseparated) > collision_score(draw)
+
+
+def test_seeded_clubmate_counts_against_its_half():
+    # Сеяный w0 из клуба «a»: второй из «a» уходит в другую половину
+    field = wrestlers(["a", "b", "a", "c"])
+    draw = build_draw(field, 4, n_seeds=1)
+    assert draw[0]["name"] == "w0"
+    assert [w["name"] for w in draw[2:]].count("w2") == 1
+
+
+def test_second_field_separates_within_equal_clubs():
+    clubs = ["a", "b", "c", "d"]
+    field = wrestlers(clubs, cities=["x", "x", "y", "y"])
+    draw = build_draw(field, 4, separate_by=("club", "city"), n_seeds=0)
+    assert club_collisions(draw, key="club") == {}
+    assert club_collisions(draw, key="city") == {2: 2}
@@ -0,0 +1,90 @@
+import pytest
+
+import core.db as db
+import core.warehouse as warehouse
+from core.db import save_match_result
+from core.warehouse import ResultsWarehouse
+
+
+CATEGORY = "60 кг"
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.db")
+    monkeypatch.setattr(db, "get_db_path", lambda: path)
+    return path
+
+
+def tournament():
+    participants = [{"name": "Иванов", "club": "Динамо"}, {"name": "Петров", "club": "Спартак"}]
+    return {"name": "Кубок", "date": "01.02.2026", "location": "Казань",
+            "participants": participants,
+            "categories": {CATEGORY: {"type": "round_robin", "participants": participants, "matches": []}}}
+
+
+def bout(score1, score2, winner="Иванов", completed=True):
+    return {"id": "m1", "wrestler1": "Иванов", "wrestler2": "Петров",
+            "score1": score1, "score2": score2, "winner": winner, "completed": completed}
+
+
+def stats(path):
+    store = ResultsWarehouse(path)
+    try:
+        return store.athlete_record("Иванов"), store.athlete_record("Петров"), store.head_to_head("Иванов", "Петров")
+    finally:
+        store.close()
+
+
+def test_resaving_corrected_score_replaces_contribution(db_path):
+    data = tournament()
+    save_match_result(data, CATEGORY, bout(3, 1))
+    save_match_result(data, CATEGORY, bout(5, 1))
+    ivanov, petrov, h2h = stats(db_path)
+    assert (ivanov["bouts"], ivanov["wins"], ivanov["points_for"], ivanov["points_against"]) == (1, 1, 5, 1)
+    assert (petrov["bouts"], petrov["losses"], petrov["points_for"]) == (1, 1, 1)
+    assert (h2h["bouts"], h2h["wins_a"], h2h["points_a"], h2h["points_b"]) == (1, 1, 5, 1)
+
+
+def test_changing_winner_moves_win_and_loss(db_path):
+    data = tournament()
+    save_match_result(data, CATEGORY, bout(3, 1))
+    save_match_result(data, CATEGORY, bout(3, 4, winner="Петров"))
+    ivanov, petrov, h2h = stats(db_path)
+    assert (ivanov["wins"], ivanov["losses"], petrov["wins"], petrov["losses"]) == (0, 1, 1, 0)
+    assert (h2h["wins_a"], h2h["wins_b"]) == (0, 1)
+
+
+def test_uncompleting_bout_removes_contribution(db_path):
+    data = tournament()
+    save_match_result(data, CATEGORY, bout(3, 1))
+    save_match_result(data, CATEGORY, bout(0, 0, winner=None, completed=False))
+    ivanov, petrov, h2h = stats(db_path)
+    assert ivanov["bouts"] == petrov["bouts"] == h2h["bouts"] == 0
+    assert ivanov["points_for"] == petrov["points_for"] == 0
+
+
+def test_medals_follow_placements(db_path):
+    data = tournament()
+    data["categories"][CATEGORY]["matches"].append(bout(3, 1))
+    save_match_result(data, CATEGORY, data["categories"][CATEGORY]["matches"][0])
+    store = ResultsWarehouse(db_path)
+    try:
+        medals = {row["club"]: (row["gold"], row["silver"]) for row in store.club_medals(2026)}
+    finally:
+        store.close()
+    assert medals == {"Динамо": (1, 0), "Спартак": (0, 1)}
+
+
+def test_analytics_failure_keeps_match_result(db_path, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("schema drift")
+
+    monkeypatch.setattr(warehouse, "record_bout", broken)
+    save_match_result(tournament(), CATEGORY, bout(3, 1))
+    conn = db.get_connection(db_path)
+    try:
+        row = conn.execute("SELECT score1, score2, winner, completed FROM matches WHERE match_uid = 'm1'").fetchone()
+    finally:
+        conn.close()
+    assert tuple(row) == (3, 1, "Иванов", 1)
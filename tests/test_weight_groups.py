@@ -0,0 +1,36 @@
+from core.weight_groups import partition_participants, partition_sorted_weights
+
+
+def test_partition_minimizes_max_spread():
+    weights = [40, 41, 42, 50, 51, 52, 53]
+    # 3+4 лучше, чем 4+3 (разброс 3 против 10)
+    assert partition_sorted_weights(weights, 3, 5) == [(0, 3), (3, 7)]
+
+
+def test_partition_prefers_fewer_groups_on_equal_spread():
+    assert len(partition_sorted_weights([60] * 8, 3, 5)) == 2
+    assert partition_sorted_weights([60, 61], 3, 5) == [(0, 2)]
+
+
+def test_partition_relaxes_min_size_when_impossible():
+    bounds = partition_sorted_weights([40, 41, 42, 43, 44, 45, 46], 4, 4)
+    assert sorted(end - start for start, end in bounds) == [3, 4]
+
+
+def test_participants_split_by_gender_and_named_by_weight():
+    participants = (
+        [{"name": f"М{i}", "gender": "М", "weight": 50 + i} for i in range(6)]
+        + [{"name": f"Ж{i}", "gender": "Ж", "weight": 45.2 + i} for i in range(3)]
+        + [{"name": "ПРОПУСК", "gender": "М", "weight": 0}, {"name": "", "weight": 70}]
+    )
+    categories = partition_participants(participants)
+    assert list(categories) == ["48 кг (Ж)", "52 кг (М)", "55 кг (М)"]
+    boys = categories["55 кг (М)"]
+    assert (boys["weight_min"], boys["weight_max"]) == (53, 55)
+    assert [p["name"] for p in boys["participants"]] == ["М3", "М4", "М5"]
+    assert all(c["matches"] == [] for c in categories.values())
+
+
+def test_duplicate_names_are_numbered():
+    participants = [{"name": f"Б{i}", "weight": 50.5} for i in range(6)]
+    assert list(partition_participants(participants)) == ["51 кг", "51 кг №2"]
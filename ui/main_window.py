@@ -1,9 +1,8 @@
 import json
-from datetime import datetime
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QTabWidget, 
                              QPushButton, QGroupBox, QTextEdit, QLabel, QMessageBox, QInputDialog, QHBoxLayout)
 from PyQt5.QtCore import QTimer, pyqtSignal, QMetaObject, Qt
-from core.network import NetworkManager
+from core.network import TOPIC_SCHEDULE, TOPIC_TOURNAMENT, NetworkManager
 from ui.widgets.scoreboard import ScoreboardDisplay, ScoreboardWindow
 from ui.widgets.control_panel import ControlPanel
 from ui.widgets.tournament_manager import TournamentManager
@@ -15,6 +14,16 @@ from core.utils import get_local_ip
 from core.settings import get_settings
 from network.schedule_sync import ScheduleSyncService
 from core.logger import get_logger
+from core.cluster_clock import is_stale_update
+from core.durations import forecast_mat
+from core.journal import (
+    find_recoverable_journals, get_journal, journal_match_update, journal_schedule_delta, recover_tournament,
+)
+from core.mat_queue import notify_match_changed
+from core.progression import adopt_bout
+from core.repository import save_tournament_to_db
+from core.autosave import get_snapshot_service
+from core.schedule_time import migrate_schedule, sort_schedule
 
 class EnhancedControlPanel(QMainWindow):
     # Сигналы для безопасного обновления UI из потоков
@@ -69,10 +78,13 @@ class EnhancedControlPanel(QMainWindow):
         
         # Настройка сетевого взаимодействия
         if is_secondary:
+            # Данные турнира и расписание; табло ковров подписываются сами
+            self.network_manager.subscribe(TOPIC_TOURNAMENT)
+            self.network_manager.subscribe(TOPIC_SCHEDULE)
             if server_host and self.network_manager.connect_to_server(server_host):
                 print(f"Успешно подключено к серверу {server_host}")
             else:
-                QMessageBox.warning(self, "Ошибка", "Не удалось подключиться к серверу")
+                QMessageBox.warning(self, "Ошибка", "Не удалось подключиться к серверу.\nПодключение будет повторяться автоматически.")
         else:
             if self.network_manager.start_server():
                 print("Сервер запущен")
@@ -81,6 +93,54 @@ class EnhancedControlPanel(QMainWindow):
         
         self.setup_ui()
 
+        # Журнал изменений: периодическая компактизация и восстановление после сбоя
+        self._journal_timer = QTimer(self)
+        self._journal_timer.timeout.connect(self._compact_journal_if_needed)
+        self._journal_timer.start(60 * 1000)
+        QTimer.singleShot(0, self._offer_journal_recovery)
+
+        # Периодическое автосохранение JSON (сериализация и запись — в фоновом потоке)
+        autosave_minutes = self.settings.get("tournament", "autosave_interval_min", 5) or 0
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.timeout.connect(self.autosave_tournament_data)
+        if autosave_minutes > 0:
+            self._autosave_timer.start(int(autosave_minutes * 60 * 1000))
+
+    def _compact_journal_if_needed(self, force=False):
+        """Снимок турнира + очистка журнала, когда в журнале накопилось много операций."""
+        journal = get_journal(self.tournament_data)
+        if journal is None:
+            return
+        try:
+            if force or journal.needs_compaction():
+                journal.compact(self.tournament_data)
+        except Exception as e:
+            print(f"[journal] Ошибка компактизации журнала: {e}")
+
+    def _offer_journal_recovery(self):
+        """Если прошлый запуск завершился с несохранёнными изменениями — предлагает восстановить турнир."""
+        if self.tournament_data:
+            return
+        try:
+            journals = find_recoverable_journals()
+        except Exception as e:
+            print(f"[journal] Ошибка поиска журналов: {e}")
+            return
+        if not journals:
+            return
+        _, key = journals[0]
+        reply = QMessageBox.question(
+            self, "Восстановление турнира",
+            f"Найдены несохранённые изменения турнира «{key}».\nВосстановить?",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if reply != QMessageBox.Yes:
+            return
+        data = recover_tournament(key)
+        if data:
+            self.set_tournament_data(data)
+            self.update_schedule_tab()
+
     def _auto_start_schedule_sync(self):
         """Автозапуск модуля синхронизации расписаний согласно настройкам."""
         net_role_default = "node" if self.is_secondary else "coordinator"
@@ -204,6 +264,9 @@ class EnhancedControlPanel(QMainWindow):
         if self.tournament_data is None:
             self.tournament_data = {}
         
+        # Узлы со старой версией присылают только строку "time"
+        migrate_schedule(schedule)
+        
         existing_schedule = self.tournament_data.get('schedule', [])
         if existing_schedule:
             mats_in_existing = {}
@@ -216,6 +279,8 @@ class EnhancedControlPanel(QMainWindow):
             existing_schedule,
             schedule
         )
+        # В журнал — только изменённые слиянием записи, а не всё расписание
+        journal_schedule_delta(self.tournament_data, existing_schedule)
         
         # Обновляем результаты матчей в категориях на основе обновленного расписания
         updated_categories = self._update_category_matches_from_schedule(schedule)
@@ -317,6 +382,10 @@ class EnhancedControlPanel(QMainWindow):
         for s_match in schedule:
             # Проверяем оба варианта идентификатора
             if s_match.get('match_id') == match_id or s_match.get('id') == match_id:
+                if is_stale_update(s_match, match_data):
+                    # Ретрансляция пришла позже более нового обновления
+                    print(f"[SYNC] Устаревшее обновление матча {match_id} пропущено")
+                    return
                 # Обновляем все поля из входящего матча
                 print(f"[SYNC] Найден матч в расписании, обновляю поля: {list(match_data.keys())}")
                 old_values = {k: s_match.get(k) for k in match_data.keys() if k in s_match}
@@ -324,6 +393,8 @@ class EnhancedControlPanel(QMainWindow):
                 # Убеждаемся, что match_id установлен
                 if 'match_id' not in s_match:
                     s_match['match_id'] = match_id
+                notify_match_changed(self.tournament_data, s_match)
+                journal_match_update(self.tournament_data, s_match)
                 updated_in_schedule = True
                 print(f"[SYNC] Матч обновлен в расписании. Изменения: {[(k, old_values.get(k), s_match.get(k)) for k in match_data.keys() if old_values.get(k) != s_match.get(k)]}")
                 break
@@ -334,9 +405,20 @@ class EnhancedControlPanel(QMainWindow):
             # Убеждаемся, что match_id установлен
             if 'match_id' not in match_data:
                 match_data['match_id'] = match_id
-            schedule.append(match_data.copy())
+            new_entry = match_data.copy()
+            schedule.append(new_entry)
             self.tournament_data['schedule'] = schedule
+            notify_match_changed(self.tournament_data, new_entry)
+            journal_match_update(self.tournament_data, new_entry)
         
+        # Пересчитываем ETA только ковра, на котором схватка началась/завершилась
+        if match_data.get('mat') is not None and match_data.get('status') in ('В процессе', 'Завершен'):
+            try:
+                current = match_data if match_data.get('status') == 'В процессе' else None
+                forecast_mat(self.tournament_data, match_data.get('mat'), current_match=current)
+            except Exception as e:
+                print(f"[durations] Ошибка пересчёта ETA: {e}")
+
         # Обновляем матч в категориях
         updated_categories = self._update_category_match_from_data(match_id, match_data)
         
@@ -380,13 +462,18 @@ class EnhancedControlPanel(QMainWindow):
                     if updated:
                         updated_categories.add(cat_name)
                         print(f"[SYNC] Матч {match_id} обновлен в категории {cat_name}")
-                    break
-        
+                    return updated_categories
+
+        # Новая схватка, созданная по результатам на другом ковре
+        adopted = adopt_bout(self.tournament_data, dict(match_data, match_id=match_id))
+        if adopted:
+            updated_categories.add(adopted)
+            print(f"[SYNC] Схватка {match_id} добавлена в категорию {adopted}")
         return updated_categories
 
     @staticmethod
     def _merge_schedule(existing_schedule, incoming_schedule):
-        """Объединяет расписания, не теряя матчи с других ковров. Приоритет у входящих данных для результатов."""
+        """Объединяет расписания, не теряя матчи с других ковров. Приоритет у входящих данных для результатов, кроме устаревших (updated_ts)."""
         if not existing_schedule:
             return list(incoming_schedule or [])
         if not incoming_schedule:
@@ -417,20 +504,16 @@ class EnhancedControlPanel(QMainWindow):
             if key in merged:
                 # Объединяем данные: входящие данные имеют приоритет, но сохраняем все поля
                 existing = merged[key]
+                if is_stale_update(existing, m):
+                    continue
                 # Обновляем все поля из входящего матча
                 existing.update(m)
             else:
                 # Новый матч
                 merged[key] = m.copy()
 
-        result = list(merged.values())
-        result.sort(key=lambda x: (
-            x.get('time', ''),
-            x.get('mat', 0),
-            x.get('round', 0),
-            x.get('match_id', '')
-        ))
-        return result
+        # Сортировка по целочисленным ключам времени (корректно и после полуночи)
+        return sort_schedule(merged.values())
 
     def create_main_tab(self):
         """Создает главную вкладку с кнопками управления"""
@@ -689,9 +772,13 @@ class EnhancedControlPanel(QMainWindow):
         self.update_status()
         # Инициализируем статусы матчей если их нет
         if 'schedule' in self.tournament_data:
+            migrate_schedule(self.tournament_data['schedule'])
             for match in self.tournament_data['schedule']:
                 if 'status' not in match:
                     match['status'] = 'Ожидание'
+        save_tournament_to_db(self.tournament_data)
+        # Новый базовый снимок для журнала изменений
+        self._compact_journal_if_needed(force=True)
         self._push_schedule_to_sync()
 
     def update_status(self):
@@ -781,6 +868,15 @@ class EnhancedControlPanel(QMainWindow):
         except Exception as e:
             if logger:
                 logger.log_error("Ошибка при сохранении данных при закрытии", e)
+
+        try:
+            # Фоновый поток журнала дописывает операции и снимок перед выходом
+            journal = get_journal(getattr(self, 'tournament_data', None))
+            if journal is not None:
+                journal.close()
+        except Exception as e:
+            if logger:
+                logger.log_error("Ошибка при закрытии журнала", e)
         
         try:
             if hasattr(self, 'network_manager'):
@@ -860,14 +956,33 @@ class EnhancedControlPanel(QMainWindow):
                 self.schedule_sync_service.push_schedule(self.tournament_data)
 
     def save_tournament_data(self):
+        db_future = None
+        if getattr(self, 'tournament_data', None):
+            # Основное хранилище — БД (пишутся только изменённые строки, в фоновом потоке)
+            db_future = save_tournament_to_db(self.tournament_data)
+            self._compact_journal_if_needed(force=True)
+        future = self.autosave_tournament_data()
+        # При закрытии дожидаемся записи, иначе поток завершится вместе с программой
+        if db_future is not None:
+            try:
+                db_future.result(timeout=30)
+            except Exception as e:
+                print(f"Ошибка при сохранении в БД: {e}")
+        if future is not None:
+            try:
+                future.result(timeout=30)
+            except Exception as e:
+                print(f"Ошибка при автосохранении: {e}")
+
+    def autosave_tournament_data(self):
+        """Фоновое автосохранение; пропускается, если турнир не менялся."""
+        if not getattr(self, 'tournament_data', None):
+            return None
         try:
-            if hasattr(self, 'tournament_data') and self.tournament_data:
-                filename = f"autosave_{self.tournament_data.get('name', 'tournament')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(self.tournament_data, f, ensure_ascii=False, indent=2)
-                print(f"Турнир автоматически сохранен в {filename}")
+            return get_snapshot_service().autosave(self.tournament_data)
         except Exception as e:
             print(f"Ошибка при автосохранении: {e}")
+            return None
     
     def find_control_panel_by_mat(self, mat_number):
         """Находит панель управления по номеру ковра"""
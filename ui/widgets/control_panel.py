@@ -21,12 +21,26 @@ try:
 except ImportError:
     winsound = DummyWinsound()
 
-from datetime import datetime
 from core.constants import *
 from core.models import Wrestler, MatchHistory
 from core.network import NetworkManager
+from core.bout_recorder import REC_END, REC_EVENT, REC_REDO, REC_UNDO, BoutRecorder, bout_path
+from core.cluster_clock import cluster_datetime, cluster_time
+from core.commands import CommandStack
 from core.db import save_match_result
+from core.durations import format_eta, forecast_mat, match_timing, tournament_sport
+from core.journal import journal_category_match, journal_match_update
+from core.mat_queue import get_mat_queue, notify_match_changed
+from core.match_clock import BEEP_MARKS, RENDER_INTERVAL_MS, MatchClock
+from core.progression import on_result
+from core.reflow import reflow_after_bout
+from core.rules import (
+    BLUE, EVENT_CAUTION, EVENT_PASSIVITY, EVENT_POINTS, RED, BoutState, ScoringEvent,
+)
+from core.schedule_time import format_schedule_time
+from core.scoreboard_clock import KEEPALIVE_SECONDS, ClockPublisher
 from core.settings import get_settings
+from core.sport_loader import SportLoader
 from ui.widgets.scoreboard import ScoreboardWindow
 from ui.widgets.schedule import ScheduleWindow, filter_schedule_items
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
@@ -35,6 +49,9 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor, QBrush
 
+# Строк истории действий, видимых в окне каждого борца
+HISTORY_LINES = 10
+
 class BracketTab(QWidget):
     def __init__(self, tournament_data, control_panel, parent=None):
         super().__init__(parent)
@@ -725,6 +742,10 @@ class InlineMatScheduleWidget(QWidget):
         self.title = QLabel("Расписание ковра")
         self.title.setStyleSheet("font-weight: bold;")
         layout.addWidget(self.title)
+        # Ближайшие схватки из очереди вызова ковра
+        self.on_deck_label = QLabel("")
+        self.on_deck_label.setWordWrap(True)
+        layout.addWidget(self.on_deck_label)
         layout.addWidget(self._placeholder)
         self.update_data(tournament_data, mat_number)
 
@@ -734,8 +755,20 @@ class InlineMatScheduleWidget(QWidget):
         if not tournament_data or "schedule" not in tournament_data:
             if self.table:
                 self.table.setRowCount(0)
+            self.on_deck_label.setText("")
             return
 
+        on_deck = get_mat_queue(tournament_data).peek(mat_number, 3)
+        if on_deck:
+            self.on_deck_label.setText("На подходе: " + "; ".join(
+                f"{format_schedule_time(m)}"
+                + (f" (ожид. {format_eta(m)})" if format_eta(m) else "")
+                + f" {m.get('wrestler1', '')} — {m.get('wrestler2', '')}"
+                for m in on_deck
+            ))
+        else:
+            self.on_deck_label.setText("На подходе: нет ожидающих схваток")
+
         mat_matches = filter_schedule_items(
             tournament_data.get("schedule", []), query="", mat_filter=mat_number
         )
@@ -769,14 +802,27 @@ class ControlPanel(QWidget):
         self.red = Wrestler("Красный")
         self.blue = Wrestler("Синий")
         self.current_period = 1
-        self.technical_superiority = 10
+        # Правила вида спорта турнира (core.rules); панель только показывает их результат
+        self.rules_engine = SportLoader.load_rules(tournament_sport(tournament_data))
+        self.rules = self.rules_engine.rules
+        self.technical_superiority = self.rules.technical_superiority
         self.settings = get_settings()
-        self.period_base_duration = self.settings.get("timers", "period_duration", PERIOD_DURATION)
-        self.break_base_duration = self.settings.get("timers", "break_duration", BREAK_DURATION)
+        self.period_base_duration = self.settings.get("timers", "period_duration", self.rules.period_duration)
+        self.break_base_duration = self.settings.get("timers", "break_duration", self.rules.break_duration)
         self.opponent_wait_duration = self.settings.get("timers", "opponent_wait_duration", 60)
+        # Отсчёт по монотонным часам (core.match_clock); remaining_time,
+        # break_time_remaining и opponent_wait_time_remaining — свойства поверх них
+        self.period_clock = MatchClock(self.period_base_duration, marks=BEEP_MARKS, on_mark=self._on_period_mark)
+        self.break_clock = MatchClock(self.break_base_duration, on_mark=self._on_break_mark)
+        self.opponent_wait_clock = MatchClock(self.opponent_wait_duration, on_mark=self._on_opponent_wait_mark)
+        self._shown_seconds = {}
         self.remaining_time = self.period_base_duration
         self.timer_running = False
         self.history = MatchHistory()
+        # Действия судьи для отмены/повтора (core.commands)
+        self.commands = CommandStack()
+        # Запись текущей схватки (core.bout_recorder); открывается при пуске таймера или первом действии
+        self.recorder = None
         self.winner = None
         self.tournament_date = None
         self.tournament_data = tournament_data
@@ -792,17 +838,21 @@ class ControlPanel(QWidget):
         self.current_match_w2 = None
         self.current_match_id = None
        
+        # QTimer только перерисовывает время, отсчёт ведут часы выше
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_timer)
        
         # Таймер перерыва
         self.break_timer = QTimer()
+        self.break_timer.setTimerType(Qt.PreciseTimer)
         self.break_timer.timeout.connect(self.update_break_timer)
         self.break_time_remaining = self.break_base_duration
         self.break_timer_running = False
         
         # Таймер ожидания соперника (обратный отсчет)
         self.opponent_wait_timer = QTimer()
+        self.opponent_wait_timer.setTimerType(Qt.PreciseTimer)
         self.opponent_wait_timer.timeout.connect(self.update_opponent_wait_timer)
         self.opponent_wait_time_remaining = self.opponent_wait_duration
         self.opponent_wait_timer_running = False
@@ -810,10 +860,14 @@ class ControlPanel(QWidget):
         # Сохраняем отредактированное время для каждого периода
         self.period_times = {1: self.period_base_duration, 2: self.period_base_duration, 3: self.period_base_duration}
        
-        # Таймер для постоянной отправки данных на табло
+        # Проверка изменений для табло: в сеть уходят только изменения счёта/имён
+        # и переходы таймера — время табло отсчитывают сами (core.scoreboard_clock)
+        self.clock_publisher = ClockPublisher()
+        self._scoreboard_signature = None
+        self._scoreboard_sent_at = 0.0
         self.scoreboard_update_timer = QTimer()
         self.scoreboard_update_timer.timeout.connect(self.send_scoreboard_update)
-        self.scoreboard_update_timer.start(500)  # Отправляем обновления каждые 500 мс
+        self.scoreboard_update_timer.start(500)
         self.setup_ui()
        
         # Регистрация обработчиков сетевых сообщений
@@ -822,6 +876,8 @@ class ControlPanel(QWidget):
         
         # Горячие клавиши
         QShortcut(QKeySequence("Ctrl+Z"), self, self.undo_action)
+        QShortcut(QKeySequence("Ctrl+Y"), self, self.redo_action)
+        QShortcut(QKeySequence("Ctrl+Shift+Z"), self, self.redo_action)
         QShortcut(QKeySequence("Ctrl+Space"), self, self.add_point_shortcut)
         
         # Устанавливаем фокус для обработки клавиш
@@ -964,7 +1020,7 @@ class ControlPanel(QWidget):
         tech_sup_group = QGroupBox("Настройки матча")
         tech_sup_layout = QHBoxLayout(tech_sup_group)
         tech_sup_layout.addWidget(QLabel("Техн. превосходство:"))
-        self.tech_sup_edit = QLineEdit("10")
+        self.tech_sup_edit = QLineEdit(str(self.technical_superiority))
         self.tech_sup_edit.setValidator(QIntValidator(1, 100))
         self.tech_sup_edit.setMaximumWidth(60)
         self.tech_sup_edit.editingFinished.connect(self.update_technical_superiority)
@@ -1062,6 +1118,7 @@ class ControlPanel(QWidget):
         self.red_history_text = QTextEdit()
         self.red_history_text.setMaximumHeight(150)
         self.red_history_text.setStyleSheet("background-color: #f8f8f8; color: black;")
+        self.red_history_text.document().setMaximumBlockCount(HISTORY_LINES)
         red_layout.addWidget(self.red_history_text)
        
         splitter.addWidget(red_group)
@@ -1156,6 +1213,7 @@ class ControlPanel(QWidget):
         self.blue_history_text = QTextEdit()
         self.blue_history_text.setMaximumHeight(150)
         self.blue_history_text.setStyleSheet("background-color: #f8f8f8; color: black;")
+        self.blue_history_text.document().setMaximumBlockCount(HISTORY_LINES)
         blue_layout.addWidget(self.blue_history_text)
 
         splitter.addWidget(blue_group)
@@ -1177,6 +1235,10 @@ class ControlPanel(QWidget):
         undo_btn.clicked.connect(self.undo_action)
         undo_btn.setStyleSheet("background-color: #FFFFCC; font-weight: bold;")
         match_layout.addWidget(undo_btn)
+        redo_btn = QPushButton("ПОВТОРИТЬ")
+        redo_btn.clicked.connect(self.redo_action)
+        redo_btn.setStyleSheet("background-color: #FFFFCC; font-weight: bold;")
+        match_layout.addWidget(redo_btn)
         fall_red_btn = QPushButton("ТУШЕ КРАСНЫЙ")
         fall_red_btn.clicked.connect(lambda: self.end_match("ТУШЕ Красным"))
         fall_red_btn.setStyleSheet("background-color: #ff4444; color: white; font-weight: bold;")
@@ -1213,19 +1275,75 @@ class ControlPanel(QWidget):
         try:
             self.technical_superiority = int(self.tech_sup_edit.text())
         except:
-            self.technical_superiority = 10
-            self.tech_sup_edit.setText("10")
+            self.technical_superiority = self.rules.technical_superiority
+            self.tech_sup_edit.setText(str(self.technical_superiority))
+        self.rules_engine.technical_superiority = self.technical_superiority
+
+    def _bout_state(self):
+        """Состояние для движка правил поверх борцов панели"""
+        return BoutState(red=self.red, blue=self.blue)
+
+    def _execute(self, kind, wrestler, points=0, description=""):
+        """Применяет событие к борцам панели через стек команд; возвращает ScoreCommand"""
+        corner = RED if wrestler is self.red else BLUE
+        self._start_recording()
+        command = self.commands.execute(
+            self.rules_engine, self._bout_state(), ScoringEvent(kind, corner, points=points, description=description)
+        )
+        self._record(REC_EVENT, event=command.event.to_dict())
+        return command
+
+    def _start_recording(self):
+        """Открывает запись схватки, если она ещё не ведётся"""
+        if self.recorder is not None or self.mat_number <= 0:
+            return
+        try:
+            self.recorder = BoutRecorder(
+                bout_path(self.mat_number, self.current_match_id, (self.red.name, self.blue.name)),
+                header={
+                    'mat': self.mat_number,
+                    'match_id': self.current_match_id,
+                    'category': self.current_match_category or "",
+                    'red': self.red.name,
+                    'blue': self.blue.name,
+                    'sport': self.rules.key,
+                },
+            )
+        except OSError as e:
+            print(f"[bouts] Не удалось начать запись схватки: {e}")
 
-    def check_technical_superiority(self):
-        diff = abs(self.red.points - self.blue.points)
-        if diff >= self.technical_superiority:
-            winner = self.red if self.red.points > self.blue.points else self.blue
-            self.end_match(f"Техническое превосходство {winner.color}")
+    def _record(self, kind, **fields):
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.record(kind, **fields)
+        except (OSError, ValueError) as e:
+            print(f"[bouts] Ошибка записи схватки: {e}")
+
+    def _stop_recording(self):
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.close()
+        except OSError as e:
+            print(f"[bouts] Ошибка закрытия записи схватки: {e}")
+        self.recorder = None
+
+    def _history_widget(self, wrestler):
+        return self.red_history_text if wrestler is self.red else self.blue_history_text
+
+    def _append_history(self, wrestler, text, command=None):
+        """Строка в историю борца и в конец виджета (без перерисовки всей истории)"""
+        if command is not None:
+            command.log(self._bout_state(), RED if wrestler is self.red else BLUE, text)
+        else:
+            wrestler.action_history.append(text)
+        self._history_widget(wrestler).append(text)
 
     def open_external_scoreboard(self):
         main_window = self.window()
         if not hasattr(main_window, 'external_scoreboard') or main_window.external_scoreboard is None:
-            scoreboard = ScoreboardWindow(self.network_manager, main_window)
+            scoreboard = ScoreboardWindow(self.network_manager, main_window, mat_number=self.mat_number)
             main_window.external_scoreboard = scoreboard
             # === КРИТИЧНО: Очищаем ссылку при закрытии ===
             def on_close():
@@ -1325,6 +1443,26 @@ class ControlPanel(QWidget):
             # Таймер ожидания соперника (оставшееся время)
             'opponent_wait_time': getattr(self, 'opponent_wait_time_remaining', 0) if self.settings.get_scoreboard_setting("show_opponent_wait_timer") else 0
         }
+
+        # Ход времени сам по себе не повод для рассылки: табло отсчитывают его локально
+        running = self.break_timer_running if is_break else self.timer_running
+        exact_remaining = (self.break_clock if is_break else self.period_clock).remaining()
+        clock = self.clock_publisher.observe(running, exact_remaining, period, is_break)
+        signature = json.dumps(
+            {k: v for k, v in data.items() if k not in ('time_remaining', 'break_time_remaining')},
+            sort_keys=True, ensure_ascii=False,
+        )
+        now = time.monotonic()
+        if clock is None and signature == self._scoreboard_signature and now - self._scoreboard_sent_at < KEEPALIVE_SECONDS:
+            return
+        self._scoreboard_signature = signature
+        self._scoreboard_sent_at = now
+        data['clock'] = self.clock_publisher.state
+        if self.recorder is not None:
+            try:
+                self.recorder.board(data)
+            except (OSError, ValueError) as e:
+                print(f"[bouts] Ошибка записи табло: {e}")
     
         # === 1. Отправляем в сеть (для вкладки "Табло") ===
         try:
@@ -1369,6 +1507,8 @@ class ControlPanel(QWidget):
             self.end_match(data['reason'])
         elif command == 'undo_action':
             self.undo_action()
+        elif command == 'redo_action':
+            self.redo_action()
    
     def send_match_control(self, command, **kwargs):
         """Отправка команды управления матчем в сеть"""
@@ -1441,11 +1581,13 @@ class ControlPanel(QWidget):
         self.blue.cautions = 0
         self.red.passivity = 0
         self.blue.passivity = 0
+        self.commands.clear()
+        self._stop_recording()
         self.current_period = 1
 
         # Время периода берется из настроек
         self.remaining_time = self.period_base_duration
-        for period in range(1, PERIODS + 1):
+        for period in range(1, self.rules.periods + 1):
             self.period_times[period] = self.period_base_duration
     
         # Обновляем локальный интерфейс
@@ -1483,12 +1625,14 @@ class ControlPanel(QWidget):
         self.send_scoreboard_update()
    
     def start_timer(self):
+        self._start_recording()
         self.send_scoreboard_update()
         if self.is_secondary or not self.window().is_secondary:
             self.open_external_scoreboard()
         if not self.timer_running:
             self.timer_running = True
-            self.timer.start(1000)
+            self.period_clock.start()
+            self.timer.start(RENDER_INTERVAL_MS)
             self.start_btn.setEnabled(False)
             self.pause_btn.setEnabled(True)
             if self.is_secondary:
@@ -1496,6 +1640,7 @@ class ControlPanel(QWidget):
    
     def pause_timer(self):
         self.timer_running = False
+        self.period_clock.pause()
         self.timer.stop()
         self.start_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
@@ -1523,7 +1668,7 @@ class ControlPanel(QWidget):
     
     def next_period(self):
         """Переходит к следующему периоду через перерыв"""
-        if self.current_period < PERIODS:
+        if self.current_period < self.rules.periods:
             # Останавливаем таймер периода, если он работает
             self.pause_timer()
            
@@ -1533,7 +1678,8 @@ class ControlPanel(QWidget):
             # Запускаем таймер перерыва
             self.break_time_remaining = self.break_base_duration
             self.break_timer_running = True
-            self.break_timer.start(1000)
+            self.break_clock.start()
+            self.break_timer.start(RENDER_INTERVAL_MS)
             self.break_start_btn.setEnabled(False)
             self.break_pause_btn.setEnabled(True)
             self.break_toggle_btn.setText("ВЫКЛ")
@@ -1546,35 +1692,74 @@ class ControlPanel(QWidget):
             if self.is_secondary:
                 self.send_match_control('next_period')
    
+    @property
+    def remaining_time(self):
+        """Остаток периода в целых секундах (по часам периода)"""
+        return self.period_clock.seconds()
+
+    @remaining_time.setter
+    def remaining_time(self, seconds):
+        self.period_clock.set(seconds)
+
+    @property
+    def break_time_remaining(self):
+        return self.break_clock.seconds()
+
+    @break_time_remaining.setter
+    def break_time_remaining(self, seconds):
+        self.break_clock.set(seconds)
+
+    @property
+    def opponent_wait_time_remaining(self):
+        return self.opponent_wait_clock.seconds()
+
+    @opponent_wait_time_remaining.setter
+    def opponent_wait_time_remaining(self, seconds):
+        self.opponent_wait_clock.set(seconds)
+
+    def _second_changed(self, name, seconds):
+        """Сменилась ли показываемая секунда таймера name с прошлой отрисовки"""
+        if self._shown_seconds.get(name) == seconds:
+            return False
+        self._shown_seconds[name] = seconds
+        return True
+
     def update_timer(self):
-        if self.remaining_time > 0:
-            self.remaining_time -= 1
+        """Отрисовка таймера периода; вызывается часто, меняет надписи только при смене секунды"""
+        changed = self._second_changed('period', self.remaining_time)
+        if changed:
             minutes = self.remaining_time // 60
             seconds = self.remaining_time % 60
             self.current_time_label.setText(f"{minutes:02d}:{seconds:02d}")
             self.period_label.setText(f"Период: {self.current_period}")
-            if self.remaining_time == 30:
-                winsound.Beep(1000, 500)
-            elif self.remaining_time == 10:
-                winsound.Beep(1000, 200)
-                winsound.Beep(1000, 200)
-            elif self.remaining_time == 0:
-                winsound.Beep(2000, 1000)
-                self.pause_timer()
-                if self.current_period < PERIODS:
-                    # Автоматически запускаем перерыв между периодами
-                    self.next_period()
-                else:
-                    self.determine_winner()
+        # Сигналы 30/10 с и окончание периода — по отметкам часов
+        self.period_clock.poll()
+        if changed:
             # Обновляем отображение и отправляем на табло
             self.update_display()
             self.send_scoreboard_update()
+
+    def _on_period_mark(self, mark):
+        if mark == 30:
+            winsound.Beep(1000, 500)
+        elif mark == 10:
+            winsound.Beep(1000, 200)
+            winsound.Beep(1000, 200)
+        elif mark == 0:
+            winsound.Beep(2000, 1000)
+            self.pause_timer()
+            if self.current_period < self.rules.periods:
+                # Автоматически запускаем перерыв между периодами
+                self.next_period()
+            else:
+                self.determine_winner()
    
     def start_break_timer(self):
         """Запускает таймер перерыва"""
         if not self.break_timer_running:
             self.break_timer_running = True
-            self.break_timer.start(1000)
+            self.break_clock.start()
+            self.break_timer.start(RENDER_INTERVAL_MS)
             self.break_start_btn.setEnabled(False)
             self.break_pause_btn.setEnabled(True)
             if self.is_secondary:
@@ -1583,6 +1768,7 @@ class ControlPanel(QWidget):
     def pause_break_timer(self):
         """Останавливает таймер перерыва"""
         self.break_timer_running = False
+        self.break_clock.pause()
         self.break_timer.stop()
         self.break_start_btn.setEnabled(True)
         self.break_pause_btn.setEnabled(False)
@@ -1602,49 +1788,46 @@ class ControlPanel(QWidget):
    
     def update_break_timer(self):
         """Обновляет таймер перерыва"""
-        if self.break_time_remaining > 0:
-            self.break_time_remaining -= 1
+        if self._second_changed('break', self.break_time_remaining):
             minutes = self.break_time_remaining // 60
             seconds = self.break_time_remaining % 60
             self.break_time_label.setText(f"{minutes:02d}:{seconds:02d}")
            
             # Обновляем табло с информацией о перерыве
             self.send_scoreboard_update()
+        self.break_clock.poll()
+
+    def _on_break_mark(self, mark):
+        """Перерыв закончился"""
+        winsound.Beep(2000, 1000)
+        self.pause_break_timer()
+        self.break_toggle_btn.setText("ВКЛ")
+        self.break_toggle_btn.setStyleSheet("font-size: 14px; font-weight: bold; background-color: #87CEEB;")
+       
+        # Автоматически переходим к следующему периоду
+        if self.current_period < self.rules.periods:
+            self.current_period += 1
+            self.remaining_time = self.period_times.get(self.current_period, self.period_base_duration)
            
-            if self.break_time_remaining == 0:
-                winsound.Beep(2000, 1000)
-                self.pause_break_timer()
-                self.break_toggle_btn.setText("ВКЛ")
-                self.break_toggle_btn.setStyleSheet("font-size: 14px; font-weight: bold; background-color: #87CEEB;")
-               
-                # Автоматически переходим к следующему периоду
-                if self.current_period < PERIODS:
-                    self.current_period += 1
-                    self.remaining_time = self.period_times.get(self.current_period, self.period_base_duration)
-                   
-                    # Обновляем таймер времени для нового периода
-                    minutes = self.remaining_time // 60
-                    secs = self.remaining_time % 60
-                    self.current_time_label.setText(f"{minutes:02d}:{secs:02d}")
-                    self.period_label.setText(f"Период: {self.current_period}")
-                   
-                    # Обновляем отображение
-                    self.update_display()
-                    self.send_scoreboard_update()
+            # Обновляем таймер времени для нового периода
+            minutes = self.remaining_time // 60
+            secs = self.remaining_time % 60
+            self.current_time_label.setText(f"{minutes:02d}:{secs:02d}")
+            self.period_label.setText(f"Период: {self.current_period}")
+           
+            # Обновляем отображение
+            self.update_display()
+            self.send_scoreboard_update()
    
     def add_points(self, wrestler, points, description):
-        wrestler.points += points
-        wrestler.last_scored = True
+        command = self._execute(EVENT_POINTS, wrestler, points, description)
        
-        opponent = self.blue if wrestler == self.red else self.red
-        opponent.last_scored = False
-       
-        timestamp = time.strftime("%H:%M:%S")
-        wrestler.action_history.append(f"{timestamp} - {description} (+{points})")
+        timestamp = cluster_datetime().strftime("%H:%M:%S")
+        self._append_history(wrestler, f"{timestamp} - {description} (+{points})", command)
        
-        self.update_history_text()
         self.update_display()
-        self.check_technical_superiority()
+        if command.end_reason:
+            self.end_match(command.end_reason)
        
         # Немедленная отправка на табло
         self.send_scoreboard_update()
@@ -1658,19 +1841,16 @@ class ControlPanel(QWidget):
                                   description=description)
    
     def add_caution(self, wrestler, description):
-        wrestler.cautions += 1
+        command = self._execute(EVENT_CAUTION, wrestler, description=description)
         opponent = self.blue if wrestler == self.red else self.red
-        opponent.points += 1
-        opponent.last_scored = True
-        wrestler.last_scored = False
        
-        timestamp = time.strftime("%H:%M:%S")
-        wrestler.action_history.append(f"{timestamp} - {description}")
-        opponent.action_history.append(f"{timestamp} - Соперник получил {description.lower()} (+1 вам)")
+        timestamp = cluster_datetime().strftime("%H:%M:%S")
+        self._append_history(wrestler, f"{timestamp} - {description}", command)
+        self._append_history(opponent, f"{timestamp} - Соперник получил {description.lower()} (+1 вам)", command)
        
-        self.update_history_text()
         self.update_display()
-        self.check_cautions(wrestler)
+        if command.end_reason:
+            self.end_match(command.end_reason)
        
         # Немедленная отправка на табло
         self.send_scoreboard_update()
@@ -1681,22 +1861,14 @@ class ControlPanel(QWidget):
                                   description=description)
    
     def add_passivity(self, wrestler, description):
-        wrestler.passivity += 1
+        command = self._execute(EVENT_PASSIVITY, wrestler, description=description)
         opponent = self.blue if wrestler == self.red else self.red
        
-        if wrestler.passivity <= 2:
-            opponent.points += 1
-            opponent.last_scored = True
-            wrestler.last_scored = False
-           
-            timestamp = time.strftime("%H:%M:%S")
-            wrestler.action_history.append(f"{timestamp} - {description}")
-            opponent.action_history.append(f"{timestamp} - Соперник проявил пассивность (+1 вам)")
-        else:
-            timestamp = time.strftime("%H:%M:%S")
-            wrestler.action_history.append(f"{timestamp} - {description}")
+        timestamp = cluster_datetime().strftime("%H:%M:%S")
+        self._append_history(wrestler, f"{timestamp} - {description}", command)
+        if self.rules_engine.passivity_scores(wrestler.passivity):
+            self._append_history(opponent, f"{timestamp} - Соперник проявил пассивность (+1 вам)", command)
            
-        self.update_history_text()
         self.update_display()
        
         # Немедленная отправка на табло
@@ -1707,30 +1879,17 @@ class ControlPanel(QWidget):
                                   wrestler='red' if wrestler == self.red else 'blue',
                                   description=description)
    
-    def check_technical_superiority(self):
-        """
-        Проверка технического превосходства с учётом значения,
-        введённого пользователем в поле «Техн. превосходство».
-        """
-        diff = abs(self.red.points - self.blue.points)
-        if diff >= self.technical_superiority:
-            winner = self.red if self.red.points > self.blue.points else self.blue
-            self.end_match(f"Техническое превосходство {winner.color}")
-   
-    def check_cautions(self, wrestler):
-        if wrestler.cautions >= CAUTION_LIMIT:
-            opponent = self.blue if wrestler == self.red else self.red
-            self.end_match(f"Дисквалификация {wrestler.color} (3 предупреждения). Победа {opponent.color}")
-   
     def end_match(self, reason):
         self.pause_timer()
        
-        timestamp = time.strftime("%H:%M:%S")
-        self.red.action_history.append(f"{timestamp} - {reason}")
-        self.blue.action_history.append(f"{timestamp} - {reason}")
+        timestamp = cluster_datetime().strftime("%H:%M:%S")
+        self._append_history(self.red, f"{timestamp} - {reason}")
+        self._append_history(self.blue, f"{timestamp} - {reason}")
        
-        self.update_history_text()
         self.determine_winner()
+        self.send_scoreboard_update()
+        self._record(REC_END, reason=reason, winner=self.winner)
+        self._stop_recording()
         # После определения победителя сохраняем результат в турнирные данные
         self.update_tournament_match_result()
         QMessageBox.information(self, "Конец матча", reason)
@@ -1742,29 +1901,15 @@ class ControlPanel(QWidget):
         if self.winner:
             return
        
-        if self.red.points > self.blue.points:
-            self.winner = "Красный"
-        elif self.blue.points > self.red.points:
-            self.winner = "Синий"
-        else:
-            if self.red.cautions < self.blue.cautions:
-                self.winner = "Красный"
-            elif self.blue.cautions < self.red.cautions:
-                self.winner = "Синий"
-            elif self.red.last_scored:
-                self.winner = "Красный"
-            elif self.blue.last_scored:
-                self.winner = "Синий"
-            else:
-                self.winner = "Ничья"
+        winner = self.rules_engine.decide(self._bout_state())
+        self.winner = {RED: "Красный", BLUE: "Синий"}.get(winner, "Ничья")
        
         winner_text = f"ПОБЕДИТЕЛЬ: {self.winner}" if self.winner != "Ничья" else "НИЧЬЯ"
        
-        timestamp = time.strftime("%H:%M:%S")
-        self.red.action_history.append(f"{timestamp} - {winner_text}")
-        self.blue.action_history.append(f"{timestamp} - {winner_text}")
+        timestamp = cluster_datetime().strftime("%H:%M:%S")
+        self._append_history(self.red, f"{timestamp} - {winner_text}")
+        self._append_history(self.blue, f"{timestamp} - {winner_text}")
        
-        self.update_history_text()
         QMessageBox.information(self, "Результат", winner_text)
 
     def save_current_match_result(self):
@@ -1785,13 +1930,16 @@ class ControlPanel(QWidget):
         if target_schedule_match:
             # Обновляем статус в расписании
             target_schedule_match['status'] = 'Завершен'
-            target_schedule_match['completed_at'] = datetime.now().strftime("%H:%M")
+            target_schedule_match['completed_at'] = cluster_datetime().strftime("%H:%M")
+            target_schedule_match.setdefault('completed_ts', cluster_time())
             target_schedule_match['score1'] = self.red.points
             target_schedule_match['score2'] = self.blue.points
             if self.red.points > self.blue.points:
                 target_schedule_match['winner'] = self.red.name
             elif self.blue.points > self.red.points:
                 target_schedule_match['winner'] = self.blue.name
+            notify_match_changed(self.tournament_data, target_schedule_match)
+            journal_match_update(self.tournament_data, target_schedule_match)
         
         # Обновляем матч в категории
         if self.current_match_category:
@@ -1848,6 +1996,8 @@ class ControlPanel(QWidget):
 
         # Помечаем матч как завершенный
         target_match['completed'] = True
+        # Действия судьи (core.commands) — запись схватки для разбора и отмены
+        target_match['commands'] = self.commands.to_list()
 
         # Определяем победителя (1 балл за победу, 0 за поражение)
         if self.red.points > self.blue.points:
@@ -1864,19 +2014,38 @@ class ControlPanel(QWidget):
             target_match['winner_points'] = 0
             target_match['loser_points'] = 0
 
+        journal_category_match(
+            self.tournament_data, self.current_match_category, target_match,
+            ('score1', 'score2', 'winner', 'completed', 'winner_points', 'loser_points', 'commands'),
+        )
+
         # Обновляем расписание с полной информацией о результатах
+        finished_schedule_match = None
         if 'schedule' in self.tournament_data:
             for s_match in self.tournament_data['schedule']:
                 if s_match.get('match_id') == target_match.get('id'):
+                    finished_schedule_match = s_match
                     s_match['winner'] = target_match.get('winner')
                     s_match['status'] = 'Завершен'
-                    s_match['completed_at'] = datetime.now().strftime("%H:%M")
+                    s_match['completed_at'] = cluster_datetime().strftime("%H:%M")
+                    s_match.setdefault('completed_ts', cluster_time())
                     # Добавляем полную информацию о результатах для синхронизации
                     s_match['score1'] = target_match.get('score1', 0)
                     s_match['score2'] = target_match.get('score2', 0)
                     s_match['completed'] = True
+                    notify_match_changed(self.tournament_data, s_match)
+                    journal_match_update(self.tournament_data, s_match)
                     break
 
+        # Фактическая длительность -> модель прогноза; пересчёт ETA только этого ковра
+        timing = match_timing(self.tournament_data, self.current_match_category, finished_schedule_match)
+        self.reflow_mat_schedule()
+        self.schedule_dependent_bouts(target_match.get('id'))
+        try:
+            forecast_mat(self.tournament_data, self.mat_number)
+        except Exception as e:
+            print(f"[durations] Ошибка пересчёта ETA ковра {self.mat_number}: {e}")
+
         # Синхронизируем статус ковра
         if self.schedule_sync:
             self.schedule_sync.send_mat_status("completed", target_match.get('id'))
@@ -1908,7 +2077,7 @@ class ControlPanel(QWidget):
                         'score2': target_match.get('score2', 0),
                         'completed': target_match.get('completed', True),
                         'status': 'Завершен',
-                        'completed_at': datetime.now().strftime("%H:%M"),
+                        'completed_at': cluster_datetime().strftime("%H:%M"),
                     }
                     # Добавляем mat, если есть
                     if 'schedule' in self.tournament_data:
@@ -1918,6 +2087,8 @@ class ControlPanel(QWidget):
                                     match_update['mat'] = s_match['mat']
                                 if 'time' in s_match:
                                     match_update['time'] = s_match['time']
+                                if 'start_min' in s_match:
+                                    match_update['start_min'] = s_match['start_min']
                                 break
                 
                 # Убеждаемся, что все необходимые поля присутствуют
@@ -1939,7 +2110,7 @@ class ControlPanel(QWidget):
         # Сохраняем результат матча в БД (безопасно, с перехватом ошибок)
         if save_to_db:
             try:
-                save_match_result(self.tournament_data, self.current_match_category, target_match)
+                save_match_result(self.tournament_data, self.current_match_category, target_match, timing=timing)
             except Exception as e:
                 print(f"[DB] Ошибка при сохранении результата матча: {e}")
 
@@ -1963,6 +2134,76 @@ class ControlPanel(QWidget):
             if reply == QMessageBox.Yes:
                 QTimer.singleShot(500, self.load_next_match)  # Небольшая задержка для завершения обновлений
 
+    def reflow_mat_schedule(self):
+        """
+        Сдвигает время ожидающих схваток ковра к фактическому и, если ковёр
+        сильно опережает другие, забирает схватки с самого загруженного.
+        По сети рассылаются только изменённые записи.
+        """
+        settings = get_settings()
+        if not self.tournament_data or not settings.get("tournament", "auto_reflow", True):
+            return []
+        try:
+            n_mats = int(settings.get("tournament", "number_of_mats", 2) or 2)
+            threshold = int(settings.get("tournament", "rebalance_threshold_min", 0) or 0)
+            changed = reflow_after_bout(
+                self.tournament_data,
+                self.mat_number,
+                mats=range(1, n_mats + 1),
+                threshold_minutes=threshold,
+            )
+        except Exception as e:
+            print(f"[reflow] Ошибка пересчёта расписания ковра {self.mat_number}: {e}")
+            return []
+
+        for s_match in changed:
+            journal_match_update(self.tournament_data, s_match)
+        if changed and self.schedule_sync:
+            for s_match in changed:
+                try:
+                    self.schedule_sync.send_match_update(s_match.copy())
+                except Exception as e:
+                    print(f"[ERROR] Ошибка синхронизации пересчитанного матча: {e}")
+        if changed:
+            print(f"[reflow] Ковёр {self.mat_number}: пересчитано схваток {len(changed)}")
+        return changed
+
+    def schedule_dependent_bouts(self, match_id):
+        """
+        Создаёт схватки, определившиеся после результата (следующий раунд,
+        утешительные, сетка проигравших), и ставит их в ближайшие свободные
+        слоты ковров. По сети рассылаются только новые записи.
+        """
+        category_name = self.current_match_category
+        if not self.tournament_data or not category_name or not match_id:
+            return []
+        try:
+            n_mats = int(get_settings().get("tournament", "number_of_mats", 2) or 2)
+            created = on_result(self.tournament_data, category_name, match_id, mats=range(1, n_mats + 1))
+        except Exception as e:
+            print(f"[progression] Ошибка создания следующих схваток категории {category_name}: {e}")
+            return []
+        if not created:
+            return []
+
+        cat_matches = {
+            m.get('id'): m
+            for m in self.tournament_data.get('categories', {}).get(category_name, {}).get('matches', [])
+        }
+        for s_match in created:
+            cat_match = cat_matches.get(s_match.get('match_id'))
+            if cat_match is not None:
+                journal_category_match(self.tournament_data, category_name, cat_match, tuple(cat_match.keys()))
+            journal_match_update(self.tournament_data, s_match)
+        if self.schedule_sync:
+            for s_match in created:
+                try:
+                    self.schedule_sync.send_match_update(s_match.copy())
+                except Exception as e:
+                    print(f"[ERROR] Ошибка синхронизации новой схватки: {e}")
+        print(f"[progression] {category_name}: создано схваток {len(created)}")
+        return created
+
     def update_category_points(self, category, match):
         """Обновляет общие очки участников в категории"""
         wrestlers = category.get('wrestlers', [])
@@ -1998,95 +2239,12 @@ class ControlPanel(QWidget):
         self.update_bracket_display()
 
     def undo_action(self):
-        """Отменяет последнее действие, обрабатывая предупреждения и пассивность"""
-        undone = False
-       
-        try:
-            # Проверяем историю красного борца
-            if self.red.action_history:
-                last_red = self.red.action_history[-1] # Смотрим последнее действие без удаления
-               
-                # Если это предупреждение (не "Соперник получил...")
-                if ("Предупреждение" in last_red or "предупреждение" in last_red) and "Соперник" not in last_red:
-                    self.red.action_history.pop()
-                    if self.red.cautions > 0:
-                        self.red.cautions -= 1
-                    # Отменяем очко, которое было дано синему
-                    if self.blue.points > 0:
-                        self.blue.points -= 1
-                    # Удаляем соответствующую запись из истории синего
-                    if self.blue.action_history and "Соперник получил" in self.blue.action_history[-1]:
-                        self.blue.action_history.pop()
-                    undone = True
-                # Если это пассивность (не "Соперник проявил...")
-                elif ("Пассивность" in last_red or "пассивность" in last_red) and "Соперник" not in last_red:
-                    self.red.action_history.pop()
-                    old_passivity = self.red.passivity
-                    if self.red.passivity > 0:
-                        self.red.passivity -= 1
-                    # Отменяем очко, которое было дано синему (только если было <= 2 пассивности до отмены)
-                    if old_passivity <= 2 and self.blue.points > 0:
-                        self.blue.points -= 1
-                    # Удаляем соответствующую запись из истории синего
-                    if self.blue.action_history and "Соперник проявил" in self.blue.action_history[-1]:
-                        self.blue.action_history.pop()
-                    undone = True
-           
-            # Проверяем историю синего борца, если еще ничего не было отменено
-            if not undone and self.blue.action_history:
-                last_blue = self.blue.action_history[-1]
-               
-                # Если это предупреждение (не "Соперник получил...")
-                if ("Предупреждение" in last_blue or "предупреждение" in last_blue) and "Соперник" not in last_blue:
-                    self.blue.action_history.pop()
-                    if self.blue.cautions > 0:
-                        self.blue.cautions -= 1
-                    # Отменяем очко, которое было дано красному
-                    if self.red.points > 0:
-                        self.red.points -= 1
-                    # Удаляем соответствующую запись из истории красного
-                    if self.red.action_history and "Соперник получил" in self.red.action_history[-1]:
-                        self.red.action_history.pop()
-                    undone = True
-                # Если это пассивность (не "Соперник проявил...")
-                elif ("Пассивность" in last_blue or "пассивность" in last_blue) and "Соперник" not in last_blue:
-                    self.blue.action_history.pop()
-                    old_passivity = self.blue.passivity
-                    if self.blue.passivity > 0:
-                        self.blue.passivity -= 1
-                    # Отменяем очко, которое было дано красному (только если было <= 2 пассивности до отмены)
-                    if old_passivity <= 2 and self.red.points > 0:
-                        self.red.points -= 1
-                    # Удаляем соответствующую запись из истории красного
-                    if self.red.action_history and "Соперник проявил" in self.red.action_history[-1]:
-                        self.red.action_history.pop()
-                    undone = True
-           
-            # Если это не предупреждение/пассивность, обрабатываем как обычные очки
-            if not undone:
-                if self.red.action_history:
-                    last_red = self.red.action_history.pop()
-                    if "+" in last_red:
-                        points_match = re.search(r'\(\+(\d+)\)', last_red)
-                        if points_match:
-                            points = int(points_match.group(1))
-                            if self.red.points >= points:
-                                self.red.points -= points
-                            undone = True
-               
-                if not undone and self.blue.action_history:
-                    last_blue = self.blue.action_history.pop()
-                    if "+" in last_blue:
-                        points_match = re.search(r'\(\+(\d+)\)', last_blue)
-                        if points_match:
-                            points = int(points_match.group(1))
-                            if self.blue.points >= points:
-                                self.blue.points -= points
-        except (IndexError, AttributeError, ValueError) as e:
-            print(f"[UNDO] Ошибка при отмене действия: {e}")
-            QMessageBox.warning(self, "Ошибка", "Не удалось отменить последнее действие")
+        """Отменяет последнее действие судьи по стеку команд (core.commands)"""
+        command = self.commands.undo(self._bout_state())
+        if command is None:
             return
-           
+        self._record(REC_UNDO, event=command.event.to_dict())
+        # Строки команды могли быть не последними — перерисовываем хвост истории
         self.update_history_text()
         self.update_display()
         # Немедленная отправка на табло для обновления предупреждений и пассивности
@@ -2094,6 +2252,22 @@ class ControlPanel(QWidget):
        
         if self.is_secondary:
             self.send_match_control('undo_action')
+
+    def redo_action(self):
+        """Повторяет последнее отменённое действие судьи"""
+        command = self.commands.redo(self._bout_state())
+        if command is None:
+            return
+        self._record(REC_REDO, event=command.event.to_dict())
+        for corner, lines in command.lines.items():
+            widget = self.red_history_text if corner == RED else self.blue_history_text
+            for line in lines:
+                widget.append(line)
+        self.update_display()
+        self.send_scoreboard_update()
+       
+        if self.is_secondary:
+            self.send_match_control('redo_action')
    
     def update_display(self):
         main_window = self.window()
@@ -2117,11 +2291,11 @@ class ControlPanel(QWidget):
    
     def update_history_text(self):
         self.red_history_text.clear()
-        for event in self.red.action_history[-10:]:
+        for event in self.red.action_history[-HISTORY_LINES:]:
             self.red_history_text.append(event)
            
         self.blue_history_text.clear()
-        for event in self.blue.action_history[-10:]:
+        for event in self.blue.action_history[-HISTORY_LINES:]:
             self.blue_history_text.append(event)
    
     def save_match(self):
@@ -2144,7 +2318,8 @@ class ControlPanel(QWidget):
             },
             "period": self.current_period,
             "time": self.remaining_time,
-            "history": self.history.events
+            "history": self.history.events,
+            "commands": self.commands.to_list()
         }
        
         filename, _ = QFileDialog.getSaveFileName(self, "Сохранить матч", "", "JSON files (*.json)")
@@ -2175,6 +2350,7 @@ class ControlPanel(QWidget):
             self.current_period = data["period"]
             self.remaining_time = data["time"]
             self.history.events = data["history"]
+            self.commands = CommandStack.from_list(data.get("commands"))
            
             self.red_name_edit.setText(self.red.name)
             self.red_region_edit.setText(self.red.region)
@@ -2198,7 +2374,7 @@ class ControlPanel(QWidget):
         seconds = qtime.minute() * 60 + qtime.second()
         self.remaining_time = seconds
         # Сохраняем отредактированное время для текущего периода и всех будущих периодов
-        for period in range(self.current_period, PERIODS + 1):
+        for period in range(self.current_period, self.rules.periods + 1):
             self.period_times[period] = seconds
         self.current_time_label.setText(f"{qtime.minute():02d}:{qtime.second():02d}")
         self.update_display()
@@ -2220,43 +2396,19 @@ class ControlPanel(QWidget):
         # Сначала пытаемся использовать расписание
         schedule = self.tournament_data.get('schedule', [])
         if schedule:
-            # Фильтруем матчи для текущего ковра и сортируем по времени и раунду
-            mat_matches = [m for m in schedule if m.get('mat') == self.mat_number]
-            mat_matches.sort(key=lambda x: (x.get('time', ''), x.get('round', 0)))
-            
-            # Находим следующий несыгранный матч
-            next_match = None
-            current_match_found = False
-            
-            for match in mat_matches:
-                is_completed = match.get('status') == 'Завершен' or match.get('completed', False)
-                is_in_progress = match.get('status') == 'В процессе'
-                
-                # Если нашли текущий матч, следующий будет следующим несыгранным
-                if current_match_found and not is_completed and not is_in_progress:
-                    next_match = match
-                    break
-                
-                # Проверяем, это ли текущий матч
-                if self.current_match_id and match.get('match_id') == self.current_match_id:
-                    current_match_found = True
-                elif (match.get('wrestler1') == self.current_match_w1 and 
-                      match.get('wrestler2') == self.current_match_w2):
-                    current_match_found = True
-            
-            # Если не нашли после текущего, ищем первый несыгранный
-            if not next_match:
-                for match in mat_matches:
-                    is_completed = match.get('status') == 'Завершен' or match.get('completed', False)
-                    is_in_progress = match.get('status') == 'В процессе'
-                    if not is_completed and not is_in_progress:
-                        next_match = match
-                        break
+            # Ближайший несыгранный матч ковра берём из очереди вызова (O(log n))
+            next_match = get_mat_queue(self.tournament_data).pop(self.mat_number)
             
             if next_match:
                 # Обновляем статус матча в расписании
                 next_match['status'] = 'В процессе'
-                next_match['started_at'] = datetime.now().strftime("%H:%M")
+                next_match['started_at'] = cluster_datetime().strftime("%H:%M")
+                next_match['started_ts'] = cluster_time()
+                journal_match_update(self.tournament_data, next_match)
+                try:
+                    forecast_mat(self.tournament_data, self.mat_number, current_match=next_match)
+                except Exception as e:
+                    print(f"[durations] Ошибка пересчёта ETA ковра {self.mat_number}: {e}")
                 self.refresh_inline_schedule()
                 if self.schedule_sync:
                     self.schedule_sync.send_mat_status("in_progress", next_match.get('match_id'))
@@ -2394,16 +2546,19 @@ class ControlPanel(QWidget):
         self.current_time_label.setText(f"{self.period_base_duration // 60:02d}:{self.period_base_duration % 60:02d}")
         self.timer_running = False
         self.timer.stop()
+        self.period_clock.reset(self.period_base_duration)
         self.start_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
         self.history = MatchHistory()
+        self.commands.clear()
+        self._stop_recording()
         self.winner = None
         self.red_history_text.clear()
         self.blue_history_text.clear()
         # Сбрасываем таймер перерыва
         self.break_timer_running = False
         self.break_timer.stop()
-        self.break_time_remaining = self.break_base_duration
+        self.break_clock.reset(self.break_base_duration)
         minutes = self.break_base_duration // 60
         secs = self.break_base_duration % 60
         self.break_time_label.setText(f"{minutes:02d}:{secs:02d}")
@@ -2425,6 +2580,10 @@ class ControlPanel(QWidget):
         # Скрываем/показываем кнопки предупреждений и пассивности
         show_cautions = self.settings.get_scoreboard_setting("show_cautions")
         show_passivity = self.settings.get_scoreboard_setting("show_passivity")
+        # В видах спорта без пассивности (вольная борьба) кнопки нет вовсе
+        engine = getattr(self, 'rules_engine', None)
+        if engine is not None and not engine.rules.passivity_enabled:
+            show_passivity = False
         show_opponent_wait = self.settings.get_scoreboard_setting("show_opponent_wait_timer")
         
         if hasattr(self, 'red_caution_btn') and self.red_caution_btn:
@@ -2483,7 +2642,8 @@ class ControlPanel(QWidget):
             
             if self.opponent_wait_time_remaining > 0:
                 self.opponent_wait_timer_running = True
-                self.opponent_wait_timer.start(1000)
+                self.opponent_wait_clock.start()
+                self.opponent_wait_timer.start(RENDER_INTERVAL_MS)
                 self.opponent_wait_start_btn.setEnabled(False)
                 self.opponent_wait_pause_btn.setEnabled(True)
                 self.send_scoreboard_update()
@@ -2491,6 +2651,7 @@ class ControlPanel(QWidget):
     def pause_opponent_wait_timer(self):
         """Останавливает таймер ожидания соперника"""
         self.opponent_wait_timer_running = False
+        self.opponent_wait_clock.pause()
         self.opponent_wait_timer.stop()
         self.opponent_wait_start_btn.setEnabled(True)
         self.opponent_wait_pause_btn.setEnabled(False)
@@ -2507,16 +2668,17 @@ class ControlPanel(QWidget):
     
     def update_opponent_wait_timer(self):
         """Обновляет таймер ожидания соперника (обратный отсчет)"""
-        if self.opponent_wait_time_remaining > 0:
-            self.opponent_wait_time_remaining -= 1
+        if self._second_changed('opponent_wait', self.opponent_wait_time_remaining):
             minutes = self.opponent_wait_time_remaining // 60
             seconds = self.opponent_wait_time_remaining % 60
             self.opponent_wait_time_label.setText(f"{minutes:02d}:{seconds:02d}")
             self.send_scoreboard_update()
-            
-            if self.opponent_wait_time_remaining == 0:
-                winsound.Beep(2000, 1000)
-                self.pause_opponent_wait_timer()
+        self.opponent_wait_clock.poll()
+
+    def _on_opponent_wait_mark(self, mark):
+        """Время ожидания соперника вышло"""
+        winsound.Beep(2000, 1000)
+        self.pause_opponent_wait_timer()
     
     def update_bracket_realtime(self):
         """Обновляет сетку в реальном времени при изменении очков"""
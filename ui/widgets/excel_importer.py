@@ -7,11 +7,19 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBut
                              QGroupBox, QLineEdit, QTableWidget, QTableWidgetItem,
                              QFileDialog, QMessageBox, QProgressBar, QGridLayout,
                              QHeaderView, QCheckBox, QDialog, QFormLayout,
-                             QComboBox, QDialogButtonBox, QInputDialog)
+                             QComboBox, QDialogButtonBox, QInputDialog, QSpinBox)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QBrush, QColor
-from core.utils import create_bracket, generate_schedule
+from core.utils import create_brackets_batch
 from core.settings import get_settings
+from core.durations import get_duration_model
+from core.ratings import seeding_ratings
+from core.autosave import get_snapshot_service
+from core.tournament_file import TOURNAMENT_FILE_FILTER, load_tournament_file
+from ui.widgets.save_status import report_save_result
+from core.schedule_time import migrate_schedule
+from core.schedule_cache import update_schedule
+from core.weight_groups import partition_participants, DEFAULT_MIN_GROUP_SIZE, DEFAULT_MAX_GROUP_SIZE
 from ui.widgets.tournament_manager import TournamentManager
 import math
 
@@ -131,6 +139,26 @@ class ExcelImporter(QWidget):
         )
         self.use_group_by_empty_rows.setChecked(True)
         layout.addWidget(self.use_group_by_empty_rows)
+
+        # Автоматическое разбиение по весу внутри пола/возраста (вместо ручных групп)
+        auto_groups_layout = QHBoxLayout()
+        self.use_weight_partition = QCheckBox(
+            "Автоматически разбить по весу на группы (внутри пола и возраста)"
+        )
+        self.use_weight_partition.setChecked(False)
+        auto_groups_layout.addWidget(self.use_weight_partition)
+        auto_groups_layout.addWidget(QLabel("Размер группы от"))
+        self.group_size_min = QSpinBox()
+        self.group_size_min.setRange(2, 16)
+        self.group_size_min.setValue(DEFAULT_MIN_GROUP_SIZE)
+        auto_groups_layout.addWidget(self.group_size_min)
+        auto_groups_layout.addWidget(QLabel("до"))
+        self.group_size_max = QSpinBox()
+        self.group_size_max.setRange(2, 64)
+        self.group_size_max.setValue(DEFAULT_MAX_GROUP_SIZE)
+        auto_groups_layout.addWidget(self.group_size_max)
+        auto_groups_layout.addStretch()
+        layout.addLayout(auto_groups_layout)
         
         # Кнопка формирования турнира
         generate_btn = QPushButton("Сформировать турнирную сетку")
@@ -152,7 +180,7 @@ class ExcelImporter(QWidget):
             self,
             "Выберите файл с участниками",
             "",
-            "Таблицы (*.xlsx *.xls *.csv *.json)",
+            "Таблицы (*.xlsx *.xls *.csv *.json *.mvpz)",
         )
         if not filename:
             return
@@ -215,7 +243,7 @@ class ExcelImporter(QWidget):
                     df = mapped_df
                 else:
                     df = self.process_csv_data(df_raw)
-            elif suffix == ".json":
+            elif suffix in (".json", ".mvpz"):
                 self.load_tournament_json(filename)
                 return
             else:
@@ -558,13 +586,16 @@ class ExcelImporter(QWidget):
                 n_mats = 2  # Минимум 2 ковра
                 settings.set("tournament", "number_of_mats", n_mats)
                 print(f"[WARNING] Количество ковров было меньше 1, установлено значение {n_mats}")
-            schedule = generate_schedule(
+            # Полная генерация с сохранением отпечатка входов: при следующей
+            # загрузке файла расписание будет использовано повторно
+            update_schedule(
                 tournament_info,
+                n_mats=n_mats,
                 start_time="10:00",
                 match_duration=8,
-                n_mats=n_mats
+                duration_model=get_duration_model(),
+                force=True,
             )
-            tournament_info["schedule"] = schedule
             print(f"[INFO] Расписание сгенерировано для {n_mats} ковров")
         except Exception as e:
             print(f"Ошибка при генерации расписания: {e}")
@@ -582,26 +613,26 @@ class ExcelImporter(QWidget):
             QMessageBox.information(self, "Успех", "Турнирная сетка и расписание успешно сформированы!")
         
         # Дополнительно сохраняем в файл
-        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить турнир", "", "JSON files (*.json)")
+        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить турнир", "", TOURNAMENT_FILE_FILTER)
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(tournament_info, f, ensure_ascii=False, indent=2, default=str)
+                future = get_snapshot_service().save_async(tournament_info, filename)
+                report_save_result(self, future)
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить файл: {str(e)}")
 
     def load_tournament_json(self, filename):
-        """Загрузка готового турнира из JSON (как в менеджере турниров)."""
+        """Загрузка готового турнира из JSON или .mvpz (как в менеджере турниров)."""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                tournament_info = json.load(f)
+            tournament_info = load_tournament_file(filename)
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось прочитать JSON: {e}")
+            QMessageBox.critical(self, "Ошибка", f"Не удалось прочитать файл турнира: {e}")
             return
 
         if not isinstance(tournament_info, dict) or 'categories' not in tournament_info:
             QMessageBox.critical(self, "Ошибка", "Некорректный формат файла турнира")
             return
+        migrate_schedule(tournament_info.get('schedule'))
 
         self.tournament_data = tournament_info.get('participants', [])
         # Показываем превью участников, если есть
@@ -647,7 +678,7 @@ class ExcelImporter(QWidget):
                 tm_widget.management_group.setVisible(True)
                 tm_widget.matches_group.setVisible(True)
         self.file_label.setText(filename)
-        QMessageBox.information(self, "Успех", "Турнир загружен из JSON")
+        QMessageBox.information(self, "Успех", "Турнир загружен из файла")
     
     def create_categories_automatically(self):
         """Автоматическое создание категорий на основе данных участников.
@@ -657,9 +688,16 @@ class ExcelImporter(QWidget):
         то каждая группа соответствует отдельной категории, название которой —
         средний алгебраический вес участников в группе.
 
+        Если включено "Автоматически разбить по весу на группы", участники
+        сортируются по весу внутри пола/возраста и делятся на группы заданного
+        размера с минимальным разбросом веса (см. core.weight_groups).
+
         Иначе используется автоматическое разбиение по возрасту, весу и стажу.
         """
 
+        if hasattr(self, "use_weight_partition") and self.use_weight_partition.isChecked():
+            return self._create_categories_by_weight_partition()
+
         # Если включена группировка по пустым строкам и есть group_index — используем её
         if (
             hasattr(self, "use_group_by_empty_rows")
@@ -725,13 +763,17 @@ class ExcelImporter(QWidget):
                 "matches": [],
             }
 
-            # Создаём сетку для каждой категории: авто-выбор типа (круг если <=5, иначе олимпийка)
-        for category_name, data in categories.items():
-            participants = data["participants"]
-            bracket = create_bracket(participants, category_name, bracket_type=None)
-            categories[category_name]["matches"] = bracket["matches"]
-            categories[category_name]["type"] = bracket["type"]
+        # Создаём сетку для каждой категории: авто-выбор типа (круг если <=5, иначе олимпийка)
+        create_brackets_batch(categories, bracket_type=None, ratings=seeding_ratings(categories))
+
+        return categories
 
+    def _create_categories_by_weight_partition(self):
+        """Создание категорий оптимальным разбиением по весу (группы заданного размера)."""
+        min_size = self.group_size_min.value()
+        max_size = max(min_size, self.group_size_max.value())
+        categories = partition_participants(self.tournament_data, min_size, max_size)
+        create_brackets_batch(categories, bracket_type=None, ratings=seeding_ratings(categories))
         return categories
 
     def _create_categories_by_auto_params(self):
@@ -771,11 +813,7 @@ class ExcelImporter(QWidget):
             categories[category_name]['participants'].append(wrestler)
         
         # Создаем матчи для каждой категории (автовыбор типа сетки)
-        for category_name, data in categories.items():
-            participants = data['participants']
-            bracket = create_bracket(participants, category_name, bracket_type=None)
-            categories[category_name]['matches'] = bracket['matches']
-            categories[category_name]['type'] = bracket['type']
+        create_brackets_batch(categories, bracket_type=None, ratings=seeding_ratings(categories))
         
         return categories
     
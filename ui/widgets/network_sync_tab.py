@@ -20,6 +20,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QObject
 
+from core.cluster_clock import cluster_datetime
 from core.settings import get_settings
 from network.schedule_sync import ScheduleSyncService
 
@@ -96,9 +97,9 @@ class NetworkSyncTab(QWidget):
 
         peers_group = QGroupBox("Узлы в сети")
         peers_layout = QVBoxLayout(peers_group)
-        self.peers_table = QTableWidget(0, 6)
+        self.peers_table = QTableWidget(0, 7)
         self.peers_table.setHorizontalHeaderLabels(
-            ["Имя", "Роль", "Ковёр", "IP", "Статус", "Обновл."]
+            ["Имя", "Роль", "Ковёр", "IP", "Статус", "Обновл.", "Часы"]
         )
         self.peers_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         peers_layout.addWidget(self.peers_table)
@@ -213,17 +214,30 @@ class NetworkSyncTab(QWidget):
                 info.get("ip", ""),
                 info.get("status", "") or info.get("current_match", "") or "",
                 datetime.fromtimestamp(info.get("last_seen", time.time())).strftime("%H:%M:%S"),
+                self._format_clock(info.get("clock")),
             ]
             for col, value in enumerate(items):
                 self.peers_table.setItem(row, col, QTableWidgetItem(str(value)))
 
+    @staticmethod
+    def _format_clock(clock: Optional[Dict[str, Any]]) -> str:
+        """Состояние часов узла из его heartbeat (core.cluster_clock)."""
+        if not clock:
+            return ""
+        if clock.get("reference"):
+            return "опорные"
+        if not clock.get("synced"):
+            return "не синхр."
+        delay = clock.get("delay_ms")
+        return f"{clock.get('offset_ms', 0):+.1f} мс" + (f" (RTT {delay:.1f})" if delay is not None else "")
+
     def _log(self, text: str):
         """Безопасный вызов из потока - эмитирует сигнал."""
         self.log_signal.emit(text)
     
     def _log_safe(self, text: str):
         """Запись в лог (вызывается из главного потока через сигнал)."""
-        now = datetime.now().strftime("%H:%M:%S")
+        now = cluster_datetime().strftime("%H:%M:%S")
         self.log_text.append(f"[{now}] {text}")
 
     # ------------------------------------------------------------------ #
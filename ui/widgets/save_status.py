@@ -0,0 +1,29 @@
+"""
+Отображение результата фонового сохранения (core.autosave) в UI.
+"""
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QMessageBox
+
+
+POLL_INTERVAL_MS = 100
+
+
+def report_save_result(widget, future, success_text=None, on_success=None):
+    """
+    Дожидается future фонового сохранения без блокировки UI (опрос по таймеру)
+    и показывает сообщение об успехе или ошибке.
+    """
+    def check():
+        if not future.done():
+            QTimer.singleShot(POLL_INTERVAL_MS, check)
+            return
+        error = future.exception()
+        if error is not None:
+            QMessageBox.critical(widget, "Ошибка", f"Не удалось сохранить файл: {error}")
+            return
+        if on_success:
+            on_success(future.result())
+        if success_text:
+            QMessageBox.information(widget, "Успех", success_text)
+
+    QTimer.singleShot(0, check)
@@ -1,6 +1,5 @@
 # ui/widgets/schedule.py
 import json
-from datetime import datetime
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
@@ -13,6 +12,11 @@ from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QSize, QMimeData
 from PyQt5.QtGui import QFont, QTextDocument, QAbstractTextDocumentLayout, QBrush, QColor, QKeyEvent, QDrag
 
 from core.utils import get_wrestler_club
+from core.cluster_clock import cluster_datetime, cluster_time
+from core.durations import format_eta, forecast_mat
+from core.journal import journal_match_update
+from core.mat_queue import is_pending, notify_match_changed
+from core.schedule_time import format_schedule_time
 
 
 # ===================================================================
@@ -71,7 +75,7 @@ def filter_schedule_items(schedule, query="", mat_filter=None):
             item.get("wrestler2", ""),
             item.get("club1", ""),
             item.get("club2", ""),
-            str(item.get("time", "")),
+            format_schedule_time(item),
             str(item.get("mat", "")),
         ]
         return any(query in str(f).lower() for f in fields)
@@ -463,7 +467,10 @@ class ScheduleWindow(QWidget):
                 table.setItem(row, 0, num_item)
 
             # HTML с улучшенным дизайном
-            time_str = match.get('time', '')
+            time_str = format_schedule_time(match)
+            eta_str = format_eta(match) if is_pending(match) else ""
+            if eta_str and eta_str != time_str:
+                time_str = f"{time_str} (ожид. {eta_str})" if time_str else f"ожид. {eta_str}"
             time_html = f'<div style="color:#6c757d; font-size:12px; margin-bottom:4px;">{time_str}</div>' if time_str else ''
             
             html = f"""
@@ -568,6 +575,8 @@ class ScheduleWindow(QWidget):
                 if match.get('match_id') == match_id:
                     old_mat = match.get('mat')
                     match['mat'] = target_mat
+                    notify_match_changed(self.tournament_data, match)
+                    journal_match_update(self.tournament_data, match)
                     print(f"[DRAG-DROP] Матч {match_id} перемещен с ковра {old_mat} на ковер {target_mat}")
                     break
         
@@ -772,7 +781,8 @@ class ScheduleWindow(QWidget):
             return
 
         match['status'] = 'В процессе'
-        match['started_at'] = datetime.now().strftime("%H:%M")
+        match['started_at'] = cluster_datetime().strftime("%H:%M")
+        match['started_ts'] = cluster_time()
 
         match_data = {
             'wrestler1': {
@@ -1245,7 +1255,8 @@ class MatScheduleWindow(QWidget):
             return
 
         match['status'] = 'В процессе'
-        match['started_at'] = datetime.now().strftime("%H:%M")
+        match['started_at'] = cluster_datetime().strftime("%H:%M")
+        match['started_ts'] = cluster_time()
         # Синхронизируем изменения в реальном времени
         self._sync_match_update(match)
 
@@ -1291,7 +1302,8 @@ class MatScheduleWindow(QWidget):
         m = item.data(Qt.UserRole) if item else None
         if m:
             m['status'] = 'Завершен'
-            m['completed_at'] = datetime.now().strftime("%H:%M")
+            m['completed_at'] = cluster_datetime().strftime("%H:%M")
+            m.setdefault('completed_ts', cluster_time())
             m['completed'] = True
             self.update_mat_schedule()
             # Синхронизируем изменения в реальном времени
@@ -1303,7 +1315,7 @@ class MatScheduleWindow(QWidget):
         if m:
             m['status'] = 'Ожидание'
             m['completed'] = False
-            for k in ('started_at', 'completed_at', 'winner', 'score1', 'score2'):
+            for k in ('started_at', 'completed_at', 'started_ts', 'completed_ts', 'winner', 'score1', 'score2'):
                 m.pop(k, None)
             self.update_mat_schedule()
             # Синхронизируем изменения в реальном времени
@@ -1338,6 +1350,14 @@ class MatScheduleWindow(QWidget):
     
     def _sync_match_update(self, match_data):
         """Синхронизирует обновление одного матча в реальном времени."""
+        notify_match_changed(self.tournament_data, match_data)
+        journal_match_update(self.tournament_data, match_data)
+        if self.tournament_data and match_data and match_data.get('mat') is not None:
+            try:
+                current = match_data if match_data.get('status') == 'В процессе' else None
+                forecast_mat(self.tournament_data, match_data.get('mat'), current_match=current)
+            except Exception as e:
+                print(f"[durations] Ошибка пересчёта ETA: {e}")
         schedule_sync = self._get_schedule_sync()
         if schedule_sync and match_data:
             try:
@@ -3,7 +3,8 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QMainWindow, QHBoxLay
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPropertyAnimation
 from PyQt5.QtGui import QKeySequence, QBrush, QColor, QKeyEvent
 from core.constants import *
-from core.network import NetworkManager
+from core.network import NetworkManager, mat_topic
+from core.scoreboard_clock import ClockFollower
 from core.settings import get_settings
 
 class ScoreboardDisplay(QWidget):
@@ -360,9 +361,12 @@ class ScoreboardDisplay(QWidget):
 
 class ScoreboardWindow(QMainWindow):
     closed = pyqtSignal()
-    def __init__(self, network_manager=None, parent=None):
+    # Обновления из сети приходят в потоке приёма — в UI передаём сигналом
+    scoreboard_message = pyqtSignal(dict)
+    def __init__(self, network_manager=None, parent=None, mat_number=None):
         super().__init__(parent)
         self.network_manager = network_manager
+        self.mat_number = mat_number
 
         # === 1. Окно ===
         self.setWindowFlags(
@@ -400,20 +404,37 @@ class ScoreboardWindow(QMainWindow):
         self.move_to_second_screen()
 
         
-        # === 8. ТАЙМЕР ДЛЯ ПЕРИОДИЧЕСКОГО ОБНОВЛЕНИЯ ===
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.request_update)
-        self.update_timer.start(1000)  # Запрос обновления каждую секунду
+        # === 8. ЛОКАЛЬНЫЕ ЧАСЫ ТАБЛО ===
+        # Панель присылает только переходы таймера, отсчёт идёт здесь (core.scoreboard_clock)
+        self.clock = ClockFollower()
 
         # === 9. ТАЙМЕР ДЛЯ ОБНОВЛЕНИЯ ВРЕМЕНИ НА ТАБЛО ===
+        # С частотой перерисовки; надпись меняется только при смене секунды
         self.time_update_timer = QTimer()
+        self.time_update_timer.setTimerType(Qt.PreciseTimer)
         self.time_update_timer.timeout.connect(self.update_time_display)
-        self.time_update_timer.start(500)  # Обновление времени каждые 500 мс (уменьшена частота для устранения мерцания)
+        self.time_update_timer.start(16)
         
         self.current_data = None
         self._last_is_break = False  # Инициализация для отслеживания состояния перерыва
 
+        # === 10. ПОДПИСКА НА ТАБЛО СВОЕГО КОВРА ===
+        # Клиент получает от сервера только обновления этого ковра, а не всех
+        self._scoreboard_topic = None
+        self.scoreboard_message.connect(self.handle_scoreboard_update)
+        if self.network_manager and self.mat_number and not self.network_manager.is_server:
+            self._scoreboard_topic = mat_topic(self.mat_number, "scoreboard")
+            self.network_manager.subscribe(self._scoreboard_topic, self._on_scoreboard_message)
+            # Одного запроса достаточно: дальше панель присылает изменения сама
+            QTimer.singleShot(0, self.request_update)
+
+    def _on_scoreboard_message(self, message, client_socket=None):
+        self.scoreboard_message.emit(message)
+
     def closeEvent(self, event):
+        if self._scoreboard_topic:
+            self.network_manager.unsubscribe(self._scoreboard_topic, self._on_scoreboard_message)
+            self._scoreboard_topic = None
         self.closed.emit()
         super().closeEvent(event)
 
@@ -427,9 +448,12 @@ class ScoreboardWindow(QMainWindow):
         """Обновляет отображение времени на табло"""
         if hasattr(self, 'current_data') and self.current_data:
             # Обновляем время на табло
-            period = self.current_data.get('period', 1)
-            time_remaining = self.current_data.get('time_remaining', PERIOD_DURATION)
-            is_break = self.current_data.get('is_break', False)
+            if self.clock.has_state():
+                time_remaining = self.clock.seconds()
+                is_break = self.clock.is_break
+            else:
+                time_remaining = self.current_data.get('time_remaining', PERIOD_DURATION)
+                is_break = self.current_data.get('is_break', False)
             
             if hasattr(self, 'display') and self.display:
                 # Обновляем только время, не трогая текст периода и стили
@@ -451,8 +475,6 @@ class ScoreboardWindow(QMainWindow):
 
     def handle_scoreboard_update(self, message, client_socket=None):
         """Обрабатывает обновления от NetworkManager"""
-        print(f"[ТАБЛО] Получено обновление: {message}")
-        
         if not hasattr(self, 'display') or self.display is None:
             print("ОШИБКА: display не инициализирован!")
             return
@@ -462,9 +484,15 @@ class ScoreboardWindow(QMainWindow):
             print("ОШИБКА: пустые данные в scoreboard_update")
             return
 
+        # Табло показывает только свой ковёр
+        if self.mat_number and data.get('mat') != self.mat_number:
+            return
+
         try:
             # Сохраняем текущие данные для обновления времени
             self.current_data = data
+            if data.get('clock'):
+                self.clock.apply(data['clock'])
             
             # === Красный ===
             red_data = data.get('red', {})
@@ -484,7 +512,7 @@ class ScoreboardWindow(QMainWindow):
 
             # === Период, категория и время ===
             period = data.get('period', 1)
-            time_remaining = data.get('time_remaining', PERIOD_DURATION)
+            time_remaining = self.clock.seconds() if self.clock.has_state() else data.get('time_remaining', PERIOD_DURATION)
             is_break = data.get('is_break', False)
             category = data.get('category', "")
 
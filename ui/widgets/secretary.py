@@ -5,8 +5,16 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLa
                              QTabWidget, QLineEdit, QTextEdit, QInputDialog, QApplication)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QBrush, QColor
-from core.utils import create_bracket, generate_schedule
+from core.utils import create_bracket, create_brackets_batch
 from core.settings import get_settings
+from core.durations import get_duration_model
+from core.ratings import seeding_ratings
+from core.journal import journal_schedule, journal_schedule_delta
+from core.autosave import get_snapshot_service
+from core.tournament_file import TOURNAMENT_FILE_FILTER
+from ui.widgets.save_status import report_save_result
+from core.schedule_time import migrate_schedule, sort_schedule
+from core.schedule_cache import update_schedule
 from ui.dialogs.wrestler_dialogs import AddWrestlerDialog, MoveWrestlerDialog
 from ui.dialogs.category_dialogs import CategoryEditDialog
 from ui.widgets.network_sync_tab import NetworkSyncTab
@@ -238,17 +246,17 @@ class SecretaryWindow(QMainWindow):
 
     def regenerate_bracket(self, cat):
         wrestlers = self.tournament_data['categories'][cat]['participants']
-        bracket = create_bracket(wrestlers, cat)
+        bracket = create_bracket(wrestlers, cat, ratings=seeding_ratings({cat: self.tournament_data['categories'][cat]}))
         self.tournament_data['categories'][cat]['matches'] = bracket['matches']
         self.tournament_data['categories'][cat]['type'] = bracket['type']
 
     def regenerate_all(self):
-        for cat in self.tournament_data['categories']:
-            self.regenerate_bracket(cat)
-        self.generate_schedule()
+        create_brackets_batch(self.tournament_data['categories'], ratings=seeding_ratings(self.tournament_data['categories']))
+        # Сетки построены заново (результаты сброшены) — расписание тоже целиком
+        self.generate_schedule(force=True)
         self.broadcast_update()
 
-    def generate_schedule(self):
+    def generate_schedule(self, force=False):
         try:
             settings = get_settings()
             # Перезагружаем настройки перед генерацией
@@ -259,8 +267,14 @@ class SecretaryWindow(QMainWindow):
                 n_mats = 2  # Минимум 2 ковра
                 settings.set("tournament", "number_of_mats", n_mats)
                 print(f"[WARNING] Количество ковров было меньше 1, установлено значение {n_mats}")
-            schedule = generate_schedule(self.tournament_data, start_time="10:00", match_duration=8, n_mats=n_mats)
-            self.tournament_data['schedule'] = schedule
+            _, changed = update_schedule(
+                self.tournament_data, n_mats=n_mats, start_time="10:00", match_duration=8,
+                duration_model=get_duration_model(), force=force,
+            )
+            if changed is not None and not changed:
+                print("[INFO] Использовано сохранённое расписание")
+                return
+            journal_schedule(self.tournament_data)
             print(f"[INFO] Расписание сгенерировано для {n_mats} ковров")
         except Exception as e:
             print("Ошибка генерации расписания:", e)
@@ -296,31 +310,25 @@ class SecretaryWindow(QMainWindow):
             )
 
         existing = self.tournament_data.get('schedule', []) if isinstance(self.tournament_data, dict) else []
+        migrate_schedule(schedule)
         merged = {}
         for m in existing:
             merged[make_key(m)] = m
         for m in schedule:
             merged[make_key(m)] = m
-        merged_list = list(merged.values())
-        merged_list.sort(key=lambda x: (
-            x.get('time', ''),
-            x.get('mat', 0),
-            x.get('round', 0),
-            x.get('match_id', '')
-        ))
-        self.tournament_data['schedule'] = merged_list
+        self.tournament_data['schedule'] = sort_schedule(merged.values())
+        journal_schedule_delta(self.tournament_data, existing)
         # уведомляем главное окно о смене данных
         if self.parent() and hasattr(self.parent(), 'update_schedule_tab'):
             self.parent().update_schedule_tab()
         QMessageBox.information(self, "Синхронизация", "Расписание обновлено из сети.")
 
     def save_tournament(self):
-        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить", "", "JSON (*.json)")
+        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить", "", TOURNAMENT_FILE_FILTER)
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(self.tournament_data, f, ensure_ascii=False, indent=2, default=str)
-                QMessageBox.information(self, "Успех", "Турнир сохранён")
+                future = get_snapshot_service().save_async(self.tournament_data, filename)
+                report_save_result(self, future, "Турнир сохранён")
                 self.broadcast_update()
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", str(e))
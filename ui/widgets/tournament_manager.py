@@ -6,12 +6,22 @@ from PyQt5.QtWidgets import (
     QLabel, QPushButton, QFrame, QGridLayout, QGroupBox,
     QLineEdit, QTextEdit, QMessageBox, QFileDialog, QTabWidget,
     QTableWidget, QTableWidgetItem, QComboBox, QListWidget,
-    QSplitter, QProgressBar, QHeaderView, QDialog, QDialogButtonBox, QFormLayout, QDesktopWidget
+    QSplitter, QProgressBar, QHeaderView, QDialog, QDialogButtonBox, QFormLayout, QDesktopWidget,
+    QInputDialog
 )
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QScreen, QPainter, QPen, QBrush, QColor, QPixmap
-from core.utils import create_bracket, generate_schedule, get_wrestler_club
+from core.utils import create_bracket, create_brackets_batch, get_wrestler_club
 from core.settings import get_settings
+from core.durations import get_duration_model
+from core.ratings import seeding_ratings
+from core.journal import journal_schedule
+from core.repository import get_repository, save_tournament_to_db
+from core.autosave import get_snapshot_service
+from core.tournament_file import TOURNAMENT_FILE_FILTER, load_tournament_file
+from ui.widgets.save_status import report_save_result
+from core.schedule_time import migrate_schedule
+from core.schedule_cache import update_schedule
 from ui.dialogs.wrestler_dialogs import AddWrestlerDialog, MoveWrestlerDialog
 from ui.dialogs.category_dialogs import CategoryEditDialog
 from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsRectItem, QGraphicsTextItem, QColorDialog
@@ -1140,6 +1150,9 @@ class TournamentManager(QWidget):
         load_btn = QPushButton("Загрузить турнир из JSON")
         load_btn.clicked.connect(self.load_tournament)
         load_layout.addWidget(load_btn)
+        load_db_btn = QPushButton("Загрузить турнир из БД")
+        load_db_btn.clicked.connect(self.load_tournament_from_db)
+        load_layout.addWidget(load_db_btn)
         self.tournament_label = QLabel("Турнир не загружен")
         load_layout.addWidget(self.tournament_label)
         layout.addWidget(load_group)
@@ -1420,32 +1433,57 @@ class TournamentManager(QWidget):
             self.bracket_window.update_bracket(cat)
 
     def load_tournament(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "Открыть турнир", "", "JSON files (*.json)")
+        filename, _ = QFileDialog.getOpenFileName(self, "Открыть турнир", "", TOURNAMENT_FILE_FILTER)
         if filename:
             self.load_tournament_from_file(filename)
 
     def load_tournament_from_file(self, filename):
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                self.tournament_data = json.load(f)
+            self.tournament_data = load_tournament_file(filename)
+            self._apply_loaded_tournament()
+            save_tournament_to_db(self.tournament_data)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить: {e}")
 
-            self.tournament_label.setText(f"Загружен: {self.tournament_data.get('name', 'Без имени')}")
-            self.update_tournament_info()
-            self.update_categories_lists()
-            self.generate_tournament_schedule()
+    def load_tournament_from_db(self):
+        """Загрузка турнира из БД: категории подгружаются по мере обращения к ним."""
+        try:
+            repository = get_repository()
+            tournaments = repository.list_tournaments()
+            if not tournaments:
+                QMessageBox.information(self, "БД", "В базе нет сохранённых турниров")
+                return
+            labels = [
+                f"{t['name']} — {t.get('date') or ''} {t.get('location') or ''} (участников: {t['participants']})"
+                for t in tournaments
+            ]
+            label, ok = QInputDialog.getItem(self, "Загрузить турнир из БД", "Турнир:", labels, 0, False)
+            if not ok:
+                return
+            tournament_id = tournaments[labels.index(label)]['id']
+            self.tournament_data = repository.load(tournament_id)
+            self._apply_loaded_tournament(regenerate_schedule=not self.tournament_data.get('schedule'))
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить из БД: {e}")
 
-            self.info_group.setVisible(True)
-            self.management_group.setVisible(True)
-            self.matches_group.setVisible(True)
+    def _apply_loaded_tournament(self, regenerate_schedule=True):
+        migrate_schedule(self.tournament_data.get('schedule'))
 
-            if self.bracket_window:
-                self.bracket_window.tournament_data = self.tournament_data
-                current_cat = self.category_combo.currentText()
-                if current_cat:
-                    self.bracket_window.update_bracket(current_cat)
+        self.tournament_label.setText(f"Загружен: {self.tournament_data.get('name', 'Без имени')}")
+        self.update_tournament_info()
+        self.update_categories_lists()
+        if regenerate_schedule:
+            self.generate_tournament_schedule()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить: {e}")
+        self.info_group.setVisible(True)
+        self.management_group.setVisible(True)
+        self.matches_group.setVisible(True)
+
+        if self.bracket_window:
+            self.bracket_window.tournament_data = self.tournament_data
+            current_cat = self.category_combo.currentText()
+            if current_cat:
+                self.bracket_window.update_bracket(current_cat)
 
     def update_tournament_info(self):
         if not self.tournament_data:
@@ -1668,7 +1706,7 @@ class TournamentManager(QWidget):
 
     def regenerate_bracket(self, cat):
         wrestlers = self.tournament_data['categories'][cat]['participants']
-        new_bracket = create_bracket(wrestlers, cat)
+        new_bracket = create_bracket(wrestlers, cat, ratings=seeding_ratings({cat: self.tournament_data['categories'][cat]}))
         self.tournament_data['categories'][cat]['matches'] = new_bracket['matches']
         self.tournament_data['categories'][cat]['type'] = new_bracket['type']
 
@@ -1710,13 +1748,11 @@ class TournamentManager(QWidget):
             QMessageBox.warning(self, "Ошибка", "Турнир не загружен")
             return
 
-        for cat, data in self.tournament_data['categories'].items():
-            wrestlers = data.get('participants', [])
-            bracket = create_bracket(wrestlers, cat, bracket_type='round_robin')
-            data['matches'] = bracket.get('matches', [])
-            data['type'] = bracket.get('type', 'round_robin')
+        # Сетки всех категорий строятся пакетно, расписание — один раз в конце
+        create_brackets_batch(self.tournament_data['categories'], bracket_type='round_robin')
 
-        self.generate_tournament_schedule()
+        # Сетки построены заново (результаты сброшены) — расписание тоже целиком
+        self.generate_tournament_schedule(force=True)
 
         current_cat = self.category_combo.currentText()
         if current_cat:
@@ -1726,7 +1762,11 @@ class TournamentManager(QWidget):
 
         QMessageBox.information(self, "Готово", "Для всех категорий созданы круговые сетки.")
 
-    def generate_tournament_schedule(self):
+    def generate_tournament_schedule(self, force=False):
+        """
+        Обновляет расписание: пересобираются только категории, чьи схватки
+        изменились (см. core.schedule_cache); force=True — полная генерация.
+        """
         if not self.tournament_data:
             return
         try:
@@ -1739,14 +1779,18 @@ class TournamentManager(QWidget):
                 n_mats = 2  # Минимум 2 ковра
                 settings.set("tournament", "number_of_mats", n_mats)
                 print(f"[WARNING] Количество ковров было меньше 1, установлено значение {n_mats}")
-            schedule = generate_schedule(self.tournament_data, start_time="10:00", match_duration=8, n_mats=n_mats)
-            self.tournament_data["schedule"] = schedule
+            _, changed = update_schedule(
+                self.tournament_data, n_mats=n_mats, start_time="10:00", match_duration=8,
+                duration_model=get_duration_model(), force=force,
+            )
+            if changed is not None and not changed:
+                # Сохранённое расписание актуально — ни журнала, ни рассылки по сети
+                print("[INFO] Использовано сохранённое расписание")
+                self._refresh_schedule_views()
+                return
+            journal_schedule(self.tournament_data)
             print(f"[INFO] Расписание сгенерировано для {n_mats} ковров")
-            main_window = self.window()
-            if hasattr(main_window, 'update_schedule_tab'):
-                main_window.update_schedule_tab()
-            if hasattr(self, 'mat_schedule_window') and self.mat_schedule_window:
-                self.mat_schedule_window.update_data(self.tournament_data)
+            self._refresh_schedule_views()
             # Синхронизируем изменения
             self._sync_tournament_changes()
         except Exception as e:
@@ -1754,6 +1798,13 @@ class TournamentManager(QWidget):
             import traceback
             traceback.print_exc()
 
+    def _refresh_schedule_views(self):
+        main_window = self.window()
+        if hasattr(main_window, 'update_schedule_tab'):
+            main_window.update_schedule_tab()
+        if hasattr(self, 'mat_schedule_window') and self.mat_schedule_window:
+            self.mat_schedule_window.update_data(self.tournament_data)
+
     def update_matches_list(self, cat):
         self.matches_list.clear()
         if not cat or not self.tournament_data:
@@ -1831,13 +1882,13 @@ class TournamentManager(QWidget):
         if not self.tournament_data:
             QMessageBox.warning(self, "Ошибка", "Нет данных для сохранения")
             return
-        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить турнир", "", "JSON files (*.json)")
+        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить турнир", "", TOURNAMENT_FILE_FILTER)
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(self.tournament_data, f, ensure_ascii=False, indent=2, default=str)
-                self.load_tournament_from_file(filename)
-                QMessageBox.information(self, "Успех", "Турнир сохранен и перезагружен")
+                # Данные в памяти и есть сохранённое состояние — перечитывать файл не нужно
+                future = get_snapshot_service().save_async(self.tournament_data, filename)
+                report_save_result(self, future, "Турнир сохранен")
+                save_tournament_to_db(self.tournament_data)
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", str(e))
 